@@ -0,0 +1,230 @@
+"""
+Perencanaan alokasi kamar otomatis untuk calon penghuni baru (tanpa akses database).
+
+Kolom CSV calon penghuni (tidak peka huruf besar/kecil):
+    nim            : wajib, hanya angka
+    nama_penghuni  : wajib (alias: nama)
+    fakultas       : opsional; dipakai untuk mengelompokkan penghuni satu fakultas dalam kamar yang sama
+    asrama_id      : opsional, asrama yang diutamakan, atau kolom nama_asrama (alias: asrama)
+    grup           : opsional (alias: kelompok); calon dengan label grup yang sama ditempatkan bersama
+
+Algoritma greedy best-fit: grup diproses dari yang terbesar, lalu calon perorangan per fakultas. Setiap unit
+masuk ke kamar dengan sisa tempat terkecil yang masih cukup, dengan urutan preferensi: asrama pilihan,
+kamar yang penghuninya satu fakultas dengan unit, kamar kosong, lalu kamar mana pun. Kamar dikelompokkan
+per (label fakultas, asrama, sisa tempat); setiap (label, asrama) menyimpan daftar terurut sisa tempat yang
+masih berisi kamar, sehingga pencarian cukup satu bisect per asrama dan tidak bergantung pada kamar terbesar.
+Grup yang tidak muat di satu kamar dipecah ke kamar-kamar dengan sisa terbanyak di asrama yang sama.
+"""
+import bisect
+import collections
+import time
+
+import impor_csv
+
+ALIAS_KOLOM = {"kelompok": "grup"}
+
+# Label kamar: nama fakultas jika semua penghuninya (yang berfakultas) satu fakultas.
+KAMAR_KOSONG = "__kosong__"
+KAMAR_CAMPURAN = "__campuran__"
+SEMUA_KAMAR = "__semua__"
+
+
+def baca_calon_penghuni(sumber, asrama_per_nama):
+    """
+    Membaca CSV calon penghuni lalu memeriksa format dan NIM ganda di dalam file.
+    Mengembalikan (calon, ditolak, total); calon berisi nim, nama_penghuni, fakultas, asrama_id, grup, baris.
+    """
+    calon, ditolak, nim_di_file, total = [], [], set(), 0
+    for nomor_baris, baris in impor_csv.baca_csv_penghuni(sumber):
+        total += 1
+        baris = {ALIAS_KOLOM.get(k, k): v for k, v in baris.items()}
+        data, alasan = normalisasi_calon(baris, asrama_per_nama)
+        if alasan:
+            ditolak.append({'baris': nomor_baris, 'nim': baris.get('nim', ''), 'alasan': alasan})
+        elif data['nim'] in nim_di_file:
+            ditolak.append({'baris': nomor_baris, 'nim': data['nim'], 'alasan': "NIM ganda di dalam file."})
+        else:
+            nim_di_file.add(data['nim'])
+            calon.append(dict(data, baris=nomor_baris))
+    return calon, ditolak, total
+
+
+def normalisasi_calon(baris, asrama_per_nama):
+    """Memeriksa format satu baris calon. Mengembalikan (data, None) jika valid, atau (None, alasan) jika ditolak."""
+    nim = baris.get("nim", "")
+    if not nim or not nim.isdigit():
+        return None, "NIM tidak valid (harus berupa angka dan tidak boleh kosong)."
+    nama = baris.get("nama_penghuni", "")
+    if not nama:
+        return None, "Nama penghuni kosong."
+    asrama_id = None
+    if baris.get("asrama_id"):
+        try:
+            asrama_id = int(baris["asrama_id"])
+        except ValueError:
+            return None, "ID asrama tidak valid."
+    elif baris.get("nama_asrama"):
+        asrama_id = asrama_per_nama.get(baris["nama_asrama"])
+        if asrama_id is None:
+            return None, f"Asrama '{baris['nama_asrama']}' tidak ditemukan."
+    return {"nim": nim, "nama_penghuni": nama, "fakultas": baris.get("fakultas") or None,
+            "asrama_id": asrama_id, "grup": baris.get("grup") or None}, None
+
+
+def label_kamar(jumlah_penghuni, fakultas_penghuni):
+    """Label fakultas kamar dari jumlah penghuni dan himpunan nama fakultas penghuninya."""
+    if not jumlah_penghuni:
+        return KAMAR_KOSONG
+    return next(iter(fakultas_penghuni)) if len(fakultas_penghuni) == 1 else KAMAR_CAMPURAN
+
+
+class _PetaKosong:
+    """
+    Kamar yang masih memiliki tempat, dikelompokkan per (label, asrama_id) lalu per sisa tempat. _daftar_sisa
+    menyimpan sisa tempat yang keranjangnya tidak kosong (terurut naik) untuk setiap (label, asrama_id).
+    """
+
+    def __init__(self, kamar_kosong, fakultas_per_kamar, kelompok_fakultas):
+        self._kelompok_fakultas = kelompok_fakultas
+        self._kamar = {}
+        self._fakultas = {}
+        self._label = {}
+        self._ember = collections.defaultdict(dict)
+        self._daftar_sisa = collections.defaultdict(list)
+        self.sisa_per_asrama = collections.Counter()
+        for k in sorted(kamar_kosong, key=lambda k: (k['asrama_id'], k['nomor_kamar'])):
+            if k['sisa_kapasitas'] <= 0:
+                continue
+            kamar_id = k['kamar_id_internal']
+            self._kamar[kamar_id] = dict(k)
+            self._fakultas[kamar_id] = set(fakultas_per_kamar.get(kamar_id, ()))
+            self._label[kamar_id] = label_kamar(k['jumlah_penghuni'], self._fakultas[kamar_id]) if kelompok_fakultas else SEMUA_KAMAR
+            self._masukkan(kamar_id)
+            self.sisa_per_asrama[k['asrama_id']] += k['sisa_kapasitas']
+        self.daftar_asrama = sorted(self.sisa_per_asrama)
+
+    def _kunci_ember(self, kamar_id):
+        asrama_id = self._kamar[kamar_id]['asrama_id']
+        kunci = [(SEMUA_KAMAR, asrama_id)]
+        if self._label[kamar_id] != SEMUA_KAMAR:
+            kunci.append((self._label[kamar_id], asrama_id))
+        return kunci
+
+    def _masukkan(self, kamar_id):
+        sisa = self._kamar[kamar_id]['sisa_kapasitas']
+        if sisa > 0:
+            for kunci in self._kunci_ember(kamar_id):
+                if (kunci, sisa) not in self._ember:
+                    bisect.insort(self._daftar_sisa[kunci], sisa)
+                self._ember[kunci, sisa][kamar_id] = None
+
+    def _keluarkan(self, kamar_id):
+        sisa = self._kamar[kamar_id]['sisa_kapasitas']
+        for kunci in self._kunci_ember(kamar_id):
+            ember = self._ember.get((kunci, sisa))
+            if ember is None or ember.pop(kamar_id, False) is False:
+                continue
+            if not ember:
+                del self._ember[kunci, sisa]
+                daftar = self._daftar_sisa[kunci]
+                del daftar[bisect.bisect_left(daftar, sisa)]
+
+    def cari_pas(self, jumlah, daftar_asrama, urutan_label):
+        """Kamar dengan sisa terkecil >= jumlah, mengikuti urutan label lalu urutan asrama; None jika tidak ada."""
+        for label in urutan_label:
+            terbaik = None
+            for asrama_id in daftar_asrama:
+                daftar = self._daftar_sisa.get((label, asrama_id))
+                if not daftar:
+                    continue
+                i = bisect.bisect_left(daftar, jumlah)
+                if i < len(daftar) and (terbaik is None or daftar[i] < terbaik[0]):
+                    terbaik = (daftar[i], asrama_id)
+            if terbaik is not None:
+                return next(iter(self._ember[(label, terbaik[1]), terbaik[0]]))
+        return None
+
+    def cari_terbesar(self, asrama_id):
+        """Kamar dengan sisa terbanyak di satu asrama; None jika asrama sudah penuh."""
+        kunci = (SEMUA_KAMAR, asrama_id)
+        daftar = self._daftar_sisa.get(kunci)
+        return next(iter(self._ember[kunci, daftar[-1]])) if daftar else None
+
+    def sisa(self, kamar_id):
+        return self._kamar[kamar_id]['sisa_kapasitas']
+
+    def tempatkan(self, kamar_id, daftar_calon):
+        """Mengurangi sisa kamar dan memperbarui label fakultasnya; mengembalikan baris penempatan."""
+        self._keluarkan(kamar_id)
+        kamar = self._kamar[kamar_id]
+        kamar['sisa_kapasitas'] -= len(daftar_calon)
+        kamar['jumlah_penghuni'] += len(daftar_calon)
+        self.sisa_per_asrama[kamar['asrama_id']] -= len(daftar_calon)
+        if self._kelompok_fakultas:
+            self._fakultas[kamar_id].update(c['fakultas'] for c in daftar_calon if c['fakultas'])
+            self._label[kamar_id] = label_kamar(kamar['jumlah_penghuni'], self._fakultas[kamar_id])
+        self._masukkan(kamar_id)
+        return [dict(c, kamar_id_internal=kamar_id, nomor_kamar=kamar['nomor_kamar'], asrama_id=kamar['asrama_id'],
+                     nama_asrama=kamar['nama_asrama'], asrama_pilihan=c['asrama_id']) for c in daftar_calon]
+
+
+def _unit_penempatan(calon, satukan_grup):
+    """Grup (terbesar lebih dulu) lalu calon perorangan diurutkan per fakultas agar satu fakultas berdekatan."""
+    grup, perorangan = collections.OrderedDict(), []
+    for c in calon:
+        if satukan_grup and c['grup']:
+            grup.setdefault(c['grup'], []).append(c)
+        else:
+            perorangan.append([c])
+    perorangan.sort(key=lambda unit: (unit[0]['fakultas'] or "", unit[0]['asrama_id'] or 0))
+    return sorted(grup.values(), key=len, reverse=True) + perorangan
+
+
+def rencanakan_alokasi(calon, kamar_kosong, fakultas_per_kamar=None, kelompok_fakultas=True, satukan_grup=True):
+    """
+    Menyusun rencana penempatan tanpa mengubah database.
+    calon: hasil baca_calon_penghuni. kamar_kosong: baris cari_kamar_kosong (kamar_id_internal, nomor_kamar,
+    asrama_id, nama_asrama, jumlah_penghuni, sisa_kapasitas). fakultas_per_kamar: {kamar_id_internal: {nama fakultas}}
+    penghuni saat ini. Mengembalikan {'penempatan': [calon + kamar tujuan], 'tidak_ditempatkan': [calon + alasan],
+    'jumlah_kamar': n, 'durasi_detik': d}.
+    """
+    mulai = time.perf_counter()
+    peta = _PetaKosong(kamar_kosong, fakultas_per_kamar or {}, kelompok_fakultas)
+    penempatan, tidak_ditempatkan = [], []
+    for unit in _unit_penempatan(calon, satukan_grup):
+        pilihan = next((c['asrama_id'] for c in unit if c['asrama_id'] in peta.sisa_per_asrama), None)
+        urutan_asrama = ([[pilihan]] if pilihan is not None else []) + [[a for a in peta.daftar_asrama if a != pilihan]]
+        if kelompok_fakultas:
+            fakultas = collections.Counter(c['fakultas'] for c in unit if c['fakultas']).most_common(1)
+            urutan_label = [fakultas[0][0], KAMAR_KOSONG, SEMUA_KAMAR] if fakultas else [SEMUA_KAMAR]
+        else:
+            urutan_label = [SEMUA_KAMAR]
+
+        kamar_id = None
+        for daftar_asrama in urutan_asrama:
+            kamar_id = peta.cari_pas(len(unit), daftar_asrama, urutan_label)
+            if kamar_id is not None:
+                break
+        if kamar_id is not None:
+            penempatan.extend(peta.tempatkan(kamar_id, unit))
+            continue
+
+        # Grup lebih besar dari kamar mana pun: pecah ke kamar dengan sisa terbanyak, asrama sebanyak mungkin tetap sama.
+        sisa_unit = list(unit)
+        urutan_pecah = ([pilihan] if pilihan is not None else []) + sorted(
+            (a for a in peta.daftar_asrama if a != pilihan), key=lambda a: peta.sisa_per_asrama[a], reverse=True)
+        for asrama_id in urutan_pecah:
+            while sisa_unit:
+                kamar_id = peta.cari_terbesar(asrama_id)
+                if kamar_id is None:
+                    break
+                jumlah = min(len(sisa_unit), peta.sisa(kamar_id))
+                penempatan.extend(peta.tempatkan(kamar_id, sisa_unit[:jumlah]))
+                sisa_unit = sisa_unit[jumlah:]
+            if not sisa_unit:
+                break
+        tidak_ditempatkan.extend(dict(c, alasan="Tidak ada tempat kosong yang tersisa.") for c in sisa_unit)
+
+    return {'penempatan': penempatan, 'tidak_ditempatkan': tidak_ditempatkan,
+            'jumlah_kamar': len({p['kamar_id_internal'] for p in penempatan}),
+            'durasi_detik': round(time.perf_counter() - mulai, 3)}
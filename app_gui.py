@@ -2,8 +2,10 @@ from tkinter import Canvas, messagebox, NW
 from PIL import Image, ImageTk
 import tkinter as tk
 import os
-from database_service import DatabaseService
+from backend_db import buat_database_service
+from seeding import muat_tata_letak
 from screen_manager import ScreenManager
+from db_executor import DbExecutor
 class AppGui: 
     def __init__(self, root_window):
         self.window = root_window
@@ -19,15 +21,38 @@ class AppGui:
         self.asset_path = "./assets/um.png" 
         self._load_assets()
         
+        DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+        DB_SQLITE_PATH = os.getenv("DB_SQLITE_PATH", "./asrama.db")
         MYSQL_HOST = os.getenv("DB_HOST", "localhost")
         MYSQL_USER = os.getenv("DB_USER", "root")
         MYSQL_PASSWORD = os.getenv("DB_PASSWORD", "") 
         MYSQL_DB_NAME = os.getenv("DB_NAME", "asrama_db_mysql") 
+        DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+        DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+        DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "1800"))
+        DB_SEED_LAYOUT = os.getenv("DB_SEED_LAYOUT")
+        DB_SEED_TANPA_AUDIT = os.getenv("DB_SEED_TANPA_AUDIT", "0") == "1"
+        DB_AUDIT_RETENSI_BULAN = int(os.getenv("DB_AUDIT_RETENSI_BULAN", "0")) or None
+        DB_CACHE_TTL = float(os.getenv("DB_CACHE_TTL", "60"))
+        DB_STATS = os.getenv("DB_STATS", "0") == "1"
+        DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "0")) or None
+        DB_SLOW_QUERY_LOG = os.getenv("DB_SLOW_QUERY_LOG", "./slow_query.log")
+        DB_AUDIT_MODE = os.getenv("DB_AUDIT_MODE", "trigger").lower()
+        DB_POLL_PERUBAHAN_MS = int(os.getenv("DB_POLL_PERUBAHAN_MS", "3000"))
         
-        self.db_service = DatabaseService(host=MYSQL_HOST, user=MYSQL_USER, password=MYSQL_PASSWORD, database_name=MYSQL_DB_NAME, parent_window=self.window) 
-        self.screen_manager = ScreenManager(self, self.db_service)
+        opsi_umum = dict(parent_window=self.window, seed_tata_letak=muat_tata_letak(DB_SEED_LAYOUT) if DB_SEED_LAYOUT else None,
+                         seed_tanpa_audit=DB_SEED_TANPA_AUDIT, audit_retensi_bulan=DB_AUDIT_RETENSI_BULAN, cache_ttl=DB_CACHE_TTL,
+                         statistik_kueri=DB_STATS, ambang_lambat_ms=DB_SLOW_QUERY_MS, log_kueri_lambat=DB_SLOW_QUERY_LOG if DB_SLOW_QUERY_MS else None,
+                         audit_mode=DB_AUDIT_MODE)
+        if DB_BACKEND == "sqlite":
+            self.db_service = buat_database_service("sqlite", path=DB_SQLITE_PATH, timeout=DB_POOL_TIMEOUT, **opsi_umum)
+        else:
+            self.db_service = buat_database_service(DB_BACKEND, host=MYSQL_HOST, user=MYSQL_USER, password=MYSQL_PASSWORD, database_name=MYSQL_DB_NAME,
+                                                    pool_size=DB_POOL_SIZE, pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE, **opsi_umum)
+        self.db_executor = DbExecutor(self.window, max_workers=max(1, DB_POOL_SIZE - 1))
+        self.screen_manager = ScreenManager(self, self.db_service, interval_perubahan_ms=DB_POLL_PERUBAHAN_MS)
         
-        if self.db_service._conn and self.db_service._conn.is_connected(): 
+        if self.db_service.is_connected(): 
             self._draw_background()
             self.screen_manager.show_login_screen() 
         else:
@@ -82,6 +107,7 @@ class AppGui:
 
     def quit(self):
         if messagebox.askokcancel("Keluar", "Anda yakin ingin keluar dari aplikasi?", parent=self.window):
+            self.db_executor.tutup()
             if self.db_service: 
                 self.db_service._close()
             self.window.quit()
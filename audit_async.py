@@ -0,0 +1,126 @@
+"""
+Penulis log audit asinkron untuk mode audit aplikasi.
+
+Dalam mode ini trigger log Penghuni tidak mencatat apa pun (variabel sesi @audit_mode_aplikasi = 1).
+DatabaseService membuat satu event per perubahan setelah transaksinya commit dan menyerahkannya ke
+PenulisAuditAsinkron; thread latar mengumpulkan event lalu menulisnya dengan INSERT multi-baris, di luar
+transaksi pengguna. Event yang masih di antrian hilang jika proses berhenti mendadak; setelah flush()
+mengembalikan True, semua event sebelumnya sudah tersimpan (commit).
+"""
+import collections
+import threading
+import time
+
+
+def event_penghuni(aksi, nim, user_aksi, nama_lama=None, nama_baru=None, fakultas_lama=None, fakultas_baru=None,
+                   kamar_lama=None, kamar_baru=None):
+    """
+    Satu perubahan data penghuni. fakultas_* berisi fakultas_id (int) atau nama fakultas (str);
+    kamar_* berisi kamar_id_internal (int) atau tuple (nomor_kamar, asrama_id). Nama kamar, asrama, dan
+    fakultas dilengkapi saat event ditulis; waktu_aksi diisi server saat INSERT.
+    """
+    return {
+        'aksi': aksi, 'nim': nim, 'user_aksi': user_aksi,
+        'nama_lama': nama_lama, 'nama_baru': nama_baru,
+        'fakultas_lama': fakultas_lama, 'fakultas_baru': fakultas_baru,
+        'kamar_lama': kamar_lama, 'kamar_baru': kamar_baru,
+    }
+
+
+class PenulisAuditAsinkron:
+    """
+    Antrian event audit dengan satu thread penulis. Batch ditulis saat antrian mencapai ukuran_batch,
+    setelah interval_detik, atau saat flush() dipanggil. Batch yang gagal dikembalikan ke depan antrian
+    dan dicoba lagi setelah interval_detik. Jika antrian mencapai maks_antrian, catat() menunggu sampai ada ruang.
+    """
+    def __init__(self, tulis_batch, interval_detik=1.0, ukuran_batch=500, maks_antrian=100000):
+        self._tulis_batch = tulis_batch
+        self._interval = interval_detik
+        self._ukuran_batch = ukuran_batch
+        self._maks_antrian = maks_antrian
+        self._antrian = collections.deque()
+        self._kondisi = threading.Condition()
+        self._sedang_ditulis = 0
+        self._flush_diminta = 0
+        self._berhenti = False
+        self._ditulis = 0
+        self._batch_gagal = 0
+        self._thread = threading.Thread(target=self._jalan, name="PenulisAudit", daemon=True)
+        self._thread.start()
+
+    def catat(self, daftar_event):
+        with self._kondisi:
+            for event in daftar_event:
+                while len(self._antrian) >= self._maks_antrian and self._thread.is_alive():
+                    self._kondisi.wait(self._interval)
+                self._antrian.append(event)
+            if len(self._antrian) >= self._ukuran_batch:
+                self._kondisi.notify_all()
+
+    def _siap_tulis(self):
+        if not self._antrian:
+            return self._berhenti
+        return self._berhenti or self._flush_diminta > 0 or len(self._antrian) >= self._ukuran_batch
+
+    def _jalan(self):
+        while True:
+            with self._kondisi:
+                tenggat = time.monotonic() + self._interval
+                while not self._siap_tulis():
+                    sisa = tenggat - time.monotonic()
+                    if sisa <= 0 and self._antrian:
+                        break
+                    self._kondisi.wait(sisa if sisa > 0 else self._interval)
+                if not self._antrian:
+                    return
+                batch = [self._antrian.popleft() for _ in range(min(self._ukuran_batch, len(self._antrian)))]
+                self._sedang_ditulis = len(batch)
+            try:
+                self._tulis_batch(batch)
+                berhasil = True
+            except Exception as err:
+                print(f"Gagal menulis {len(batch)} log audit ({err}); akan dicoba lagi.")
+                berhasil = False
+            with self._kondisi:
+                self._sedang_ditulis = 0
+                if berhasil:
+                    self._ditulis += len(batch)
+                else:
+                    self._batch_gagal += 1
+                    self._antrian.extendleft(reversed(batch))
+                self._kondisi.notify_all()
+                if not berhasil:
+                    if self._berhenti:
+                        print(f"Penulis audit berhenti dengan {len(self._antrian)} log audit yang belum tersimpan.")
+                        return
+                    self._kondisi.wait(self._interval)
+
+    def flush(self, timeout=None):
+        """Menunggu semua event yang sudah dicatat tersimpan. False jika ada batch gagal atau timeout habis."""
+        tenggat = None if timeout is None else time.monotonic() + timeout
+        with self._kondisi:
+            gagal_awal = self._batch_gagal
+            self._flush_diminta += 1
+            self._kondisi.notify_all()
+            try:
+                while self._antrian or self._sedang_ditulis:
+                    if self._batch_gagal != gagal_awal or not self._thread.is_alive():
+                        return False
+                    sisa = None if tenggat is None else tenggat - time.monotonic()
+                    if sisa is not None and sisa <= 0:
+                        return False
+                    self._kondisi.wait(sisa)
+                return True
+            finally:
+                self._flush_diminta -= 1
+
+    def hentikan(self, timeout=10.0):
+        """Menulis sisa antrian lalu menghentikan thread penulis."""
+        with self._kondisi:
+            self._berhenti = True
+            self._kondisi.notify_all()
+        self._thread.join(timeout)
+
+    def statistik(self):
+        with self._kondisi:
+            return {'antrian': len(self._antrian), 'ditulis': self._ditulis, 'batch_gagal': self._batch_gagal}
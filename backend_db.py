@@ -0,0 +1,24 @@
+"""
+Pemilihan backend penyimpanan. Kedua service memiliki metode publik yang sama, sehingga layar
+dan DbExecutor tidak perlu tahu backend mana yang dipakai.
+
+    mysql  : DatabaseService (database_service.py), server MySQL dengan pool koneksi
+    sqlite : SQLiteDatabaseService (sqlite_service.py), satu file lokal tanpa server
+"""
+
+BACKEND_DB = ("mysql", "sqlite")
+
+
+def buat_database_service(backend, **opsi):
+    """
+    Membuat service untuk backend yang diminta; opsi diteruskan ke konstruktor service tersebut.
+    Modul backend diimpor saat dibutuhkan, sehingga backend sqlite tidak memerlukan mysql-connector.
+    """
+    backend = (backend or "mysql").lower()
+    if backend == "mysql":
+        from database_service import DatabaseService
+        return DatabaseService(**opsi)
+    if backend == "sqlite":
+        from sqlite_service import SQLiteDatabaseService
+        return SQLiteDatabaseService(**opsi)
+    raise ValueError(f"Backend database tidak dikenal: {backend} (pilihan: {', '.join(BACKEND_DB)}).")
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+
+# Skrip pengukuran kinerja; dijalankan dari root proyek, misalnya: python -m benchmarks.bench_service --help
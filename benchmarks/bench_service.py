@@ -0,0 +1,420 @@
+"""
+Benchmark operasi service database terhadap database lokal (MySQL atau SQLite tertanam).
+
+Database benchmark dibuat ulang dari nol, diisi sesuai ukuran yang diminta (jumlah asrama, kamar per asrama,
+penghuni, dan kedalaman riwayat audit), lalu setiap operasi dijalankan dengan pemanasan dan pengulangan.
+Hasilnya berupa latensi p50/p95/p99 dan ops/detik per operasi, dan dapat disimpan sebagai JSON untuk
+dibandingkan antar-commit.
+
+Contoh (dari root proyek):
+    python -m benchmarks.bench_service --backend sqlite --asrama 20 --penghuni 5000 --audit 200000 --output hasil.json
+    python -m benchmarks.bench_service --backend sqlite --asrama 20 --penghuni 5000 --audit 200000 --bandingkan hasil.json
+    python -m benchmarks.bench_service --muat hasil_baru.json --bandingkan hasil_lama.json
+
+Backend mysql memakai DB_HOST/DB_USER/DB_PASSWORD dari environment dan database --mysql-db (bawaan
+asrama_bench) yang DIHAPUS lalu dibuat ulang setiap kali benchmark berjalan.
+Dialog messagebox dimatikan selama benchmark agar bisa berjalan tanpa layar.
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from tkinter import messagebox
+
+import seeding
+from backend_db import buat_database_service, BACKEND_DB
+
+USER_BENCH = "benchmark"
+NAMA_ASRAMA_BENCH = "Benchmark"
+UKURAN_BATCH_PINDAH = 10
+JUMLAH_CALON_ALOKASI = 2000
+
+
+def matikan_dialog():
+    """Mengganti fungsi messagebox dengan fungsi kosong; metode tulis service menampilkan dialog di setiap panggilan."""
+    for nama in ("showinfo", "showwarning", "showerror"):
+        setattr(messagebox, nama, lambda *args, **kwargs: "ok")
+
+
+# --- Statistik ---
+def persentil(sampel_urut, p):
+    """Persentil ke-p (0-100) dari sampel yang sudah diurutkan, dengan interpolasi linear."""
+    if not sampel_urut:
+        return 0.0
+    posisi = (len(sampel_urut) - 1) * p / 100
+    bawah = int(posisi)
+    atas = min(bawah + 1, len(sampel_urut) - 1)
+    return sampel_urut[bawah] + (sampel_urut[atas] - sampel_urut[bawah]) * (posisi - bawah)
+
+
+def ringkas_latensi(sampel_detik):
+    """Ringkasan latensi (milidetik) dan throughput dari daftar durasi dalam detik."""
+    urut = sorted(sampel_detik)
+    total = sum(urut)
+    ms = lambda detik: round(detik * 1000, 3)
+    return {
+        'n': len(urut),
+        'p50_ms': ms(persentil(urut, 50)), 'p95_ms': ms(persentil(urut, 95)), 'p99_ms': ms(persentil(urut, 99)),
+        'rata_ms': ms(total / len(urut)) if urut else 0.0,
+        'min_ms': ms(urut[0]) if urut else 0.0, 'maks_ms': ms(urut[-1]) if urut else 0.0,
+        'ops_per_detik': round(len(urut) / total, 1) if total else 0.0,
+    }
+
+
+def ukur(operasi, warmup, ulang):
+    """Menjalankan operasi(i) warmup kali tanpa dicatat, lalu ulang kali sambil mencatat latensinya."""
+    for i in range(warmup):
+        operasi(i)
+    sampel = []
+    for i in range(warmup, warmup + ulang):
+        mulai = time.perf_counter()
+        operasi(i)
+        sampel.append(time.perf_counter() - mulai)
+    return ringkas_latensi(sampel)
+
+
+# --- Penyiapan database ---
+def tata_letak_bench(jumlah_asrama, jumlah_lantai, kamar_per_lantai, kapasitas):
+    return {
+        "asrama": [(i, f"Asrama {i:03d}") for i in range(1, jumlah_asrama + 1)],
+        "fakultas": list(seeding.TATA_LETAK_DEFAULT["fakultas"]),
+        "jumlah_lantai": jumlah_lantai,
+        "kamar_per_lantai": kamar_per_lantai,
+        "kapasitas_default": kapasitas,
+    }
+
+
+class LingkunganBench:
+    """Menghapus dan membuat database benchmark, serta membuat service untuk backend yang dipilih."""
+    def __init__(self, args, tata_letak):
+        self.backend = args.backend
+        self.args = args
+        self.tata_letak = tata_letak
+        self._dir_sementara = None
+        if self.backend == "sqlite":
+            if args.sqlite_path:
+                self.path = args.sqlite_path
+            else:
+                self._dir_sementara = tempfile.TemporaryDirectory(prefix="bench_asrama_")
+                self.path = os.path.join(self._dir_sementara.name, "bench.db")
+        elif args.mysql_db == os.getenv("DB_NAME", "asrama_db_mysql"):
+            raise SystemExit(f"Menolak memakai database aplikasi '{args.mysql_db}' untuk benchmark (database akan dihapus).")
+
+    def hapus_database(self):
+        if self.backend == "sqlite":
+            for akhiran in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + akhiran):
+                    os.remove(self.path + akhiran)
+            return
+        import mysql.connector
+        conn = mysql.connector.connect(host=os.getenv("DB_HOST", "localhost"), user=os.getenv("DB_USER", "root"),
+                                       password=os.getenv("DB_PASSWORD", ""))
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS `{self.args.mysql_db}`")
+            cursor.close()
+        finally:
+            conn.close()
+
+    def buat_service(self):
+        opsi = dict(seed_tata_letak=self.tata_letak, seed_tanpa_audit=True, cache_ttl=self.args.cache_ttl,
+                    audit_mode=self.args.audit_mode)
+        if self.backend == "sqlite":
+            service = buat_database_service("sqlite", path=self.path, **opsi)
+        else:
+            service = buat_database_service("mysql", host=os.getenv("DB_HOST", "localhost"), user=os.getenv("DB_USER", "root"),
+                                            password=os.getenv("DB_PASSWORD", ""), database_name=self.args.mysql_db,
+                                            pool_size=self.args.pool_size, **opsi)
+        if not service.is_connected():
+            raise SystemExit(f"Tidak dapat membuka database benchmark ({self.backend}).")
+        return service
+
+    def tulis_massal(self, service, query, rows, ukuran_batch=5000):
+        """INSERT banyak baris langsung (tanpa trigger audit); query memakai placeholder %s."""
+        if self.backend == "sqlite":
+            with service._transaksi(tanpa_audit=True) as conn:
+                for i in range(0, len(rows), ukuran_batch):
+                    conn.executemany(query.replace("%s", "?"), rows[i:i + ukuran_batch])
+            return
+        with service.transaction() as (conn, cursor):
+            for i in range(0, len(rows), ukuran_batch):
+                cursor.executemany(query, rows[i:i + ukuran_batch])
+
+    def bersihkan(self):
+        if self._dir_sementara:
+            self._dir_sementara.cleanup()
+
+
+def nim_penghuni(i):
+    return f"9{i:09d}"
+
+
+def isi_penghuni(service, tata_letak, jumlah):
+    """Mengisi jumlah penghuni lewat impor CSV, tersebar merata ke semua kamar (bukan kamar demi kamar)."""
+    kamar = seeding.baris_kamar(tata_letak)
+    kapasitas_total = sum(k[2] for k in kamar)
+    if jumlah > kapasitas_total:
+        raise SystemExit(f"--penghuni {jumlah} melebihi kapasitas total {kapasitas_total} tempat.")
+    fakultas = tata_letak["fakultas"]
+    buffer = io.StringIO()
+    penulis = csv.writer(buffer)
+    penulis.writerow(["nim", "nama_penghuni", "fakultas", "nomor_kamar", "asrama_id"])
+    i = 0
+    for slot in range(max(k[2] for k in kamar)):
+        for nomor_kamar, asrama_id, kapasitas in kamar:
+            if i < jumlah and slot < kapasitas:
+                penulis.writerow([nim_penghuni(i), f"Penghuni {i}", fakultas[i % len(fakultas)], nomor_kamar, asrama_id])
+                i += 1
+    buffer.seek(0)
+    ringkasan = service.impor_penghuni_csv(buffer, USER_BENCH, ukuran_chunk=1000)
+    if ringkasan['ditolak']:
+        raise SystemExit(f"Pengisian penghuni gagal: {ringkasan['ditolak'][0]['alasan']}")
+
+
+def csv_calon_alokasi(tata_letak, jumlah):
+    """Teks CSV calon penghuni untuk rencanakan_alokasi: fakultas bergiliran, satu dari sepuluh dalam grup bertiga."""
+    fakultas = tata_letak["fakultas"]
+    buffer = io.StringIO()
+    penulis = csv.writer(buffer)
+    penulis.writerow(["nim", "nama_penghuni", "fakultas", "grup"])
+    for i in range(jumlah):
+        penulis.writerow([f"7{i:09d}", f"Calon {i}", fakultas[i % len(fakultas)], f"g{i // 3}" if i % 30 < 3 else ""])
+    return buffer.getvalue()
+
+
+def isi_riwayat_audit(lingkungan, service, tata_letak, jumlah):
+    """
+    Menambahkan jumlah baris sintetis ke log audit penghuni (dan sepersepuluhnya ke log kamar dan asrama),
+    tersebar merata selama 12 bulan terakhir.
+    """
+    if jumlah <= 0:
+        return
+    akhir = datetime.datetime.now().replace(microsecond=0)
+    awal = akhir - datetime.timedelta(days=365)
+    langkah = (akhir - awal) / jumlah
+    waktu = lambda i: (awal + langkah * i).strftime("%Y-%m-%d %H:%M:%S")
+    daftar_asrama = seeding.baris_asrama(tata_letak)
+    asrama = dict(daftar_asrama)
+    kamar = seeding.baris_kamar(tata_letak)
+    aksi = ("INSERT", "UPDATE", "DELETE")
+
+    lingkungan.tulis_massal(service, """INSERT INTO AuditLogAktivitasPenghuni
+            (nim, nama_penghuni_baru, nomor_kamar_baru, nama_asrama_baru, aksi, waktu_aksi, user_aksi, keterangan_tambahan)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+            [(nim_penghuni(i), f"Penghuni {i}", kamar[i % len(kamar)][0], asrama[kamar[i % len(kamar)][1]],
+              aksi[i % 3], waktu(i), USER_BENCH, "Riwayat sintetis benchmark") for i in range(jumlah)])
+    jumlah_master = max(1, jumlah // 10)
+    langkah_master = jumlah / jumlah_master
+    lingkungan.tulis_massal(service, """INSERT INTO AuditLogAktivitasKamar
+            (kamar_id_internal_aksi, nomor_kamar_baru, asrama_id_baru, nama_asrama_baru, kapasitas_baru, aksi, waktu_aksi, user_aksi)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+            [(i % len(kamar) + 1, kamar[i % len(kamar)][0], kamar[i % len(kamar)][1], asrama[kamar[i % len(kamar)][1]],
+              kamar[i % len(kamar)][2], "UPDATE", waktu(int(i * langkah_master)), USER_BENCH) for i in range(jumlah_master)])
+    lingkungan.tulis_massal(service, """INSERT INTO AuditLogAktivitasAsrama
+            (asrama_id_aksi, nama_asrama_baru, aksi, waktu_aksi, user_aksi) VALUES (%s, %s, %s, %s, %s)""",
+            [(*daftar_asrama[i % len(daftar_asrama)], "UPDATE", waktu(int(i * langkah_master)), USER_BENCH) for i in range(jumlah_master)])
+
+
+# --- Benchmark ---
+def ukur_bootstrap(lingkungan, ulang):
+    """Lama membuat service pada database kosong (skema + data master) dan pada database yang skemanya sudah terbaru."""
+    sampel_baru, sampel_terbaru = [], []
+    service = None
+    for i in range(ulang):
+        if service:
+            service._close()
+        lingkungan.hapus_database()
+        mulai = time.perf_counter()
+        service = lingkungan.buat_service()
+        sampel_baru.append(time.perf_counter() - mulai)
+    for i in range(ulang):
+        mulai = time.perf_counter()
+        lingkungan.buat_service()._close()
+        sampel_terbaru.append(time.perf_counter() - mulai)
+    return service, {'bootstrap_skema_baru': ringkas_latensi(sampel_baru), 'bootstrap_skema_terbaru': ringkas_latensi(sampel_terbaru)}
+
+
+def siapkan_kamar_bench(service, asrama_id, kapasitas):
+    """Asrama khusus dengan kamar 1 dan 2 berkapasitas besar, untuk operasi tulis yang tidak boleh gagal karena penuh."""
+    for kode, pesan in (service.add_asrama(asrama_id, NAMA_ASRAMA_BENCH),
+                        service.add_kamar(1, asrama_id, kapasitas), service.add_kamar(2, asrama_id, kapasitas)):
+        if kode != 0:
+            raise SystemExit(f"Gagal menyiapkan kamar benchmark: {pesan}")
+
+
+def jalankan_benchmark(args):
+    tata_letak = tata_letak_bench(args.asrama, args.lantai, args.kamar_per_lantai, args.kapasitas)
+    lingkungan = LingkunganBench(args, tata_letak)
+    try:
+        print(f"Menyiapkan database benchmark ({args.backend})...")
+        service, hasil = ukur_bootstrap(lingkungan, args.ulang_bootstrap)
+        mulai = time.perf_counter()
+        isi_penghuni(service, tata_letak, args.penghuni)
+        isi_riwayat_audit(lingkungan, service, tata_letak, args.audit)
+        print(f"Data benchmark siap dalam {time.perf_counter() - mulai:.1f} detik.")
+
+        n = args.warmup + args.ulang
+        asrama_bench = args.asrama + 1
+        siapkan_kamar_bench(service, asrama_bench, n)
+        nim_bench = [f"8{i:09d}" for i in range(n)]
+        fakultas = tata_letak["fakultas"][0]
+        posisi = {}  # nim -> nomor kamar benchmark saat ini
+        acak = random.Random(args.seed)
+        semua_kamar = [(nomor, asrama_id) for nomor, asrama_id, _ in seeding.baris_kamar(tata_letak)]
+        kamar_sampel = [acak.choice(semua_kamar) for _ in range(n)]
+
+        def tambah(i):
+            service.add_penghuni(nim_bench[i], f"Bench {i}", fakultas, 1, asrama_bench, USER_BENCH)
+            posisi[nim_bench[i]] = 1
+
+        def pindah(i):
+            nim = nim_bench[i]
+            posisi[nim] = 3 - posisi[nim]
+            service.pindah_kamar_penghuni(nim, posisi[nim], asrama_bench, USER_BENCH)
+
+        def pindah_batch(i):
+            daftar = []
+            for j in range(UKURAN_BATCH_PINDAH):
+                nim = nim_bench[(i * UKURAN_BATCH_PINDAH + j) % n]
+                posisi[nim] = 3 - posisi[nim]
+                daftar.append((nim, asrama_bench, posisi[nim]))
+            service.pindah_kamar_batch(daftar, USER_BENCH)
+
+        halaman = [None]
+        for _ in range(args.halaman_audit):
+            logs = service.get_audit_log_penghuni(100, sebelum=halaman[-1])
+            if not logs:
+                break
+            halaman.append(service.kursor_log(logs[-1]))
+        kursor_dalam = halaman[1:] or [None]
+
+        operasi = [
+            ("add_penghuni", tambah),
+            ("update_penghuni", lambda i: service.update_penghuni(nim_bench[i], nim_bench[i], f"Bench {i} diubah", None, USER_BENCH)),
+            ("pindah_kamar_penghuni", pindah),
+            (f"pindah_kamar_batch_{UKURAN_BATCH_PINDAH}", pindah_batch),
+            ("get_penghuni_in_kamar", lambda i: service.get_penghuni_in_kamar(*kamar_sampel[i])),
+            ("get_kamar_snapshot", lambda i: service.get_kamar_snapshot(*kamar_sampel[i])),
+            ("cari_kamar_kosong", lambda i: service.cari_kamar_kosong()),
+            ("get_audit_log_penghuni", lambda i: service.get_audit_log_penghuni(100)),
+            ("get_audit_log_penghuni_halaman", lambda i: service.get_audit_log_penghuni(100, sebelum=kursor_dalam[i % len(kursor_dalam)])),
+            ("get_audit_log_kamar", lambda i: service.get_audit_log_kamar(100)),
+            ("get_audit_log_asrama", lambda i: service.get_audit_log_asrama(100)),
+            ("delete_penghuni", lambda i: service.delete_penghuni(nim_bench[i], USER_BENCH)),
+        ]
+        for nama, fungsi in operasi:
+            hasil[nama] = ukur(fungsi, args.warmup, args.ulang)
+            print(f"  {nama}: p50 {hasil[nama]['p50_ms']} ms, p95 {hasil[nama]['p95_ms']} ms")
+        teks_calon = csv_calon_alokasi(tata_letak, JUMLAH_CALON_ALOKASI)
+        nama = f"rencanakan_alokasi_{JUMLAH_CALON_ALOKASI}"
+        hasil[nama] = ukur(lambda i: service.rencanakan_alokasi(io.StringIO(teks_calon)), 1, min(args.ulang, 20))
+        print(f"  {nama}: p50 {hasil[nama]['p50_ms']} ms, p95 {hasil[nama]['p95_ms']} ms")
+        service._close()
+    finally:
+        lingkungan.bersihkan()
+    return {'meta': meta_run(args), 'operasi': hasil}
+
+
+def meta_run(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'backend': args.backend, 'commit': commit, 'waktu': datetime.datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'ukuran': {'asrama': args.asrama, 'lantai': args.lantai, 'kamar_per_lantai': args.kamar_per_lantai,
+                   'kapasitas': args.kapasitas, 'penghuni': args.penghuni, 'audit': args.audit},
+        'warmup': args.warmup, 'ulang': args.ulang, 'audit_mode': args.audit_mode,
+    }
+
+
+# --- Laporan ---
+def cetak_hasil(hasil):
+    meta = hasil['meta']
+    print(f"\nBackend {meta['backend']} @ {meta['commit'] or '-'} ({meta['waktu']}), ukuran {meta['ukuran']}")
+    print(f"{'operasi':<34}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/dtk':>11}")
+    for nama, r in hasil['operasi'].items():
+        print(f"{nama:<34}{r['n']:>6}{r['p50_ms']:>11.3f}{r['p95_ms']:>11.3f}{r['p99_ms']:>11.3f}{r['ops_per_detik']:>11.1f}")
+
+
+def bandingkan(lama, baru, ambang_persen=10.0):
+    """Mencetak perubahan p50/p95 per operasi; mengembalikan operasi yang p95-nya memburuk lebih dari ambang_persen."""
+    if lama['meta'].get('ukuran') != baru['meta'].get('ukuran') or lama['meta'].get('backend') != baru['meta'].get('backend'):
+        print("Peringatan: backend atau ukuran data berbeda; perbandingan mungkin tidak setara.")
+    print(f"\nPerbandingan {lama['meta'].get('commit') or 'lama'} -> {baru['meta'].get('commit') or 'baru'}")
+    print(f"{'operasi':<34}{'p50 lama':>10}{'p50 baru':>10}{'Δ p50':>9}{'p95 lama':>10}{'p95 baru':>10}{'Δ p95':>9}")
+    regresi = []
+    for nama, r in baru['operasi'].items():
+        r_lama = lama['operasi'].get(nama)
+        if not r_lama:
+            print(f"{nama:<34}{'-':>10}{r['p50_ms']:>10.3f}{'baru':>9}")
+            continue
+        delta = lambda kunci: (r[kunci] - r_lama[kunci]) / r_lama[kunci] * 100 if r_lama[kunci] else 0.0
+        tanda = ""
+        if delta('p95_ms') > ambang_persen:
+            regresi.append(nama)
+            tanda = "  <- regresi"
+        print(f"{nama:<34}{r_lama['p50_ms']:>10.3f}{r['p50_ms']:>10.3f}{delta('p50_ms'):>+8.1f}%"
+              f"{r_lama['p95_ms']:>10.3f}{r['p95_ms']:>10.3f}{delta('p95_ms'):>+8.1f}%{tanda}")
+    return regresi
+
+
+def baca_argumen(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark operasi service database asrama.")
+    parser.add_argument("--backend", choices=BACKEND_DB, default=os.getenv("DB_BACKEND", "sqlite"))
+    parser.add_argument("--sqlite-path", help="file SQLite benchmark (bawaan: file sementara yang dihapus setelah selesai)")
+    parser.add_argument("--mysql-db", default="asrama_bench", help="database MySQL benchmark; dihapus dan dibuat ulang")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--cache-ttl", type=float, default=60.0)
+    parser.add_argument("--audit-mode", choices=("trigger", "aplikasi"), default="trigger",
+                        help="mode penulisan log audit penghuni (aplikasi: batch asinkron, hanya MySQL)")
+    parser.add_argument("--asrama", type=int, default=8)
+    parser.add_argument("--lantai", type=int, default=3)
+    parser.add_argument("--kamar-per-lantai", type=int, default=10)
+    parser.add_argument("--kapasitas", type=int, default=4)
+    parser.add_argument("--penghuni", type=int, default=500)
+    parser.add_argument("--audit", type=int, default=10000, help="baris riwayat audit sintetis tambahan")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--ulang", type=int, default=200)
+    parser.add_argument("--ulang-bootstrap", type=int, default=3)
+    parser.add_argument("--halaman-audit", type=int, default=20, help="kedalaman halaman untuk get_audit_log_penghuni_halaman")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="simpan hasil sebagai JSON")
+    parser.add_argument("--muat", help="pakai hasil JSON yang sudah ada alih-alih menjalankan benchmark")
+    parser.add_argument("--bandingkan", help="hasil JSON lama sebagai pembanding")
+    parser.add_argument("--ambang-regresi", type=float, default=10.0, help="persen kenaikan p95 yang dianggap regresi")
+    parser.add_argument("--gagal-jika-regresi", action="store_true", help="keluar dengan kode 1 jika ada regresi")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = baca_argumen(argv)
+    if args.muat:
+        with open(args.muat, encoding="utf-8") as f:
+            hasil = json.load(f)
+    else:
+        matikan_dialog()
+        hasil = jalankan_benchmark(args)
+    cetak_hasil(hasil)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(hasil, f, indent=2)
+        print(f"Hasil disimpan ke {args.output}.")
+    if args.bandingkan:
+        with open(args.bandingkan, encoding="utf-8") as f:
+            regresi = bandingkan(json.load(f), hasil, args.ambang_regresi)
+        if regresi and args.gagal_jika_regresi:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
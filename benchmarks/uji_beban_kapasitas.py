@@ -0,0 +1,168 @@
+"""
+Uji beban penegakan kapasitas kamar: banyak penulis paralel berebut tempat terakhir di beberapa kamar kecil.
+
+Setiap penulis (satu thread, satu koneksi pool) menjalankan campuran tambah penghuni, pindah kamar, pindah
+kamar batch, dan hapus penghuni terhadap kamar acak di satu asrama uji. Kamar sengaja sedikit dan kecil agar
+hampir setiap operasi tambah/pindah memperebutkan tempat terakhir, dan pemindahan antar-kamar saling bersilangan
+(menguji urutan kunci dan pengulangan deadlock). Setelah semua penulis selesai, jumlah penghuni setiap kamar
+dihitung langsung dari tabel Penghuni dan dibandingkan dengan kapasitas dan kolom occupied.
+
+Contoh (dari root proyek):
+    python -m benchmarks.uji_beban_kapasitas --backend mysql --penulis 50 --operasi 40
+    python -m benchmarks.uji_beban_kapasitas --backend sqlite --penulis 50
+
+Keluar dengan kode 1 jika ada kamar yang kelebihan penghuni atau kolom occupied yang tidak cocok.
+Backend mysql memakai DB_HOST/DB_USER/DB_PASSWORD dari environment dan database --mysql-db yang DIHAPUS
+lalu dibuat ulang setiap kali uji berjalan.
+"""
+import argparse
+import collections
+import random
+import sys
+import threading
+import time
+
+from backend_db import BACKEND_DB
+from benchmarks.bench_service import LingkunganBench, matikan_dialog, tata_letak_bench, ringkas_latensi
+
+USER_UJI = "uji_beban"
+NAMA_ASRAMA_UJI = "Uji Beban"
+
+
+def siapkan_asrama_uji(service, asrama_id, jumlah_kamar, kapasitas):
+    kode, pesan = service.add_asrama(asrama_id, NAMA_ASRAMA_UJI)
+    if kode != 0:
+        raise SystemExit(f"Gagal menyiapkan asrama uji: {pesan}")
+    for nomor in range(1, jumlah_kamar + 1):
+        kode, pesan = service.add_kamar(nomor, asrama_id, kapasitas)
+        if kode != 0:
+            raise SystemExit(f"Gagal menyiapkan kamar uji {nomor}: {pesan}")
+
+
+def jalankan_penulis(service, nomor_penulis, args, asrama_id, gerbang, hasil):
+    """Satu penulis: operasi acak terhadap penghuninya sendiri (NIM unik per penulis) dan kamar acak."""
+    acak = random.Random(args.seed * 1000 + nomor_penulis)
+    milik = []  # NIM penghuni yang berhasil ditambahkan penulis ini dan belum dihapus
+    hitungan = collections.Counter()
+    latensi = collections.defaultdict(list)
+    gerbang.wait()
+    for i in range(args.operasi):
+        kamar = acak.randint(1, args.kamar)
+        pilihan = acak.random()
+        mulai = time.perf_counter()
+        if not milik or pilihan < 0.45:
+            nim = f"5{nomor_penulis:03d}{i:06d}"
+            jenis = "tambah"
+            sukses = service.add_penghuni(nim, f"Uji {nomor_penulis}-{i}", None, kamar, asrama_id, USER_UJI)
+            if sukses:
+                milik.append(nim)
+        elif pilihan < 0.75:
+            jenis = "pindah"
+            sukses, _ = service.pindah_kamar_penghuni(acak.choice(milik), kamar, asrama_id, USER_UJI)
+        elif pilihan < 0.85 and len(milik) >= 2:
+            jenis = "pindah_batch"
+            daftar = acak.sample(milik, 2)
+            sukses, _ = service.pindah_kamar_batch([(nim, asrama_id, acak.randint(1, args.kamar)) for nim in daftar], USER_UJI)
+        else:
+            jenis = "hapus"
+            nim = milik.pop(acak.randrange(len(milik)))
+            sukses = service.delete_penghuni(nim, USER_UJI)
+        latensi[jenis].append(time.perf_counter() - mulai)
+        hitungan[(jenis, "sukses" if sukses else "gagal")] += 1
+    with hasil['kunci']:
+        hasil['hitungan'].update(hitungan)
+        for jenis, sampel in latensi.items():
+            hasil['latensi'][jenis].extend(sampel)
+
+
+def periksa_kamar(service, backend, asrama_id):
+    """Jumlah penghuni nyata per kamar uji (dihitung dari tabel Penghuni), kapasitas, dan kolom occupied."""
+    query = """SELECT K.nomor_kamar, K.kapasitas, K.occupied, COUNT(P.nim) AS jumlah
+               FROM Kamar K LEFT JOIN Penghuni P ON P.kamar_id_internal = K.kamar_id_internal
+               WHERE K.asrama_id = %s GROUP BY K.kamar_id_internal, K.nomor_kamar, K.kapasitas, K.occupied
+               ORDER BY K.nomor_kamar"""
+    if backend == "sqlite":
+        query = query.replace("%s", "?")
+    return service._execute_query(query, (asrama_id,), fetch_all=True) or []
+
+
+def jalankan_uji(args):
+    tata_letak = tata_letak_bench(1, 1, 1, 1)
+    lingkungan = LingkunganBench(args, tata_letak)
+    try:
+        lingkungan.hapus_database()
+        service = lingkungan.buat_service()
+        asrama_id = 2
+        siapkan_asrama_uji(service, asrama_id, args.kamar, args.kapasitas)
+
+        gerbang = threading.Barrier(args.penulis)
+        hasil = {'kunci': threading.Lock(), 'hitungan': collections.Counter(), 'latensi': collections.defaultdict(list)}
+        penulis = [threading.Thread(target=jalankan_penulis, args=(service, n, args, asrama_id, gerbang, hasil), daemon=True)
+                   for n in range(args.penulis)]
+        print(f"{args.penulis} penulis x {args.operasi} operasi pada {args.kamar} kamar berkapasitas {args.kapasitas} ({args.backend})...")
+        mulai = time.perf_counter()
+        for t in penulis:
+            t.start()
+        for t in penulis:
+            t.join()
+        durasi = time.perf_counter() - mulai
+
+        kamar = periksa_kamar(service, args.backend, asrama_id)
+        service._close()
+    finally:
+        lingkungan.bersihkan()
+
+    print(f"\nSelesai dalam {durasi:.2f} detik ({sum(hasil['hitungan'].values()) / durasi:.1f} operasi/detik).")
+    print(f"{'operasi':<14}{'sukses':>8}{'gagal':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for jenis in ("tambah", "pindah", "pindah_batch", "hapus"):
+        if not hasil['latensi'][jenis]:
+            continue
+        r = ringkas_latensi(hasil['latensi'][jenis])
+        print(f"{jenis:<14}{hasil['hitungan'][(jenis, 'sukses')]:>8}{hasil['hitungan'][(jenis, 'gagal')]:>8}"
+              f"{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}")
+
+    pelanggaran = []
+    print(f"\n{'kamar':<8}{'kapasitas':>10}{'penghuni':>10}{'occupied':>10}")
+    for k in kamar:
+        print(f"{k['nomor_kamar']:<8}{k['kapasitas']:>10}{k['jumlah']:>10}{k['occupied']:>10}")
+        if k['jumlah'] > k['kapasitas']:
+            pelanggaran.append(f"Kamar {k['nomor_kamar']} berisi {k['jumlah']} penghuni, kapasitas {k['kapasitas']}.")
+        if k['jumlah'] != k['occupied']:
+            pelanggaran.append(f"Kamar {k['nomor_kamar']}: occupied {k['occupied']}, penghuni sebenarnya {k['jumlah']}.")
+    if len(kamar) != args.kamar:
+        pelanggaran.append(f"Hanya {len(kamar)} dari {args.kamar} kamar uji yang terbaca.")
+    for p in pelanggaran:
+        print(f"PELANGGARAN: {p}")
+    if not pelanggaran:
+        print("Tidak ada kamar yang kelebihan penghuni; occupied cocok dengan jumlah penghuni.")
+    return not pelanggaran
+
+
+def baca_argumen(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban penegakan kapasitas kamar dengan banyak penulis paralel.")
+    parser.add_argument("--backend", choices=BACKEND_DB, default="mysql")
+    parser.add_argument("--sqlite-path", help="file SQLite uji (bawaan: file sementara yang dihapus setelah selesai)")
+    parser.add_argument("--mysql-db", default="asrama_uji_beban", help="database MySQL uji; dihapus dan dibuat ulang")
+    parser.add_argument("--pool-size", type=int, help="ukuran pool koneksi (bawaan: sama dengan --penulis)")
+    parser.add_argument("--cache-ttl", type=float, default=60.0)
+    parser.add_argument("--audit-mode", choices=("trigger", "aplikasi"), default="trigger")
+    parser.add_argument("--penulis", type=int, default=50, help="jumlah thread penulis paralel")
+    parser.add_argument("--operasi", type=int, default=40, help="operasi per penulis")
+    parser.add_argument("--kamar", type=int, default=5)
+    parser.add_argument("--kapasitas", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    if args.pool_size is None:
+        args.pool_size = args.penulis
+    return args
+
+
+def main(argv=None):
+    args = baca_argumen(argv)
+    matikan_dialog()
+    if not jalankan_uji(args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
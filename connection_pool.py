@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+import mysql.connector
+from mysql.connector import errorcode
+from mysql.connector.errors import PoolError
+
+# Kode error yang menandakan server tidak terjangkau atau koneksi terputus (bukan kesalahan kueri).
+KODE_KONEKSI_PUTUS = frozenset({
+    errorcode.CR_CONNECTION_ERROR, errorcode.CR_CONN_HOST_ERROR,
+    errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST,
+    errorcode.CR_SERVER_LOST_EXTENDED, 4031,  # 4031: ER_CLIENT_INTERACTION_TIMEOUT (MySQL 8.0.24+)
+})
+
+
+def koneksi_putus(err):
+    """True jika error MySQL disebabkan koneksi yang hilang, sehingga koneksinya harus dibuang."""
+    errno = getattr(err, 'errno', None)
+    if errno in KODE_KONEKSI_PUTUS:
+        return True
+    return errno in (None, -1) and isinstance(err, (mysql.connector.InterfaceError, mysql.connector.OperationalError))
+
+
+class PoolHabisError(PoolError):
+    """Dilempar jika tidak ada koneksi yang bisa dipinjam dalam batas waktu tunggu."""
+
+
+class ConnectionPool:
+    """
+    Pool koneksi MySQL yang aman dipakai dari banyak thread.
+    Setiap operasi meminjam satu koneksi lewat pinjam() lalu mengembalikannya lewat kembalikan(),
+    sehingga kueri lambat di satu thread tidak menahan thread lain (misalnya thread UI Tk).
+    Koneksi yang menganggur lebih lama dari recycle_detik ditutup dan diganti koneksi baru.
+    Koneksi tidak di-ping saat dipinjam; koneksi yang ketahuan putus ditandai lewat tandai_rusak()
+    dan penggantinya dibuat dengan backoff terbatas (maks_percobaan_sambung).
+    """
+    def __init__(self, connect_kwargs, ukuran=5, timeout_checkout=10.0, recycle_detik=1800,
+                 maks_percobaan_sambung=3, jeda_awal_sambung=0.2, jeda_maks_sambung=2.0):
+        self._connect_kwargs = dict(connect_kwargs)
+        self._ukuran = max(1, int(ukuran))
+        self._timeout_checkout = float(timeout_checkout)
+        self._recycle_detik = float(recycle_detik) if recycle_detik else 0.0
+        self._maks_percobaan_sambung = max(1, int(maks_percobaan_sambung))
+        self._jeda_awal_sambung = jeda_awal_sambung
+        self._jeda_maks_sambung = jeda_maks_sambung
+        self._idle = deque()  # berisi (koneksi, waktu_dikembalikan); kanan = paling baru
+        self._rusak = set()  # id() koneksi yang harus dibuang saat dikembalikan
+        self._jumlah_terbuka = 0
+        self._kondisi = threading.Condition()
+        self._ditutup = False
+
+    @property
+    def ukuran(self):
+        return self._ukuran
+
+    def _sambung(self):
+        return mysql.connector.connect(**self._connect_kwargs)
+
+    def _buat_koneksi(self):
+        """Membuka koneksi baru; jika server tidak terjangkau, mencoba lagi dengan jeda yang berlipat."""
+        jeda = self._jeda_awal_sambung
+        for percobaan in range(1, self._maks_percobaan_sambung + 1):
+            try:
+                return self._sambung()
+            except mysql.connector.Error as err:
+                if percobaan == self._maks_percobaan_sambung or not koneksi_putus(err):
+                    raise
+                print(f"Gagal menyambung ke MySQL (percobaan {percobaan}/{self._maks_percobaan_sambung}): {err}. Mencoba lagi dalam {jeda:.1f} detik.")
+                time.sleep(jeda)
+                jeda = min(jeda * 2, self._jeda_maks_sambung)
+
+    def _kedaluwarsa(self, waktu_dikembalikan, sekarang):
+        return self._recycle_detik > 0 and (sekarang - waktu_dikembalikan) > self._recycle_detik
+
+    @staticmethod
+    def _tutup_diam(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def pinjam(self):
+        """Meminjam satu koneksi. Menunggu maksimal timeout_checkout detik jika pool penuh."""
+        batas_waktu = time.monotonic() + self._timeout_checkout
+        koneksi_basi = []
+        conn = None
+        try:
+            with self._kondisi:
+                while True:
+                    if self._ditutup:
+                        raise PoolHabisError("Pool koneksi sudah ditutup.")
+                    sekarang = time.monotonic()
+                    # Koneksi paling lama menganggur ada di kiri; buang yang sudah melewati batas recycle.
+                    while self._idle and self._kedaluwarsa(self._idle[0][1], sekarang):
+                        koneksi_basi.append(self._idle.popleft()[0])
+                        self._jumlah_terbuka -= 1
+                    if self._idle:
+                        conn = self._idle.pop()[0]
+                        return conn
+                    if self._jumlah_terbuka < self._ukuran:
+                        self._jumlah_terbuka += 1
+                        break
+                    sisa_waktu = batas_waktu - sekarang
+                    if sisa_waktu <= 0:
+                        raise PoolHabisError(f"Tidak ada koneksi database yang tersedia dalam {self._timeout_checkout:.1f} detik (ukuran pool: {self._ukuran}).")
+                    self._kondisi.wait(sisa_waktu)
+        finally:
+            for basi in koneksi_basi:
+                self._tutup_diam(basi)
+
+        try:
+            return self._buat_koneksi()
+        except Exception:
+            with self._kondisi:
+                self._jumlah_terbuka -= 1
+                self._kondisi.notify()
+            raise
+
+    def tandai_rusak(self, conn):
+        """Menandai koneksi agar ditutup (tidak dipakai ulang) ketika dikembalikan."""
+        with self._kondisi:
+            self._rusak.add(id(conn))
+
+    def kembalikan(self, conn):
+        """Mengembalikan koneksi ke pool, atau menutupnya jika ditandai rusak atau pool sudah ditutup."""
+        with self._kondisi:
+            buang = self._ditutup or id(conn) in self._rusak
+            self._rusak.discard(id(conn))
+            if buang:
+                self._jumlah_terbuka -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._kondisi.notify()
+        if buang:
+            self._tutup_diam(conn)
+
+    def tutup_semua(self):
+        """Menutup semua koneksi yang menganggur dan menolak peminjaman berikutnya."""
+        with self._kondisi:
+            self._ditutup = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._jumlah_terbuka -= len(idle)
+            self._kondisi.notify_all()
+        for conn in idle:
+            self._tutup_diam(conn)
@@ -1,671 +1,616 @@
 import mysql.connector
+from mysql.connector import errorcode
+from contextlib import contextmanager
+import collections
+import datetime
+import random
+import threading
+import time
 from tkinter import messagebox # messagebox diimpor di siniimport hashlib
+from connection_pool import ConnectionPool, koneksi_putus
+from master_cache import MasterDataCache
+from query_stats import StatistikKueri
+from audit_async import PenulisAuditAsinkron, event_penghuni
+import schema
+import seeding
+import impor_csv
+import alokasi
+import ekspor
+import umpan_perubahan
+
+# ALTER yang sudah pernah diterapkan (kolom/indeks sudah ada) dianggap berhasil saat langkah skema diulang.
+KODE_DDL_SUDAH_ADA = frozenset({errorcode.ER_DUP_FIELDNAME, errorcode.ER_DUP_KEYNAME})
+
+# Transaksi yang dibatalkan karena konflik kunci (deadlock / batas tunggu kunci) aman diulang dari awal.
+KODE_KONFLIK_KUNCI = frozenset({errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT})
+MAKS_PERCOBAAN_KONFLIK = 4
+JEDA_AWAL_KONFLIK = 0.05
+
+# Kolom dan tabel untuk layar riwayat log audit; halaman diurutkan (waktu_aksi, log_id) menurun,
+# urutan yang dilayani indeks idx_audit*_waktu. waktu_aksi mentah ikut diambil sebagai bagian kursor halaman.
+KUERI_LOG_AUDIT = {
+    "penghuni": ("AuditLogAktivitasPenghuni", """
+                log_id, waktu_aksi, DATE_FORMAT(waktu_aksi, '%Y-%m-%d %H:%i:%S') AS waktu_aksi_formatted, 
+                aksi, nim, user_aksi, 
+                IFNULL(nama_penghuni_baru, nama_penghuni_lama) AS nama_terkait,
+                IF(aksi = 'INSERT', 
+                   CONCAT('Ke: ', IFNULL(nomor_kamar_baru, 'N/A'), ' (', IFNULL(nama_asrama_baru, 'N/A'), ') - Fak: ', IFNULL(fakultas_baru, 'N/A')),
+                   IF(aksi = 'DELETE',
+                      CONCAT('Dari: ', IFNULL(nomor_kamar_lama, 'N/A'), ' (', IFNULL(nama_asrama_lama, 'N/A'), ') - Fak: ', IFNULL(fakultas_lama, 'N/A')),
+                      CONCAT('Dari: ', IFNULL(nomor_kamar_lama, 'N/A'), ' (', IFNULL(nama_asrama_lama, 'N/A'), ') Fak: ', IFNULL(fakultas_lama, 'N/A'),
+                             ' Ke: ', IFNULL(nomor_kamar_baru, 'N/A'), ' (', IFNULL(nama_asrama_baru, 'N/A'), ') Fak: ', IFNULL(fakultas_baru, 'N/A'))
+                   )
+                ) AS detail_perubahan,
+                keterangan_tambahan"""),
+    "asrama": ("AuditLogAktivitasAsrama", """
+                log_id, waktu_aksi, asrama_id_aksi, nama_asrama_lama, nama_asrama_baru, aksi, 
+                DATE_FORMAT(waktu_aksi, '%Y-%m-%d %H:%i:%S') AS waktu_aksi_formatted, 
+                user_aksi, keterangan_tambahan"""),
+    "kamar": ("AuditLogAktivitasKamar", """
+                log_id, waktu_aksi, kamar_id_internal_aksi, 
+                nomor_kamar_lama, nomor_kamar_baru, 
+                asrama_id_lama, asrama_id_baru,
+                nama_asrama_lama, nama_asrama_baru,
+                kapasitas_lama, kapasitas_baru, 
+                aksi, DATE_FORMAT(waktu_aksi, '%Y-%m-%d %H:%i:%S') AS waktu_aksi_formatted, 
+                user_aksi, keterangan_tambahan"""),
+}
+
+
+# Kode status sp_UpdatePenghuni -> nilai kembali update_penghuni, beserta jenis dialognya.
+STATUS_UPDATE_PENGHUNI = {
+    0: "SUCCESS_DATA_CHANGED",
+    1: "ERROR_NIM_ORIGINAL_NOT_FOUND",
+    2: "ERROR_INVALID_NIM_FORMAT",
+    3: "ERROR_NIM_CONFLICT",
+    4: "SUCCESS_NO_CHANGE",
+    5: "SUCCESS_NO_ACTUAL_CHANGE",
+}
+
+DIALOG_UPDATE_PENGHUNI = {
+    "SUCCESS_DATA_CHANGED": (messagebox.showinfo, "Sukses"),
+    "SUCCESS_NO_CHANGE": (messagebox.showinfo, "Info"),
+    "SUCCESS_NO_ACTUAL_CHANGE": (messagebox.showwarning, "Perhatian"),
+    "ERROR_NIM_ORIGINAL_NOT_FOUND": (messagebox.showwarning, "Perhatian"),
+    "ERROR_INVALID_NIM_FORMAT": (messagebox.showerror, "Kesalahan Input"),
+    "ERROR_NIM_CONFLICT": (messagebox.showerror, "Kesalahan"),
+}
+
+def kueri_log_audit(jenis, arah=None, jumlah_celah=0):
+    """
+    Menyusun kueri satu halaman log audit. arah=None: halaman terbaru; "sebelum": baris yang lebih lama
+    dari kursor; "sesudah": baris yang lebih baru dari kursor (urut naik, dibalik oleh pemanggil);
+    "sejak_log_id": baris dengan log_id di atas nilai yang diberikan ditambah jumlah_celah log_id di bawahnya
+    yang masih ditunggu (mode live, urut log_id naik).
+    Parameter: (waktu, waktu, log_id, limit) untuk arah dengan kursor, (log_id, *celah, limit) untuk sejak_log_id,
+    atau (limit,) tanpa kursor.
+    Predikat kursor ditulis dengan OR (bukan perbandingan baris) agar MySQL memakai range scan pada indeks.
+    """
+    tabel, kolom = KUERI_LOG_AUDIT[jenis]
+    if arah == "sejak_log_id":
+        # Range scan kunci primer (log_id, waktu_aksi) di setiap partisi, ditambah lookup titik untuk celah.
+        where = "log_id > %s" + (f" OR log_id IN ({', '.join(['%s'] * jumlah_celah)})" if jumlah_celah else "")
+        return f"SELECT {kolom}\n            FROM {tabel}\n            WHERE {where}\n            ORDER BY log_id ASC\n            LIMIT %s"
+    where, urut = "", "DESC"
+    if arah == "sebelum":
+        where = "WHERE waktu_aksi < %s OR (waktu_aksi = %s AND log_id < %s)"
+    elif arah == "sesudah":
+        where, urut = "WHERE waktu_aksi > %s OR (waktu_aksi = %s AND log_id > %s)", "ASC"
+    return f"SELECT {kolom}\n            FROM {tabel}\n            {where}\n            ORDER BY waktu_aksi {urut}, log_id {urut}\n            LIMIT %s"
+
+# trigger: log Penghuni ditulis trigger di dalam transaksi. aplikasi: DatabaseService mencatat event dan
+# PenulisAuditAsinkron menulisnya per batch (lihat audit_async.py).
+MODE_AUDIT = ("trigger", "aplikasi")
+
+# waktu_aksi tidak diisi klien: DEFAULT CURRENT_TIMESTAMP memakai jam server saat INSERT, sama seperti trigger, sehingga
+# kursor halaman (waktu_aksi, log_id) dan partisi bulanan tidak terpengaruh jam workstation yang menyimpang.
+KOLOM_LOG_PENGHUNI = ("nim", "nama_penghuni_lama", "nama_penghuni_baru", "fakultas_lama", "fakultas_baru",
+                      "kamar_id_internal_lama", "kamar_id_internal_baru", "nomor_kamar_lama", "nama_asrama_lama",
+                      "nomor_kamar_baru", "nama_asrama_baru", "aksi", "user_aksi", "keterangan_tambahan")
+
+# Kueri sumber ekspor; log audit diekspor lengkap (semua kolom) dalam urutan indeks (waktu_aksi, log_id).
+SUMBER_EKSPOR = {
+    "penghuni": """SELECT nim, nama_penghuni, fakultas, nomor_kamar, id_asrama_kamar AS asrama_id, nama_asrama
+            FROM vw_DaftarPenghuniLengkap ORDER BY id_asrama_kamar, nomor_kamar, nim""",
+    **{f"audit_{jenis}": f"SELECT * FROM {tabel} ORDER BY waktu_aksi, log_id" for jenis, (tabel, _) in KUERI_LOG_AUDIT.items()},
+}
+
 class DatabaseService:
     """
     Mengenkapsulasi semua interaksi dengan database MySQL.
     Menyediakan metode untuk operasi CRUD pada entitas Asrama, Kamar, dan Penghuni.
     Menggunakan View dan Stored Procedure.
     Otomatis mencoba membuat skema database jika belum ada.
+    Setiap operasi meminjam koneksi sendiri dari pool sehingga aman dipanggil dari beberapa thread.
     """
-    def __init__(self, host, user, password, database_name, parent_window=None):
+    def __init__(self, host, user, password, database_name, parent_window=None,
+                 pool_size=5, pool_timeout=10.0, pool_recycle=1800,
+                 seed_tata_letak=None, seed_tanpa_audit=False, audit_retensi_bulan=None, cache_ttl=60.0,
+                 statistik_kueri=False, ambang_lambat_ms=None, log_kueri_lambat=None, audit_mode="trigger"):
         self._host = host
         self._user = user
         self._password = password
         self._database_name = database_name
         self._parent_window = parent_window 
-        self._conn = None 
-        self._cursor = None 
+        self._pool_size = pool_size
+        self._pool_timeout = pool_timeout
+        self._pool_recycle = pool_recycle
+        self._seed_tata_letak = seed_tata_letak
+        self._seed_tanpa_audit = seed_tanpa_audit
+        self._audit_retensi_bulan = audit_retensi_bulan
+        self._cache = MasterDataCache(cache_ttl)
+        self._statistik_kueri = StatistikKueri(statistik_kueri, ambang_lambat_ms, log_kueri_lambat)
+        self._pool = None 
+        self._penulis_audit = None
+        self._lokal = threading.local()  # transaksi aktif milik thread ini (lihat transaction())
         self._connect()
-        if self._conn: 
+        if self._pool: 
             self._initialize_database_schema() 
+            self.kelola_partisi_audit(self._audit_retensi_bulan)
             self._populate_initial_master_data_if_empty() 
+            self.atur_mode_audit(audit_mode)
 
     def _connect(self):
-        """Membuat koneksi ke database MySQL."""
+        """Memastikan database ada, lalu membuat pool koneksi ke database MySQL."""
         try:
-            self._conn = mysql.connector.connect(
+            conn_awal = mysql.connector.connect(
                 host=self._host, 
                 user=self._user, 
                 password=self._password 
             )
-            self._cursor = self._conn.cursor(dictionary=True) 
-            self._cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self._database_name}") 
-            self._cursor.execute(f"USE {self._database_name}") 
-            self._conn.database = self._database_name
-            print(f"Berhasil terhubung ke database MySQL dan menggunakan database '{self._database_name}'.")
+            try:
+                cursor_awal = conn_awal.cursor()
+                cursor_awal.execute(f"CREATE DATABASE IF NOT EXISTS {self._database_name}") 
+                cursor_awal.close()
+            finally:
+                conn_awal.close()
+            self._pool = ConnectionPool(
+                # autocommit: kueri baca tidak membuka transaksi (dan snapshot REPEATABLE READ) yang tertinggal;
+                # penulisan multi-pernyataan dibungkus transaction().
+                dict(host=self._host, user=self._user, password=self._password, database=self._database_name, autocommit=True),
+                ukuran=self._pool_size, timeout_checkout=self._pool_timeout, recycle_detik=self._pool_recycle
+            )
+            print(f"Berhasil terhubung ke database MySQL dan menggunakan database '{self._database_name}' (pool {self._pool.ukuran} koneksi).")
         except mysql.connector.Error as err:
             print(f"Kesalahan koneksi database MySQL: {err}")
             if self._parent_window and self._parent_window.winfo_exists():
                 messagebox.showerror("Kesalahan Database", f"Tidak dapat terhubung ke MySQL: {err}\n\nPastikan server MySQL berjalan dan detail koneksi benar.", parent=self._parent_window)
             else:
                 print("Tidak dapat menampilkan messagebox karena parent window tidak valid atau tidak ada.")
-            self._conn = None
-            self._cursor = None
+            self._pool = None
+
+    def is_connected(self):
+        """True jika pool koneksi berhasil dibuat."""
+        return self._pool is not None
 
     def _close(self):
-        """Menutup koneksi database."""
-        if self._cursor: 
-            self._cursor.close()
-        if self._conn and self._conn.is_connected(): 
-            self._conn.close()
+        """Menutup semua koneksi di pool."""
+        if self._pool: 
+            self.atur_mode_audit("trigger")
+            self._pool.tutup_semua()
+            self._pool = None
+            self._statistik_kueri.tutup()
             print("Koneksi MySQL ditutup.")
 
-    def _execute_single_ddl(self, ddl_statement):
+    @contextmanager
+    def _koneksi(self):
+        """
+        Meminjam satu koneksi dan cursor dari pool untuk satu operasi, lalu mengembalikannya.
+        Di dalam blok transaction() pada thread yang sama, koneksi transaksi itulah yang dipakai.
+        """
+        aktif = getattr(self._lokal, 'transaksi', None)
+        if aktif is not None:
+            yield aktif['koneksi']
+            return
+        conn = self._pool.pinjam()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True, buffered=True)
+            yield conn, cursor
+        except mysql.connector.Error as err:
+            if koneksi_putus(err):
+                self._pool.tandai_rusak(conn)
+            raise
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except mysql.connector.Error:
+                    self._pool.tandai_rusak(conn)
+            # Pengaman: transaksi yang tertinggal terbuka (misalnya karena error) tidak boleh terbawa ke
+            # peminjam berikutnya beserta kunci dan snapshot-nya.
+            try:
+                if conn.in_transaction: conn.rollback()
+            except mysql.connector.Error:
+                self._pool.tandai_rusak(conn)
+            self._pool.kembalikan(conn)
+
+    def _panggil_sp(self, cursor, nama_sp, args):
+        """Memanggil stored procedure dan mengembalikan baris pertama dari result set pertamanya."""
+        with self._statistik_kueri.ukur(None, args, nama=f"CALL {nama_sp}") as ukur:
+            cursor.callproc(nama_sp, args)
+            for result in cursor.stored_results():
+                row = result.fetchone()
+                ukur.catat_baris(1 if row else 0)
+                return row
+            return None
+
+    @contextmanager
+    def transaction(self, user_aksi=None):
+        """
+        Blok transaksi tulis eksplisit:
+
+            with service.transaction(user_aksi) as (conn, cursor):
+                cursor.execute(...)
+
+        Koneksi pool berjalan dengan autocommit, sehingga kueri baca tidak pernah menahan snapshot; blok ini
+        memulai transaksi, commit jika selesai, dan rollback jika melempar exception. Koneksinya disimpan per
+        thread: _koneksi()/_execute_query di thread yang sama memakai koneksi ini. transaction() bersarang
+        berjalan di atas SAVEPOINT milik transaksi terluar: exception atau _batalkan_transaksi() di dalamnya
+        hanya membatalkan blok itu sendiri. Jangan memanggil conn.commit()/conn.rollback() di dalam blok; untuk
+        membatalkan isi blok (misalnya saat validasi gagal) gunakan _batalkan_transaksi().
+        user_aksi diset sebagai @session_user_aksi selama blok terluar.
+        Fungsi yang didaftarkan lewat _setelah_commit() dijalankan setelah commit berhasil, dan dibuang bersama
+        blok yang dibatalkan.
+        """
+        aktif = getattr(self._lokal, 'transaksi', None)
+        if aktif is not None:
+            yield from self._transaksi_bersarang(aktif)
+            return
+        with self._koneksi() as (conn, cursor):
+            tingkat = {'savepoint': None, 'setelah_commit': []}
+            aktif = {'koneksi': (conn, cursor), 'tingkat': [tingkat]}
+            conn.start_transaction()
+            self._lokal.transaksi = aktif
+            try:
+                if user_aksi is not None:
+                    cursor.execute("SET @session_user_aksi = %s", (user_aksi,))
+                yield conn, cursor
+                conn.commit()
+            except BaseException:
+                try:
+                    if conn.in_transaction: conn.rollback()
+                except mysql.connector.Error: pass
+                raise
+            finally:
+                self._lokal.transaksi = None
+                if user_aksi is not None:
+                    try:
+                        cursor.execute("SET @session_user_aksi = NULL")
+                    except mysql.connector.Error: pass
+        for fungsi in tingkat['setelah_commit']:
+            fungsi()
+
+    def _transaksi_bersarang(self, aktif):
+        conn, cursor = aktif['koneksi']
+        induk = aktif['tingkat'][-1]
+        tingkat = {'savepoint': f"sp_transaksi_{len(aktif['tingkat'])}", 'setelah_commit': []}
+        cursor.execute(f"SAVEPOINT {tingkat['savepoint']}")
+        aktif['tingkat'].append(tingkat)
+        try:
+            yield conn, cursor
+            cursor.execute(f"RELEASE SAVEPOINT {tingkat['savepoint']}")
+        except BaseException:
+            try:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {tingkat['savepoint']}")
+            except mysql.connector.Error: pass  # misalnya deadlock: server sudah membatalkan seluruh transaksi
+            raise
+        finally:
+            aktif['tingkat'].pop()
+        induk['setelah_commit'] += tingkat['setelah_commit']
+
+    def _batalkan_transaksi(self):
+        """
+        Membatalkan semua perubahan blok transaction() terdalam milik thread ini (dan fungsi _setelah_commit-nya)
+        tanpa menyentuh transaksi pemanggil di luarnya; blok tetap dapat dilanjutkan lalu selesai normal.
+        """
+        aktif = self._lokal.transaksi
+        conn, cursor = aktif['koneksi']
+        tingkat = aktif['tingkat'][-1]
+        if tingkat['savepoint']:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {tingkat['savepoint']}")
+        else:
+            conn.rollback()
+            conn.start_transaction()
+        tingkat['setelah_commit'].clear()
+
+    def _dalam_transaksi(self):
+        return getattr(self._lokal, 'transaksi', None) is not None
+
+    def _setelah_commit(self, fungsi):
+        """Menunda fungsi (catatan audit, invalidasi cache) sampai transaksi thread ini di-commit; langsung jika tidak ada transaksi."""
+        aktif = getattr(self._lokal, 'transaksi', None)
+        if aktif is None:
+            fungsi()
+        else:
+            aktif['tingkat'][-1]['setelah_commit'].append(fungsi)
+
+    def _transaksi_dengan_ulang(self, operasi, *args, user_aksi=None):
+        """
+        Menjalankan operasi(conn, cursor, *args) di dalam transaction(). Jika transaksinya dibatalkan server karena
+        deadlock (1213) atau batas tunggu kunci (1205), seluruh operasi diulang pada koneksi baru dengan jeda acak
+        yang berlipat, paling banyak MAKS_PERCOBAAN_KONFLIK kali; error lain langsung dilempar. Di dalam transaksi
+        yang sudah berjalan, operasi dijalankan sekali tanpa pengulangan (transaksi terluar yang menentukan).
+        """
+        bersarang = self._dalam_transaksi()
+        for percobaan in range(1, MAKS_PERCOBAAN_KONFLIK + 1):
+            try:
+                with self.transaction(user_aksi) as (conn, cursor):
+                    return operasi(conn, cursor, *args)
+            except mysql.connector.Error as err:
+                if bersarang or err.errno not in KODE_KONFLIK_KUNCI or percobaan == MAKS_PERCOBAAN_KONFLIK:
+                    raise
+                jeda = JEDA_AWAL_KONFLIK * (2 ** (percobaan - 1)) * random.uniform(0.5, 1.5)
+                print(f"Transaksi dibatalkan karena konflik kunci ({err.errno}), percobaan {percobaan}/{MAKS_PERCOBAAN_KONFLIK}. "
+                      f"Mengulang dalam {jeda:.2f} detik.")
+                time.sleep(jeda)
+
+    def _execute_single_ddl(self, ddl_statement, koneksi=None):
         """Mengeksekusi satu pernyataan DDL dan melakukan commit."""
-        if not self._conn or not self._conn.is_connected():
+        if not self._pool:
             print(f"Eksekusi DDL dibatalkan, tidak ada koneksi: {ddl_statement[:50]}...")
             return False
+        if koneksi is None:
+            with self._koneksi() as koneksi_baru:
+                return self._execute_single_ddl(ddl_statement, koneksi_baru)
+        conn, cursor = koneksi
         try:
-            if "$$" in ddl_statement: 
-                statements = ddl_statement.split("$$")
-                for stmt_part in statements:
-                    stmt_part = stmt_part.strip()
-                    if stmt_part.upper().startswith("DELIMITER"): 
-                        continue
-                    if stmt_part: 
-                        self._cursor.execute(stmt_part)
-            else:
-                self._cursor.execute(ddl_statement)
-            
-            self._conn.commit()
+            with self._statistik_kueri.ukur(ddl_statement):
+                if "$$" in ddl_statement: 
+                    statements = ddl_statement.split("$$")
+                    for stmt_part in statements:
+                        stmt_part = stmt_part.strip()
+                        if stmt_part.upper().startswith("DELIMITER"): 
+                            continue
+                        if stmt_part: 
+                            cursor.execute(stmt_part)
+                else:
+                    cursor.execute(ddl_statement)
+                
+                conn.commit()
             return True
         except mysql.connector.Error as err:
+            if err.errno in KODE_DDL_SUDAH_ADA:
+                print(f"Info: DDL sudah pernah diterapkan ({err.msg}), dilewati.")
+                return True
             print(f"Peringatan/Error saat menjalankan DDL: {err}\nDDL: {ddl_statement[:200]}...")
             try:
-                if self._conn.in_transaction: self._conn.rollback()
+                if conn.in_transaction: conn.rollback()
             except: pass
             return False
 
-    def _execute_query(self, query, params=None, fetch_one=False, fetch_all=False, is_ddl_or_commit_managed_elsewhere=False): 
-        """Helper untuk eksekusi kueri dengan error handling."""
-        if not self._conn or not self._conn.is_connected(): 
+    @staticmethod
+    def _kueri_baca(query):
+        """True untuk kueri yang aman diulang (tidak mengubah data)."""
+        return query.lstrip().upper().startswith(("SELECT", "SHOW", "EXPLAIN", "WITH"))
+
+    def _execute_query(self, query, params=None, fetch_one=False, fetch_all=False, is_ddl_or_commit_managed_elsewhere=False, koneksi=None): 
+        """
+        Helper untuk eksekusi kueri dengan error handling.
+        Jika koneksi (conn, cursor) tidak diberikan, satu koneksi dipinjam dari pool khusus untuk kueri ini.
+        Kueri dijalankan tanpa ping terlebih dahulu; kueri baca yang gagal karena koneksi putus diulang sekali
+        dengan koneksi baru.
+        """
+        nilai_gagal = None if fetch_one or fetch_all else False
+        if not self._pool: 
             print("Kesalahan Database: Tidak ada koneksi ke database MySQL.")
-            return None if fetch_one or fetch_all else False
+            return nilai_gagal
+        if koneksi is not None:
+            try:
+                return self._jalankan_kueri(koneksi, query, params, fetch_one, fetch_all, is_ddl_or_commit_managed_elsewhere)
+            except mysql.connector.Error as err:
+                print(f"Kesalahan kueri MySQL: {err}\nKueri: {query}\nParams: {params}")
+                if self._dalam_transaksi(): raise
+                return nilai_gagal
+
+        maks_percobaan = 2 if self._kueri_baca(query) else 1
+        for percobaan in range(1, maks_percobaan + 1):
+            try:
+                with self._koneksi() as koneksi_baru:
+                    return self._jalankan_kueri(koneksi_baru, query, params, fetch_one, fetch_all, is_ddl_or_commit_managed_elsewhere)
+            except mysql.connector.Error as err:
+                if percobaan < maks_percobaan and koneksi_putus(err) and not self._dalam_transaksi():
+                    print(f"Koneksi MySQL terputus ({err}). Mengulang kueri dengan koneksi baru...")
+                    continue
+                print(f"Kesalahan kueri MySQL: {err}\nKueri: {query}\nParams: {params}")
+                if self._dalam_transaksi(): raise  # jangan sembunyikan kegagalan dari blok transaction() pemanggil
+                return nilai_gagal
+
+    def _jalankan_kueri(self, koneksi, query, params, fetch_one, fetch_all, is_ddl_or_commit_managed_elsewhere):
+        """Mengeksekusi kueri pada koneksi yang sudah dipinjam; rollback (di luar transaction()) lalu melempar ulang jika gagal."""
+        conn, cursor = koneksi
         try:
-            self._cursor.execute(query, params) 
-            if not is_ddl_or_commit_managed_elsewhere and \
-               query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
-                self._conn.commit() 
-            if fetch_one:
-                return self._cursor.fetchone() 
-            if fetch_all:
-                return self._cursor.fetchall() 
-            return True
+            with self._statistik_kueri.ukur(query, params) as ukur:
+                cursor.execute(query, params)  # autocommit, kecuali di dalam transaction()
+                if fetch_one:
+                    row = cursor.fetchone()
+                    ukur.catat_baris(1 if row else 0)
+                    return row
+                if fetch_all:
+                    rows = cursor.fetchall()
+                    ukur.catat_baris(len(rows))
+                    return rows
+                ukur.catat_baris(cursor.rowcount)
+                return True
         except mysql.connector.Error as err:
-            print(f"Kesalahan kueri MySQL: {err}\nKueri: {query}\nParams: {params}")
-            if not is_ddl_or_commit_managed_elsewhere: 
+            if koneksi_putus(err):
+                self._pool.tandai_rusak(conn)
+            elif not is_ddl_or_commit_managed_elsewhere and not self._dalam_transaksi():
+                 # Di dalam transaction(), error dilempar ke blok transaksi yang membatalkan sendiri.
                  try:
-                    if self._conn.in_transaction:  
-                        self._conn.rollback() 
+                    if conn.in_transaction:  
+                        conn.rollback() 
                  except mysql.connector.Error as rb_err:
                     print(f"Kesalahan saat rollback: {rb_err}")
-            return None if fetch_one or fetch_all else False
+            raise
 
     def _initialize_database_schema(self):
-        """Membuat semua tabel, view, trigger, dan stored procedure jika belum ada."""
-        if not self._conn or not self._conn.is_connected():
+        """
+        Menerapkan langkah-langkah skema (tabel, view, trigger, stored procedure) dari schema.LANGKAH_SKEMA.
+        Jika checksum bundel yang tercatat di SchemaVersi sama dengan versi kode, tidak ada DDL yang dijalankan.
+        Jika berbeda, hanya langkah yang checksum-nya berubah yang diterapkan ulang.
+        """
+        if not self._pool:
             print("Inisialisasi skema dibatalkan: Tidak ada koneksi database.")
             return
 
-        print("Memulai inisialisasi skema database...")
-
-        tables_ddl = [
-            """CREATE TABLE IF NOT EXISTS Asrama (
-                asrama_id INTEGER PRIMARY KEY,
-                nama_asrama VARCHAR(255) NOT NULL UNIQUE
-            ) ENGINE=InnoDB;""",
-            """CREATE TABLE IF NOT EXISTS Fakultas (
-                fakultas_id INT AUTO_INCREMENT PRIMARY KEY,
-                nama_fakultas VARCHAR(255) NOT NULL UNIQUE
-            ) ENGINE=InnoDB;""",
-            """CREATE TABLE IF NOT EXISTS Kamar (
-                kamar_id_internal INTEGER PRIMARY KEY AUTO_INCREMENT,
-                nomor_kamar INTEGER NOT NULL,
-                asrama_id INTEGER NOT NULL,
-                kapasitas INTEGER NOT NULL DEFAULT 2,
-                FOREIGN KEY (asrama_id) REFERENCES Asrama(asrama_id) ON DELETE CASCADE,
-                UNIQUE (nomor_kamar, asrama_id)
-            ) ENGINE=InnoDB;""",
-            """CREATE TABLE IF NOT EXISTS PenggunaAplikasi (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(50) NOT NULL UNIQUE,
-                password_hash VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            ) ENGINE=InnoDB;""",
-            """CREATE TABLE IF NOT EXISTS Penghuni (
-                nim VARCHAR(50) PRIMARY KEY, nama_penghuni VARCHAR(255) NOT NULL,
-                fakultas_id INT NULL DEFAULT NULL, kamar_id_internal INTEGER NOT NULL,
-                FOREIGN KEY (kamar_id_internal) REFERENCES Kamar(kamar_id_internal) ON DELETE CASCADE,
-                FOREIGN KEY (fakultas_id) REFERENCES Fakultas(fakultas_id) ON DELETE SET NULL ON UPDATE CASCADE
-            ) ENGINE=InnoDB;""",
-            """CREATE TABLE IF NOT EXISTS AuditLogAktivitasPenghuni (
-                log_id INT AUTO_INCREMENT PRIMARY KEY, nim VARCHAR(50),
-                nama_penghuni_lama VARCHAR(255) DEFAULT NULL, nama_penghuni_baru VARCHAR(255) DEFAULT NULL,
-                fakultas_lama VARCHAR(255) DEFAULT NULL, fakultas_baru VARCHAR(255) DEFAULT NULL,
-                kamar_id_internal_lama INT DEFAULT NULL, kamar_id_internal_baru INT DEFAULT NULL,
-                nomor_kamar_lama INT DEFAULT NULL, nama_asrama_lama VARCHAR(255) DEFAULT NULL,
-                nomor_kamar_baru INT DEFAULT NULL, nama_asrama_baru VARCHAR(255) DEFAULT NULL,
-                aksi VARCHAR(10) NOT NULL, waktu_aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                user_aksi VARCHAR(50) DEFAULT NULL, keterangan_tambahan TEXT DEFAULT NULL
-            ) ENGINE=InnoDB;""",
-            """CREATE TABLE IF NOT EXISTS AuditLogAktivitasAsrama (
-                log_id INT AUTO_INCREMENT PRIMARY KEY,
-                asrama_id_aksi INT, 
-                nama_asrama_lama VARCHAR(255) DEFAULT NULL,
-                nama_asrama_baru VARCHAR(255) DEFAULT NULL,
-                aksi VARCHAR(10) NOT NULL,
-                waktu_aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                user_aksi VARCHAR(50) DEFAULT NULL,
-                keterangan_tambahan TEXT DEFAULT NULL
-            ) ENGINE=InnoDB;""",
-            """CREATE TABLE IF NOT EXISTS AuditLogAktivitasKamar (
-                log_id INT AUTO_INCREMENT PRIMARY KEY,
-                kamar_id_internal_aksi INT, 
-                nomor_kamar_lama INT DEFAULT NULL,
-                nomor_kamar_baru INT DEFAULT NULL,
-                asrama_id_lama INT DEFAULT NULL, 
-                asrama_id_baru INT DEFAULT NULL, 
-                nama_asrama_lama VARCHAR(255) DEFAULT NULL,
-                nama_asrama_baru VARCHAR(255) DEFAULT NULL,
-                kapasitas_lama INT DEFAULT NULL,
-                kapasitas_baru INT DEFAULT NULL,
-                aksi VARCHAR(10) NOT NULL,
-                waktu_aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                user_aksi VARCHAR(50) DEFAULT NULL,
-                keterangan_tambahan TEXT DEFAULT NULL
-            ) ENGINE=InnoDB;"""
-        ]
-        for ddl in tables_ddl: self._execute_single_ddl(ddl)
-        print("Tabel utama telah diperiksa/dibuat.")
-
-        views_ddl = [
-            """CREATE OR REPLACE VIEW vw_DetailKamarPenghuni AS
-            SELECT K.nomor_kamar, A.nama_asrama, K.asrama_id, K.kapasitas,
-            (SELECT COUNT(*) FROM Penghuni P WHERE P.kamar_id_internal = K.kamar_id_internal) AS jumlah_penghuni_sekarang,
-            K.kamar_id_internal FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id;""",
-            """CREATE OR REPLACE VIEW vw_DaftarPenghuniLengkap AS
-            SELECT P.nim, P.nama_penghuni, F.nama_fakultas AS fakultas, K.nomor_kamar, A.nama_asrama, 
-            K.asrama_id AS id_asrama_penghuni, A.asrama_id AS id_asrama_kamar, K.kamar_id_internal, P.fakultas_id
-            FROM Penghuni P JOIN Kamar K ON P.kamar_id_internal = K.kamar_id_internal
-            JOIN Asrama A ON K.asrama_id = A.asrama_id LEFT JOIN Fakultas F ON P.fakultas_id = F.fakultas_id;"""
-        ]
-        for ddl in views_ddl: self._execute_single_ddl(ddl)
-        print("View telah diperiksa/dibuat.")
-
-        # Triggers for Penghuni
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogInsertPenghuni")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogInsertPenghuni AFTER INSERT ON Penghuni FOR EACH ROW
-        BEGIN
-            DECLARE v_nk INT; DECLARE v_na VARCHAR(255); DECLARE v_nf VARCHAR(255) DEFAULT NULL; DECLARE v_ua VARCHAR(50) DEFAULT NULL;
-            SELECT K.nomor_kamar, A.nama_asrama INTO v_nk, v_na FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = NEW.kamar_id_internal;
-            IF NEW.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nf FROM Fakultas WHERE fakultas_id = NEW.fakultas_id; END IF;
-            SET v_ua = @session_user_aksi;
-            INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_baru, fakultas_baru, kamar_id_internal_baru, nomor_kamar_baru, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
-            VALUES (NEW.nim, NEW.nama_penghuni, v_nf, NEW.kamar_id_internal, v_nk, v_na, 'INSERT', v_ua, CONCAT('Penghuni baru ditambahkan ke kamar ', v_nk, ' Asrama ', v_na));
-        END""")
-        
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogUpdatePenghuni")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogUpdatePenghuni AFTER UPDATE ON Penghuni FOR EACH ROW
-        BEGIN
-            DECLARE v_nkl INT DEFAULT NULL; DECLARE v_nal VARCHAR(255) DEFAULT NULL; DECLARE v_nfl VARCHAR(255) DEFAULT NULL;
-            DECLARE v_nkb INT DEFAULT NULL; DECLARE v_nab VARCHAR(255) DEFAULT NULL; DECLARE v_nfb VARCHAR(255) DEFAULT NULL;
-            DECLARE v_ua VARCHAR(50) DEFAULT NULL; DECLARE v_ket TEXT DEFAULT 'Data penghuni diubah.';
-            IF OLD.kamar_id_internal IS NOT NULL THEN SELECT K.nomor_kamar, A.nama_asrama INTO v_nkl, v_nal FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = OLD.kamar_id_internal; END IF;
-            IF OLD.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nfl FROM Fakultas WHERE fakultas_id = OLD.fakultas_id; END IF;
-            IF NEW.kamar_id_internal IS NOT NULL THEN SELECT K.nomor_kamar, A.nama_asrama INTO v_nkb, v_nab FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = NEW.kamar_id_internal; END IF;
-            IF NEW.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nfb FROM Fakultas WHERE fakultas_id = NEW.fakultas_id; END IF;
-            SET v_ua = @session_user_aksi;
-            IF OLD.kamar_id_internal != NEW.kamar_id_internal THEN SET v_ket = CONCAT('Penghuni pindah dari kamar ', IFNULL(v_nkl,'N/A'), ' Asrama ', IFNULL(v_nal,'N/A'), ' ke kamar ', IFNULL(v_nkb,'N/A'), ' Asrama ', IFNULL(v_nab,'N/A'), '.');
-            ELSEIF OLD.fakultas_id != NEW.fakultas_id OR (OLD.fakultas_id IS NULL AND NEW.fakultas_id IS NOT NULL) OR (OLD.fakultas_id IS NOT NULL AND NEW.fakultas_id IS NULL) THEN SET v_ket = CONCAT('Fakultas diubah dari ', IFNULL(v_nfl,'N/A'), ' menjadi ', IFNULL(v_nfb,'N/A'), '.');
-            ELSEIF OLD.nama_penghuni != NEW.nama_penghuni THEN SET v_ket = CONCAT('Nama diubah dari ', OLD.nama_penghuni, ' menjadi ', NEW.nama_penghuni, '.'); END IF;
-            INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_lama, nama_penghuni_baru, fakultas_lama, fakultas_baru, kamar_id_internal_lama, kamar_id_internal_baru, nomor_kamar_lama, nama_asrama_lama, nomor_kamar_baru, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
-            VALUES (OLD.nim, OLD.nama_penghuni, NEW.nama_penghuni, v_nfl, v_nfb, OLD.kamar_id_internal, NEW.kamar_id_internal, v_nkl, v_nal, v_nkb, v_nab, 'UPDATE', v_ua, v_ket);
-        END""")
-
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogDeletePenghuni")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogDeletePenghuni AFTER DELETE ON Penghuni FOR EACH ROW
-        BEGIN
-            DECLARE v_nk INT DEFAULT NULL; DECLARE v_na VARCHAR(255) DEFAULT NULL; DECLARE v_nf VARCHAR(255) DEFAULT NULL; DECLARE v_ua VARCHAR(50) DEFAULT NULL;
-            IF OLD.kamar_id_internal IS NOT NULL THEN SELECT K.nomor_kamar, A.nama_asrama INTO v_nk, v_na FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = OLD.kamar_id_internal; END IF;
-            IF OLD.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nf FROM Fakultas WHERE fakultas_id = OLD.fakultas_id; END IF;
-            SET v_ua = @session_user_aksi;
-            INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_lama, fakultas_lama, kamar_id_internal_lama, nomor_kamar_lama, nama_asrama_lama, aksi, user_aksi, keterangan_tambahan)
-            VALUES (OLD.nim, OLD.nama_penghuni, v_nf, OLD.kamar_id_internal, v_nk, v_na, 'DELETE', v_ua, CONCAT('Penghuni dihapus dari kamar ', IFNULL(v_nk, 'N/A'), ' Asrama ', IFNULL(v_na, 'N/A')));
-        END""")
-        
-        # Triggers for Asrama
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogInsertAsrama")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogInsertAsrama AFTER INSERT ON Asrama FOR EACH ROW
-        BEGIN
-            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; SET v_user_aksi = @session_user_aksi;
-            INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
-            VALUES (NEW.asrama_id, NEW.nama_asrama, 'INSERT', v_user_aksi, CONCAT('Asrama baru: ID ', NEW.asrama_id, ', Nama: ', NEW.nama_asrama));
-        END""")
-
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogUpdateAsrama")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogUpdateAsrama AFTER UPDATE ON Asrama FOR EACH ROW
-        BEGIN
-            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_keterangan TEXT;
-            SET v_user_aksi = @session_user_aksi; SET v_keterangan = CONCAT('Asrama ID ', OLD.asrama_id, ' diubah. ');
-            IF OLD.nama_asrama != NEW.nama_asrama THEN SET v_keterangan = CONCAT(v_keterangan, 'Nama dari ''', OLD.nama_asrama, ''' menjadi ''', NEW.nama_asrama, '''.'); END IF;
-            INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_lama, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
-            VALUES (OLD.asrama_id, OLD.nama_asrama, NEW.nama_asrama, 'UPDATE', v_user_aksi, v_keterangan);
-        END""")
-
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogDeleteAsrama")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogDeleteAsrama AFTER DELETE ON Asrama FOR EACH ROW
-        BEGIN
-            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; SET v_user_aksi = @session_user_aksi;
-            INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_lama, aksi, user_aksi, keterangan_tambahan)
-            VALUES (OLD.asrama_id, OLD.nama_asrama, 'DELETE', v_user_aksi, CONCAT('Asrama dihapus: ID ', OLD.asrama_id, ', Nama: ', OLD.nama_asrama));
-        END""")
-
-        # Triggers for Kamar
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogInsertKamar")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogInsertKamar AFTER INSERT ON Kamar FOR EACH ROW
-        BEGIN
-            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_nama_asrama VARCHAR(255);
-            SET v_user_aksi = @session_user_aksi; SELECT nama_asrama INTO v_nama_asrama FROM Asrama WHERE asrama_id = NEW.asrama_id;
-            INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_baru, asrama_id_baru, nama_asrama_baru, kapasitas_baru, aksi, user_aksi, keterangan_tambahan)
-            VALUES (NEW.kamar_id_internal, NEW.nomor_kamar, NEW.asrama_id, v_nama_asrama, NEW.kapasitas, 'INSERT', v_user_aksi, 
-                    CONCAT('Kamar baru: No ', NEW.nomor_kamar, ', Asrama: ', v_nama_asrama, ', Kap: ', NEW.kapasitas));
-        END""")
-
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogUpdateKamar")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogUpdateKamar AFTER UPDATE ON Kamar FOR EACH ROW
-        BEGIN
-            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_na_lama VARCHAR(255); DECLARE v_na_baru VARCHAR(255); DECLARE v_ket TEXT;
-            SET v_user_aksi = @session_user_aksi;
-            SELECT nama_asrama INTO v_na_lama FROM Asrama WHERE asrama_id = OLD.asrama_id;
-            SELECT nama_asrama INTO v_na_baru FROM Asrama WHERE asrama_id = NEW.asrama_id;
-            SET v_ket = CONCAT('Kamar ID Int ', OLD.kamar_id_internal, ' diubah. ');
-            IF OLD.nomor_kamar != NEW.nomor_kamar THEN SET v_ket = CONCAT(v_ket, 'No: ', OLD.nomor_kamar, '->', NEW.nomor_kamar, '. '); END IF;
-            IF OLD.kapasitas != NEW.kapasitas THEN SET v_ket = CONCAT(v_ket, 'Kap: ', OLD.kapasitas, '->', NEW.kapasitas, '. '); END IF;
-            IF OLD.asrama_id != NEW.asrama_id THEN SET v_ket = CONCAT(v_ket, 'Asrama: ', v_na_lama, '->', v_na_baru, '. '); END IF;
-            INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_lama, nomor_kamar_baru, asrama_id_lama, asrama_id_baru, nama_asrama_lama, nama_asrama_baru, kapasitas_lama, kapasitas_baru, aksi, user_aksi, keterangan_tambahan)
-            VALUES (OLD.kamar_id_internal, OLD.nomor_kamar, NEW.nomor_kamar, OLD.asrama_id, NEW.asrama_id, v_na_lama, v_na_baru, OLD.kapasitas, NEW.kapasitas, 'UPDATE', v_user_aksi, v_ket);
-        END""")
-
-        self._execute_single_ddl("DROP TRIGGER IF EXISTS trg_LogDeleteKamar")
-        self._execute_single_ddl("""
-        CREATE TRIGGER trg_LogDeleteKamar AFTER DELETE ON Kamar FOR EACH ROW
-        BEGIN
-            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_nama_asrama VARCHAR(255);
-            SET v_user_aksi = @session_user_aksi; SELECT nama_asrama INTO v_nama_asrama FROM Asrama WHERE asrama_id = OLD.asrama_id;
-            INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_lama, asrama_id_lama, nama_asrama_lama, kapasitas_lama, aksi, user_aksi, keterangan_tambahan)
-            VALUES (OLD.kamar_id_internal, OLD.nomor_kamar, OLD.asrama_id, v_nama_asrama, OLD.kapasitas, 'DELETE', v_user_aksi, 
-                    CONCAT('Kamar dihapus: No ', OLD.nomor_kamar, ', Asrama: ', v_nama_asrama));
-        END""")
-        print("Trigger telah diperiksa/dibuat.")
-
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_TambahAsrama")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_TambahAsrama (
-            IN p_asrama_id INT,
-            IN p_nama_asrama VARCHAR(255)
-        )
-        BEGIN
-            DECLARE v_status_code INT;
-            DECLARE v_status_message VARCHAR(255);
-            SET v_status_code = 1; 
-            SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
-            IF p_asrama_id IS NULL OR p_nama_asrama IS NULL OR p_nama_asrama = '' THEN
-                SET v_status_code = 1;
-                SET v_status_message = 'Gagal: ID Asrama dan Nama Asrama tidak boleh kosong.';
-            ELSEIF EXISTS (SELECT 1 FROM Asrama WHERE asrama_id = p_asrama_id) THEN
-                SET v_status_code = 2;
-                SET v_status_message = CONCAT('Gagal: Asrama dengan ID ', p_asrama_id, ' sudah ada.');
-            ELSEIF EXISTS (SELECT 1 FROM Asrama WHERE nama_asrama = p_nama_asrama) THEN
-                SET v_status_code = 3;
-                SET v_status_message = CONCAT('Gagal: Nama Asrama ''', p_nama_asrama, ''' sudah digunakan.');
-            ELSE
-                SET @session_user_aksi = USER(); 
-                INSERT INTO Asrama (asrama_id, nama_asrama) VALUES (p_asrama_id, p_nama_asrama);
-                SET v_status_code = 0;
-                SET v_status_message = 'Sukses: Asrama berhasil ditambahkan.';
-                SET @session_user_aksi = NULL;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_UpdateAsrama")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_UpdateAsrama (
-            IN p_asrama_id INT,
-            IN p_nama_asrama_baru VARCHAR(255)
-        )
-        BEGIN
-            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
-            DECLARE v_asrama_exists INT DEFAULT 0; DECLARE v_nama_conflict INT DEFAULT 0;
-            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
-            IF p_asrama_id IS NULL OR p_nama_asrama_baru IS NULL OR p_nama_asrama_baru = '' THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Asrama dan Nama Asrama baru tidak boleh kosong.';
-            ELSE
-                SELECT COUNT(*) INTO v_asrama_exists FROM Asrama WHERE asrama_id = p_asrama_id;
-                IF v_asrama_exists = 0 THEN SET v_status_code = 2; SET v_status_message = CONCAT('Gagal: Asrama dengan ID ', p_asrama_id, ' tidak ditemukan.');
-                ELSE
-                    SELECT COUNT(*) INTO v_nama_conflict FROM Asrama WHERE nama_asrama = p_nama_asrama_baru AND asrama_id != p_asrama_id;
-                    IF v_nama_conflict > 0 THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: Nama Asrama ''', p_nama_asrama_baru, ''' sudah digunakan oleh asrama lain.');
-                    ELSE
-                        SET @session_user_aksi = USER();
-                        UPDATE Asrama SET nama_asrama = p_nama_asrama_baru WHERE asrama_id = p_asrama_id;
-                        IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Nama asrama berhasil diubah.';
-                        ELSE SET v_status_code = 0; SET v_status_message = 'Info: Tidak ada perubahan pada nama asrama (nama baru sama dengan nama lama).';
-                        END IF;
-                        SET @session_user_aksi = NULL;
-                    END IF;
-                END IF;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_HapusAsrama")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_HapusAsrama (
-            IN p_asrama_id INT
-        )
-        BEGIN
-            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
-            DECLARE v_kamar_count INT DEFAULT 0;
-            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
-            IF p_asrama_id IS NULL THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Asrama tidak boleh kosong.';
-            ELSE
-                SELECT COUNT(*) INTO v_kamar_count FROM Kamar WHERE asrama_id = p_asrama_id;
-                IF v_kamar_count > 0 THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Asrama tidak dapat dihapus karena masih memiliki kamar. Hapus semua kamar di asrama ini terlebih dahulu.';
-                ELSE
-                    SET @session_user_aksi = USER();
-                    DELETE FROM Asrama WHERE asrama_id = p_asrama_id;
-                    IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Asrama berhasil dihapus.';
-                    ELSE SET v_status_code = 3; SET v_status_message = 'Gagal: Asrama dengan ID tersebut tidak ditemukan.';
-                    END IF;
-                    SET @session_user_aksi = NULL;
-                END IF;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-        
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_TambahKamar")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_TambahKamar (
-            IN p_nomor_kamar INT, IN p_asrama_id INT, IN p_kapasitas INT
-        )
-        BEGIN
-            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
-            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
-            IF p_nomor_kamar IS NULL OR p_asrama_id IS NULL OR p_kapasitas IS NULL OR p_kapasitas <= 0 THEN SET v_status_code = 1; SET v_status_message = 'Gagal: Nomor kamar, ID asrama, dan kapasitas (harus > 0) tidak boleh kosong.';
-            ELSEIF NOT EXISTS (SELECT 1 FROM Asrama WHERE asrama_id = p_asrama_id) THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Asrama dengan ID tersebut tidak ditemukan.';
-            ELSEIF EXISTS (SELECT 1 FROM Kamar WHERE nomor_kamar = p_nomor_kamar AND asrama_id = p_asrama_id) THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: Kamar nomor ', p_nomor_kamar, ' sudah ada di asrama ini.');
-            ELSE 
-                SET @session_user_aksi = USER();
-                INSERT INTO Kamar (nomor_kamar, asrama_id, kapasitas) VALUES (p_nomor_kamar, p_asrama_id, p_kapasitas); 
-                SET v_status_code = 0; SET v_status_message = 'Sukses: Kamar berhasil ditambahkan.';
-                SET @session_user_aksi = NULL;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_UpdateKamar")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_UpdateKamar (
-            IN p_kamar_id_internal INT, IN p_nomor_kamar_baru INT, IN p_kapasitas_baru INT, IN p_asrama_id_konteks INT
-        )
-        BEGIN
-            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
-            DECLARE v_kamar_exists INT DEFAULT 0; DECLARE v_nomor_conflict INT DEFAULT 0;
-            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
-            IF p_kamar_id_internal IS NULL OR p_nomor_kamar_baru IS NULL OR p_kapasitas_baru IS NULL OR p_kapasitas_baru <= 0 THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Kamar, Nomor Kamar baru, dan Kapasitas baru (harus > 0) tidak boleh kosong.';
-            ELSE
-                SELECT COUNT(*) INTO v_kamar_exists FROM Kamar WHERE kamar_id_internal = p_kamar_id_internal;
-                IF v_kamar_exists = 0 THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar dengan ID tersebut tidak ditemukan.';
-                ELSE
-                    SELECT COUNT(*) INTO v_nomor_conflict FROM Kamar WHERE nomor_kamar = p_nomor_kamar_baru AND asrama_id = p_asrama_id_konteks AND kamar_id_internal != p_kamar_id_internal;
-                    IF v_nomor_conflict > 0 THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: Nomor kamar ', p_nomor_kamar_baru, ' sudah ada di asrama ini.');
-                    ELSE
-                        SET @session_user_aksi = USER();
-                        UPDATE Kamar SET nomor_kamar = p_nomor_kamar_baru, kapasitas = p_kapasitas_baru WHERE kamar_id_internal = p_kamar_id_internal;
-                        IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Detail kamar berhasil diubah.';
-                        ELSE SET v_status_code = 0; SET v_status_message = 'Info: Tidak ada perubahan pada detail kamar.';
-                        END IF;
-                        SET @session_user_aksi = NULL;
-                    END IF;
-                END IF;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_HapusKamar")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_HapusKamar (
-            IN p_kamar_id_internal INT
-        )
-        BEGIN
-            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
-            DECLARE v_penghuni_count INT DEFAULT 0;
-            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
-            IF p_kamar_id_internal IS NULL THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Kamar tidak boleh kosong.';
-            ELSE
-                SELECT COUNT(*) INTO v_penghuni_count FROM Penghuni WHERE kamar_id_internal = p_kamar_id_internal;
-                IF v_penghuni_count > 0 THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar tidak dapat dihapus karena masih memiliki penghuni. Hapus semua penghuni di kamar ini terlebih dahulu.';
-                ELSE
-                    SET @session_user_aksi = USER();
-                    DELETE FROM Kamar WHERE kamar_id_internal = p_kamar_id_internal;
-                    IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Kamar berhasil dihapus.';
-                    ELSE SET v_status_code = 3; SET v_status_message = 'Gagal: Kamar dengan ID tersebut tidak ditemukan.';
-                    END IF;
-                    SET @session_user_aksi = NULL;
-                END IF;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_TambahPenghuni")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_TambahPenghuni (
-            IN p_nim VARCHAR(50), IN p_nama_penghuni VARCHAR(255), IN p_nama_fakultas_input VARCHAR(255), 
-            IN p_nomor_kamar INT, IN p_asrama_id INT, IN p_user_aksi VARCHAR(50)
-        )
-        BEGIN
-            DECLARE v_k_id_int INT; DECLARE v_kap_kmr INT; DECLARE v_jml_p_skr INT; DECLARE v_fak_id INT DEFAULT NULL;
-            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
-            SET v_status_code = 4; SET v_status_message = 'Terjadi kesalahan tidak diketahui.';
-            SET @session_user_aksi = p_user_aksi; 
-            IF p_nim IS NULL OR p_nim = '' OR NOT (p_nim REGEXP '^[0-9]+$') THEN SET v_status_code = 5; SET v_status_message = 'Gagal: NIM tidak valid (harus berupa angka dan tidak boleh kosong).';
-            ELSE
-                IF p_nama_fakultas_input IS NOT NULL AND p_nama_fakultas_input != '' THEN
-                    SELECT fakultas_id INTO v_fak_id FROM Fakultas WHERE nama_fakultas = p_nama_fakultas_input;
-                    IF v_fak_id IS NULL THEN INSERT INTO Fakultas (nama_fakultas) VALUES (p_nama_fakultas_input); SET v_fak_id = LAST_INSERT_ID(); END IF;
-                END IF;
-                SELECT kamar_id_internal INTO v_k_id_int FROM Kamar WHERE nomor_kamar = p_nomor_kamar AND asrama_id = p_asrama_id;
-                IF v_k_id_int IS NULL THEN SET v_status_code = 1; SET v_status_message = 'Gagal: Kamar tidak ditemukan.';
-                ELSE
-                    SELECT kapasitas INTO v_kap_kmr FROM Kamar WHERE kamar_id_internal = v_k_id_int;
-                    SELECT COUNT(*) INTO v_jml_p_skr FROM Penghuni WHERE kamar_id_internal = v_k_id_int;
-                    IF v_jml_p_skr >= v_kap_kmr THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar sudah penuh.';
-                    ELSE
-                        IF EXISTS (SELECT 1 FROM Penghuni WHERE nim = p_nim) THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: NIM ', p_nim, ' sudah terdaftar.');
-                        ELSE INSERT INTO Penghuni (nim, nama_penghuni, fakultas_id, kamar_id_internal) VALUES (p_nim, p_nama_penghuni, v_fak_id, v_k_id_int); SET v_status_code = 0; SET v_status_message = 'Sukses: Penghuni berhasil ditambahkan.';
-                        END IF;
-                    END IF;
-                END IF;
-            END IF;
-            SET @session_user_aksi = NULL; 
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-        
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_PindahKamarPenghuni")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_PindahKamarPenghuni (
-            IN p_nim VARCHAR(50), IN p_nomor_kamar_baru INT, IN p_asrama_id_baru INT, IN p_user_aksi VARCHAR(50)
-        )
-        BEGIN
-            DECLARE v_k_id_lama INT; DECLARE v_k_id_baru INT; DECLARE v_kap_k_baru INT; DECLARE v_jml_p_k_baru INT;
-            DECLARE v_p_exists INT DEFAULT 0;
-            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
-            SET v_status_code = 4; SET v_status_message = 'Terjadi kesalahan tidak diketahui.';
-            SET @session_user_aksi = p_user_aksi;
-            IF p_nim IS NULL OR p_nim = '' OR NOT (p_nim REGEXP '^[0-9]+$') THEN SET v_status_code = 5; SET v_status_message = 'Gagal: NIM tidak valid (harus berupa angka dan tidak boleh kosong).';
-            ELSE
-                SELECT COUNT(*), kamar_id_internal INTO v_p_exists, v_k_id_lama FROM Penghuni WHERE nim = p_nim;
-                IF v_p_exists = 0 THEN SET v_status_code = 1; SET v_status_message = 'Gagal: Penghuni dengan NIM tersebut tidak ditemukan.';
-                ELSE
-                    SELECT kamar_id_internal INTO v_k_id_baru FROM Kamar WHERE nomor_kamar = p_nomor_kamar_baru AND asrama_id = p_asrama_id_baru;
-                    IF v_k_id_baru IS NULL THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar tujuan tidak ditemukan.';
-                    ELSE
-                        IF v_k_id_lama = v_k_id_baru THEN SET v_status_code = 0; SET v_status_message = 'Info: Penghuni sudah berada di kamar tujuan.';
-                        ELSE
-                            SELECT kapasitas INTO v_kap_k_baru FROM Kamar WHERE kamar_id_internal = v_k_id_baru;
-                            SELECT COUNT(*) INTO v_jml_p_k_baru FROM Penghuni WHERE kamar_id_internal = v_k_id_baru;
-                            IF v_jml_p_k_baru >= v_kap_k_baru THEN SET v_status_code = 3; SET v_status_message = 'Gagal: Kamar tujuan sudah penuh.';
-                            ELSE UPDATE Penghuni SET kamar_id_internal = v_k_id_baru WHERE nim = p_nim; SET v_status_code = 0; SET v_status_message = 'Sukses: Penghuni berhasil dipindahkan.';
-                            END IF;
-                        END IF;
-                    END IF;
-                END IF;
-            END IF;
-            SET @session_user_aksi = NULL;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
-        END""")
-        
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_RegistrasiPengguna")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_RegistrasiPengguna (
-            IN p_username VARCHAR(50), 
-            IN p_password_text VARCHAR(255) 
-        )
-        BEGIN
-            DECLARE v_user_exists INT DEFAULT 0;
-            DECLARE v_status_code INT; 
-            DECLARE v_status_message VARCHAR(255);
-            SET v_status_code = 2; 
-            SET v_status_message = 'Gagal melakukan registrasi.';
-            IF p_username IS NULL OR p_username = '' OR p_password_text IS NULL OR p_password_text = '' THEN 
-                SET v_status_code = 1; 
-                SET v_status_message = 'Username dan password tidak boleh kosong.';
-            ELSE
-                SELECT COUNT(*) INTO v_user_exists FROM PenggunaAplikasi WHERE username = p_username;
-                IF v_user_exists > 0 THEN 
-                    SET v_status_code = 2; 
-                    SET v_status_message = 'Username sudah terdaftar.';
-                ELSE 
-                    INSERT INTO PenggunaAplikasi (username, password_hash) VALUES (p_username, p_password_text); 
-                    SET v_status_code = 0; 
-                    SET v_status_message = 'Registrasi berhasil.';
-                END IF;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message; 
-        END""")
-
-        self._execute_single_ddl("DROP PROCEDURE IF EXISTS sp_LoginPengguna")
-        self._execute_single_ddl("""
-        CREATE PROCEDURE sp_LoginPengguna (
-            IN p_username VARCHAR(50), 
-            IN p_input_password_text VARCHAR(255) 
-        )
-        BEGIN
-            DECLARE v_stored_password_text VARCHAR(255) DEFAULT ''; 
-            DECLARE v_temp_user_id INT DEFAULT NULL;
-            DECLARE v_status_code INT; 
-            DECLARE v_status_message VARCHAR(255);
-            DECLARE v_logged_in_username VARCHAR(50) DEFAULT NULL;
-
-            SET v_status_code = 3; 
-            SET v_status_message = 'Login gagal. Periksa username dan password.'; 
-            
-            IF p_username IS NULL OR p_username = '' OR p_input_password_text IS NULL OR p_input_password_text = '' THEN 
-                SET v_status_code = 1; 
-                SET v_status_message = 'Username dan password tidak boleh kosong.';
-            ELSE
-                SELECT id, username, password_hash INTO v_temp_user_id, v_logged_in_username, v_stored_password_text 
-                FROM PenggunaAplikasi WHERE username = p_username;
-                
-                IF v_temp_user_id IS NULL THEN 
-                    SET v_status_code = 2; 
-                    SET v_status_message = 'Username tidak ditemukan.'; 
-                    SET v_logged_in_username = NULL; 
-                ELSE
-                    IF v_stored_password_text = p_input_password_text THEN 
-                        SET v_status_code = 0; 
-                        SET v_status_message = 'Login berhasil.'; 
-                    ELSE 
-                        SET v_status_code = 3; 
-                        SET v_status_message = 'Password salah.'; 
-                        SET v_temp_user_id = NULL; 
-                        SET v_logged_in_username = NULL;
-                    END IF;
-                END IF;
-            END IF;
-            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message, v_temp_user_id AS p_user_id, v_logged_in_username AS p_logged_in_username; 
-        END""")
-        print("Stored Procedures telah diperiksa/dibuat.")
-
-        print("Inisialisasi skema database selesai.")
+        checksum_bundel = schema.checksum_bundel()
+        try:
+            with self._koneksi() as koneksi:
+                conn, cursor = koneksi
+                if self._baca_checksum_versi(cursor, schema.NAMA_BUNDEL) == checksum_bundel:
+                    print("Skema database sudah terbaru.")
+                    return
+
+                # Klien lain mungkin sedang bermigrasi pada saat yang sama; tunggu gilirannya lalu periksa ulang.
+                cursor.execute("SELECT GET_LOCK(%s, 60) AS dapat", (f"{self._database_name}.migrasi_skema",))
+                if not (cursor.fetchone() or {}).get('dapat'):
+                    print("Inisialisasi skema dibatalkan: gagal mendapatkan kunci migrasi.")
+                    return
+                try:
+                    self._terapkan_langkah_skema(koneksi, checksum_bundel)
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (f"{self._database_name}.migrasi_skema",))
+                    cursor.fetchall()
+        except mysql.connector.Error as err:
+            print(f"Kesalahan saat inisialisasi skema database: {err}")
+
+    def _baca_checksum_versi(self, cursor, komponen):
+        """Membaca checksum satu komponen dari SchemaVersi; None jika belum ada (tabel dibuat bila belum ada)."""
+        try:
+            cursor.execute("SELECT checksum FROM SchemaVersi WHERE komponen = %s", (komponen,))
+        except mysql.connector.Error as err:
+            if err.errno != errorcode.ER_NO_SUCH_TABLE:
+                raise
+            cursor.execute(schema.DDL_TABEL_VERSI)
+            return None
+        row = cursor.fetchone()
+        return row['checksum'] if row else None
+
+    def _terapkan_langkah_skema(self, koneksi, checksum_bundel):
+        """Menjalankan langkah skema yang berubah dan mencatat checksum-nya di SchemaVersi."""
+        conn, cursor = koneksi
+        if self._baca_checksum_versi(cursor, schema.NAMA_BUNDEL) == checksum_bundel:
+            print("Skema database sudah dimigrasikan oleh klien lain.")
+            return
+        cursor.execute("SELECT komponen, checksum FROM SchemaVersi")
+        tercatat = {row['komponen']: row['checksum'] for row in cursor.fetchall()}
+
+        langkah_berubah = [(nama, pernyataan, schema.checksum_langkah(pernyataan))
+                           for nama, pernyataan in schema.LANGKAH_SKEMA
+                           if tercatat.get(nama) != schema.checksum_langkah(pernyataan)]
+        print(f"Memulai migrasi skema database: {len(langkah_berubah)} dari {len(schema.LANGKAH_SKEMA)} langkah perlu diterapkan...")
+
+        semua_sukses = True
+        for nama, pernyataan, checksum in langkah_berubah:
+            if all(self._execute_single_ddl(stmt, koneksi) for stmt in pernyataan):
+                self._catat_versi(koneksi, nama, checksum)
+                print(f"Langkah skema '{nama}' diterapkan.")
+            else:
+                semua_sukses = False
+                print(f"Langkah skema '{nama}' gagal; akan dicoba lagi saat aplikasi dijalankan berikutnya.")
+
+        if semua_sukses:
+            self._catat_versi(koneksi, schema.NAMA_BUNDEL, checksum_bundel)
+            print("Inisialisasi skema database selesai.")
+
+    def _catat_versi(self, koneksi, komponen, checksum):
+        conn, cursor = koneksi
+        cursor.execute("REPLACE INTO SchemaVersi (komponen, checksum) VALUES (%s, %s)", (komponen, checksum))
+        conn.commit()
+
+    def kelola_partisi_audit(self, retensi_bulan=None, bulan_ke_depan=3, hari_ini=None):
+        """
+        Menyiapkan partisi bulanan tabel log audit sampai bulan_ke_depan bulan setelah bulan ini (memecah p_max,
+        yang biasanya kosong atau kecil), lalu menghapus partisi yang lebih tua dari retensi_bulan bulan
+        (termasuk bulan ini) dengan DROP PARTITION, tanpa DELETE per baris. retensi_bulan=None berarti log disimpan selamanya.
+        Dijalankan otomatis saat start; aman dipanggil berkali-kali. Mengembalikan
+        {tabel: {'dibuat': [...], 'dihapus': [...]}}, atau None jika gagal/dilewati.
+        """
+        if not self._pool: return None
+        hari_ini = hari_ini or datetime.date.today()
+        bulan_ini = (hari_ini.year, hari_ini.month)
+        nama_kunci = f"{self._database_name}.partisi_audit"
+        try:
+            with self._koneksi() as (conn, cursor):
+                cursor.execute("SELECT GET_LOCK(%s, 0) AS dapat", (nama_kunci,))
+                if not (cursor.fetchone() or {}).get('dapat'):
+                    print("Pengelolaan partisi audit dilewati: sedang dijalankan oleh klien lain.")
+                    return None
+                try:
+                    ringkasan = {}
+                    for tabel in schema.TABEL_AUDIT:
+                        ringkasan[tabel] = self._kelola_partisi_tabel(cursor, tabel, bulan_ini, retensi_bulan, bulan_ke_depan)
+                    return ringkasan
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (nama_kunci,))
+                    cursor.fetchall()
+        except mysql.connector.Error as err:
+            print(f"Kesalahan saat mengelola partisi log audit: {err}")
+            return None
+
+    def _kelola_partisi_tabel(self, cursor, tabel, bulan_ini, retensi_bulan, bulan_ke_depan):
+        cursor.execute("""SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+                          WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY PARTITION_ORDINAL_POSITION""", (tabel,))
+        nama_partisi = [row['PARTITION_NAME'] for row in cursor.fetchall()]
+        if 'p_max' not in nama_partisi:
+            print(f"Tabel {tabel} belum dipartisi; pengelolaan partisi dilewati.")
+            return {'dibuat': [], 'dihapus': []}
+
+        bulanan = sorted(b for b in map(schema.bulan_dari_partisi, nama_partisi) if b)
+        if bulanan:
+            mulai = schema.geser_bulan(bulanan[-1], 1)
+        else:
+            # Pertama kali: riwayat lama yang masih ada di p_max ikut dibagi per bulan agar bisa dihapus sesuai retensi.
+            cursor.execute(f"SELECT MIN(waktu_aksi) AS awal FROM {tabel}")
+            awal = (cursor.fetchone() or {}).get('awal')
+            mulai = min((awal.year, awal.month), bulan_ini) if awal else bulan_ini
+
+        baru = []
+        bulan = mulai
+        while bulan <= schema.geser_bulan(bulan_ini, bulan_ke_depan):
+            baru.append(bulan)
+            bulan = schema.geser_bulan(bulan, 1)
+        if baru:
+            cursor.execute(schema.ddl_pecah_partisi_max(tabel, baru))
+            print(f"Partisi {tabel} ditambahkan: {', '.join(map(schema.nama_partisi_bulan, baru))}.")
+
+        dihapus = []
+        if retensi_bulan:
+            bulan_tertua = schema.geser_bulan(bulan_ini, -(int(retensi_bulan) - 1))
+            dihapus = [schema.nama_partisi_bulan(b) for b in bulanan + baru if b < bulan_tertua]
+            if dihapus:
+                cursor.execute(f"ALTER TABLE {tabel} DROP PARTITION {', '.join(dihapus)}")
+                print(f"Partisi {tabel} melewati retensi {retensi_bulan} bulan dan dihapus: {', '.join(dihapus)}.")
+        return {'dibuat': [schema.nama_partisi_bulan(b) for b in baru], 'dihapus': dihapus}
 
     def _populate_initial_master_data_if_empty(self):
-        """Mengisi data master awal untuk Asrama dan Fakultas jika tabel kosong."""
-        if not self._conn or not self._conn.is_connected(): return
+        """Mengisi data master awal untuk Asrama, Fakultas, dan Kamar (sesuai tata letak seeding) jika tabelnya kosong."""
+        if not self._pool: return
 
         try:
-            self._cursor.execute("SELECT COUNT(*) as count FROM Asrama")
-            if (self._cursor.fetchone() or {}).get('count', 0) == 0:
-                asramas_data = [
-                    (1, "Aster"), (2, "Soka"), (3, "Tulip"), (4, "Edelweiss"),
-                    (5, "Lily"), (6, "Dahlia"), (7, "Melati"), (8, "Anyelir")
-                ]
-                for asrama_id_val, nama in asramas_data:
-                    self._execute_query("INSERT INTO Asrama (asrama_id, nama_asrama) VALUES (%s, %s)", (asrama_id_val, nama), is_ddl_or_commit_managed_elsewhere=True)
-                self._conn.commit()
-                print("Data awal Asrama dimasukkan.")
-
-            self._cursor.execute("SELECT COUNT(*) as count FROM Fakultas")
-            if (self._cursor.fetchone() or {}).get('count', 0) == 0:
-                fakultas_data = [
-                    ('Teknik'), ('Ekonomi dan Bisnis'), ('Ilmu Sosial dan Ilmu Politik'),
-                    ('Kedokteran'), ('Ilmu Budaya'), ('MIPA'), ('Ilmu Komputer'),
-                    ('Ilmu Keolahragaan'), ('Vokasi'), ('Ilmu Pendidikan')
-                ]
-                for nama_fak in fakultas_data:
-                    self._execute_query("INSERT INTO Fakultas (nama_fakultas) VALUES (%s)", (nama_fak,), is_ddl_or_commit_managed_elsewhere=True)
-                self._conn.commit()
-                print("Data awal Fakultas dimasukkan.")
-            
-            self._cursor.execute("SELECT COUNT(*) as count FROM Kamar")
-            if (self._cursor.fetchone() or {}).get('count', 0) == 0:
-                kamar_data_all = []
-                for asrama_id_val in range(1, 9): 
-                    for lantai in range(1, 4): 
-                        for nomor_urut in range(1, 4): 
-                            nomor_kamar_val = (lantai * 100) + nomor_urut
-                            kamar_data_all.append((nomor_kamar_val, asrama_id_val, 2)) 
-                
-                for nk, aid, kap in kamar_data_all:
-                     self._execute_query("INSERT INTO Kamar (nomor_kamar, asrama_id, kapasitas) VALUES (%s, %s, %s)", (nk, aid, kap), is_ddl_or_commit_managed_elsewhere=True)
-                self._conn.commit()
-                print("Data awal Kamar untuk semua asrama dimasukkan.")
+            with self._koneksi() as (conn, cursor):
+                cursor.execute("""SELECT EXISTS(SELECT 1 FROM Asrama) AS ada_asrama, EXISTS(SELECT 1 FROM Fakultas) AS ada_fakultas,
+                                         EXISTS(SELECT 1 FROM Kamar) AS ada_kamar, EXISTS(SELECT 1 FROM PenggunaAplikasi) AS ada_pengguna""")
+                status_isi = cursor.fetchone() or {}
+
+            if not (status_isi.get('ada_asrama') and status_isi.get('ada_fakultas') and status_isi.get('ada_kamar')):
+                self.seed_master_data(self._seed_tata_letak, tanpa_audit=self._seed_tanpa_audit,
+                                      isi_asrama=not status_isi.get('ada_asrama'),
+                                      isi_fakultas=not status_isi.get('ada_fakultas'),
+                                      isi_kamar=not status_isi.get('ada_kamar'))
 
             # Tambahkan Admin Default jika tabel PenggunaAplikasi kosong
-            self._cursor.execute("SELECT COUNT(*) as count FROM PenggunaAplikasi")
-            if (self._cursor.fetchone() or {}).get('count', 0) == 0:
+            if not status_isi.get('ada_pengguna'):
                 print("Membuat pengguna admin default...")
                 default_username = "admin"
                 default_password_plain = "adminpassword" 
                 
                 args_admin_reg = (default_username, default_password_plain) 
-                self._cursor.callproc('sp_RegistrasiPengguna', args_admin_reg)
-                
-                admin_reg_result = None
-                for result in self._cursor.stored_results():
-                    admin_reg_result = result.fetchone()
-                    break
+                with self.transaction() as (conn, cursor):
+                    admin_reg_result = self._panggil_sp(cursor, 'sp_RegistrasiPengguna', args_admin_reg)
                 
                 if admin_reg_result and admin_reg_result.get('p_status_code') == 0:
-                    self._conn.commit()
                     print(f"Pengguna admin default '{default_username}' berhasil dibuat: {admin_reg_result.get('p_status_message')}")
                 elif admin_reg_result:
                     print(f"Gagal membuat pengguna admin default: {admin_reg_result.get('p_status_message')}")
@@ -676,6 +621,41 @@ class DatabaseService:
         except mysql.connector.Error as e:
             print(f"Kesalahan saat mengisi data master awal: {e}")
 
+    def seed_master_data(self, tata_letak=None, tanpa_audit=False, isi_asrama=True, isi_fakultas=True, isi_kamar=True, ukuran_batch=1000):
+        """
+        Memuat data master (Asrama, Fakultas, Kamar) dari tata letak deklaratif (lihat seeding.py)
+        dengan INSERT multi-baris dalam satu transaksi. Jika tanpa_audit=True, trigger audit tidak
+        mencatat baris-baris ini. Mengembalikan dict jumlah baris per tabel; melempar mysql.connector.Error
+        (setelah rollback) jika gagal.
+        """
+        tata_letak = tata_letak or seeding.TATA_LETAK_DEFAULT
+        muatan = []
+        if isi_asrama:
+            muatan.append(("Asrama", "INSERT INTO Asrama (asrama_id, nama_asrama) VALUES (%s, %s)", seeding.baris_asrama(tata_letak)))
+        if isi_fakultas:
+            muatan.append(("Fakultas", "INSERT INTO Fakultas (nama_fakultas) VALUES (%s)", seeding.baris_fakultas(tata_letak)))
+        if isi_kamar:
+            muatan.append(("Kamar", "INSERT INTO Kamar (nomor_kamar, asrama_id, kapasitas) VALUES (%s, %s, %s)", seeding.baris_kamar(tata_letak)))
+
+        jumlah = {}
+        with self.transaction() as (conn, cursor):
+            try:
+                if tanpa_audit:
+                    cursor.execute("SET @audit_nonaktif = 1")
+                for tabel, query, rows in muatan:
+                    for i in range(0, len(rows), ukuran_batch):
+                        cursor.executemany(query, rows[i:i + ukuran_batch])
+                    jumlah[tabel] = len(rows)
+            finally:
+                if tanpa_audit:
+                    try:
+                        cursor.execute("SET @audit_nonaktif = NULL")
+                    except mysql.connector.Error: pass
+        self._cache.hapus_semua()
+        for tabel, total in jumlah.items():
+            print(f"Data awal {tabel} dimasukkan ({total} baris).")
+        return jumlah
+
     def _hash_password(self, password):
         """Mengembalikan password teks biasa (TIDAK AMAN)."""
         return password 
@@ -685,38 +665,32 @@ class DatabaseService:
         if not username or not password:
             return False, "Username dan password tidak boleh kosong."
         
+        if not self._pool:
+            return False, "Kesalahan koneksi database internal (pool koneksi tidak ada)."
+
         try:
             args_in = (username, password) 
             
-            if not self._cursor:
-                return False, "Kesalahan koneksi database internal (cursor tidak ada)."
-
-            self._cursor.callproc('sp_RegistrasiPengguna', args_in)
-            
-            out_params_dict = None
-            for result in self._cursor.stored_results(): 
-                out_params_dict = result.fetchone()
-                break 
-            
-            if out_params_dict:
-                status_code = out_params_dict.get('p_status_code')
-                status_message = out_params_dict.get('p_status_message')
+            with self.transaction() as (conn, cursor):
+                out_params_dict = self._panggil_sp(cursor, 'sp_RegistrasiPengguna', args_in)
+                
+                if out_params_dict:
+                    status_code = out_params_dict.get('p_status_code')
+                    status_message = out_params_dict.get('p_status_message')
 
-                if status_code == 0:
-                    self._conn.commit()
-                    return True, status_message if status_message else "Registrasi berhasil."
+                    if status_code == 0:
+                        return True, status_message if status_message else "Registrasi berhasil."
+                    else:
+                        self._batalkan_transaksi()
+                        return False, status_message if status_message else "Registrasi gagal karena alasan tidak diketahui."
                 else:
-                    return False, status_message if status_message else "Registrasi gagal karena alasan tidak diketahui."
-            else:
-                msg = "Gagal mengambil hasil dari Stored Procedure Registrasi (tidak ada result set)."
-                print(f"ERROR: {msg}")
-                return False, msg
+                    msg = "Gagal mengambil hasil dari Stored Procedure Registrasi (tidak ada result set)."
+                    print(f"ERROR: {msg}")
+                    self._batalkan_transaksi()
+                    return False, msg
         except mysql.connector.Error as err:
             msg = f"Gagal memanggil sp_RegistrasiPengguna: {err}"
             print(f"ERROR: {msg}")
-            try:
-                if self._conn.in_transaction: self._conn.rollback()
-            except: pass
             return False, msg
         except Exception as e: 
             msg = f"Kesalahan tidak terduga saat registrasi: {e}"
@@ -732,16 +706,12 @@ class DatabaseService:
         args_in = (username, password)
         
         try:
-            if not self._cursor:
-                print("ERROR: Database cursor is not initialized.")
+            if not self._pool:
+                print("ERROR: Database pool is not initialized.")
                 return None, None, "Kesalahan koneksi database internal."
 
-            self._cursor.callproc('sp_LoginPengguna', args_in)
-            
-            out_params_dict = None
-            for result in self._cursor.stored_results():
-                out_params_dict = result.fetchone()
-                break
+            with self._koneksi() as (conn, cursor):
+                out_params_dict = self._panggil_sp(cursor, 'sp_LoginPengguna', args_in)
             
             if out_params_dict:
                 status_code = out_params_dict.get('p_status_code')
@@ -775,17 +745,13 @@ class DatabaseService:
 
 
     def add_penghuni(self, nim, nama, nama_fakultas, nomor_kamar_val, asrama_id_val, user_aksi):
-        if not self._conn or not self._conn.is_connected(): 
+        if not self._pool: 
             messagebox.showerror("Kesalahan Database", "Tidak ada koneksi ke database MySQL.", parent=self._parent_window)
             return False
+        penulis_audit = self._penulis_audit
         try:
             args_in = (nim, nama, nama_fakultas, nomor_kamar_val, asrama_id_val, user_aksi)
-            self._cursor.callproc('sp_TambahPenghuni', args_in) 
-            
-            out_params_dict = None
-            for result in self._cursor.stored_results():
-                out_params_dict = result.fetchone()
-                break
+            out_params_dict = self._transaksi_dengan_ulang(self._tambah_penghuni, args_in, penulis_audit)
             
             if out_params_dict:
                 status_code = out_params_dict.get('p_status_code')
@@ -793,7 +759,6 @@ class DatabaseService:
 
                 if status_code == 0: 
                     messagebox.showinfo("Sukses", status_message, parent=self._parent_window)
-                    self._conn.commit()  
                     return True
                 else:
                     messagebox.showerror("Gagal Menambah Penghuni", status_message, parent=self._parent_window)
@@ -803,23 +768,30 @@ class DatabaseService:
                 return False
         except mysql.connector.Error as err:
             messagebox.showerror("Kesalahan Database SP", f"Gagal memanggil sp_TambahPenghuni: {err}", parent=self._parent_window)
-            try:
-                if self._conn.in_transaction: self._conn.rollback() 
-            except: pass
             return False
 
+    def _tambah_penghuni(self, conn, cursor, args_in, penulis_audit):
+        """Satu percobaan sp_TambahPenghuni di dalam transaksi; mengembalikan baris status SP."""
+        nim, nama, nama_fakultas, nomor_kamar_val, asrama_id_val, user_aksi = args_in
+        with self._sesi_audit(cursor, penulis_audit):
+            out_params_dict = self._panggil_sp(cursor, 'sp_TambahPenghuni', args_in) 
+        if not (out_params_dict and out_params_dict.get('p_status_code') == 0):
+            self._batalkan_transaksi()  # fakultas baru yang sempat ditambahkan SP ikut dibatalkan
+            return out_params_dict
+        self._setelah_commit(lambda: self._hapus_cache_fakultas_jika_baru(nama_fakultas))
+        if penulis_audit:
+            self._setelah_commit(lambda: penulis_audit.catat([event_penghuni('INSERT', nim, user_aksi, nama_baru=nama, fakultas_baru=nama_fakultas or None,
+                                                                             kamar_baru=(int(nomor_kamar_val), int(asrama_id_val)))]))
+        return out_params_dict
+
     def pindah_kamar_penghuni(self, nim, nomor_kamar_baru, asrama_id_baru, user_aksi):
-        if not self._conn or not self._conn.is_connected(): 
+        if not self._pool: 
             messagebox.showerror("Kesalahan Database", "Tidak ada koneksi ke database MySQL.", parent=self._parent_window)
             return False, "Tidak ada koneksi database."
+        penulis_audit = self._penulis_audit
         try:
             args_in = (nim, nomor_kamar_baru, asrama_id_baru, user_aksi)
-            self._cursor.callproc('sp_PindahKamarPenghuni', args_in) 
-            
-            out_params_dict = None
-            for result in self._cursor.stored_results():
-                out_params_dict = result.fetchone()
-                break
+            out_params_dict = self._transaksi_dengan_ulang(self._pindah_kamar_penghuni, args_in, penulis_audit)
 
             if out_params_dict:
                 status_code = out_params_dict.get('p_status_code')
@@ -830,7 +802,6 @@ class DatabaseService:
                         messagebox.showinfo("Info Pindah Kamar", status_message, parent=self._parent_window)
                     else:
                         messagebox.showinfo("Sukses Pindah Kamar", status_message if status_message else "Operasi berhasil.", parent=self._parent_window)
-                    self._conn.commit() 
                     return True, status_message
                 else:
                     messagebox.showerror("Gagal Pindah Kamar", status_message, parent=self._parent_window)
@@ -840,259 +811,690 @@ class DatabaseService:
                 return False, "Gagal mengambil status SP."
         except mysql.connector.Error as err:
             messagebox.showerror("Kesalahan Database SP", f"Gagal memanggil sp_PindahKamarPenghuni: {err}", parent=self._parent_window)
-            try:
-                if self._conn.in_transaction: self._conn.rollback() 
-            except: pass
             return False, str(err)
 
 
-    def update_penghuni(self, nim_original, nim_baru, nama_baru, nama_fakultas_baru, user_aksi):
-        if not self._conn or not self._conn.is_connected(): 
+    def _pindah_kamar_penghuni(self, conn, cursor, args_in, penulis_audit):
+        """Satu percobaan sp_PindahKamarPenghuni di dalam transaksi; mengembalikan baris status SP."""
+        nim, nomor_kamar_baru, asrama_id_baru, user_aksi = args_in
+        lama = self._kunci_penghuni_untuk_audit(cursor, [nim]) if penulis_audit else {}
+        with self._sesi_audit(cursor, penulis_audit):
+            out_params_dict = self._panggil_sp(cursor, 'sp_PindahKamarPenghuni', args_in) 
+        if not (out_params_dict and out_params_dict.get('p_status_code') == 0):
+            self._batalkan_transaksi()
+            return out_params_dict
+        if penulis_audit and nim in lama and "Info:" not in (out_params_dict.get('p_status_message') or ""):
+            p = lama[nim]
+            self._setelah_commit(lambda: penulis_audit.catat([event_penghuni('UPDATE', nim, user_aksi, p['nama_penghuni'], p['nama_penghuni'],
+                                                                             p['fakultas_id'], p['fakultas_id'], p['kamar_id_internal'],
+                                                                             (int(nomor_kamar_baru), int(asrama_id_baru)))]))
+        return out_params_dict
+
+    def pindah_kamar_batch(self, daftar_pindah, user_aksi):
+        """
+        Memindahkan banyak penghuni sekaligus secara atomik. daftar_pindah berisi tuple
+        (nim, asrama_id_tujuan, nomor_kamar_tujuan). Kapasitas tiap kamar tujuan diperiksa sekali terhadap
+        efek bersih seluruh batch (penghuni yang keluar dan masuk pada batch yang sama ikut dihitung);
+        jika ada satu pemindahan yang tidak valid, tidak ada yang dipindahkan.
+        Setiap pemindahan tetap tercatat sebagai satu baris log audit (oleh trigger atau penulis audit aplikasi).
+        Mengembalikan (True, pesan) atau (False, pesan).
+        """
+        if not self._pool:
             messagebox.showerror("Kesalahan Database", "Tidak ada koneksi ke database MySQL.", parent=self._parent_window)
-            return "ERROR_CONNECTION" 
+            return False, "Tidak ada koneksi database."
+        if not daftar_pindah:
+            return False, "Tidak ada penghuni yang dipindahkan."
+        def satu_percobaan(conn, cursor):
+            with self._sesi_audit(cursor, self._penulis_audit) as penulis_audit:
+                return self._pindah_kamar_batch(conn, cursor, list(daftar_pindah), user_aksi, penulis_audit)
+        try:
+            sukses, pesan = self._transaksi_dengan_ulang(satu_percobaan, user_aksi=user_aksi)
+        except mysql.connector.Error as err:
+            messagebox.showerror("Kesalahan Database", f"Gagal memindahkan penghuni: {err}", parent=self._parent_window)
+            return False, str(err)
 
-        check_exists_query = "SELECT 1 FROM Penghuni WHERE nim = %s"
-        self._cursor.execute(check_exists_query, (nim_original,)) 
-        if not self._cursor.fetchone(): 
-            messagebox.showwarning("Perhatian", f"Tidak ada data penghuni yang cocok dengan NIM original: {nim_original}.", parent=self._parent_window)
-            return "ERROR_NIM_ORIGINAL_NOT_FOUND"
+        if sukses:
+            messagebox.showinfo("Sukses Pindah Kamar", pesan, parent=self._parent_window)
+        else:
+            messagebox.showerror("Gagal Pindah Kamar", pesan, parent=self._parent_window)
+        return sukses, pesan
+
+    def _pindah_kamar_batch(self, conn, cursor, daftar_pindah, user_aksi, penulis_audit=None):
+        """Validasi dan eksekusi pindah_kamar_batch di dalam transaksi pemanggil."""
+        kesalahan, daftar = [], []
+        for nim, asrama_id, nomor in daftar_pindah:
+            nim = str(nim)
+            if not nim.isdigit():
+                kesalahan.append(f"NIM {nim or '(kosong)'} tidak valid.")
+            try:
+                daftar.append((nim, int(asrama_id), int(nomor)))
+            except (TypeError, ValueError):
+                kesalahan.append(f"Kamar tujuan {nomor or '(kosong)'} di asrama {asrama_id or '(kosong)'} tidak valid (NIM {nim}).")
+        daftar_nim = [nim for nim, _, _ in daftar]
+        ganda = sorted({nim for nim in daftar_nim if daftar_nim.count(nim) > 1})
+        if ganda:
+            kesalahan.append(f"NIM muncul lebih dari sekali: {', '.join(ganda)}.")
+        if kesalahan:
+            return False, "Gagal: " + " ".join(kesalahan)
+
+        # Kunci baris penghuni lebih dulu, lalu baris kamar (urutan id), sama seperti urutan trigger okupansi.
+        placeholder_nim = ', '.join(['%s'] * len(daftar_nim))
+        cursor.execute(f"SELECT nim, nama_penghuni, fakultas_id, kamar_id_internal FROM Penghuni WHERE nim IN ({placeholder_nim}) FOR UPDATE", daftar_nim)
+        penghuni_asal = {row['nim']: row for row in cursor.fetchall()}
+        kamar_asal = {nim: row['kamar_id_internal'] for nim, row in penghuni_asal.items()}
+
+        tujuan_unik = sorted({(nomor, asrama_id) for _, asrama_id, nomor in daftar})
+        cursor.execute(f"""SELECT kamar_id_internal, nomor_kamar, asrama_id FROM Kamar
+                           WHERE (nomor_kamar, asrama_id) IN ({', '.join(['(%s, %s)'] * len(tujuan_unik))})""",
+                       [nilai for pasangan in tujuan_unik for nilai in pasangan])
+        id_tujuan = {(row['nomor_kamar'], row['asrama_id']): row['kamar_id_internal'] for row in cursor.fetchall()}
+
+        pindah = {}  # nim -> kamar_id_internal tujuan (hanya yang benar-benar berpindah)
+        for nim, asrama_id, nomor in daftar:
+            kamar_tujuan = id_tujuan.get((nomor, asrama_id))
+            if nim not in kamar_asal:
+                kesalahan.append(f"Penghuni dengan NIM {nim} tidak ditemukan.")
+            elif kamar_tujuan is None:
+                kesalahan.append(f"Kamar tujuan {nomor} di asrama {asrama_id} tidak ditemukan (NIM {nim}).")
+            elif kamar_tujuan != kamar_asal[nim]:
+                pindah[nim] = kamar_tujuan
+        if kesalahan:
+            self._batalkan_transaksi()
+            return False, "Gagal: " + " ".join(kesalahan)
+        if not pindah:
+            self._batalkan_transaksi()
+            return True, "Info: Semua penghuni sudah berada di kamar tujuan."
+
+        perubahan = {}  # kamar_id_internal -> perubahan bersih jumlah penghuni
+        for nim, kamar_tujuan in pindah.items():
+            perubahan[kamar_asal[nim]] = perubahan.get(kamar_asal[nim], 0) - 1
+            perubahan[kamar_tujuan] = perubahan.get(kamar_tujuan, 0) + 1
+        id_kamar = sorted(perubahan)
+        cursor.execute(f"""SELECT kamar_id_internal, nomor_kamar, kapasitas, occupied FROM Kamar
+                           WHERE kamar_id_internal IN ({', '.join(['%s'] * len(id_kamar))})
+                           ORDER BY kamar_id_internal FOR UPDATE""", id_kamar)
+        for kamar in cursor.fetchall():
+            bersih = perubahan[kamar['kamar_id_internal']]
+            if bersih > 0 and kamar['occupied'] + bersih > kamar['kapasitas']:
+                kesalahan.append(f"Kamar {kamar['nomor_kamar']} hanya memiliki {max(0, kamar['kapasitas'] - kamar['occupied'])} "
+                                 f"tempat kosong, tetapi batch menambah {bersih} penghuni.")
+        if kesalahan:
+            self._batalkan_transaksi()
+            return False, "Gagal: " + " ".join(kesalahan)
+
+        nim_pindah = list(pindah)
+        cursor.execute(f"""UPDATE Penghuni
+                           SET kamar_id_internal = CASE nim {' '.join(['WHEN %s THEN %s'] * len(nim_pindah))} END
+                           WHERE nim IN ({', '.join(['%s'] * len(nim_pindah))})""",
+                       [nilai for nim in nim_pindah for nilai in (nim, pindah[nim])] + nim_pindah)
+        if penulis_audit:
+            self._setelah_commit(lambda: penulis_audit.catat([
+                event_penghuni('UPDATE', nim, user_aksi, penghuni_asal[nim]['nama_penghuni'], penghuni_asal[nim]['nama_penghuni'],
+                               penghuni_asal[nim]['fakultas_id'], penghuni_asal[nim]['fakultas_id'], kamar_asal[nim], pindah[nim])
+                for nim in nim_pindah]))
+        return True, f"Sukses: {len(pindah)} penghuni berhasil dipindahkan."
 
-        updates = []
-        params = []
-        
-        if nim_baru and nim_original != nim_baru:
-            if not nim_baru.isdigit(): 
-                messagebox.showerror("Kesalahan Input", "NIM baru harus berupa angka.", parent=self._parent_window)
-                return "ERROR_INVALID_NIM_FORMAT"
-            check_nim_conflict_query = "SELECT 1 FROM Penghuni WHERE nim = %s"
-            self._cursor.execute(check_nim_conflict_query, (nim_baru,)) 
-            if self._cursor.fetchone(): 
-                messagebox.showerror("Kesalahan", f"NIM baru '{nim_baru}' sudah digunakan oleh penghuni lain.", parent=self._parent_window)
-                return "ERROR_NIM_CONFLICT"
-            updates.append("nim = %s")
-            params.append(nim_baru)
-        
-        if nama_baru: 
-            updates.append("nama_penghuni = %s")
-            params.append(nama_baru)
-
-        fakultas_id_to_update = None 
-        if nama_fakultas_baru is not None: 
-            if nama_fakultas_baru == "": 
-                 fakultas_id_to_update = None 
-                 updates.append("fakultas_id = %s") 
-                 params.append(fakultas_id_to_update)
-            else:
-                fakultas_id_to_update = self.get_fakultas_id_by_name(nama_fakultas_baru)
-                if fakultas_id_to_update is None: 
-                    try: 
-                        self._cursor.execute("INSERT INTO Fakultas (nama_fakultas) VALUES (%s)", (nama_fakultas_baru,)) 
-                        fakultas_id_to_update = self._cursor.lastrowid  
-                        if fakultas_id_to_update: 
-                            self._conn.commit()  
-                            print(f"Fakultas baru '{nama_fakultas_baru}' ditambahkan dengan ID: {fakultas_id_to_update}")
-                        else: 
-                            messagebox.showerror("Kesalahan", f"Gagal menambahkan fakultas baru '{nama_fakultas_baru}'.", parent=self._parent_window)
-                            return "ERROR_ADD_FAKULTAS"
-                    except mysql.connector.Error as e_fak:
-                        messagebox.showerror("Kesalahan Database", f"Gagal menambahkan fakultas baru: {e_fak}", parent=self._parent_window)
-                        return "ERROR_ADD_FAKULTAS_DB"
-                updates.append("fakultas_id = %s")
-                params.append(fakultas_id_to_update)
-        
-        if not updates:
-            messagebox.showinfo("Info", "Tidak ada data yang akan diubah (semua input kosong atau sama dengan data lama).", parent=self._parent_window)
-            return "SUCCESS_NO_CHANGE" 
+    def update_penghuni(self, nim_original, nim_baru, nama_baru, nama_fakultas_baru, user_aksi):
+        if not self._pool: 
+            messagebox.showerror("Kesalahan Database", "Tidak ada koneksi ke database MySQL.", parent=self._parent_window)
+            return "ERROR_CONNECTION" 
 
-        params_for_update = list(params) 
-        params_for_update.append(nim_original)
-        query = f"UPDATE Penghuni SET {', '.join(updates)} WHERE nim = %s"
-        
         try:
-            self._cursor.execute("SET @session_user_aksi = %s", (user_aksi,))
-            success = self._execute_query(query, tuple(params_for_update), is_ddl_or_commit_managed_elsewhere=False) 
-            self._cursor.execute("SET @session_user_aksi = NULL") 
-        except mysql.connector.Error as e_sess:
-            messagebox.showerror("Kesalahan Database", f"Gagal mengatur session variable: {e_sess}", parent=self._parent_window)
-            return "ERROR_SESSION_VAR"
-
-        if success:
-            if self._cursor.rowcount > 0: 
-                messagebox.showinfo("Sukses", "Data penghuni berhasil diubah.", parent=self._parent_window)
-                return "SUCCESS_DATA_CHANGED" 
-            else:
-                messagebox.showwarning("Perhatian", "Tidak ada perubahan aktual pada data (data baru mungkin sama dengan data lama).", parent=self._parent_window)
-                return "SUCCESS_NO_ACTUAL_CHANGE" 
-        else:
+            kode, pesan = self._transaksi_dengan_ulang(self._update_penghuni, nim_original, nim_baru, nama_baru, nama_fakultas_baru, user_aksi)
+        except mysql.connector.Error as err:
+            messagebox.showerror("Kesalahan Database", f"Gagal mengubah data penghuni: {err}", parent=self._parent_window)
+            return "ERROR_UPDATE_FAILED"
+        if kode is None:
+            messagebox.showerror("Kesalahan SP", "Tidak dapat mengambil status dari SP Update Penghuni.", parent=self._parent_window)
             return "ERROR_UPDATE_FAILED"
+        # Dialog ditampilkan setelah koneksi dikembalikan agar kunci baris tidak tertahan selama dialog terbuka.
+        tampilkan, judul = DIALOG_UPDATE_PENGHUNI.get(kode, (messagebox.showerror, "Kesalahan"))
+        tampilkan(judul, pesan, parent=self._parent_window)
+        return kode
+
+    def _update_penghuni(self, conn, cursor, nim_original, nim_baru, nama_baru, nama_fakultas_baru, user_aksi):
+        """
+        Satu panggilan sp_UpdatePenghuni (pemeriksaan NIM, Fakultas, dan UPDATE) di dalam transaksi pemanggil.
+        Mengembalikan (kode status seperti STATUS_UPDATE_PENGHUNI, pesan), atau (None, None) jika SP tidak memberi status.
+        """
+        penulis_audit = self._penulis_audit
+        with self._sesi_audit(cursor, penulis_audit):
+            hasil = self._panggil_sp(cursor, 'sp_UpdatePenghuni', (nim_original, nim_baru or None, nama_baru or None, nama_fakultas_baru, user_aksi))
+        kode = STATUS_UPDATE_PENGHUNI.get(hasil['p_status_code']) if hasil else None
+        if kode != "SUCCESS_DATA_CHANGED":
+            self._batalkan_transaksi()
+            return kode, hasil and hasil['p_status_message']
+        self._setelah_commit(lambda: self._hapus_cache_fakultas_jika_baru(nama_fakultas_baru))
+        if penulis_audit:
+            self._setelah_commit(lambda: penulis_audit.catat([
+                event_penghuni('UPDATE', nim_original, user_aksi, hasil['p_nama_lama'], nama_baru or hasil['p_nama_lama'],
+                               hasil['p_fakultas_lama'], hasil['p_fakultas_baru'], hasil['p_kamar_id'], hasil['p_kamar_id'])]))
+        return kode, hasil['p_status_message']
 
 
     def delete_penghuni(self, nim, user_aksi):
-        if not self._conn or not self._conn.is_connected(): 
+        if not self._pool: 
             messagebox.showerror("Kesalahan Database", "Tidak ada koneksi ke database MySQL.", parent=self._parent_window)
             return False
+        penulis_audit = self._penulis_audit
         try:
-            self._cursor.execute("SET @session_user_aksi = %s", (user_aksi,))
-            success = self._execute_query("DELETE FROM Penghuni WHERE nim = %s", (nim,), is_ddl_or_commit_managed_elsewhere=False) 
-            self._cursor.execute("SET @session_user_aksi = NULL") 
-        except mysql.connector.Error as e_sess:
-            messagebox.showerror("Kesalahan Database", f"Gagal mengatur session variable: {e_sess}", parent=self._parent_window)
+            with self.transaction(user_aksi) as (conn, cursor):
+                lama = self._kunci_penghuni_untuk_audit(cursor, [nim]) if penulis_audit else {}
+                with self._sesi_audit(cursor, penulis_audit):
+                    cursor.execute("DELETE FROM Penghuni WHERE nim = %s", (nim,))
+                    rowcount = cursor.rowcount
+                if penulis_audit and nim in lama:
+                    p = lama[nim]
+                    self._setelah_commit(lambda: penulis_audit.catat([event_penghuni('DELETE', nim, user_aksi, nama_lama=p['nama_penghuni'],
+                                                                                     fakultas_lama=p['fakultas_id'], kamar_lama=p['kamar_id_internal'])]))
+        except mysql.connector.Error as e:
+            messagebox.showerror("Kesalahan Database", f"Gagal menghapus penghuni: {e}", parent=self._parent_window)
             return False
 
-        if success and self._cursor.rowcount > 0: 
+        if rowcount > 0: 
             messagebox.showinfo("Sukses", f"Data penghuni dengan NIM {nim} berhasil dihapus.", parent=self._parent_window)
             return True
-        elif success and self._cursor.rowcount == 0: 
-            messagebox.showwarning("Gagal", f"Penghuni dengan NIM {nim} tidak ditemukan.", parent=self._parent_window)
-            return False
+        messagebox.showwarning("Gagal", f"Penghuni dengan NIM {nim} tidak ditemukan.", parent=self._parent_window)
         return False
 
-    def get_audit_log_penghuni(self, limit=100): 
-        """Mengambil data log aktivitas penghuni dengan batasan jumlah."""
-        query = """
-            SELECT 
-                log_id, DATE_FORMAT(waktu_aksi, '%Y-%m-%d %H:%i:%S') AS waktu_aksi_formatted, 
-                aksi, nim, user_aksi, 
-                IFNULL(nama_penghuni_baru, nama_penghuni_lama) AS nama_terkait,
-                IF(aksi = 'INSERT', 
-                   CONCAT('Ke: ', IFNULL(nomor_kamar_baru, 'N/A'), ' (', IFNULL(nama_asrama_baru, 'N/A'), ') - Fak: ', IFNULL(fakultas_baru, 'N/A')),
-                   IF(aksi = 'DELETE',
-                      CONCAT('Dari: ', IFNULL(nomor_kamar_lama, 'N/A'), ' (', IFNULL(nama_asrama_lama, 'N/A'), ') - Fak: ', IFNULL(fakultas_lama, 'N/A')),
-                      CONCAT('Dari: ', IFNULL(nomor_kamar_lama, 'N/A'), ' (', IFNULL(nama_asrama_lama, 'N/A'), ') Fak: ', IFNULL(fakultas_lama, 'N/A'),
-                             ' Ke: ', IFNULL(nomor_kamar_baru, 'N/A'), ' (', IFNULL(nama_asrama_baru, 'N/A'), ') Fak: ', IFNULL(fakultas_baru, 'N/A'))
-                   )
-                ) AS detail_perubahan,
-                keterangan_tambahan
-            FROM AuditLogAktivitasPenghuni 
-            ORDER BY waktu_aksi DESC 
-            LIMIT %s
-        """ 
-        return self._execute_query(query, (limit,), fetch_all=True) or [] 
-    
-    def get_audit_log_asrama(self, limit=100):
-        query = """
-            SELECT log_id, asrama_id_aksi, nama_asrama_lama, nama_asrama_baru, aksi, 
-                   DATE_FORMAT(waktu_aksi, '%Y-%m-%d %H:%i:%S') AS waktu_aksi_formatted, 
-                   user_aksi, keterangan_tambahan
-            FROM AuditLogAktivitasAsrama
-            ORDER BY waktu_aksi DESC
-            LIMIT %s
+    def impor_penghuni_csv(self, sumber, user_aksi, ukuran_chunk=500):
+        """
+        Mengimpor penghuni dari file CSV (lihat impor_csv.py untuk format kolom) tanpa dialog per baris.
+        Format baris, NIM ganda, NIM yang sudah terdaftar, keberadaan kamar, dan kapasitas diperiksa sekaligus
+        terhadap data yang diambil di awal; baris yang lolos dimasukkan dengan INSERT multi-baris per chunk,
+        masing-masing dalam satu transaksi yang mengunci baris Kamar terkait dan memeriksa ulang kapasitas.
+        Mengembalikan ringkasan {'total', 'diterima', 'ditolak': [{'baris', 'nim', 'alasan'}], 'durasi_detik'}.
+        Melempar mysql.connector.Error jika database gagal di luar masalah per baris.
         """
-        return self._execute_query(query, (limit,), fetch_all=True) or []
+        mulai = time.monotonic()
+        ringkasan = {'total': 0, 'diterima': 0, 'ditolak': [], 'durasi_detik': 0.0}
+        def tolak(data, alasan):
+            ringkasan['ditolak'].append({'baris': data['baris'], 'nim': data.get('nim', ''), 'alasan': alasan})
+
+        asrama_per_nama = {a['nama_asrama']: a['asrama_id'] for a in self.get_all_asrama()}
+        kandidat, nim_di_file = [], set()
+        for nomor_baris, baris in impor_csv.baca_csv_penghuni(sumber):
+            ringkasan['total'] += 1
+            data, alasan = impor_csv.normalisasi_baris(baris, asrama_per_nama)
+            if alasan:
+                tolak({'baris': nomor_baris, 'nim': baris.get('nim', '')}, alasan)
+            elif data['nim'] in nim_di_file:
+                tolak(dict(data, baris=nomor_baris), "NIM ganda di dalam file.")
+            else:
+                nim_di_file.add(data['nim'])
+                kandidat.append(dict(data, baris=nomor_baris))
+
+        with self._koneksi() as (conn, cursor):
+            nim_terdaftar = self._nim_terdaftar(cursor, [d['nim'] for d in kandidat])
+            cursor.execute("SELECT kamar_id_internal, nomor_kamar, asrama_id, kapasitas, occupied FROM Kamar")
+            kamar_per_nomor = {(k['nomor_kamar'], k['asrama_id']): k for k in cursor.fetchall()}
+        sisa = {k['kamar_id_internal']: k['kapasitas'] - k['occupied'] for k in kamar_per_nomor.values()}
+
+        valid = []
+        for data in kandidat:
+            kamar = kamar_per_nomor.get((data['nomor_kamar'], data['asrama_id']))
+            if data['nim'] in nim_terdaftar:
+                tolak(data, f"NIM {data['nim']} sudah terdaftar.")
+            elif not kamar:
+                tolak(data, f"Kamar {data['nomor_kamar']} di asrama {data['asrama_id']} tidak ditemukan.")
+            elif sisa[kamar['kamar_id_internal']] <= 0:
+                tolak(data, f"Kamar {data['nomor_kamar']} sudah penuh.")
+            else:
+                sisa[kamar['kamar_id_internal']] -= 1
+                valid.append(dict(data, kamar_id_internal=kamar['kamar_id_internal']))
 
-    def get_audit_log_kamar(self, limit=100):
-        query = """
-            SELECT log_id, kamar_id_internal_aksi, 
-                   nomor_kamar_lama, nomor_kamar_baru, 
-                   asrama_id_lama, asrama_id_baru,
-                   nama_asrama_lama, nama_asrama_baru,
-                   kapasitas_lama, kapasitas_baru, 
-                   aksi, DATE_FORMAT(waktu_aksi, '%Y-%m-%d %H:%i:%S') AS waktu_aksi_formatted, 
-                   user_aksi, keterangan_tambahan
-            FROM AuditLogAktivitasKamar
-            ORDER BY waktu_aksi DESC
-            LIMIT %s
+        with self.transaction() as (conn, cursor):
+            fakultas_id = self._pastikan_fakultas(conn, cursor, {d['fakultas'] for d in valid if d['fakultas']})
+        for i in range(0, len(valid), ukuran_chunk):
+            ringkasan['diterima'] += self._impor_chunk_penghuni(valid[i:i + ukuran_chunk], fakultas_id, tolak, user_aksi)
+
+        ringkasan['ditolak'].sort(key=lambda t: t['baris'])
+        ringkasan['durasi_detik'] = round(time.monotonic() - mulai, 3)
+        print(f"Impor penghuni selesai: {ringkasan['diterima']} diterima, {len(ringkasan['ditolak'])} ditolak dari {ringkasan['total']} baris ({ringkasan['durasi_detik']} detik).")
+        return ringkasan
+
+    def rencanakan_alokasi(self, sumber, asrama_id=None, kelompok_fakultas=True, satukan_grup=True):
+        """
+        Menyusun rencana alokasi kamar untuk calon penghuni dari file CSV (lihat alokasi.py) tanpa mengubah data.
+        Peta kamar kosong diambil dengan cari_kamar_kosong, fakultas penghuni kamar-kamar tersebut dengan satu kueri.
+        asrama_id membatasi alokasi ke satu asrama. Mengembalikan rencana alokasi.rencanakan_alokasi ditambah
+        'total' dan 'ditolak' (format salah, NIM ganda, atau NIM sudah terdaftar). Melempar mysql.connector.Error.
+        """
+        mulai = time.monotonic()
+        asrama_per_nama = {a['nama_asrama']: a['asrama_id'] for a in self.get_all_asrama()}
+        calon, ditolak, total = alokasi.baca_calon_penghuni(sumber, asrama_per_nama)
+        with self._koneksi() as (conn, cursor):
+            nim_terdaftar = self._nim_terdaftar(cursor, [c['nim'] for c in calon])
+            cursor.execute("""SELECT P.kamar_id_internal, F.nama_fakultas FROM Penghuni P
+                              JOIN Kamar K ON P.kamar_id_internal = K.kamar_id_internal
+                              JOIN Fakultas F ON P.fakultas_id = F.fakultas_id
+                              WHERE K.sisa_kapasitas > 0""")
+            fakultas_per_kamar = collections.defaultdict(set)
+            for row in cursor.fetchall():
+                fakultas_per_kamar[row['kamar_id_internal']].add(row['nama_fakultas'])
+        ditolak += [{'baris': c['baris'], 'nim': c['nim'], 'alasan': f"NIM {c['nim']} sudah terdaftar."} for c in calon if c['nim'] in nim_terdaftar]
+        calon = [c for c in calon if c['nim'] not in nim_terdaftar]
+        rencana = alokasi.rencanakan_alokasi(calon, self.cari_kamar_kosong(asrama_id), fakultas_per_kamar, kelompok_fakultas, satukan_grup)
+        rencana.update(total=total, ditolak=sorted(ditolak, key=lambda t: t['baris']), durasi_detik=round(time.monotonic() - mulai, 3))
+        print(f"Rencana alokasi: {len(rencana['penempatan'])} ditempatkan di {rencana['jumlah_kamar']} kamar, "
+              f"{len(rencana['tidak_ditempatkan'])} tanpa kamar, {len(ditolak)} ditolak ({rencana['durasi_detik']} detik).")
+        return rencana
+
+    def terapkan_alokasi(self, rencana, user_aksi):
         """
-        return self._execute_query(query, (limit,), fetch_all=True) or []
+        Menyimpan seluruh penempatan rencana dalam satu transaksi: baris Kamar tujuan dikunci (urutan id), sisa
+        tempat dan NIM diperiksa ulang, lalu semua penghuni dimasukkan dengan INSERT multi-baris. Jika data sudah
+        berubah sejak rencana dibuat, tidak ada yang disimpan. Mengembalikan (True, pesan) atau (False, pesan);
+        melempar mysql.connector.Error jika database gagal (dipanggil dari thread latar, tanpa messagebox).
+        """
+        penempatan = rencana['penempatan']
+        if not penempatan:
+            return False, "Tidak ada penghuni yang ditempatkan dalam rencana."
+        def satu_percobaan(conn, cursor):
+            fakultas_id = self._pastikan_fakultas(conn, cursor, {p['fakultas'] for p in penempatan if p['fakultas']})
+            with self._sesi_audit(cursor, self._penulis_audit) as penulis_audit:
+                return self._terapkan_alokasi(conn, cursor, penempatan, fakultas_id, user_aksi, penulis_audit)
+        return self._transaksi_dengan_ulang(satu_percobaan, user_aksi=user_aksi)
+
+    def _terapkan_alokasi(self, conn, cursor, penempatan, fakultas_id, user_aksi, penulis_audit=None):
+        kebutuhan = collections.Counter(p['kamar_id_internal'] for p in penempatan)
+        id_kamar = sorted(kebutuhan)
+        cursor.execute(f"""SELECT kamar_id_internal, nomor_kamar, asrama_id, sisa_kapasitas FROM Kamar
+                           WHERE kamar_id_internal IN ({', '.join(['%s'] * len(id_kamar))})
+                           ORDER BY kamar_id_internal FOR UPDATE""", id_kamar)
+        kamar = {k['kamar_id_internal']: k for k in cursor.fetchall()}
+        kesalahan = [f"Kamar {p['nomor_kamar']} {p['nama_asrama']} sudah tidak ada." for p in penempatan
+                     if p['kamar_id_internal'] not in kamar]
+        kesalahan += [f"Kamar {k['nomor_kamar']} (asrama {k['asrama_id']}) tinggal {k['sisa_kapasitas']} tempat, rencana {kebutuhan[kamar_id]}."
+                      for kamar_id, k in kamar.items() if k['sisa_kapasitas'] < kebutuhan[kamar_id]]
+        kesalahan += [f"NIM {nim} sudah terdaftar." for nim in sorted(self._nim_terdaftar(cursor, [p['nim'] for p in penempatan]))]
+        if kesalahan:
+            self._batalkan_transaksi()
+            contoh = "\n".join(kesalahan[:10]) + (f"\n... dan {len(kesalahan) - 10} lainnya." if len(kesalahan) > 10 else "")
+            return False, f"Data kamar/penghuni berubah sejak rencana dibuat; buat ulang rencana.\n{contoh}"
+        cursor.executemany("INSERT INTO Penghuni (nim, nama_penghuni, fakultas_id, kamar_id_internal) VALUES (%s, %s, %s, %s)",
+                           [(p['nim'], p['nama_penghuni'], fakultas_id.get(p['fakultas']), p['kamar_id_internal']) for p in penempatan])
+        if penulis_audit:
+            self._setelah_commit(lambda: penulis_audit.catat([
+                event_penghuni('INSERT', p['nim'], user_aksi, nama_baru=p['nama_penghuni'],
+                               fakultas_baru=fakultas_id.get(p['fakultas']), kamar_baru=p['kamar_id_internal'])
+                for p in penempatan]))
+        return True, f"Sukses: {len(penempatan)} penghuni ditempatkan di {len(kebutuhan)} kamar."
+
+    @staticmethod
+    def _nim_terdaftar(cursor, daftar_nim, ukuran_batch=1000):
+        """Subset daftar_nim yang sudah ada di tabel Penghuni."""
+        terdaftar = set()
+        for i in range(0, len(daftar_nim), ukuran_batch):
+            batch = daftar_nim[i:i + ukuran_batch]
+            cursor.execute(f"SELECT nim FROM Penghuni WHERE nim IN ({', '.join(['%s'] * len(batch))})", batch)
+            terdaftar.update(row['nim'] for row in cursor.fetchall())
+        return terdaftar
+
+    def _pastikan_fakultas(self, conn, cursor, nama_fakultas):
+        """Menambahkan fakultas yang belum ada (di dalam transaksi pemanggil) lalu mengembalikan {nama_fakultas: fakultas_id}."""
+        cursor.execute("SELECT fakultas_id, nama_fakultas FROM Fakultas")
+        peta = {f['nama_fakultas']: f['fakultas_id'] for f in cursor.fetchall()}
+        baru = sorted(n for n in nama_fakultas if n not in peta)
+        if baru:
+            cursor.executemany("INSERT IGNORE INTO Fakultas (nama_fakultas) VALUES (%s)", [(n,) for n in baru])
+            self._setelah_commit(lambda: self._cache.hapus(("fakultas",)))
+            cursor.execute(f"SELECT fakultas_id, nama_fakultas FROM Fakultas WHERE nama_fakultas IN ({', '.join(['%s'] * len(baru))})", baru)
+            peta.update({f['nama_fakultas']: f['fakultas_id'] for f in cursor.fetchall()})
+        return peta
+
+    def _impor_chunk_penghuni(self, chunk, fakultas_id, tolak, user_aksi, ulang=True):
+        """Memasukkan satu chunk dalam satu transaksi; mengembalikan jumlah baris yang diterima."""
+        id_kamar = sorted({d['kamar_id_internal'] for d in chunk})
+        ditolak = []  # baru diteruskan ke tolak setelah commit agar percobaan ulang tidak mencatat penolakan ganda
+        try:
+            with self.transaction(user_aksi) as (conn, cursor), self._sesi_audit(cursor, self._penulis_audit) as penulis_audit:
+                # Kunci baris Kamar (urutan tetap) agar kapasitas tidak berubah oleh klien lain sampai commit.
+                cursor.execute(f"""SELECT kamar_id_internal, kapasitas, occupied FROM Kamar
+                                   WHERE kamar_id_internal IN ({', '.join(['%s'] * len(id_kamar))})
+                                   ORDER BY kamar_id_internal FOR UPDATE""", id_kamar)
+                sisa = {k['kamar_id_internal']: k['kapasitas'] - k['occupied'] for k in cursor.fetchall()}
+                nim_terdaftar = self._nim_terdaftar(cursor, [d['nim'] for d in chunk])
+                diterima = []
+                for data in chunk:
+                    if data['nim'] in nim_terdaftar:
+                        ditolak.append((data, f"NIM {data['nim']} sudah terdaftar."))
+                    elif sisa.get(data['kamar_id_internal'], 0) <= 0:
+                        ditolak.append((data, f"Kamar {data['nomor_kamar']} sudah penuh."))
+                    else:
+                        sisa[data['kamar_id_internal']] -= 1
+                        diterima.append(data)
+                if diterima:
+                    cursor.executemany("INSERT INTO Penghuni (nim, nama_penghuni, fakultas_id, kamar_id_internal) VALUES (%s, %s, %s, %s)",
+                                       [(d['nim'], d['nama_penghuni'], fakultas_id.get(d['fakultas']), d['kamar_id_internal']) for d in diterima])
+                if penulis_audit:
+                    self._setelah_commit(lambda: penulis_audit.catat([
+                        event_penghuni('INSERT', d['nim'], user_aksi, nama_baru=d['nama_penghuni'],
+                                       fakultas_baru=fakultas_id.get(d['fakultas']), kamar_baru=d['kamar_id_internal'])
+                        for d in diterima]))
+        except mysql.connector.IntegrityError as err:
+            # NIM yang sama dimasukkan klien lain di antara pemeriksaan dan INSERT: periksa ulang chunk sekali.
+            if ulang:
+                return self._impor_chunk_penghuni(chunk, fakultas_id, tolak, user_aksi, ulang=False)
+            for data in chunk:
+                tolak(data, f"Gagal disimpan: {err.msg}")
+            return 0
+        for data, alasan in ditolak:
+            tolak(data, alasan)
+        return len(diterima)
+
+    @staticmethod
+    def kursor_log(log):
+        """Kursor halaman (waktu_aksi, log_id) dari satu baris log audit."""
+        return (log['waktu_aksi'], log['log_id'])
+
+    def _get_audit_log(self, jenis, limit, sebelum, sesudah, sejak_log_id=None, celah=()):
+        if sum(kursor is not None for kursor in (sebelum, sesudah, sejak_log_id)) > 1:
+            raise ValueError("Gunakan salah satu dari 'sebelum', 'sesudah', atau 'sejak_log_id'.")
+        if sebelum is not None:
+            query, params = kueri_log_audit(jenis, "sebelum"), (sebelum[0], sebelum[0], sebelum[1], limit)
+        elif sesudah is not None:
+            query, params = kueri_log_audit(jenis, "sesudah"), (sesudah[0], sesudah[0], sesudah[1], limit)
+        elif sejak_log_id is not None:
+            celah = sorted(celah)
+            query, params = kueri_log_audit(jenis, "sejak_log_id", len(celah)), (sejak_log_id, *celah, limit)
+        else:
+            query, params = kueri_log_audit(jenis), (limit,)
+        if jenis == "penghuni" and sejak_log_id is None:
+            # Mode audit aplikasi: perubahan sendiri yang masih di antrian ikut terlihat saat memuat halaman. Polling
+            # live tidak menunggu; catatan yang ditulis penulis latar belakang muncul pada putaran berikutnya.
+            self.flush_audit(timeout=5.0)
+        logs = self._execute_query(query, params, fetch_all=True) or []
+        if sesudah is not None or sejak_log_id is not None:
+            logs.reverse()
+        return logs
+
+    def get_audit_log_penghuni(self, limit=100, sebelum=None, sesudah=None, sejak_log_id=None, celah=()): 
+        """
+        Mengambil satu halaman log aktivitas penghuni, terbaru lebih dulu.
+        sebelum/sesudah adalah kursor (waktu_aksi, log_id) dari kursor_log(); tanpa kursor, halaman terbaru
+        yang diambil. Biaya setiap halaman sama karena kursor langsung mencari posisi di indeks (tanpa OFFSET).
+        sejak_log_id (mode live): paling banyak limit baris tertua dengan log_id di atas nilai tersebut atau di
+        dalam celah (log_id di bawahnya yang transaksinya belum commit saat polling sebelumnya).
+        """
+        return self._get_audit_log("penghuni", limit, sebelum, sesudah, sejak_log_id, celah)
+    
+    def get_audit_log_asrama(self, limit=100, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        return self._get_audit_log("asrama", limit, sebelum, sesudah, sejak_log_id, celah)
 
-    # --- CRUD Asrama ---
-    def get_all_asrama(self):
-        return self._execute_query("SELECT asrama_id, nama_asrama FROM Asrama ORDER BY nama_asrama", fetch_all=True) or []
+    def get_audit_log_kamar(self, limit=100, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        return self._get_audit_log("kamar", limit, sebelum, sesudah, sejak_log_id, celah)
 
-    def add_asrama(self, asrama_id, nama_asrama):
+    def ambil_perubahan(self, sejak=None, batas=umpan_perubahan.BATAS_BAWAAN):
+        """
+        Umpan perubahan untuk penyegaran otomatis antar-klien (lihat umpan_perubahan.py): event log audit dengan
+        log_id di atas penanda sejak, dibaca dengan satu kueri UNION ALL. sejak=None hanya mengambil penanda awal
+        (log_id tertinggi saat ini). Mengembalikan {'penanda', 'perubahan', 'asrama', 'kamar', 'lengkap'}; penanda
+        diteruskan ke panggilan berikutnya. Cache master data yang terdampak perubahan ikut dihapus.
+        """
+        if sejak is None:
+            return umpan_perubahan.hasil_awal(self._execute_query(umpan_perubahan.kueri_penanda_awal(), fetch_all=True))
+        query, params = umpan_perubahan.kueri_perubahan(sejak, batas)
+        hasil = umpan_perubahan.ringkas_perubahan(sejak, self._execute_query(query, params, fetch_all=True), batas)
+        self._hapus_cache_perubahan(hasil)
+        return hasil
+
+    def _hapus_cache_perubahan(self, hasil):
+        """Menghapus cache daftar asrama/kamar/fakultas yang terdampak event umpan perubahan (termasuk dari klien lain)."""
+        kunci = [("kamar", asrama_id) for asrama_id in hasil['asrama']]
+        if any(row['sumber'] == "asrama" for row in hasil['perubahan']):
+            kunci.append(("asrama",))
+        for row in hasil['perubahan']:
+            if row['sumber'] == "kamar":
+                kunci += self._kunci_cache_kamar(row['kamar_lama'])
+        fakultas = self._cache.intip(("fakultas",))
+        if fakultas is not None:
+            dikenal = {f['nama_fakultas'] for f in fakultas}
+            if any(row['fakultas'] and row['fakultas'] not in dikenal for row in hasil['perubahan']):
+                kunci.append(("fakultas",))
+        if kunci:
+            self._cache.hapus(*kunci)
+
+    def periksa_rencana_kueri_audit(self, limit=100):
+        """
+        Menjalankan EXPLAIN untuk kueri halaman pertama dan halaman berikutnya (kursor) setiap log audit,
+        lalu memeriksa apakah urutan waktu_aksi dilayani indeks.
+        Mengembalikan dict {(jenis, arah): {'tabel', 'key', 'type', 'rows', 'extra', 'pakai_indeks'}}.
+        pakai_indeks bernilai False jika MySQL memindai seluruh tabel atau masih melakukan filesort.
+        """
+        kursor_contoh = (datetime.datetime.now(), 2**31 - 1)
+        hasil = {}
+        for jenis in KUERI_LOG_AUDIT:
+            for arah, params in ((None, (limit,)), ("sebelum", (kursor_contoh[0], kursor_contoh[0], kursor_contoh[1], limit))):
+                rencana = self._execute_query("EXPLAIN " + kueri_log_audit(jenis, arah), params, fetch_all=True) or []
+                baris = next((r for r in rencana if (r.get('table') or '').startswith('AuditLogAktivitas')), None)
+                if not baris:
+                    print(f"Rencana kueri log audit {jenis} ({arah or 'terbaru'}) tidak dapat dibaca.")
+                    hasil[(jenis, arah)] = None
+                    continue
+                extra = baris.get('Extra') or ''
+                pakai_indeks = baris.get('key') is not None and 'filesort' not in extra.lower()
+                hasil[(jenis, arah)] = {'tabel': baris.get('table'), 'key': baris.get('key'), 'type': baris.get('type'),
+                                        'rows': baris.get('rows'), 'extra': extra, 'pakai_indeks': pakai_indeks}
+                if not pakai_indeks:
+                    print(f"Peringatan: kueri log audit {jenis} ({arah or 'terbaru'}) tidak memakai indeks (type={baris.get('type')}, Extra={extra}).")
+        return hasil
+
+    def ekspor_data(self, jenis, path, format=None, kompres=None, ukuran_batch=1000):
+        """
+        Mengekspor data ke file CSV atau JSON Lines tanpa memuat seluruh hasil ke memori.
+        jenis: salah satu kunci SUMBER_EKSPOR ("penghuni", "audit_penghuni", "audit_asrama", "audit_kamar").
+        format/kompres ditebak dari ekstensi path jika tidak diberikan (".csv", ".jsonl", akhiran ".gz").
+        Baris dibaca dengan cursor tanpa buffer lewat fetchmany(ukuran_batch), jadi paling banyak satu batch
+        yang berada di memori. Mengembalikan jumlah baris yang diekspor; melempar mysql.connector.Error atau
+        OSError jika gagal (dipanggil dari thread latar, tanpa messagebox).
+        """
+        if jenis == "audit_penghuni":
+            self.flush_audit(timeout=5.0)
+        if jenis not in SUMBER_EKSPOR:
+            raise ValueError(f"Jenis ekspor tidak dikenal: {jenis}.")
+        mulai = time.monotonic()
+        with self._koneksi() as (conn, _):
+            cursor = conn.cursor()  # tanpa buffer: baris diambil dari server sesuai kebutuhan fetchmany
+            try:
+                cursor.execute(SUMBER_EKSPOR[jenis])
+                with ekspor.PenulisEkspor(path, cursor.column_names, format, kompres) as penulis:
+                    while True:
+                        batch = cursor.fetchmany(ukuran_batch)
+                        if not batch:
+                            break
+                        penulis.tulis(batch)
+            except BaseException:
+                # Sisa hasil yang belum dibaca membuat koneksi tidak bisa dipakai ulang.
+                self._pool.tandai_rusak(conn)
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except mysql.connector.Error:
+                    self._pool.tandai_rusak(conn)
+        print(f"Ekspor {jenis} selesai: {penulis.jumlah_baris} baris ke {path} ({time.monotonic() - mulai:.2f} detik).")
+        return penulis.jumlah_baris
+
+    def _jalankan_sp_crud(self, nama_sp, args, nama_operasi, kunci_cache=()):
+        """
+        Memanggil SP CRUD master data yang mengembalikan (p_status_code, p_status_message) dan commit jika sukses.
+        Entri cache pada kunci_cache dihapus setelah commit.
+        """
+        if not self._pool:
+            return -1, "Error database: Tidak ada koneksi ke database MySQL."
         try:
-            args = (asrama_id, nama_asrama)
-            self._cursor.callproc('sp_TambahAsrama', args)
-            stored_results = list(self._cursor.stored_results()) 
-            if stored_results:
-                result_set = stored_results[0]
-                result = result_set.fetchone()
+            with self.transaction() as (conn, cursor):
+                result = self._panggil_sp(cursor, nama_sp, args)
                 if result:
-                    if result.get('p_status_code') == 0: self._conn.commit()
+                    if result.get('p_status_code') == 0:
+                        self._setelah_commit(lambda: self._cache.hapus(*kunci_cache))
+                    else:
+                        self._batalkan_transaksi()
                     return result.get('p_status_code'), result.get('p_status_message')
-            return -1, "Gagal mengambil hasil dari SP Tambah Asrama."
+            return -1, f"Gagal mengambil hasil dari SP {nama_operasi}."
         except mysql.connector.Error as err:
             return -1, f"Error database: {err}"
 
-    def update_asrama(self, asrama_id, nama_asrama_baru):
+    # --- Mode audit aplikasi ---
+    def atur_mode_audit(self, mode):
+        """
+        'trigger': log Penghuni ditulis trigger (bawaan). 'aplikasi': trigger log Penghuni dilewati dan
+        setiap perubahan dicatat sebagai event yang ditulis per batch oleh thread latar (lihat audit_async.py).
+        Saat kembali ke 'trigger', sisa event ditulis lebih dulu.
+        """
+        if mode not in MODE_AUDIT:
+            raise ValueError(f"Mode audit tidak dikenal: {mode} (pilihan: {', '.join(MODE_AUDIT)}).")
+        if mode == "aplikasi" and self._penulis_audit is None:
+            self._penulis_audit = PenulisAuditAsinkron(self._tulis_batch_audit)
+            print("Mode audit aplikasi aktif: log penghuni ditulis per batch oleh penulis latar.")
+        elif mode == "trigger" and self._penulis_audit is not None:
+            penulis, self._penulis_audit = self._penulis_audit, None
+            penulis.hentikan()
+            print("Mode audit trigger aktif.")
+
+    def get_mode_audit(self):
+        return "aplikasi" if self._penulis_audit else "trigger"
+
+    def flush_audit(self, timeout=None):
+        """Menunggu semua log audit aplikasi yang sudah dicatat tersimpan. True jika berhasil (selalu True pada mode trigger)."""
+        penulis = self._penulis_audit
+        return penulis.flush(timeout) if penulis else True
+
+    def get_audit_stats(self):
+        """Statistik penulis audit aplikasi: antrian, ditulis, batch_gagal (None pada mode trigger)."""
+        penulis = self._penulis_audit
+        return penulis.statistik() if penulis else None
+
+    @contextmanager
+    def _sesi_audit(self, cursor, penulis_audit):
+        """Menonaktifkan trigger log Penghuni pada koneksi ini selama blok jika mode audit aplikasi dipakai."""
+        if penulis_audit is None:
+            yield None
+            return
+        cursor.execute("SET @audit_mode_aplikasi = 1")
         try:
-            args = (asrama_id, nama_asrama_baru)
-            self._cursor.callproc('sp_UpdateAsrama', args)
-            stored_results = list(self._cursor.stored_results())
-            if stored_results:
-                result_set = stored_results[0]
-                result = result_set.fetchone()
-                if result:
-                    if result.get('p_status_code') == 0: self._conn.commit()
-                    return result.get('p_status_code'), result.get('p_status_message')
-            return -1, "Gagal mengambil hasil dari SP Update Asrama."
-        except mysql.connector.Error as err:
-            return -1, f"Error database: {err}"
+            yield penulis_audit
+        finally:
+            cursor.execute("SET @audit_mode_aplikasi = NULL")
+
+    @staticmethod
+    def _kunci_penghuni_untuk_audit(cursor, daftar_nim):
+        """Data penghuni sebelum perubahan (dikunci sampai commit) untuk event audit aplikasi."""
+        cursor.execute(f"""SELECT nim, nama_penghuni, fakultas_id, kamar_id_internal FROM Penghuni
+                           WHERE nim IN ({', '.join(['%s'] * len(daftar_nim))}) FOR UPDATE""", list(daftar_nim))
+        return {row['nim']: row for row in cursor.fetchall()}
+
+    def _tulis_batch_audit(self, daftar_event):
+        """Dipanggil thread penulis audit: melengkapi nama kamar/asrama/fakultas lalu INSERT multi-baris dalam satu commit."""
+        with self.transaction() as (conn, cursor):
+            kamar = self._peta_kamar_audit(cursor, [k for e in daftar_event for k in (e['kamar_lama'], e['kamar_baru']) if k is not None])
+            id_fakultas = sorted({f for e in daftar_event for f in (e['fakultas_lama'], e['fakultas_baru']) if isinstance(f, int)})
+            fakultas = {}
+            if id_fakultas:
+                cursor.execute(f"SELECT fakultas_id, nama_fakultas FROM Fakultas WHERE fakultas_id IN ({', '.join(['%s'] * len(id_fakultas))})", id_fakultas)
+                fakultas = {row['fakultas_id']: row['nama_fakultas'] for row in cursor.fetchall()}
+            rows = [self._baris_log_penghuni(e, kamar, fakultas) for e in daftar_event]
+            cursor.executemany(f"INSERT INTO AuditLogAktivitasPenghuni ({', '.join(KOLOM_LOG_PENGHUNI)}) "
+                               f"VALUES ({', '.join(['%s'] * len(KOLOM_LOG_PENGHUNI))})", rows)
+
+    @staticmethod
+    def _peta_kamar_audit(cursor, daftar_kamar):
+        """{kamar_id_internal atau (nomor_kamar, asrama_id): (kamar_id_internal, nomor_kamar, nama_asrama)} dengan satu kueri."""
+        id_kamar = sorted({k for k in daftar_kamar if isinstance(k, int)})
+        nomor_kamar = sorted({k for k in daftar_kamar if isinstance(k, tuple)})
+        kondisi, params = [], []
+        if id_kamar:
+            kondisi.append(f"K.kamar_id_internal IN ({', '.join(['%s'] * len(id_kamar))})")
+            params += id_kamar
+        if nomor_kamar:
+            kondisi.append(f"(K.nomor_kamar, K.asrama_id) IN ({', '.join(['(%s, %s)'] * len(nomor_kamar))})")
+            params += [nilai for pasangan in nomor_kamar for nilai in pasangan]
+        if not kondisi:
+            return {}
+        cursor.execute(f"""SELECT K.kamar_id_internal, K.nomor_kamar, K.asrama_id, A.nama_asrama
+                           FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE {' OR '.join(kondisi)}""", params)
+        peta = {}
+        for row in cursor.fetchall():
+            nilai = (row['kamar_id_internal'], row['nomor_kamar'], row['nama_asrama'])
+            peta[row['kamar_id_internal']] = peta[(row['nomor_kamar'], row['asrama_id'])] = nilai
+        return peta
+
+    @staticmethod
+    def _baris_log_penghuni(event, kamar, fakultas):
+        """Satu baris AuditLogAktivitasPenghuni dengan isi dan keterangan yang sama seperti trigger log Penghuni."""
+        id_lama, nk_lama, na_lama = kamar.get(event['kamar_lama'], (event['kamar_lama'], None, None)) if event['kamar_lama'] is not None else (None, None, None)
+        id_baru, nk_baru, na_baru = kamar.get(event['kamar_baru'], (None, None, None)) if event['kamar_baru'] is not None else (None, None, None)
+        nama_fakultas = lambda f: fakultas.get(f) if isinstance(f, int) else f
+        nf_lama, nf_baru = nama_fakultas(event['fakultas_lama']), nama_fakultas(event['fakultas_baru'])
+        n_a = lambda nilai: 'N/A' if nilai is None else nilai
+        if event['aksi'] == 'INSERT':
+            keterangan = f"Penghuni baru ditambahkan ke kamar {n_a(nk_baru)} Asrama {n_a(na_baru)}"
+        elif event['aksi'] == 'DELETE':
+            keterangan = f"Penghuni dihapus dari kamar {n_a(nk_lama)} Asrama {n_a(na_lama)}"
+        elif id_lama != id_baru:
+            keterangan = f"Penghuni pindah dari kamar {n_a(nk_lama)} Asrama {n_a(na_lama)} ke kamar {n_a(nk_baru)} Asrama {n_a(na_baru)}."
+        elif nf_lama != nf_baru:
+            keterangan = f"Fakultas diubah dari {n_a(nf_lama)} menjadi {n_a(nf_baru)}."
+        elif event['nama_lama'] != event['nama_baru']:
+            keterangan = f"Nama diubah dari {event['nama_lama']} menjadi {event['nama_baru']}."
+        else:
+            keterangan = "Data penghuni diubah."
+        return (event['nim'], event['nama_lama'], event['nama_baru'], nf_lama, nf_baru, id_lama, id_baru,
+                nk_lama, na_lama, nk_baru, na_baru, event['aksi'], event['user_aksi'], keterangan)
+
+    # --- Statistik kueri ---
+    def get_stats(self):
+        """
+        Snapshot statistik kueri: pengaturan (aktif, ambang_lambat_ms, log_lambat) dan, per pernyataan,
+        jumlah, error, baris, lambat, total/rata/maks/p50/p95/p99 dalam milidetik, serta histogram latensi.
+        """
+        return self._statistik_kueri.snapshot()
+
+    def atur_instrumentasi(self, **pengaturan):
+        """Mengubah instrumentasi saat berjalan: aktif, ambang_lambat_ms (None = tanpa log), path_log_lambat."""
+        self._statistik_kueri.atur(**pengaturan)
+
+    def reset_stats(self):
+        self._statistik_kueri.reset()
+
+    # --- CRUD Asrama ---
+    def get_cache_stats(self):
+        """Statistik cache data master: hit, miss, penghapusan, entri, rasio_hit, ttl_detik."""
+        return self._cache.statistik()
+
+    def get_all_asrama(self):
+        return list(self._cache.ambil(("asrama",), lambda: self._execute_query(
+            "SELECT asrama_id, nama_asrama FROM Asrama ORDER BY nama_asrama", fetch_all=True)) or [])
+
+    def add_asrama(self, asrama_id, nama_asrama):
+        return self._jalankan_sp_crud('sp_TambahAsrama', (asrama_id, nama_asrama), "Tambah Asrama", [("asrama",)])
+
+    def update_asrama(self, asrama_id, nama_asrama_baru):
+        return self._jalankan_sp_crud('sp_UpdateAsrama', (asrama_id, nama_asrama_baru), "Update Asrama", [("asrama",)])
 
     def delete_asrama(self, asrama_id):
-        try:
-            args = (asrama_id,)
-            self._cursor.callproc('sp_HapusAsrama', args)
-            stored_results = list(self._cursor.stored_results())
-            if stored_results:
-                result_set = stored_results[0]
-                result = result_set.fetchone()
-                if result:
-                    if result.get('p_status_code') == 0: self._conn.commit()
-                    return result.get('p_status_code'), result.get('p_status_message')
-            return -1, "Gagal mengambil hasil dari SP Hapus Asrama."
-        except mysql.connector.Error as err:
-            return -1, f"Error database: {err}"
+        return self._jalankan_sp_crud('sp_HapusAsrama', (asrama_id,), "Hapus Asrama", [("asrama",), ("kamar", asrama_id)])
 
     # --- CRUD Kamar ---
     def get_all_kamar_in_asrama(self, asrama_id):
         query = "SELECT kamar_id_internal, nomor_kamar, kapasitas FROM Kamar WHERE asrama_id = %s ORDER BY nomor_kamar"
-        return self._execute_query(query, (asrama_id,), fetch_all=True) or []
+        return list(self._cache.ambil(("kamar", asrama_id), lambda: self._execute_query(query, (asrama_id,), fetch_all=True)) or [])
 
     def add_kamar(self, nomor_kamar, asrama_id, kapasitas):
-        try:
-            args = (nomor_kamar, asrama_id, kapasitas)
-            self._cursor.callproc('sp_TambahKamar', args)
-            stored_results = list(self._cursor.stored_results())
-            if stored_results:
-                result_set = stored_results[0]
-                result = result_set.fetchone()
-                if result:
-                    if result.get('p_status_code') == 0: self._conn.commit()
-                    return result.get('p_status_code'), result.get('p_status_message')
-            return -1, "Gagal mengambil hasil dari SP Tambah Kamar."
-        except mysql.connector.Error as err:
-            return -1, f"Error database: {err}"
+        return self._jalankan_sp_crud('sp_TambahKamar', (nomor_kamar, asrama_id, kapasitas), "Tambah Kamar", [("kamar", asrama_id)])
             
     def update_kamar(self, kamar_id_internal, nomor_kamar_baru, kapasitas_baru, asrama_id_konteks):
-        try:
-            args = (kamar_id_internal, nomor_kamar_baru, kapasitas_baru, asrama_id_konteks)
-            self._cursor.callproc('sp_UpdateKamar', args)
-            stored_results = list(self._cursor.stored_results())
-            if stored_results:
-                result_set = stored_results[0]
-                result = result_set.fetchone()
-                if result:
-                    if result.get('p_status_code') == 0: self._conn.commit()
-                    return result.get('p_status_code'), result.get('p_status_message')
-            return -1, "Gagal mengambil hasil dari SP Update Kamar."
-        except mysql.connector.Error as err:
-            return -1, f"Error database: {err}"
+        return self._jalankan_sp_crud('sp_UpdateKamar', (kamar_id_internal, nomor_kamar_baru, kapasitas_baru, asrama_id_konteks), "Update Kamar",
+                                      [("kamar", asrama_id_konteks)] + self._kunci_cache_kamar(kamar_id_internal))
 
     def delete_kamar(self, kamar_id_internal):
-        try:
-            args = (kamar_id_internal,)
-            self._cursor.callproc('sp_HapusKamar', args)
-            stored_results = list(self._cursor.stored_results())
-            if stored_results:
-                result_set = stored_results[0]
-                result = result_set.fetchone()
-                if result:
-                    if result.get('p_status_code') == 0: self._conn.commit()
-                    return result.get('p_status_code'), result.get('p_status_message')
-            return -1, "Gagal mengambil hasil dari SP Hapus Kamar."
-        except mysql.connector.Error as err:
-            return -1, f"Error database: {err}"
+        return self._jalankan_sp_crud('sp_HapusKamar', (kamar_id_internal,), "Hapus Kamar", self._kunci_cache_kamar(kamar_id_internal))
+
+    def _kunci_cache_kamar(self, kamar_id_internal):
+        """Kunci cache daftar kamar yang memuat kamar_id_internal (asramanya tidak diketahui pemanggil)."""
+        return self._cache.kunci_dengan(lambda kunci, daftar: kunci[0] == "kamar" and
+                                        any(k['kamar_id_internal'] == kamar_id_internal for k in daftar))
             
     # --- Metode untuk Penghuni (sudah ada, pastikan menggunakan stored_results jika SP diubah) ---
     def get_penghuni_in_kamar(self, nomor_kamar, asrama_id):
@@ -1115,11 +1517,53 @@ class DatabaseService:
         return options_display, penghuni or []
 
 
+    def get_kamar_snapshot(self, nomor_kamar, asrama_id):
+        """
+        Mengambil header kamar, kapasitas, jumlah penghuni, dan daftar penghuni dalam satu panggilan sp_SnapshotKamar.
+        Mengembalikan dict {'kamar': header atau None, 'kapasitas', 'jumlah_penghuni', 'penghuni': [{nim, nama_penghuni, fakultas}]}.
+        """
+        snapshot = {'kamar': None, 'kapasitas': 0, 'jumlah_penghuni': 0, 'penghuni': []}
+        if not self._pool: return snapshot
+        try:
+            with self._koneksi() as (conn, cursor):
+                with self._statistik_kueri.ukur(None, (nomor_kamar, asrama_id), nama="CALL sp_SnapshotKamar") as ukur:
+                    cursor.callproc('sp_SnapshotKamar', (nomor_kamar, asrama_id))
+                    result_sets = [result.fetchall() for result in cursor.stored_results()]
+                    ukur.catat_baris(sum(len(rows) for rows in result_sets))
+        except mysql.connector.Error as err:
+            print(f"Kesalahan saat mengambil data kamar {nomor_kamar} (asrama {asrama_id}): {err}")
+            return snapshot
+        if result_sets and result_sets[0]:
+            kamar = result_sets[0][0]
+            snapshot.update(kamar=kamar, kapasitas=kamar['kapasitas'], jumlah_penghuni=kamar['jumlah_penghuni'])
+        if len(result_sets) > 1:
+            snapshot['penghuni'] = result_sets[1]
+        return snapshot
+
     def get_jumlah_penghuni(self, nomor_kamar, asrama_id):
-        """Mengambil jumlah penghuni saat ini di kamar tertentu."""
-        query = "SELECT jumlah_penghuni_sekarang FROM vw_DetailKamarPenghuni WHERE nomor_kamar = %s AND asrama_id = %s"
+        """Mengambil jumlah penghuni saat ini di kamar tertentu (kolom Kamar.occupied yang dijaga trigger)."""
+        query = "SELECT occupied FROM Kamar WHERE nomor_kamar = %s AND asrama_id = %s"
         result = self._execute_query(query, (nomor_kamar, asrama_id), fetch_one=True)
-        return result['jumlah_penghuni_sekarang'] if result else 0
+        return result['occupied'] if result else 0
+
+    def rekonsiliasi_okupansi(self):
+        """
+        Menghitung ulang Kamar.occupied dari tabel Penghuni untuk semua kamar.
+        Semua baris Kamar dikunci lebih dulu sehingga penulisan penghuni yang sedang berjalan selesai
+        sebelum penghitungan. Mengembalikan jumlah kamar yang nilainya dikoreksi, atau None jika gagal.
+        """
+        if not self._pool: return None
+        try:
+            with self.transaction() as (conn, cursor):
+                cursor.execute("SELECT kamar_id_internal FROM Kamar ORDER BY kamar_id_internal FOR UPDATE")
+                cursor.fetchall()
+                cursor.execute(schema.SQL_REKONSILIASI_OKUPANSI)
+                dikoreksi = cursor.rowcount
+            print(f"Rekonsiliasi okupansi selesai: {dikoreksi} kamar dikoreksi.")
+            return dikoreksi
+        except mysql.connector.Error as err:
+            print(f"Kesalahan saat rekonsiliasi okupansi kamar: {err}")
+            return None
 
     def get_kapasitas_kamar(self, nomor_kamar, asrama_id):
         """Mengambil kapasitas kamar tertentu."""
@@ -1127,12 +1571,47 @@ class DatabaseService:
         result = self._execute_query(query, (nomor_kamar, asrama_id), fetch_one=True)
         return result['kapasitas'] if result else 0
         
+    def cari_kamar_kosong(self, asrama_id=None, min_kosong=1, limit=None):
+        """
+        Kamar di semua asrama (atau satu asrama) yang masih memiliki minimal min_kosong tempat tidur kosong,
+        diurutkan dari sisa terbanyak. Satu kueri lewat indeks kolom generated Kamar.sisa_kapasitas; tidak di-cache
+        karena berubah setiap ada penghuni masuk/keluar. Setiap baris berisi kamar_id_internal, nomor_kamar,
+        asrama_id, nama_asrama, kapasitas, jumlah_penghuni, dan sisa_kapasitas.
+        """
+        kondisi, params = ["K.sisa_kapasitas >= %s"], [max(1, int(min_kosong))]
+        if asrama_id is not None:
+            kondisi.append("K.asrama_id = %s")
+            params.append(asrama_id)
+        query = f"""SELECT K.kamar_id_internal, K.nomor_kamar, K.asrama_id, A.nama_asrama, K.kapasitas,
+                           K.occupied AS jumlah_penghuni, K.sisa_kapasitas
+                    FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id
+                    WHERE {' AND '.join(kondisi)}
+                    ORDER BY K.sisa_kapasitas DESC, A.nama_asrama, K.nomor_kamar"""
+        if limit:
+            query += " LIMIT %s"
+            params.append(int(limit))
+        return self._execute_query(query, tuple(params), fetch_all=True) or []
+
     def get_all_fakultas(self):
-        return self._execute_query("SELECT fakultas_id, nama_fakultas FROM Fakultas ORDER BY nama_fakultas", fetch_all=True) or []
+        return list(self._cache.ambil(("fakultas",), lambda: self._execute_query(
+            "SELECT fakultas_id, nama_fakultas FROM Fakultas ORDER BY nama_fakultas", fetch_all=True)) or [])
 
     def get_fakultas_id_by_name(self, nama_fakultas):
-        result = self._execute_query("SELECT fakultas_id FROM Fakultas WHERE nama_fakultas = %s", (nama_fakultas,), fetch_one=True)
-        return result['fakultas_id'] if result else None
+        fakultas_id = {f['nama_fakultas']: f['fakultas_id'] for f in self.get_all_fakultas()}.get(nama_fakultas)
+        if fakultas_id is None:
+            # Fakultas yang baru ditambahkan klien lain belum ada di cache sampai TTL habis.
+            result = self._execute_query("SELECT fakultas_id FROM Fakultas WHERE nama_fakultas = %s", (nama_fakultas,), fetch_one=True)
+            fakultas_id = result['fakultas_id'] if result else None
+        return fakultas_id
+
+    def _peta_fakultas_tersimpan(self):
+        """{nama_fakultas: fakultas_id} dari cache tanpa memuat ke database."""
+        return {f['nama_fakultas']: f['fakultas_id'] for f in (self._cache.intip(("fakultas",)) or [])}
+
+    def _hapus_cache_fakultas_jika_baru(self, nama_fakultas):
+        # sp_TambahPenghuni dan sp_UpdatePenghuni menambahkan Fakultas sendiri jika namanya belum ada.
+        if nama_fakultas and nama_fakultas not in self._peta_fakultas_tersimpan():
+            self._cache.hapus(("fakultas",))
 
 
     def __del__(self):
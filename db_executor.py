@@ -0,0 +1,101 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DbExecutor:
+    """
+    Menjalankan panggilan DatabaseService di thread latar agar mainloop Tk tidak membeku.
+    Hasil dikirim kembali ke thread UI dengan polling lewat root.after, sehingga callback
+    selalu berjalan di thread Tk. Setiap permintaan terikat ke 'generasi' layar; ketika layar
+    berganti (generasi_baru), permintaan lama dibatalkan dan hasilnya tidak pernah dipanggil.
+    Fungsi yang dijalankan di latar tidak boleh menyentuh widget Tk atau memanggil messagebox.
+    """
+    def __init__(self, root, max_workers=4, interval_poll_ms=30):
+        self._root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._hasil = queue.Queue()
+        self._interval_poll_ms = interval_poll_ms
+        self._lock = threading.Lock()
+        self._generasi = 0
+        self._tertunda = set()
+        self._jumlah_aktif = 0  # permintaan yang hasilnya belum diambil oleh thread UI
+        self._after_id = None
+        self._ditutup = False
+
+    @property
+    def generasi(self):
+        return self._generasi
+
+    def generasi_baru(self):
+        """Membatalkan semua permintaan yang masih tertunda (misalnya saat berpindah layar)."""
+        with self._lock:
+            self._generasi += 1
+            tertunda = list(self._tertunda)
+        for future in tertunda:
+            future.cancel()
+        return self._generasi
+
+    def jalankan(self, fungsi, *args, saat_selesai=None, saat_gagal=None, **kwargs):
+        """
+        Menjalankan fungsi(*args, **kwargs) di thread latar (dipanggil dari thread UI).
+        saat_selesai(hasil) atau saat_gagal(exception) dipanggil di thread UI, kecuali jika
+        generasi sudah berganti sebelum hasilnya tiba.
+        """
+        if self._ditutup:
+            return None
+        generasi = self._generasi
+        future = self._executor.submit(fungsi, *args, **kwargs)
+        with self._lock:
+            self._tertunda.add(future)
+            self._jumlah_aktif += 1
+        future.add_done_callback(lambda f: self._selesai(f, generasi, saat_selesai, saat_gagal))
+        self._jadwalkan_poll()
+        return future
+
+    def _selesai(self, future, generasi, saat_selesai, saat_gagal):
+        # Dipanggil di thread worker (atau di thread UI jika future dibatalkan); hanya memakai queue.
+        with self._lock:
+            self._tertunda.discard(future)
+        self._hasil.put((future, generasi, saat_selesai, saat_gagal))
+
+    def _jadwalkan_poll(self):
+        if self._after_id is None and not self._ditutup:
+            self._after_id = self._root.after(self._interval_poll_ms, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        while True:
+            try:
+                future, generasi, saat_selesai, saat_gagal = self._hasil.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._jumlah_aktif -= 1
+            if future.cancelled() or generasi != self._generasi:
+                continue
+            err = future.exception()
+            try:
+                if err is None:
+                    if saat_selesai:
+                        saat_selesai(future.result())
+                elif saat_gagal:
+                    saat_gagal(err)
+                else:
+                    print(f"Kesalahan pada tugas database latar: {err}")
+            except Exception as e:
+                print(f"Kesalahan saat menampilkan hasil tugas database: {e}")
+        if self._jumlah_aktif > 0:
+            self._jadwalkan_poll()
+
+    def tutup(self):
+        """Membatalkan tugas yang belum berjalan dan menghentikan polling."""
+        self._ditutup = True
+        self.generasi_baru()
+        if self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,68 @@
+"""
+Penulisan hasil ekspor secara bertahap ke CSV atau JSON Lines (opsional dikompresi gzip).
+Baris ditulis per batch sehingga memori yang dipakai tidak bergantung pada jumlah baris total.
+"""
+import csv
+import gzip
+import json
+import os
+
+FORMAT_EKSPOR = ("csv", "jsonl")
+
+
+def tebak_format(path):
+    """Menebak (format, kompres) dari ekstensi path, misalnya 'log.jsonl.gz' -> ('jsonl', True)."""
+    nama = path.lower()
+    kompres = nama.endswith(".gz")
+    if kompres:
+        nama = nama[:-3]
+    return ("jsonl" if nama.endswith((".jsonl", ".json")) else "csv"), kompres
+
+
+class PenulisEkspor:
+    """
+    Menulis baris (tuple sesuai urutan kolom) ke file ekspor. Dipakai sebagai context manager:
+    data ditulis ke file sementara dan baru mengganti path tujuan jika seluruh ekspor berhasil,
+    sehingga ekspor yang gagal di tengah jalan tidak meninggalkan file setengah jadi.
+    """
+    def __init__(self, path, kolom, format=None, kompres=None):
+        format_tebakan, kompres_tebakan = tebak_format(path)
+        self.format = format or format_tebakan
+        if self.format not in FORMAT_EKSPOR:
+            raise ValueError(f"Format ekspor tidak dikenal: {self.format} (pilihan: {', '.join(FORMAT_EKSPOR)}).")
+        self.kompres = kompres_tebakan if kompres is None else kompres
+        self.path = path
+        self.kolom = list(kolom)
+        self.jumlah_baris = 0
+        self._path_sementara = f"{path}.tmp"
+        self._file = None
+        self._csv = None
+
+    def __enter__(self):
+        if self.kompres:
+            self._file = gzip.open(self._path_sementara, "wt", newline="", encoding="utf-8")
+        else:
+            self._file = open(self._path_sementara, "w", newline="", encoding="utf-8")
+        if self.format == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.kolom)
+        return self
+
+    def tulis(self, daftar_baris):
+        if self.format == "csv":
+            self._csv.writerows(daftar_baris)
+        else:
+            self._file.writelines(json.dumps(dict(zip(self.kolom, baris)), ensure_ascii=False, default=str) + "\n"
+                                  for baris in daftar_baris)
+        self.jumlah_baris += len(daftar_baris)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._path_sementara, self.path)
+        else:
+            try:
+                os.remove(self._path_sementara)
+            except OSError:
+                pass
+        return False
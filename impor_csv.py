@@ -0,0 +1,65 @@
+"""
+Pembacaan dan pemeriksaan format file CSV impor penghuni (tanpa akses database).
+
+Kolom header (tidak peka huruf besar/kecil):
+    nim            : wajib, hanya angka
+    nama_penghuni  : wajib (alias: nama)
+    fakultas       : opsional; fakultas yang belum ada akan ditambahkan
+    nomor_kamar    : wajib, angka
+    asrama_id      : ID asrama, atau kolom nama_asrama (alias: asrama) berisi nama asrama
+"""
+import csv
+
+ALIAS_KOLOM = {"nama": "nama_penghuni", "asrama": "nama_asrama"}
+
+
+def baca_csv_penghuni(sumber):
+    """
+    Menghasilkan (nomor_baris, baris) satu per satu dari path atau objek file CSV.
+    Nama kolom dinormalisasi (huruf kecil, alias diganti); nomor_baris mengikuti baris file (header = 1).
+    """
+    if isinstance(sumber, str):
+        with open(sumber, newline="", encoding="utf-8-sig") as f:
+            yield from baca_csv_penghuni(f)
+        return
+    pembaca = csv.DictReader(sumber)
+    for nomor_baris, baris in enumerate(pembaca, start=2):
+        yield nomor_baris, {ALIAS_KOLOM.get(k, k): (v or "").strip()
+                            for k, v in ((str(k or "").strip().lower(), v) for k, v in baris.items())}
+
+
+def normalisasi_baris(baris, asrama_per_nama):
+    """
+    Memeriksa format satu baris. Mengembalikan (data, None) jika valid, atau (None, alasan) jika ditolak.
+    data berisi nim, nama_penghuni, fakultas (None jika kosong), nomor_kamar (int), asrama_id (int).
+    """
+    nim = baris.get("nim", "")
+    if not nim or not nim.isdigit():
+        return None, "NIM tidak valid (harus berupa angka dan tidak boleh kosong)."
+    nama = baris.get("nama_penghuni", "")
+    if not nama:
+        return None, "Nama penghuni kosong."
+    try:
+        nomor_kamar = int(baris.get("nomor_kamar", ""))
+    except ValueError:
+        return None, "Nomor kamar tidak valid."
+    if baris.get("asrama_id"):
+        try:
+            asrama_id = int(baris["asrama_id"])
+        except ValueError:
+            return None, "ID asrama tidak valid."
+    else:
+        asrama_id = asrama_per_nama.get(baris.get("nama_asrama", ""))
+        if asrama_id is None:
+            return None, f"Asrama '{baris.get('nama_asrama', '')}' tidak ditemukan."
+    return {"nim": nim, "nama_penghuni": nama, "fakultas": baris.get("fakultas") or None,
+            "nomor_kamar": nomor_kamar, "asrama_id": asrama_id}, None
+
+
+def tulis_laporan_penolakan(ringkasan, path):
+    """Menulis baris yang ditolak (baris, nim, alasan) dari ringkasan impor ke file CSV."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        penulis = csv.writer(f)
+        penulis.writerow(["baris", "nim", "alasan"])
+        for tolak in ringkasan["ditolak"]:
+            penulis.writerow([tolak["baris"], tolak["nim"], tolak["alasan"]])
@@ -0,0 +1,78 @@
+import threading
+import time
+
+
+class MasterDataCache:
+    """
+    Cache dalam proses untuk data master (daftar asrama, kamar per asrama, fakultas).
+    Setiap entri kedaluwarsa setelah ttl_detik agar perubahan dari klien lain tetap terlihat;
+    metode tulis DatabaseService menghapus entri yang terdampak secara langsung lewat hapus().
+    Aman dipakai dari beberapa thread. Pemuat dijalankan di luar lock; hasilnya tidak disimpan
+    jika entri yang sama dihapus selama pemuatan berlangsung.
+    """
+    def __init__(self, ttl_detik=60.0):
+        self._ttl_detik = float(ttl_detik)
+        self._lock = threading.Lock()
+        self._entri = {}  # kunci -> (nilai, waktu_kedaluwarsa)
+        self._versi = {}  # kunci -> penghitung penghapusan, untuk mendeteksi pemuatan yang basi
+        self._hit = 0
+        self._miss = 0
+        self._penghapusan = 0
+
+    @property
+    def aktif(self):
+        return self._ttl_detik > 0
+
+    def ambil(self, kunci, pemuat):
+        """Mengembalikan nilai untuk kunci dari cache, atau memanggil pemuat() lalu menyimpannya."""
+        if not self.aktif:
+            return pemuat()
+        sekarang = time.monotonic()
+        with self._lock:
+            entri = self._entri.get(kunci)
+            if entri and entri[1] > sekarang:
+                self._hit += 1
+                return entri[0]
+            self._miss += 1
+            versi = self._versi.get(kunci, 0)
+        nilai = pemuat()
+        if nilai is not None:
+            with self._lock:
+                if self._versi.get(kunci, 0) == versi:
+                    self._entri[kunci] = (nilai, time.monotonic() + self._ttl_detik)
+        return nilai
+
+    def intip(self, kunci):
+        """Nilai yang sedang tersimpan (belum kedaluwarsa) tanpa memuat dan tanpa memengaruhi statistik."""
+        with self._lock:
+            entri = self._entri.get(kunci)
+            return entri[0] if entri and entri[1] > time.monotonic() else None
+
+    def hapus(self, *daftar_kunci):
+        """Menghapus entri untuk kunci-kunci yang diberikan."""
+        with self._lock:
+            for kunci in daftar_kunci:
+                self._versi[kunci] = self._versi.get(kunci, 0) + 1
+                if self._entri.pop(kunci, None) is not None:
+                    self._penghapusan += 1
+
+    def kunci_dengan(self, predikat):
+        """Daftar kunci yang nilainya memenuhi predikat(kunci, nilai)."""
+        with self._lock:
+            return [kunci for kunci, (nilai, _) in self._entri.items() if predikat(kunci, nilai)]
+
+    def hapus_semua(self):
+        with self._lock:
+            for kunci in list(self._entri) + list(self._versi):
+                self._versi[kunci] = self._versi.get(kunci, 0) + 1
+            self._penghapusan += len(self._entri)
+            self._entri.clear()
+
+    def statistik(self):
+        with self._lock:
+            total = self._hit + self._miss
+            return {
+                'hit': self._hit, 'miss': self._miss, 'penghapusan': self._penghapusan,
+                'entri': len(self._entri), 'rasio_hit': (self._hit / total) if total else 0.0,
+                'ttl_detik': self._ttl_detik,
+            }
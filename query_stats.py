@@ -0,0 +1,186 @@
+"""
+Instrumentasi kueri database: latensi, jumlah baris, dan jumlah error per pernyataan dalam histogram
+di memori, serta log kueri lambat yang dirotasi (logging.handlers.RotatingFileHandler).
+
+Semua pengaturan dapat diubah saat aplikasi berjalan lewat StatistikKueri.atur(). Jika statistik dan
+log kueri lambat sama-sama nonaktif, ukur() mengembalikan satu objek kosong bersama sehingga biaya per
+kueri hanya satu pemeriksaan atribut.
+"""
+import logging
+import logging.handlers
+import threading
+import time
+
+# Batas atas setiap keranjang histogram latensi (milidetik); keranjang terakhir menampung sisanya.
+BATAS_HISTOGRAM_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Parameter kueri yang mengandung kata ini tidak ditulis ke log kueri lambat (password pengguna).
+KATA_RAHASIA = ("sp_LoginPengguna", "sp_RegistrasiPengguna", "PenggunaAplikasi")
+
+PANJANG_MAKS_NAMA = 300
+
+_TETAP = object()
+
+
+def nama_pernyataan(sql):
+    """Teks pernyataan dengan spasi dirapikan, dipakai sebagai kunci statistik (placeholder membuatnya stabil)."""
+    nama = " ".join(str(sql).split())
+    return nama if len(nama) <= PANJANG_MAKS_NAMA else nama[:PANJANG_MAKS_NAMA] + "..."
+
+
+class _TanpaPengukuran:
+    """Pengganti pengukuran saat instrumentasi nonaktif."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def catat_baris(self, jumlah):
+        pass
+
+
+TANPA_PENGUKURAN = _TanpaPengukuran()
+
+
+class _Pengukuran:
+    __slots__ = ("_statistik", "_nama", "_sql", "_params", "_baris", "_mulai")
+
+    def __init__(self, statistik, nama, sql, params):
+        self._statistik = statistik
+        self._nama = nama
+        self._sql = sql
+        self._params = params
+        self._baris = None
+
+    def __enter__(self):
+        self._mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._statistik.catat(self._nama, time.perf_counter() - self._mulai, self._baris, exc_type is not None,
+                              self._sql, self._params)
+        return False
+
+    def catat_baris(self, jumlah):
+        self._baris = jumlah
+
+
+class StatistikKueri:
+    """
+    Pengumpul statistik kueri yang aman dipakai dari beberapa thread.
+    aktif: kumpulkan histogram per pernyataan. ambang_lambat_ms: kueri yang lebih lama dari ini ditulis ke
+    log kueri lambat (path_log_lambat; tanpa path hanya dihitung). None berarti nonaktif.
+    """
+    def __init__(self, aktif=False, ambang_lambat_ms=None, path_log_lambat=None, maks_byte_log=10 * 1024 * 1024, cadangan_log=5):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._aktif = False
+        self._ambang_lambat_ms = None
+        self._path_log_lambat = None
+        self._logger = None
+        self._handler = None
+        self._maks_byte_log = maks_byte_log
+        self._cadangan_log = cadangan_log
+        self.perlu_ukur = False
+        self.atur(aktif, ambang_lambat_ms, path_log_lambat)
+
+    def atur(self, aktif=_TETAP, ambang_lambat_ms=_TETAP, path_log_lambat=_TETAP):
+        """Mengubah pengaturan saat berjalan; argumen yang tidak diberikan tidak berubah."""
+        with self._lock:
+            if aktif is not _TETAP:
+                self._aktif = bool(aktif)
+            if ambang_lambat_ms is not _TETAP:
+                self._ambang_lambat_ms = float(ambang_lambat_ms) if ambang_lambat_ms is not None else None
+            if path_log_lambat is not _TETAP and path_log_lambat != self._path_log_lambat:
+                self._ganti_log_lambat(path_log_lambat)
+            self.perlu_ukur = self._aktif or self._ambang_lambat_ms is not None
+
+    def _ganti_log_lambat(self, path):
+        if self._handler:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+        self._path_log_lambat = path
+        if path:
+            self._logger = logging.getLogger(f"{__name__}.lambat.{id(self)}")
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            self._handler = logging.handlers.RotatingFileHandler(path, maxBytes=self._maks_byte_log,
+                                                                 backupCount=self._cadangan_log, encoding="utf-8")
+            self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._logger.addHandler(self._handler)
+
+    def ukur(self, sql, params=None, nama=None):
+        """Context manager yang mengukur satu pernyataan; panggil catat_baris(n) di dalamnya jika jumlah baris diketahui."""
+        if not self.perlu_ukur:
+            return TANPA_PENGUKURAN
+        return _Pengukuran(self, nama or nama_pernyataan(sql), sql, params)
+
+    def catat(self, nama, durasi_detik, baris=None, error=False, sql=None, params=None):
+        durasi_ms = durasi_detik * 1000
+        ambang = self._ambang_lambat_ms
+        lambat = ambang is not None and durasi_ms >= ambang
+        if self._aktif:
+            with self._lock:
+                entri = self._data.get(nama)
+                if entri is None:
+                    entri = self._data[nama] = {'jumlah': 0, 'error': 0, 'baris': 0, 'lambat': 0, 'total_ms': 0.0,
+                                                'maks_ms': 0.0, 'histogram': [0] * (len(BATAS_HISTOGRAM_MS) + 1)}
+                entri['jumlah'] += 1
+                entri['error'] += 1 if error else 0
+                entri['baris'] += baris or 0
+                entri['lambat'] += 1 if lambat else 0
+                entri['total_ms'] += durasi_ms
+                entri['maks_ms'] = max(entri['maks_ms'], durasi_ms)
+                entri['histogram'][self._indeks_keranjang(durasi_ms)] += 1
+        if lambat and self._handler:
+            tampil_params = "***" if any(kata in (sql or nama) for kata in KATA_RAHASIA) else params
+            self._logger.info(f"{durasi_ms:.1f} ms | baris={baris if baris is not None else '-'}"
+                              f"{' | ERROR' if error else ''} | {nama} | params={tampil_params!r:.500}")
+
+    @staticmethod
+    def _indeks_keranjang(durasi_ms):
+        for i, batas in enumerate(BATAS_HISTOGRAM_MS):
+            if durasi_ms <= batas:
+                return i
+        return len(BATAS_HISTOGRAM_MS)
+
+    @staticmethod
+    def _perkiraan_persentil(histogram, maks_ms, p):
+        """Batas atas keranjang yang memuat persentil ke-p (perkiraan dari histogram)."""
+        target = sum(histogram) * p / 100
+        kumulatif = 0
+        for i, jumlah in enumerate(histogram):
+            kumulatif += jumlah
+            if jumlah and kumulatif >= target:
+                return min(BATAS_HISTOGRAM_MS[i], maks_ms) if i < len(BATAS_HISTOGRAM_MS) else maks_ms
+        return 0.0
+
+    def snapshot(self):
+        """Salinan statistik saat ini, diurutkan dari total waktu terbesar."""
+        with self._lock:
+            data = {nama: dict(entri, histogram=list(entri['histogram'])) for nama, entri in self._data.items()}
+            pengaturan = {'aktif': self._aktif, 'ambang_lambat_ms': self._ambang_lambat_ms, 'log_lambat': self._path_log_lambat}
+        label = [f"<={batas}ms" for batas in BATAS_HISTOGRAM_MS] + [f">{BATAS_HISTOGRAM_MS[-1]}ms"]
+        kueri = {}
+        for nama, entri in sorted(data.items(), key=lambda item: item[1]['total_ms'], reverse=True):
+            histogram = entri['histogram']
+            kueri[nama] = {
+                'jumlah': entri['jumlah'], 'error': entri['error'], 'baris': entri['baris'], 'lambat': entri['lambat'],
+                'total_ms': round(entri['total_ms'], 3), 'rata_ms': round(entri['total_ms'] / entri['jumlah'], 3),
+                'maks_ms': round(entri['maks_ms'], 3),
+                **{f"p{p}_ms": round(self._perkiraan_persentil(histogram, entri['maks_ms'], p), 3) for p in (50, 95, 99)},
+                'histogram': {label[i]: jumlah for i, jumlah in enumerate(histogram) if jumlah},
+            }
+        return dict(pengaturan, kueri=kueri)
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+    def tutup(self):
+        with self._lock:
+            self._ganti_log_lambat(None)
@@ -0,0 +1,693 @@
+"""
+Definisi skema database asrama dalam bentuk langkah migrasi bernama.
+
+Setiap langkah berisi satu atau lebih pernyataan DDL. DatabaseService menyimpan checksum setiap
+langkah di tabel SchemaVersi dan hanya menjalankan ulang langkah yang isinya berubah.
+Perubahan struktur tabel yang sudah ada harus ditambahkan sebagai langkah baru (misalnya ALTER TABLE),
+karena CREATE TABLE IF NOT EXISTS tidak mengubah tabel yang sudah terbuat.
+
+Semua trigger audit melewati pencatatan jika variabel sesi @audit_nonaktif bernilai 1
+(dipakai saat seeding data master awal). Trigger log Penghuni juga melewati pencatatan jika
+@audit_mode_aplikasi bernilai 1; log tersebut lalu ditulis oleh DatabaseService (lihat audit_async.py).
+
+Kolom Kamar.occupied adalah jumlah penghuni kamar yang dijaga tetap tepat oleh trigger trg_Okupansi*
+(tidak terpengaruh @audit_nonaktif). SQL_REKONSILIASI_OKUPANSI menghitung ulang kolom ini dari tabel Penghuni.
+Prosedur yang mengubah penghuni mengunci baris Penghuni lebih dulu, lalu baris Kamar menurut kamar_id_internal
+(SELECT ... FOR UPDATE) sebelum memeriksa kapasitas, sama seperti kode Python di DatabaseService.
+Kolom generated Kamar.sisa_kapasitas (kapasitas - occupied) diindeks untuk pencarian kamar kosong.
+
+Tabel log audit dipartisi RANGE per bulan pada UNIX_TIMESTAMP(waktu_aksi). Langkah skema hanya membuat
+partisi p_awal dan p_max; partisi bulanan (pYYYYMM) dibuat dan dihapus oleh DatabaseService.kelola_partisi_audit().
+Langkah partisi:* tidak boleh diubah, karena menjalankannya ulang akan menggabungkan kembali semua partisi bulanan.
+"""
+import hashlib
+import re
+
+NAMA_BUNDEL = "__bundel__"
+
+TABEL_AUDIT = ("AuditLogAktivitasPenghuni", "AuditLogAktivitasAsrama", "AuditLogAktivitasKamar")
+
+DDL_TABEL_VERSI = """CREATE TABLE IF NOT EXISTS SchemaVersi (
+    komponen VARCHAR(100) PRIMARY KEY,
+    checksum CHAR(64) NOT NULL,
+    diterapkan_pada TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB;"""
+
+
+SQL_REKONSILIASI_OKUPANSI = """UPDATE Kamar K
+            LEFT JOIN (SELECT kamar_id_internal, COUNT(*) AS jumlah FROM Penghuni GROUP BY kamar_id_internal) P
+                ON P.kamar_id_internal = K.kamar_id_internal
+            SET K.occupied = IFNULL(P.jumlah, 0)
+            WHERE K.occupied != IFNULL(P.jumlah, 0)"""
+
+
+def _trigger(nama, ddl):
+    return (f"trigger:{nama}", [f"DROP TRIGGER IF EXISTS {nama}", ddl])
+
+
+def _prosedur(nama, ddl):
+    return (f"prosedur:{nama}", [f"DROP PROCEDURE IF EXISTS {nama}", ddl])
+
+
+def _partisi_audit(tabel):
+    # Kunci unik pada tabel berpartisi harus memuat kolom partisi, sehingga PK menjadi (log_id, waktu_aksi).
+    return (f"partisi:{tabel}", [
+        f"UPDATE {tabel} SET waktu_aksi = CURRENT_TIMESTAMP WHERE waktu_aksi IS NULL",
+        f"""ALTER TABLE {tabel} MODIFY waktu_aksi TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            DROP PRIMARY KEY, ADD PRIMARY KEY (log_id, waktu_aksi)""",
+        f"""ALTER TABLE {tabel} PARTITION BY RANGE (UNIX_TIMESTAMP(waktu_aksi)) (
+            PARTITION p_awal VALUES LESS THAN (UNIX_TIMESTAMP('2000-01-01 00:00:00')),
+            PARTITION p_max VALUES LESS THAN MAXVALUE
+        )""",
+    ])
+
+
+def _indeks(tabel, daftar_indeks):
+    # Satu CREATE INDEX per indeks agar indeks yang sudah ada (errno 1061) tidak menggagalkan indeks lainnya.
+    return (f"indeks:{tabel}", [f"CREATE INDEX {nama} ON {tabel} ({kolom})" for nama, kolom in daftar_indeks])
+
+
+LANGKAH_SKEMA = [
+    ("tabel:Asrama", ["""CREATE TABLE IF NOT EXISTS Asrama (
+                asrama_id INTEGER PRIMARY KEY,
+                nama_asrama VARCHAR(255) NOT NULL UNIQUE
+            ) ENGINE=InnoDB;"""]),
+    ("tabel:Fakultas", ["""CREATE TABLE IF NOT EXISTS Fakultas (
+                fakultas_id INT AUTO_INCREMENT PRIMARY KEY,
+                nama_fakultas VARCHAR(255) NOT NULL UNIQUE
+            ) ENGINE=InnoDB;"""]),
+    ("tabel:Kamar", ["""CREATE TABLE IF NOT EXISTS Kamar (
+                kamar_id_internal INTEGER PRIMARY KEY AUTO_INCREMENT,
+                nomor_kamar INTEGER NOT NULL,
+                asrama_id INTEGER NOT NULL,
+                kapasitas INTEGER NOT NULL DEFAULT 2,
+                FOREIGN KEY (asrama_id) REFERENCES Asrama(asrama_id) ON DELETE CASCADE,
+                UNIQUE (nomor_kamar, asrama_id)
+            ) ENGINE=InnoDB;"""]),
+    ("tabel:PenggunaAplikasi", ["""CREATE TABLE IF NOT EXISTS PenggunaAplikasi (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                username VARCHAR(50) NOT NULL UNIQUE,
+                password_hash VARCHAR(255) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB;"""]),
+    ("tabel:Penghuni", ["""CREATE TABLE IF NOT EXISTS Penghuni (
+                nim VARCHAR(50) PRIMARY KEY, nama_penghuni VARCHAR(255) NOT NULL,
+                fakultas_id INT NULL DEFAULT NULL, kamar_id_internal INTEGER NOT NULL,
+                FOREIGN KEY (kamar_id_internal) REFERENCES Kamar(kamar_id_internal) ON DELETE CASCADE,
+                FOREIGN KEY (fakultas_id) REFERENCES Fakultas(fakultas_id) ON DELETE SET NULL ON UPDATE CASCADE
+            ) ENGINE=InnoDB;"""]),
+    ("tabel:AuditLogAktivitasPenghuni", ["""CREATE TABLE IF NOT EXISTS AuditLogAktivitasPenghuni (
+                log_id INT AUTO_INCREMENT PRIMARY KEY, nim VARCHAR(50),
+                nama_penghuni_lama VARCHAR(255) DEFAULT NULL, nama_penghuni_baru VARCHAR(255) DEFAULT NULL,
+                fakultas_lama VARCHAR(255) DEFAULT NULL, fakultas_baru VARCHAR(255) DEFAULT NULL,
+                kamar_id_internal_lama INT DEFAULT NULL, kamar_id_internal_baru INT DEFAULT NULL,
+                nomor_kamar_lama INT DEFAULT NULL, nama_asrama_lama VARCHAR(255) DEFAULT NULL,
+                nomor_kamar_baru INT DEFAULT NULL, nama_asrama_baru VARCHAR(255) DEFAULT NULL,
+                aksi VARCHAR(10) NOT NULL, waktu_aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                user_aksi VARCHAR(50) DEFAULT NULL, keterangan_tambahan TEXT DEFAULT NULL
+            ) ENGINE=InnoDB;"""]),
+    ("tabel:AuditLogAktivitasAsrama", ["""CREATE TABLE IF NOT EXISTS AuditLogAktivitasAsrama (
+                log_id INT AUTO_INCREMENT PRIMARY KEY,
+                asrama_id_aksi INT, 
+                nama_asrama_lama VARCHAR(255) DEFAULT NULL,
+                nama_asrama_baru VARCHAR(255) DEFAULT NULL,
+                aksi VARCHAR(10) NOT NULL,
+                waktu_aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                user_aksi VARCHAR(50) DEFAULT NULL,
+                keterangan_tambahan TEXT DEFAULT NULL
+            ) ENGINE=InnoDB;"""]),
+    ("tabel:AuditLogAktivitasKamar", ["""CREATE TABLE IF NOT EXISTS AuditLogAktivitasKamar (
+                log_id INT AUTO_INCREMENT PRIMARY KEY,
+                kamar_id_internal_aksi INT, 
+                nomor_kamar_lama INT DEFAULT NULL,
+                nomor_kamar_baru INT DEFAULT NULL,
+                asrama_id_lama INT DEFAULT NULL, 
+                asrama_id_baru INT DEFAULT NULL, 
+                nama_asrama_lama VARCHAR(255) DEFAULT NULL,
+                nama_asrama_baru VARCHAR(255) DEFAULT NULL,
+                kapasitas_lama INT DEFAULT NULL,
+                kapasitas_baru INT DEFAULT NULL,
+                aksi VARCHAR(10) NOT NULL,
+                waktu_aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                user_aksi VARCHAR(50) DEFAULT NULL,
+                keterangan_tambahan TEXT DEFAULT NULL
+            ) ENGINE=InnoDB;"""]),
+    ("kolom:Kamar.occupied", ["ALTER TABLE Kamar ADD COLUMN occupied INT NOT NULL DEFAULT 0 AFTER kapasitas"]),
+    # Sisa tempat tidur dihitung MySQL setiap kali kapasitas/occupied berubah, sehingga pencarian kamar kosong
+    # di semua asrama cukup satu range scan indeks.
+    ("kolom:Kamar.sisa_kapasitas", ["ALTER TABLE Kamar ADD COLUMN sisa_kapasitas INT AS (kapasitas - occupied) STORED AFTER occupied"]),
+    _indeks("Kamar", [
+        ("idx_kamar_sisa", "sisa_kapasitas"),
+        ("idx_kamar_asrama_sisa", "asrama_id, sisa_kapasitas"),
+    ]),
+    # (waktu_aksi, log_id) melayani ORDER BY waktu_aksi DESC, log_id DESC LIMIT n tanpa filesort.
+    _indeks("AuditLogAktivitasPenghuni", [
+        ("idx_auditpenghuni_waktu", "waktu_aksi, log_id"),
+        ("idx_auditpenghuni_nim", "nim"),
+        ("idx_auditpenghuni_user", "user_aksi"),
+    ]),
+    _indeks("AuditLogAktivitasAsrama", [
+        ("idx_auditasrama_waktu", "waktu_aksi, log_id"),
+        ("idx_auditasrama_asrama", "asrama_id_aksi"),
+        ("idx_auditasrama_user", "user_aksi"),
+    ]),
+    _indeks("AuditLogAktivitasKamar", [
+        ("idx_auditkamar_waktu", "waktu_aksi, log_id"),
+        ("idx_auditkamar_kamar", "kamar_id_internal_aksi"),
+        ("idx_auditkamar_user", "user_aksi"),
+    ]),
+    _partisi_audit("AuditLogAktivitasPenghuni"),
+    _partisi_audit("AuditLogAktivitasAsrama"),
+    _partisi_audit("AuditLogAktivitasKamar"),
+    ("view:vw_DetailKamarPenghuni", ["""CREATE OR REPLACE VIEW vw_DetailKamarPenghuni AS
+            SELECT K.nomor_kamar, A.nama_asrama, K.asrama_id, K.kapasitas,
+            K.occupied AS jumlah_penghuni_sekarang,
+            K.kamar_id_internal FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id;"""]),
+    ("view:vw_DaftarPenghuniLengkap", ["""CREATE OR REPLACE VIEW vw_DaftarPenghuniLengkap AS
+            SELECT P.nim, P.nama_penghuni, F.nama_fakultas AS fakultas, K.nomor_kamar, A.nama_asrama, 
+            K.asrama_id AS id_asrama_penghuni, A.asrama_id AS id_asrama_kamar, K.kamar_id_internal, P.fakultas_id
+            FROM Penghuni P JOIN Kamar K ON P.kamar_id_internal = K.kamar_id_internal
+            JOIN Asrama A ON K.asrama_id = A.asrama_id LEFT JOIN Fakultas F ON P.fakultas_id = F.fakultas_id;"""]),
+    _trigger("trg_LogInsertPenghuni", """
+        CREATE TRIGGER trg_LogInsertPenghuni AFTER INSERT ON Penghuni FOR EACH ROW
+        BEGIN
+            DECLARE v_nk INT; DECLARE v_na VARCHAR(255); DECLARE v_nf VARCHAR(255) DEFAULT NULL; DECLARE v_ua VARCHAR(50) DEFAULT NULL;
+            IF IFNULL(@audit_nonaktif, 0) = 0 AND IFNULL(@audit_mode_aplikasi, 0) = 0 THEN
+                SELECT K.nomor_kamar, A.nama_asrama INTO v_nk, v_na FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = NEW.kamar_id_internal;
+                IF NEW.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nf FROM Fakultas WHERE fakultas_id = NEW.fakultas_id; END IF;
+                SET v_ua = @session_user_aksi;
+                INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_baru, fakultas_baru, kamar_id_internal_baru, nomor_kamar_baru, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+                VALUES (NEW.nim, NEW.nama_penghuni, v_nf, NEW.kamar_id_internal, v_nk, v_na, 'INSERT', v_ua, CONCAT('Penghuni baru ditambahkan ke kamar ', v_nk, ' Asrama ', v_na));
+            END IF;
+        END"""),
+    _trigger("trg_LogUpdatePenghuni", """
+        CREATE TRIGGER trg_LogUpdatePenghuni AFTER UPDATE ON Penghuni FOR EACH ROW
+        BEGIN
+            DECLARE v_nkl INT DEFAULT NULL; DECLARE v_nal VARCHAR(255) DEFAULT NULL; DECLARE v_nfl VARCHAR(255) DEFAULT NULL;
+            DECLARE v_nkb INT DEFAULT NULL; DECLARE v_nab VARCHAR(255) DEFAULT NULL; DECLARE v_nfb VARCHAR(255) DEFAULT NULL;
+            DECLARE v_ua VARCHAR(50) DEFAULT NULL; DECLARE v_ket TEXT DEFAULT 'Data penghuni diubah.';
+            IF IFNULL(@audit_nonaktif, 0) = 0 AND IFNULL(@audit_mode_aplikasi, 0) = 0 THEN
+                IF OLD.kamar_id_internal IS NOT NULL THEN SELECT K.nomor_kamar, A.nama_asrama INTO v_nkl, v_nal FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = OLD.kamar_id_internal; END IF;
+                IF OLD.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nfl FROM Fakultas WHERE fakultas_id = OLD.fakultas_id; END IF;
+                IF NEW.kamar_id_internal IS NOT NULL THEN SELECT K.nomor_kamar, A.nama_asrama INTO v_nkb, v_nab FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = NEW.kamar_id_internal; END IF;
+                IF NEW.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nfb FROM Fakultas WHERE fakultas_id = NEW.fakultas_id; END IF;
+                SET v_ua = @session_user_aksi;
+                IF OLD.kamar_id_internal != NEW.kamar_id_internal THEN SET v_ket = CONCAT('Penghuni pindah dari kamar ', IFNULL(v_nkl,'N/A'), ' Asrama ', IFNULL(v_nal,'N/A'), ' ke kamar ', IFNULL(v_nkb,'N/A'), ' Asrama ', IFNULL(v_nab,'N/A'), '.');
+                ELSEIF OLD.fakultas_id != NEW.fakultas_id OR (OLD.fakultas_id IS NULL AND NEW.fakultas_id IS NOT NULL) OR (OLD.fakultas_id IS NOT NULL AND NEW.fakultas_id IS NULL) THEN SET v_ket = CONCAT('Fakultas diubah dari ', IFNULL(v_nfl,'N/A'), ' menjadi ', IFNULL(v_nfb,'N/A'), '.');
+                ELSEIF OLD.nama_penghuni != NEW.nama_penghuni THEN SET v_ket = CONCAT('Nama diubah dari ', OLD.nama_penghuni, ' menjadi ', NEW.nama_penghuni, '.'); END IF;
+                INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_lama, nama_penghuni_baru, fakultas_lama, fakultas_baru, kamar_id_internal_lama, kamar_id_internal_baru, nomor_kamar_lama, nama_asrama_lama, nomor_kamar_baru, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+                VALUES (OLD.nim, OLD.nama_penghuni, NEW.nama_penghuni, v_nfl, v_nfb, OLD.kamar_id_internal, NEW.kamar_id_internal, v_nkl, v_nal, v_nkb, v_nab, 'UPDATE', v_ua, v_ket);
+            END IF;
+        END"""),
+    _trigger("trg_LogDeletePenghuni", """
+        CREATE TRIGGER trg_LogDeletePenghuni AFTER DELETE ON Penghuni FOR EACH ROW
+        BEGIN
+            DECLARE v_nk INT DEFAULT NULL; DECLARE v_na VARCHAR(255) DEFAULT NULL; DECLARE v_nf VARCHAR(255) DEFAULT NULL; DECLARE v_ua VARCHAR(50) DEFAULT NULL;
+            IF IFNULL(@audit_nonaktif, 0) = 0 AND IFNULL(@audit_mode_aplikasi, 0) = 0 THEN
+                IF OLD.kamar_id_internal IS NOT NULL THEN SELECT K.nomor_kamar, A.nama_asrama INTO v_nk, v_na FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id WHERE K.kamar_id_internal = OLD.kamar_id_internal; END IF;
+                IF OLD.fakultas_id IS NOT NULL THEN SELECT nama_fakultas INTO v_nf FROM Fakultas WHERE fakultas_id = OLD.fakultas_id; END IF;
+                SET v_ua = @session_user_aksi;
+                INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_lama, fakultas_lama, kamar_id_internal_lama, nomor_kamar_lama, nama_asrama_lama, aksi, user_aksi, keterangan_tambahan)
+                VALUES (OLD.nim, OLD.nama_penghuni, v_nf, OLD.kamar_id_internal, v_nk, v_na, 'DELETE', v_ua, CONCAT('Penghuni dihapus dari kamar ', IFNULL(v_nk, 'N/A'), ' Asrama ', IFNULL(v_na, 'N/A')));
+            END IF;
+        END"""),
+    _trigger("trg_OkupansiInsertPenghuni", """
+        CREATE TRIGGER trg_OkupansiInsertPenghuni AFTER INSERT ON Penghuni FOR EACH ROW
+        BEGIN
+            UPDATE Kamar SET occupied = occupied + 1 WHERE kamar_id_internal = NEW.kamar_id_internal;
+        END"""),
+    _trigger("trg_OkupansiUpdatePenghuni", """
+        CREATE TRIGGER trg_OkupansiUpdatePenghuni AFTER UPDATE ON Penghuni FOR EACH ROW
+        BEGIN
+            IF NOT (OLD.kamar_id_internal <=> NEW.kamar_id_internal) THEN
+                UPDATE Kamar SET occupied = occupied - 1 WHERE kamar_id_internal = OLD.kamar_id_internal;
+                UPDATE Kamar SET occupied = occupied + 1 WHERE kamar_id_internal = NEW.kamar_id_internal;
+            END IF;
+        END"""),
+    _trigger("trg_OkupansiDeletePenghuni", """
+        CREATE TRIGGER trg_OkupansiDeletePenghuni AFTER DELETE ON Penghuni FOR EACH ROW
+        BEGIN
+            UPDATE Kamar SET occupied = occupied - 1 WHERE kamar_id_internal = OLD.kamar_id_internal;
+        END"""),
+    # Dijalankan setelah trigger okupansi terpasang agar perubahan yang terjadi selama migrasi ikut terhitung.
+    ("data:rekonsiliasi_okupansi", [SQL_REKONSILIASI_OKUPANSI]),
+    _trigger("trg_LogInsertAsrama", """
+        CREATE TRIGGER trg_LogInsertAsrama AFTER INSERT ON Asrama FOR EACH ROW
+        BEGIN
+            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; SET v_user_aksi = @session_user_aksi;
+            IF IFNULL(@audit_nonaktif, 0) = 0 THEN
+                INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+                VALUES (NEW.asrama_id, NEW.nama_asrama, 'INSERT', v_user_aksi, CONCAT('Asrama baru: ID ', NEW.asrama_id, ', Nama: ', NEW.nama_asrama));
+            END IF;
+        END"""),
+    _trigger("trg_LogUpdateAsrama", """
+        CREATE TRIGGER trg_LogUpdateAsrama AFTER UPDATE ON Asrama FOR EACH ROW
+        BEGIN
+            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_keterangan TEXT;
+            IF IFNULL(@audit_nonaktif, 0) = 0 THEN
+                SET v_user_aksi = @session_user_aksi; SET v_keterangan = CONCAT('Asrama ID ', OLD.asrama_id, ' diubah. ');
+                IF OLD.nama_asrama != NEW.nama_asrama THEN SET v_keterangan = CONCAT(v_keterangan, 'Nama dari ''', OLD.nama_asrama, ''' menjadi ''', NEW.nama_asrama, '''.'); END IF;
+                INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_lama, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+                VALUES (OLD.asrama_id, OLD.nama_asrama, NEW.nama_asrama, 'UPDATE', v_user_aksi, v_keterangan);
+            END IF;
+        END"""),
+    _trigger("trg_LogDeleteAsrama", """
+        CREATE TRIGGER trg_LogDeleteAsrama AFTER DELETE ON Asrama FOR EACH ROW
+        BEGIN
+            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; SET v_user_aksi = @session_user_aksi;
+            IF IFNULL(@audit_nonaktif, 0) = 0 THEN
+                INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_lama, aksi, user_aksi, keterangan_tambahan)
+                VALUES (OLD.asrama_id, OLD.nama_asrama, 'DELETE', v_user_aksi, CONCAT('Asrama dihapus: ID ', OLD.asrama_id, ', Nama: ', OLD.nama_asrama));
+            END IF;
+        END"""),
+    _trigger("trg_LogInsertKamar", """
+        CREATE TRIGGER trg_LogInsertKamar AFTER INSERT ON Kamar FOR EACH ROW
+        BEGIN
+            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_nama_asrama VARCHAR(255);
+            IF IFNULL(@audit_nonaktif, 0) = 0 THEN
+                SET v_user_aksi = @session_user_aksi; SELECT nama_asrama INTO v_nama_asrama FROM Asrama WHERE asrama_id = NEW.asrama_id;
+                INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_baru, asrama_id_baru, nama_asrama_baru, kapasitas_baru, aksi, user_aksi, keterangan_tambahan)
+                VALUES (NEW.kamar_id_internal, NEW.nomor_kamar, NEW.asrama_id, v_nama_asrama, NEW.kapasitas, 'INSERT', v_user_aksi, 
+                        CONCAT('Kamar baru: No ', NEW.nomor_kamar, ', Asrama: ', v_nama_asrama, ', Kap: ', NEW.kapasitas));
+            END IF;
+        END"""),
+    _trigger("trg_LogUpdateKamar", """
+        CREATE TRIGGER trg_LogUpdateKamar AFTER UPDATE ON Kamar FOR EACH ROW
+        BEGIN
+            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_na_lama VARCHAR(255); DECLARE v_na_baru VARCHAR(255); DECLARE v_ket TEXT;
+            -- Perubahan yang hanya menyentuh kolom occupied (dari trigger okupansi) tidak dicatat.
+            IF IFNULL(@audit_nonaktif, 0) = 0
+               AND (OLD.nomor_kamar != NEW.nomor_kamar OR OLD.kapasitas != NEW.kapasitas OR OLD.asrama_id != NEW.asrama_id) THEN
+                SET v_user_aksi = @session_user_aksi;
+                SELECT nama_asrama INTO v_na_lama FROM Asrama WHERE asrama_id = OLD.asrama_id;
+                SELECT nama_asrama INTO v_na_baru FROM Asrama WHERE asrama_id = NEW.asrama_id;
+                SET v_ket = CONCAT('Kamar ID Int ', OLD.kamar_id_internal, ' diubah. ');
+                IF OLD.nomor_kamar != NEW.nomor_kamar THEN SET v_ket = CONCAT(v_ket, 'No: ', OLD.nomor_kamar, '->', NEW.nomor_kamar, '. '); END IF;
+                IF OLD.kapasitas != NEW.kapasitas THEN SET v_ket = CONCAT(v_ket, 'Kap: ', OLD.kapasitas, '->', NEW.kapasitas, '. '); END IF;
+                IF OLD.asrama_id != NEW.asrama_id THEN SET v_ket = CONCAT(v_ket, 'Asrama: ', v_na_lama, '->', v_na_baru, '. '); END IF;
+                INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_lama, nomor_kamar_baru, asrama_id_lama, asrama_id_baru, nama_asrama_lama, nama_asrama_baru, kapasitas_lama, kapasitas_baru, aksi, user_aksi, keterangan_tambahan)
+                VALUES (OLD.kamar_id_internal, OLD.nomor_kamar, NEW.nomor_kamar, OLD.asrama_id, NEW.asrama_id, v_na_lama, v_na_baru, OLD.kapasitas, NEW.kapasitas, 'UPDATE', v_user_aksi, v_ket);
+            END IF;
+        END"""),
+    _trigger("trg_LogDeleteKamar", """
+        CREATE TRIGGER trg_LogDeleteKamar AFTER DELETE ON Kamar FOR EACH ROW
+        BEGIN
+            DECLARE v_user_aksi VARCHAR(50) DEFAULT NULL; DECLARE v_nama_asrama VARCHAR(255);
+            IF IFNULL(@audit_nonaktif, 0) = 0 THEN
+                SET v_user_aksi = @session_user_aksi; SELECT nama_asrama INTO v_nama_asrama FROM Asrama WHERE asrama_id = OLD.asrama_id;
+                INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_lama, asrama_id_lama, nama_asrama_lama, kapasitas_lama, aksi, user_aksi, keterangan_tambahan)
+                VALUES (OLD.kamar_id_internal, OLD.nomor_kamar, OLD.asrama_id, v_nama_asrama, OLD.kapasitas, 'DELETE', v_user_aksi, 
+                        CONCAT('Kamar dihapus: No ', OLD.nomor_kamar, ', Asrama: ', v_nama_asrama));
+            END IF;
+        END"""),
+    _prosedur("sp_TambahAsrama", """
+        CREATE PROCEDURE sp_TambahAsrama (
+            IN p_asrama_id INT,
+            IN p_nama_asrama VARCHAR(255)
+        )
+        BEGIN
+            DECLARE v_status_code INT;
+            DECLARE v_status_message VARCHAR(255);
+            SET v_status_code = 1; 
+            SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
+            IF p_asrama_id IS NULL OR p_nama_asrama IS NULL OR p_nama_asrama = '' THEN
+                SET v_status_code = 1;
+                SET v_status_message = 'Gagal: ID Asrama dan Nama Asrama tidak boleh kosong.';
+            ELSEIF EXISTS (SELECT 1 FROM Asrama WHERE asrama_id = p_asrama_id) THEN
+                SET v_status_code = 2;
+                SET v_status_message = CONCAT('Gagal: Asrama dengan ID ', p_asrama_id, ' sudah ada.');
+            ELSEIF EXISTS (SELECT 1 FROM Asrama WHERE nama_asrama = p_nama_asrama) THEN
+                SET v_status_code = 3;
+                SET v_status_message = CONCAT('Gagal: Nama Asrama ''', p_nama_asrama, ''' sudah digunakan.');
+            ELSE
+                SET @session_user_aksi = USER(); 
+                INSERT INTO Asrama (asrama_id, nama_asrama) VALUES (p_asrama_id, p_nama_asrama);
+                SET v_status_code = 0;
+                SET v_status_message = 'Sukses: Asrama berhasil ditambahkan.';
+                SET @session_user_aksi = NULL;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_UpdateAsrama", """
+        CREATE PROCEDURE sp_UpdateAsrama (
+            IN p_asrama_id INT,
+            IN p_nama_asrama_baru VARCHAR(255)
+        )
+        BEGIN
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            DECLARE v_asrama_exists INT DEFAULT 0; DECLARE v_nama_conflict INT DEFAULT 0;
+            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
+            IF p_asrama_id IS NULL OR p_nama_asrama_baru IS NULL OR p_nama_asrama_baru = '' THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Asrama dan Nama Asrama baru tidak boleh kosong.';
+            ELSE
+                SELECT COUNT(*) INTO v_asrama_exists FROM Asrama WHERE asrama_id = p_asrama_id;
+                IF v_asrama_exists = 0 THEN SET v_status_code = 2; SET v_status_message = CONCAT('Gagal: Asrama dengan ID ', p_asrama_id, ' tidak ditemukan.');
+                ELSE
+                    SELECT COUNT(*) INTO v_nama_conflict FROM Asrama WHERE nama_asrama = p_nama_asrama_baru AND asrama_id != p_asrama_id;
+                    IF v_nama_conflict > 0 THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: Nama Asrama ''', p_nama_asrama_baru, ''' sudah digunakan oleh asrama lain.');
+                    ELSE
+                        SET @session_user_aksi = USER();
+                        UPDATE Asrama SET nama_asrama = p_nama_asrama_baru WHERE asrama_id = p_asrama_id;
+                        IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Nama asrama berhasil diubah.';
+                        ELSE SET v_status_code = 0; SET v_status_message = 'Info: Tidak ada perubahan pada nama asrama (nama baru sama dengan nama lama).';
+                        END IF;
+                        SET @session_user_aksi = NULL;
+                    END IF;
+                END IF;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_HapusAsrama", """
+        CREATE PROCEDURE sp_HapusAsrama (
+            IN p_asrama_id INT
+        )
+        BEGIN
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            DECLARE v_kamar_count INT DEFAULT 0;
+            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
+            IF p_asrama_id IS NULL THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Asrama tidak boleh kosong.';
+            ELSE
+                SELECT COUNT(*) INTO v_kamar_count FROM Kamar WHERE asrama_id = p_asrama_id;
+                IF v_kamar_count > 0 THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Asrama tidak dapat dihapus karena masih memiliki kamar. Hapus semua kamar di asrama ini terlebih dahulu.';
+                ELSE
+                    SET @session_user_aksi = USER();
+                    DELETE FROM Asrama WHERE asrama_id = p_asrama_id;
+                    IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Asrama berhasil dihapus.';
+                    ELSE SET v_status_code = 3; SET v_status_message = 'Gagal: Asrama dengan ID tersebut tidak ditemukan.';
+                    END IF;
+                    SET @session_user_aksi = NULL;
+                END IF;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_TambahKamar", """
+        CREATE PROCEDURE sp_TambahKamar (
+            IN p_nomor_kamar INT, IN p_asrama_id INT, IN p_kapasitas INT
+        )
+        BEGIN
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
+            IF p_nomor_kamar IS NULL OR p_asrama_id IS NULL OR p_kapasitas IS NULL OR p_kapasitas <= 0 THEN SET v_status_code = 1; SET v_status_message = 'Gagal: Nomor kamar, ID asrama, dan kapasitas (harus > 0) tidak boleh kosong.';
+            ELSEIF NOT EXISTS (SELECT 1 FROM Asrama WHERE asrama_id = p_asrama_id) THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Asrama dengan ID tersebut tidak ditemukan.';
+            ELSEIF EXISTS (SELECT 1 FROM Kamar WHERE nomor_kamar = p_nomor_kamar AND asrama_id = p_asrama_id) THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: Kamar nomor ', p_nomor_kamar, ' sudah ada di asrama ini.');
+            ELSE 
+                SET @session_user_aksi = USER();
+                INSERT INTO Kamar (nomor_kamar, asrama_id, kapasitas) VALUES (p_nomor_kamar, p_asrama_id, p_kapasitas); 
+                SET v_status_code = 0; SET v_status_message = 'Sukses: Kamar berhasil ditambahkan.';
+                SET @session_user_aksi = NULL;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_UpdateKamar", """
+        CREATE PROCEDURE sp_UpdateKamar (
+            IN p_kamar_id_internal INT, IN p_nomor_kamar_baru INT, IN p_kapasitas_baru INT, IN p_asrama_id_konteks INT
+        )
+        BEGIN
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            DECLARE v_kamar_exists INT DEFAULT 0; DECLARE v_nomor_conflict INT DEFAULT 0;
+            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
+            IF p_kamar_id_internal IS NULL OR p_nomor_kamar_baru IS NULL OR p_kapasitas_baru IS NULL OR p_kapasitas_baru <= 0 THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Kamar, Nomor Kamar baru, dan Kapasitas baru (harus > 0) tidak boleh kosong.';
+            ELSE
+                SELECT COUNT(*) INTO v_kamar_exists FROM Kamar WHERE kamar_id_internal = p_kamar_id_internal;
+                IF v_kamar_exists = 0 THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar dengan ID tersebut tidak ditemukan.';
+                ELSE
+                    SELECT COUNT(*) INTO v_nomor_conflict FROM Kamar WHERE nomor_kamar = p_nomor_kamar_baru AND asrama_id = p_asrama_id_konteks AND kamar_id_internal != p_kamar_id_internal;
+                    IF v_nomor_conflict > 0 THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: Nomor kamar ', p_nomor_kamar_baru, ' sudah ada di asrama ini.');
+                    ELSE
+                        SET @session_user_aksi = USER();
+                        UPDATE Kamar SET nomor_kamar = p_nomor_kamar_baru, kapasitas = p_kapasitas_baru WHERE kamar_id_internal = p_kamar_id_internal;
+                        IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Detail kamar berhasil diubah.';
+                        ELSE SET v_status_code = 0; SET v_status_message = 'Info: Tidak ada perubahan pada detail kamar.';
+                        END IF;
+                        SET @session_user_aksi = NULL;
+                    END IF;
+                END IF;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_HapusKamar", """
+        CREATE PROCEDURE sp_HapusKamar (
+            IN p_kamar_id_internal INT
+        )
+        BEGIN
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            DECLARE v_penghuni_count INT DEFAULT 0;
+            SET v_status_code = 1; SET v_status_message = 'Gagal: Terjadi kesalahan tidak diketahui.';
+            IF p_kamar_id_internal IS NULL THEN SET v_status_code = 1; SET v_status_message = 'Gagal: ID Kamar tidak boleh kosong.';
+            ELSE
+                SELECT COUNT(*) INTO v_penghuni_count FROM Penghuni WHERE kamar_id_internal = p_kamar_id_internal;
+                IF v_penghuni_count > 0 THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar tidak dapat dihapus karena masih memiliki penghuni. Hapus semua penghuni di kamar ini terlebih dahulu.';
+                ELSE
+                    SET @session_user_aksi = USER();
+                    DELETE FROM Kamar WHERE kamar_id_internal = p_kamar_id_internal;
+                    IF ROW_COUNT() > 0 THEN SET v_status_code = 0; SET v_status_message = 'Sukses: Kamar berhasil dihapus.';
+                    ELSE SET v_status_code = 3; SET v_status_message = 'Gagal: Kamar dengan ID tersebut tidak ditemukan.';
+                    END IF;
+                    SET @session_user_aksi = NULL;
+                END IF;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_TambahPenghuni", """
+        CREATE PROCEDURE sp_TambahPenghuni (
+            IN p_nim VARCHAR(50), IN p_nama_penghuni VARCHAR(255), IN p_nama_fakultas_input VARCHAR(255), 
+            IN p_nomor_kamar INT, IN p_asrama_id INT, IN p_user_aksi VARCHAR(50)
+        )
+        BEGIN
+            DECLARE v_k_id_int INT; DECLARE v_kap_kmr INT; DECLARE v_jml_p_skr INT; DECLARE v_fak_id INT DEFAULT NULL;
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            SET v_status_code = 4; SET v_status_message = 'Terjadi kesalahan tidak diketahui.';
+            SET @session_user_aksi = p_user_aksi; 
+            IF p_nim IS NULL OR p_nim = '' OR NOT (p_nim REGEXP '^[0-9]+$') THEN SET v_status_code = 5; SET v_status_message = 'Gagal: NIM tidak valid (harus berupa angka dan tidak boleh kosong).';
+            ELSE
+                IF p_nama_fakultas_input IS NOT NULL AND p_nama_fakultas_input != '' THEN
+                    SELECT fakultas_id INTO v_fak_id FROM Fakultas WHERE nama_fakultas = p_nama_fakultas_input;
+                    IF v_fak_id IS NULL THEN INSERT INTO Fakultas (nama_fakultas) VALUES (p_nama_fakultas_input); SET v_fak_id = LAST_INSERT_ID(); END IF;
+                END IF;
+                SELECT kamar_id_internal INTO v_k_id_int FROM Kamar WHERE nomor_kamar = p_nomor_kamar AND asrama_id = p_asrama_id;
+                IF v_k_id_int IS NULL THEN SET v_status_code = 1; SET v_status_message = 'Gagal: Kamar tidak ditemukan.';
+                ELSE
+                    -- Baris Kamar dikunci sampai commit: dua klien yang mengisi tempat terakhir diperiksa bergantian.
+                    SELECT kapasitas, occupied INTO v_kap_kmr, v_jml_p_skr FROM Kamar WHERE kamar_id_internal = v_k_id_int FOR UPDATE;
+                    IF v_jml_p_skr >= v_kap_kmr THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar sudah penuh.';
+                    ELSE
+                        IF EXISTS (SELECT 1 FROM Penghuni WHERE nim = p_nim) THEN SET v_status_code = 3; SET v_status_message = CONCAT('Gagal: NIM ', p_nim, ' sudah terdaftar.');
+                        ELSE INSERT INTO Penghuni (nim, nama_penghuni, fakultas_id, kamar_id_internal) VALUES (p_nim, p_nama_penghuni, v_fak_id, v_k_id_int); SET v_status_code = 0; SET v_status_message = 'Sukses: Penghuni berhasil ditambahkan.';
+                        END IF;
+                    END IF;
+                END IF;
+            END IF;
+            SET @session_user_aksi = NULL; 
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_PindahKamarPenghuni", """
+        CREATE PROCEDURE sp_PindahKamarPenghuni (
+            IN p_nim VARCHAR(50), IN p_nomor_kamar_baru INT, IN p_asrama_id_baru INT, IN p_user_aksi VARCHAR(50)
+        )
+        BEGIN
+            DECLARE v_k_id_lama INT; DECLARE v_k_id_baru INT; DECLARE v_kap_k_baru INT; DECLARE v_jml_p_k_baru INT; DECLARE v_jml_p_k_lama INT;
+            DECLARE v_p_exists INT DEFAULT 0;
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            SET v_status_code = 4; SET v_status_message = 'Terjadi kesalahan tidak diketahui.';
+            SET @session_user_aksi = p_user_aksi;
+            IF p_nim IS NULL OR p_nim = '' OR NOT (p_nim REGEXP '^[0-9]+$') THEN SET v_status_code = 5; SET v_status_message = 'Gagal: NIM tidak valid (harus berupa angka dan tidak boleh kosong).';
+            ELSE
+                SELECT COUNT(*), MAX(kamar_id_internal) INTO v_p_exists, v_k_id_lama FROM Penghuni WHERE nim = p_nim FOR UPDATE;
+                IF v_p_exists = 0 THEN SET v_status_code = 1; SET v_status_message = 'Gagal: Penghuni dengan NIM tersebut tidak ditemukan.';
+                ELSE
+                    SELECT kamar_id_internal INTO v_k_id_baru FROM Kamar WHERE nomor_kamar = p_nomor_kamar_baru AND asrama_id = p_asrama_id_baru;
+                    IF v_k_id_baru IS NULL THEN SET v_status_code = 2; SET v_status_message = 'Gagal: Kamar tujuan tidak ditemukan.';
+                    ELSE
+                        IF v_k_id_lama = v_k_id_baru THEN SET v_status_code = 0; SET v_status_message = 'Info: Penghuni sudah berada di kamar tujuan.';
+                        ELSE
+                            -- Urutan kunci sama dengan pindah_kamar_batch: baris Penghuni, lalu baris Kamar asal dan tujuan
+                            -- menurut kamar_id_internal, sehingga dua pemindahan yang bersilangan tidak saling menunggu.
+                            IF v_k_id_lama < v_k_id_baru THEN SELECT occupied INTO v_jml_p_k_lama FROM Kamar WHERE kamar_id_internal = v_k_id_lama FOR UPDATE; END IF;
+                            SELECT kapasitas, occupied INTO v_kap_k_baru, v_jml_p_k_baru FROM Kamar WHERE kamar_id_internal = v_k_id_baru FOR UPDATE;
+                            IF v_k_id_lama > v_k_id_baru THEN SELECT occupied INTO v_jml_p_k_lama FROM Kamar WHERE kamar_id_internal = v_k_id_lama FOR UPDATE; END IF;
+                            IF v_jml_p_k_baru >= v_kap_k_baru THEN SET v_status_code = 3; SET v_status_message = 'Gagal: Kamar tujuan sudah penuh.';
+                            ELSE UPDATE Penghuni SET kamar_id_internal = v_k_id_baru WHERE nim = p_nim; SET v_status_code = 0; SET v_status_message = 'Sukses: Penghuni berhasil dipindahkan.';
+                            END IF;
+                        END IF;
+                    END IF;
+                END IF;
+            END IF;
+            SET @session_user_aksi = NULL;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message;
+        END"""),
+    _prosedur("sp_UpdatePenghuni", """
+        CREATE PROCEDURE sp_UpdatePenghuni (
+            IN p_nim_original VARCHAR(50), IN p_nim_baru VARCHAR(50), IN p_nama_baru VARCHAR(255),
+            IN p_nama_fakultas_baru VARCHAR(255), IN p_user_aksi VARCHAR(50)
+        )
+        BEGIN
+            -- p_nim_baru/p_nama_baru NULL atau '' = tidak diubah; p_nama_fakultas_baru NULL = tidak diubah, '' = dikosongkan.
+            -- Kolom hasil tambahan (nama/fakultas lama, fakultas baru, kamar) dipakai untuk event mode audit aplikasi.
+            DECLARE v_ada INT DEFAULT 0; DECLARE v_nama_lama VARCHAR(255); DECLARE v_fak_lama INT; DECLARE v_kamar INT;
+            DECLARE v_fak_baru INT DEFAULT NULL; DECLARE v_ganti_nim BOOLEAN; DECLARE v_nim_bentrok INT DEFAULT 0; DECLARE v_baris INT DEFAULT 0;
+            DECLARE v_status_code INT; DECLARE v_status_message VARCHAR(255);
+            SET v_status_code = 6; SET v_status_message = 'Terjadi kesalahan tidak diketahui.';
+            SET @session_user_aksi = p_user_aksi;
+            SET v_ganti_nim = IFNULL(p_nim_baru, '') != '' AND p_nim_baru != p_nim_original;
+            SELECT COUNT(*), MAX(nama_penghuni), MAX(fakultas_id), MAX(kamar_id_internal) INTO v_ada, v_nama_lama, v_fak_lama, v_kamar
+            FROM Penghuni WHERE nim = p_nim_original FOR UPDATE;
+            IF v_ada = 0 THEN SET v_status_code = 1; SET v_status_message = CONCAT('Tidak ada data penghuni yang cocok dengan NIM original: ', IFNULL(p_nim_original, ''), '.');
+            ELSEIF v_ganti_nim AND NOT (p_nim_baru REGEXP '^[0-9]+$') THEN SET v_status_code = 2; SET v_status_message = 'NIM baru harus berupa angka.';
+            ELSEIF NOT v_ganti_nim AND IFNULL(p_nama_baru, '') = '' AND p_nama_fakultas_baru IS NULL THEN
+                SET v_status_code = 4; SET v_status_message = 'Tidak ada data yang akan diubah (semua input kosong atau sama dengan data lama).';
+            ELSE
+                -- FOR UPDATE pada NIM baru yang belum ada mengunci celah indeksnya sampai transaksi selesai, sehingga
+                -- klien lain tidak dapat memakai NIM itu di antara pemeriksaan dan UPDATE; handler 1062 sebagai cadangan.
+                IF v_ganti_nim THEN SELECT COUNT(*) INTO v_nim_bentrok FROM Penghuni WHERE nim = p_nim_baru FOR UPDATE; END IF;
+                IF v_nim_bentrok = 0 THEN
+                    IF p_nama_fakultas_baru IS NOT NULL AND p_nama_fakultas_baru != '' THEN
+                        INSERT INTO Fakultas (nama_fakultas) VALUES (p_nama_fakultas_baru)
+                            ON DUPLICATE KEY UPDATE fakultas_id = LAST_INSERT_ID(fakultas_id);
+                        SET v_fak_baru = LAST_INSERT_ID();
+                    END IF;
+                    BEGIN
+                        DECLARE CONTINUE HANDLER FOR 1062 SET v_nim_bentrok = 1;
+                        UPDATE Penghuni SET nim = IF(v_ganti_nim, p_nim_baru, nim),
+                                            nama_penghuni = IF(IFNULL(p_nama_baru, '') != '', p_nama_baru, nama_penghuni),
+                                            fakultas_id = IF(p_nama_fakultas_baru IS NULL, fakultas_id, v_fak_baru)
+                        WHERE nim = p_nim_original;
+                        SET v_baris = ROW_COUNT();
+                    END;
+                END IF;
+                IF v_nim_bentrok > 0 THEN SET v_status_code = 3; SET v_status_message = CONCAT('NIM baru ''', p_nim_baru, ''' sudah digunakan oleh penghuni lain.');
+                ELSEIF v_baris > 0 THEN SET v_status_code = 0; SET v_status_message = 'Data penghuni berhasil diubah.';
+                ELSE SET v_status_code = 5; SET v_status_message = 'Tidak ada perubahan aktual pada data (data baru mungkin sama dengan data lama).';
+                END IF;
+            END IF;
+            SET @session_user_aksi = NULL;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message,
+                   v_nama_lama AS p_nama_lama, v_fak_lama AS p_fakultas_lama,
+                   IF(p_nama_fakultas_baru IS NULL, v_fak_lama, v_fak_baru) AS p_fakultas_baru, v_kamar AS p_kamar_id;
+        END"""),
+    _prosedur("sp_SnapshotKamar", """
+        CREATE PROCEDURE sp_SnapshotKamar (
+            IN p_nomor_kamar INT, IN p_asrama_id INT
+        )
+        BEGIN
+            -- Result set 1: header kamar (kosong jika kamar tidak ada); result set 2: daftar penghuni.
+            SELECT K.kamar_id_internal, K.nomor_kamar, K.asrama_id, A.nama_asrama, K.kapasitas, K.occupied AS jumlah_penghuni
+            FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id
+            WHERE K.nomor_kamar = p_nomor_kamar AND K.asrama_id = p_asrama_id;
+            SELECT P.nim, P.nama_penghuni, F.nama_fakultas AS fakultas
+            FROM Kamar K JOIN Penghuni P ON P.kamar_id_internal = K.kamar_id_internal
+            LEFT JOIN Fakultas F ON P.fakultas_id = F.fakultas_id
+            WHERE K.nomor_kamar = p_nomor_kamar AND K.asrama_id = p_asrama_id
+            ORDER BY P.nama_penghuni;
+        END"""),
+    _prosedur("sp_RegistrasiPengguna", """
+        CREATE PROCEDURE sp_RegistrasiPengguna (
+            IN p_username VARCHAR(50), 
+            IN p_password_text VARCHAR(255) 
+        )
+        BEGIN
+            DECLARE v_user_exists INT DEFAULT 0;
+            DECLARE v_status_code INT; 
+            DECLARE v_status_message VARCHAR(255);
+            SET v_status_code = 2; 
+            SET v_status_message = 'Gagal melakukan registrasi.';
+            IF p_username IS NULL OR p_username = '' OR p_password_text IS NULL OR p_password_text = '' THEN 
+                SET v_status_code = 1; 
+                SET v_status_message = 'Username dan password tidak boleh kosong.';
+            ELSE
+                SELECT COUNT(*) INTO v_user_exists FROM PenggunaAplikasi WHERE username = p_username;
+                IF v_user_exists > 0 THEN 
+                    SET v_status_code = 2; 
+                    SET v_status_message = 'Username sudah terdaftar.';
+                ELSE 
+                    INSERT INTO PenggunaAplikasi (username, password_hash) VALUES (p_username, p_password_text); 
+                    SET v_status_code = 0; 
+                    SET v_status_message = 'Registrasi berhasil.';
+                END IF;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message; 
+        END"""),
+    _prosedur("sp_LoginPengguna", """
+        CREATE PROCEDURE sp_LoginPengguna (
+            IN p_username VARCHAR(50), 
+            IN p_input_password_text VARCHAR(255) 
+        )
+        BEGIN
+            DECLARE v_stored_password_text VARCHAR(255) DEFAULT ''; 
+            DECLARE v_temp_user_id INT DEFAULT NULL;
+            DECLARE v_status_code INT; 
+            DECLARE v_status_message VARCHAR(255);
+            DECLARE v_logged_in_username VARCHAR(50) DEFAULT NULL;
+
+            SET v_status_code = 3; 
+            SET v_status_message = 'Login gagal. Periksa username dan password.'; 
+            
+            IF p_username IS NULL OR p_username = '' OR p_input_password_text IS NULL OR p_input_password_text = '' THEN 
+                SET v_status_code = 1; 
+                SET v_status_message = 'Username dan password tidak boleh kosong.';
+            ELSE
+                SELECT id, username, password_hash INTO v_temp_user_id, v_logged_in_username, v_stored_password_text 
+                FROM PenggunaAplikasi WHERE username = p_username;
+                
+                IF v_temp_user_id IS NULL THEN 
+                    SET v_status_code = 2; 
+                    SET v_status_message = 'Username tidak ditemukan.'; 
+                    SET v_logged_in_username = NULL; 
+                ELSE
+                    IF v_stored_password_text = p_input_password_text THEN 
+                        SET v_status_code = 0; 
+                        SET v_status_message = 'Login berhasil.'; 
+                    ELSE 
+                        SET v_status_code = 3; 
+                        SET v_status_message = 'Password salah.'; 
+                        SET v_temp_user_id = NULL; 
+                        SET v_logged_in_username = NULL;
+                    END IF;
+                END IF;
+            END IF;
+            SELECT v_status_code AS p_status_code, v_status_message AS p_status_message, v_temp_user_id AS p_user_id, v_logged_in_username AS p_logged_in_username; 
+        END"""),
+]
+
+
+def checksum_langkah(pernyataan):
+    """SHA-256 dari isi pernyataan satu langkah; spasi di awal/akhir baris diabaikan."""
+    h = hashlib.sha256()
+    for stmt in pernyataan:
+        normal = "\n".join(baris.strip() for baris in stmt.strip().splitlines())
+        h.update(normal.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def checksum_bundel(langkah_skema=None):
+    """Checksum gabungan seluruh langkah (nama dan isi, sesuai urutan)."""
+    h = hashlib.sha256()
+    for nama, pernyataan in (langkah_skema if langkah_skema is not None else LANGKAH_SKEMA):
+        h.update(nama.encode("utf-8"))
+        h.update(checksum_langkah(pernyataan).encode("ascii"))
+    return h.hexdigest()
+
+
+def geser_bulan(bulan, n):
+    """Menggeser (tahun, bulan) sebanyak n bulan (boleh negatif)."""
+    indeks = bulan[0] * 12 + (bulan[1] - 1) + n
+    return (indeks // 12, indeks % 12 + 1)
+
+
+def nama_partisi_bulan(bulan):
+    return f"p{bulan[0]:04d}{bulan[1]:02d}"
+
+
+def bulan_dari_partisi(nama_partisi):
+    """(tahun, bulan) dari nama partisi pYYYYMM, atau None untuk p_awal/p_max."""
+    cocok = re.fullmatch(r"p(\d{4})(\d{2})", nama_partisi or "")
+    return (int(cocok.group(1)), int(cocok.group(2))) if cocok else None
+
+
+def ddl_pecah_partisi_max(tabel, daftar_bulan):
+    """ALTER yang memecah p_max menjadi partisi bulanan baru; partisi pYYYYMM berisi baris sebelum awal bulan berikutnya."""
+    bagian = []
+    for bulan in daftar_bulan:
+        batas = geser_bulan(bulan, 1)
+        bagian.append(f"PARTITION {nama_partisi_bulan(bulan)} VALUES LESS THAN (UNIX_TIMESTAMP('{batas[0]:04d}-{batas[1]:02d}-01 00:00:00'))")
+    bagian.append("PARTITION p_max VALUES LESS THAN MAXVALUE")
+    return f"ALTER TABLE {tabel} REORGANIZE PARTITION p_max INTO ({', '.join(bagian)})"
@@ -0,0 +1,245 @@
+"""
+Definisi skema SQLite untuk SQLiteDatabaseService, padanan schema.py untuk MySQL.
+
+Struktur tabel, view, dan isi log audit sama dengan versi MySQL. Karena SQLite tidak memiliki variabel
+sesi, trigger membaca pengguna aksi dan saklar audit dari fungsi aplikasi sesi_user_aksi() dan
+sesi_audit_nonaktif() yang didaftarkan SQLiteDatabaseService di setiap koneksi; akibatnya tabel
+Penghuni/Asrama/Kamar hanya bisa diubah lewat aplikasi (alat luar seperti CLI sqlite3 hanya untuk membaca).
+
+Langkah diterapkan dengan mekanisme checksum yang sama dengan MySQL (tabel SchemaVersi).
+Tabel log audit tidak dipartisi; retensi dijalankan dengan DELETE berdasarkan waktu_aksi.
+"""
+
+NAMA_BUNDEL = "__bundel__"
+
+TABEL_AUDIT = ("AuditLogAktivitasPenghuni", "AuditLogAktivitasAsrama", "AuditLogAktivitasKamar")
+
+DDL_TABEL_VERSI = """CREATE TABLE IF NOT EXISTS SchemaVersi (
+    komponen TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    diterapkan_pada TEXT DEFAULT CURRENT_TIMESTAMP
+)"""
+
+# Waktu lokal dengan presisi detik, sama seperti TIMESTAMP MySQL pada zona waktu sesi.
+WAKTU_SEKARANG = "(strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))"
+
+SQL_REKONSILIASI_OKUPANSI = """UPDATE Kamar
+            SET occupied = (SELECT COUNT(*) FROM Penghuni P WHERE P.kamar_id_internal = Kamar.kamar_id_internal)
+            WHERE occupied != (SELECT COUNT(*) FROM Penghuni P WHERE P.kamar_id_internal = Kamar.kamar_id_internal)"""
+
+
+def _trigger(nama, ddl):
+    return (f"trigger:{nama}", [f"DROP TRIGGER IF EXISTS {nama}", ddl])
+
+
+def _view(nama, ddl):
+    return (f"view:{nama}", [f"DROP VIEW IF EXISTS {nama}", ddl])
+
+
+def _indeks(tabel, daftar_indeks):
+    return (f"indeks:{tabel}", [f"CREATE INDEX IF NOT EXISTS {nama} ON {tabel} ({kolom})" for nama, kolom in daftar_indeks])
+
+
+LANGKAH_SKEMA = [
+    ("tabel:Asrama", ["""CREATE TABLE IF NOT EXISTS Asrama (
+                asrama_id INTEGER PRIMARY KEY,
+                nama_asrama TEXT NOT NULL UNIQUE
+            )"""]),
+    ("tabel:Fakultas", ["""CREATE TABLE IF NOT EXISTS Fakultas (
+                fakultas_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nama_fakultas TEXT NOT NULL UNIQUE
+            )"""]),
+    ("tabel:Kamar", ["""CREATE TABLE IF NOT EXISTS Kamar (
+                kamar_id_internal INTEGER PRIMARY KEY AUTOINCREMENT,
+                nomor_kamar INTEGER NOT NULL,
+                asrama_id INTEGER NOT NULL REFERENCES Asrama(asrama_id) ON DELETE CASCADE,
+                kapasitas INTEGER NOT NULL DEFAULT 2,
+                occupied INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (nomor_kamar, asrama_id)
+            )"""]),
+    ("tabel:PenggunaAplikasi", ["""CREATE TABLE IF NOT EXISTS PenggunaAplikasi (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )"""]),
+    ("tabel:Penghuni", ["""CREATE TABLE IF NOT EXISTS Penghuni (
+                nim TEXT PRIMARY KEY, nama_penghuni TEXT NOT NULL,
+                fakultas_id INTEGER NULL DEFAULT NULL REFERENCES Fakultas(fakultas_id) ON DELETE SET NULL ON UPDATE CASCADE,
+                kamar_id_internal INTEGER NOT NULL REFERENCES Kamar(kamar_id_internal) ON DELETE CASCADE
+            )""",
+            "CREATE INDEX IF NOT EXISTS idx_penghuni_kamar ON Penghuni (kamar_id_internal)",
+            "CREATE INDEX IF NOT EXISTS idx_penghuni_fakultas ON Penghuni (fakultas_id)"]),
+    # AUTOINCREMENT agar log_id tidak pernah dipakai ulang setelah retensi menghapus baris lama.
+    ("tabel:AuditLogAktivitasPenghuni", [f"""CREATE TABLE IF NOT EXISTS AuditLogAktivitasPenghuni (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT, nim TEXT,
+                nama_penghuni_lama TEXT DEFAULT NULL, nama_penghuni_baru TEXT DEFAULT NULL,
+                fakultas_lama TEXT DEFAULT NULL, fakultas_baru TEXT DEFAULT NULL,
+                kamar_id_internal_lama INTEGER DEFAULT NULL, kamar_id_internal_baru INTEGER DEFAULT NULL,
+                nomor_kamar_lama INTEGER DEFAULT NULL, nama_asrama_lama TEXT DEFAULT NULL,
+                nomor_kamar_baru INTEGER DEFAULT NULL, nama_asrama_baru TEXT DEFAULT NULL,
+                aksi TEXT NOT NULL, waktu_aksi TEXT NOT NULL DEFAULT {WAKTU_SEKARANG},
+                user_aksi TEXT DEFAULT NULL, keterangan_tambahan TEXT DEFAULT NULL
+            )"""]),
+    ("tabel:AuditLogAktivitasAsrama", [f"""CREATE TABLE IF NOT EXISTS AuditLogAktivitasAsrama (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                asrama_id_aksi INTEGER,
+                nama_asrama_lama TEXT DEFAULT NULL,
+                nama_asrama_baru TEXT DEFAULT NULL,
+                aksi TEXT NOT NULL,
+                waktu_aksi TEXT NOT NULL DEFAULT {WAKTU_SEKARANG},
+                user_aksi TEXT DEFAULT NULL,
+                keterangan_tambahan TEXT DEFAULT NULL
+            )"""]),
+    ("tabel:AuditLogAktivitasKamar", [f"""CREATE TABLE IF NOT EXISTS AuditLogAktivitasKamar (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kamar_id_internal_aksi INTEGER,
+                nomor_kamar_lama INTEGER DEFAULT NULL,
+                nomor_kamar_baru INTEGER DEFAULT NULL,
+                asrama_id_lama INTEGER DEFAULT NULL,
+                asrama_id_baru INTEGER DEFAULT NULL,
+                nama_asrama_lama TEXT DEFAULT NULL,
+                nama_asrama_baru TEXT DEFAULT NULL,
+                kapasitas_lama INTEGER DEFAULT NULL,
+                kapasitas_baru INTEGER DEFAULT NULL,
+                aksi TEXT NOT NULL,
+                waktu_aksi TEXT NOT NULL DEFAULT {WAKTU_SEKARANG},
+                user_aksi TEXT DEFAULT NULL,
+                keterangan_tambahan TEXT DEFAULT NULL
+            )"""]),
+    # SQLite hanya bisa menambahkan kolom generated VIRTUAL lewat ALTER TABLE; nilainya tetap tersimpan di indeks.
+    ("kolom:Kamar.sisa_kapasitas", ["ALTER TABLE Kamar ADD COLUMN sisa_kapasitas INTEGER GENERATED ALWAYS AS (kapasitas - occupied) VIRTUAL"]),
+    _indeks("Kamar", [
+        ("idx_kamar_sisa", "sisa_kapasitas"),
+        ("idx_kamar_asrama_sisa", "asrama_id, sisa_kapasitas"),
+    ]),
+    _indeks("AuditLogAktivitasPenghuni", [
+        ("idx_auditpenghuni_waktu", "waktu_aksi, log_id"),
+        ("idx_auditpenghuni_nim", "nim"),
+        ("idx_auditpenghuni_user", "user_aksi"),
+    ]),
+    _indeks("AuditLogAktivitasAsrama", [
+        ("idx_auditasrama_waktu", "waktu_aksi, log_id"),
+        ("idx_auditasrama_asrama", "asrama_id_aksi"),
+        ("idx_auditasrama_user", "user_aksi"),
+    ]),
+    _indeks("AuditLogAktivitasKamar", [
+        ("idx_auditkamar_waktu", "waktu_aksi, log_id"),
+        ("idx_auditkamar_kamar", "kamar_id_internal_aksi"),
+        ("idx_auditkamar_user", "user_aksi"),
+    ]),
+    _view("vw_DetailKamarPenghuni", """CREATE VIEW vw_DetailKamarPenghuni AS
+            SELECT K.nomor_kamar, A.nama_asrama, K.asrama_id, K.kapasitas,
+            K.occupied AS jumlah_penghuni_sekarang,
+            K.kamar_id_internal FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id"""),
+    _view("vw_DaftarPenghuniLengkap", """CREATE VIEW vw_DaftarPenghuniLengkap AS
+            SELECT P.nim, P.nama_penghuni, F.nama_fakultas AS fakultas, K.nomor_kamar, A.nama_asrama,
+            K.asrama_id AS id_asrama_penghuni, A.asrama_id AS id_asrama_kamar, K.kamar_id_internal, P.fakultas_id
+            FROM Penghuni P JOIN Kamar K ON P.kamar_id_internal = K.kamar_id_internal
+            JOIN Asrama A ON K.asrama_id = A.asrama_id LEFT JOIN Fakultas F ON P.fakultas_id = F.fakultas_id"""),
+    _trigger("trg_LogInsertPenghuni", """
+        CREATE TRIGGER trg_LogInsertPenghuni AFTER INSERT ON Penghuni FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_baru, fakultas_baru, kamar_id_internal_baru, nomor_kamar_baru, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+            SELECT NEW.nim, NEW.nama_penghuni, (SELECT nama_fakultas FROM Fakultas WHERE fakultas_id = NEW.fakultas_id),
+                   NEW.kamar_id_internal, K.nomor_kamar, A.nama_asrama, 'INSERT', sesi_user_aksi(),
+                   'Penghuni baru ditambahkan ke kamar ' || K.nomor_kamar || ' Asrama ' || A.nama_asrama
+            FROM (SELECT 1) LEFT JOIN Kamar K ON K.kamar_id_internal = NEW.kamar_id_internal LEFT JOIN Asrama A ON K.asrama_id = A.asrama_id;
+        END"""),
+    _trigger("trg_LogUpdatePenghuni", """
+        CREATE TRIGGER trg_LogUpdatePenghuni AFTER UPDATE ON Penghuni FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_lama, nama_penghuni_baru, fakultas_lama, fakultas_baru, kamar_id_internal_lama, kamar_id_internal_baru, nomor_kamar_lama, nama_asrama_lama, nomor_kamar_baru, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+            SELECT OLD.nim, OLD.nama_penghuni, NEW.nama_penghuni, FL.nama_fakultas, FB.nama_fakultas, OLD.kamar_id_internal, NEW.kamar_id_internal,
+                   KL.nomor_kamar, AL.nama_asrama, KB.nomor_kamar, AB.nama_asrama, 'UPDATE', sesi_user_aksi(),
+                   CASE WHEN OLD.kamar_id_internal != NEW.kamar_id_internal
+                            THEN 'Penghuni pindah dari kamar ' || IFNULL(KL.nomor_kamar, 'N/A') || ' Asrama ' || IFNULL(AL.nama_asrama, 'N/A') || ' ke kamar ' || IFNULL(KB.nomor_kamar, 'N/A') || ' Asrama ' || IFNULL(AB.nama_asrama, 'N/A') || '.'
+                        WHEN OLD.fakultas_id IS NOT NEW.fakultas_id
+                            THEN 'Fakultas diubah dari ' || IFNULL(FL.nama_fakultas, 'N/A') || ' menjadi ' || IFNULL(FB.nama_fakultas, 'N/A') || '.'
+                        WHEN OLD.nama_penghuni != NEW.nama_penghuni
+                            THEN 'Nama diubah dari ' || OLD.nama_penghuni || ' menjadi ' || NEW.nama_penghuni || '.'
+                        ELSE 'Data penghuni diubah.' END
+            FROM (SELECT 1)
+            LEFT JOIN Kamar KL ON KL.kamar_id_internal = OLD.kamar_id_internal LEFT JOIN Asrama AL ON KL.asrama_id = AL.asrama_id
+            LEFT JOIN Kamar KB ON KB.kamar_id_internal = NEW.kamar_id_internal LEFT JOIN Asrama AB ON KB.asrama_id = AB.asrama_id
+            LEFT JOIN Fakultas FL ON FL.fakultas_id = OLD.fakultas_id LEFT JOIN Fakultas FB ON FB.fakultas_id = NEW.fakultas_id;
+        END"""),
+    _trigger("trg_LogDeletePenghuni", """
+        CREATE TRIGGER trg_LogDeletePenghuni AFTER DELETE ON Penghuni FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasPenghuni (nim, nama_penghuni_lama, fakultas_lama, kamar_id_internal_lama, nomor_kamar_lama, nama_asrama_lama, aksi, user_aksi, keterangan_tambahan)
+            SELECT OLD.nim, OLD.nama_penghuni, (SELECT nama_fakultas FROM Fakultas WHERE fakultas_id = OLD.fakultas_id),
+                   OLD.kamar_id_internal, K.nomor_kamar, A.nama_asrama, 'DELETE', sesi_user_aksi(),
+                   'Penghuni dihapus dari kamar ' || IFNULL(K.nomor_kamar, 'N/A') || ' Asrama ' || IFNULL(A.nama_asrama, 'N/A')
+            FROM (SELECT 1) LEFT JOIN Kamar K ON K.kamar_id_internal = OLD.kamar_id_internal LEFT JOIN Asrama A ON K.asrama_id = A.asrama_id;
+        END"""),
+    _trigger("trg_OkupansiInsertPenghuni", """
+        CREATE TRIGGER trg_OkupansiInsertPenghuni AFTER INSERT ON Penghuni FOR EACH ROW
+        BEGIN
+            UPDATE Kamar SET occupied = occupied + 1 WHERE kamar_id_internal = NEW.kamar_id_internal;
+        END"""),
+    _trigger("trg_OkupansiUpdatePenghuni", """
+        CREATE TRIGGER trg_OkupansiUpdatePenghuni AFTER UPDATE OF kamar_id_internal ON Penghuni FOR EACH ROW
+        WHEN OLD.kamar_id_internal IS NOT NEW.kamar_id_internal
+        BEGIN
+            UPDATE Kamar SET occupied = occupied - 1 WHERE kamar_id_internal = OLD.kamar_id_internal;
+            UPDATE Kamar SET occupied = occupied + 1 WHERE kamar_id_internal = NEW.kamar_id_internal;
+        END"""),
+    _trigger("trg_OkupansiDeletePenghuni", """
+        CREATE TRIGGER trg_OkupansiDeletePenghuni AFTER DELETE ON Penghuni FOR EACH ROW
+        BEGIN
+            UPDATE Kamar SET occupied = occupied - 1 WHERE kamar_id_internal = OLD.kamar_id_internal;
+        END"""),
+    ("data:rekonsiliasi_okupansi", [SQL_REKONSILIASI_OKUPANSI]),
+    _trigger("trg_LogInsertAsrama", """
+        CREATE TRIGGER trg_LogInsertAsrama AFTER INSERT ON Asrama FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+            VALUES (NEW.asrama_id, NEW.nama_asrama, 'INSERT', sesi_user_aksi(), 'Asrama baru: ID ' || NEW.asrama_id || ', Nama: ' || NEW.nama_asrama);
+        END"""),
+    _trigger("trg_LogUpdateAsrama", """
+        CREATE TRIGGER trg_LogUpdateAsrama AFTER UPDATE ON Asrama FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_lama, nama_asrama_baru, aksi, user_aksi, keterangan_tambahan)
+            VALUES (OLD.asrama_id, OLD.nama_asrama, NEW.nama_asrama, 'UPDATE', sesi_user_aksi(),
+                    'Asrama ID ' || OLD.asrama_id || ' diubah. ' ||
+                    CASE WHEN OLD.nama_asrama != NEW.nama_asrama THEN 'Nama dari ''' || OLD.nama_asrama || ''' menjadi ''' || NEW.nama_asrama || '''.' ELSE '' END);
+        END"""),
+    _trigger("trg_LogDeleteAsrama", """
+        CREATE TRIGGER trg_LogDeleteAsrama AFTER DELETE ON Asrama FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasAsrama (asrama_id_aksi, nama_asrama_lama, aksi, user_aksi, keterangan_tambahan)
+            VALUES (OLD.asrama_id, OLD.nama_asrama, 'DELETE', sesi_user_aksi(), 'Asrama dihapus: ID ' || OLD.asrama_id || ', Nama: ' || OLD.nama_asrama);
+        END"""),
+    _trigger("trg_LogInsertKamar", """
+        CREATE TRIGGER trg_LogInsertKamar AFTER INSERT ON Kamar FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_baru, asrama_id_baru, nama_asrama_baru, kapasitas_baru, aksi, user_aksi, keterangan_tambahan)
+            SELECT NEW.kamar_id_internal, NEW.nomor_kamar, NEW.asrama_id, A.nama_asrama, NEW.kapasitas, 'INSERT', sesi_user_aksi(),
+                   'Kamar baru: No ' || NEW.nomor_kamar || ', Asrama: ' || A.nama_asrama || ', Kap: ' || NEW.kapasitas
+            FROM (SELECT 1) LEFT JOIN Asrama A ON A.asrama_id = NEW.asrama_id;
+        END"""),
+    # Perubahan yang hanya menyentuh kolom occupied (dari trigger okupansi) tidak dicatat.
+    _trigger("trg_LogUpdateKamar", """
+        CREATE TRIGGER trg_LogUpdateKamar AFTER UPDATE OF nomor_kamar, kapasitas, asrama_id ON Kamar FOR EACH ROW
+        WHEN sesi_audit_nonaktif() = 0
+             AND (OLD.nomor_kamar != NEW.nomor_kamar OR OLD.kapasitas != NEW.kapasitas OR OLD.asrama_id != NEW.asrama_id)
+        BEGIN
+            INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_lama, nomor_kamar_baru, asrama_id_lama, asrama_id_baru, nama_asrama_lama, nama_asrama_baru, kapasitas_lama, kapasitas_baru, aksi, user_aksi, keterangan_tambahan)
+            SELECT OLD.kamar_id_internal, OLD.nomor_kamar, NEW.nomor_kamar, OLD.asrama_id, NEW.asrama_id, AL.nama_asrama, AB.nama_asrama,
+                   OLD.kapasitas, NEW.kapasitas, 'UPDATE', sesi_user_aksi(),
+                   'Kamar ID Int ' || OLD.kamar_id_internal || ' diubah. ' ||
+                   CASE WHEN OLD.nomor_kamar != NEW.nomor_kamar THEN 'No: ' || OLD.nomor_kamar || '->' || NEW.nomor_kamar || '. ' ELSE '' END ||
+                   CASE WHEN OLD.kapasitas != NEW.kapasitas THEN 'Kap: ' || OLD.kapasitas || '->' || NEW.kapasitas || '. ' ELSE '' END ||
+                   CASE WHEN OLD.asrama_id != NEW.asrama_id THEN 'Asrama: ' || AL.nama_asrama || '->' || AB.nama_asrama || '. ' ELSE '' END
+            FROM (SELECT 1) LEFT JOIN Asrama AL ON AL.asrama_id = OLD.asrama_id LEFT JOIN Asrama AB ON AB.asrama_id = NEW.asrama_id;
+        END"""),
+    _trigger("trg_LogDeleteKamar", """
+        CREATE TRIGGER trg_LogDeleteKamar AFTER DELETE ON Kamar FOR EACH ROW WHEN sesi_audit_nonaktif() = 0
+        BEGIN
+            INSERT INTO AuditLogAktivitasKamar (kamar_id_internal_aksi, nomor_kamar_lama, asrama_id_lama, nama_asrama_lama, kapasitas_lama, aksi, user_aksi, keterangan_tambahan)
+            SELECT OLD.kamar_id_internal, OLD.nomor_kamar, OLD.asrama_id, A.nama_asrama, OLD.kapasitas, 'DELETE', sesi_user_aksi(),
+                   'Kamar dihapus: No ' || OLD.nomor_kamar || ', Asrama: ' || A.nama_asrama
+            FROM (SELECT 1) LEFT JOIN Asrama A ON A.asrama_id = OLD.asrama_id;
+        END"""),
+]
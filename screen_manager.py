@@ -12,10 +12,12 @@ from screens import (
     AddKamarScreen,
     UpdateKamarScreen,
     KamarDetailScreen,
+    KamarKosongScreen,
     InsertDataScreen,
     UpdateDataScreen,
     DeleteDataScreen,
     PindahKamarScreen,
+    AlokasiKamarScreen,
     RiwayatUtamaScreen,
     RiwayatPenghuniScreen,
     RiwayatAsramaScreen,
@@ -24,15 +26,44 @@ from screens import (
 from tkinter import messagebox
 
 class ScreenManager:
-    def __init__(self, app, db_service):
+    def __init__(self, app, db_service, interval_perubahan_ms=3000):
         self.app = app 
         self.db_service = db_service
         self.current_screen_instance = None
         self.current_asrama_id_context = None
         self.current_asrama_nama_context = None
         self.logged_in_user_id = None 
+        self.interval_perubahan_ms = interval_perubahan_ms
+        self._penanda_perubahan = None
+        self._tugas_perubahan = None
+        if interval_perubahan_ms:
+            self.app.window.after(interval_perubahan_ms, self._pantau_perubahan)
+
+    def _pantau_perubahan(self):
+        """
+        Polling umpan perubahan (db_service.ambil_perubahan) di thread latar selama ada pengguna yang login.
+        Layar aktif diberi tahu lewat terapkan_perubahan hanya jika ada asrama/kamar yang terdampak.
+        Hasil yang dibuang karena layar berganti tidak memajukan penanda, sehingga event-nya dibaca ulang.
+        """
+        if not self.logged_in_user_id:
+            self._penanda_perubahan = None  # setelah login, event mulai dibaca dari posisi saat itu
+        elif self._tugas_perubahan is None or self._tugas_perubahan.done():
+            self._tugas_perubahan = self.app.db_executor.jalankan(self.db_service.ambil_perubahan, self._penanda_perubahan,
+                                                                  saat_selesai=self._terima_perubahan)
+            if self._tugas_perubahan is None:
+                return  # executor sudah ditutup (aplikasi keluar)
+        self.app.window.after(self.interval_perubahan_ms, self._pantau_perubahan)
+
+    def _terima_perubahan(self, hasil):
+        self._penanda_perubahan = hasil['penanda']
+        if (hasil['asrama'] or hasil['kamar']) and self.current_screen_instance:
+            self.current_screen_instance.terapkan_perubahan(hasil)
+        if not hasil['lengkap']:
+            self._tugas_perubahan = self.app.db_executor.jalankan(self.db_service.ambil_perubahan, self._penanda_perubahan,
+                                                                  saat_selesai=self._terima_perubahan)
 
     def _display_screen(self, screen_class, *args, **kwargs): 
+        self.app.db_executor.generasi_baru() # Hasil muat data milik layar lama tidak boleh digambar di layar baru
         if self.current_screen_instance: self.current_screen_instance.clear_screen_elements()
         self.app._clear_canvas_for_new_screen()
         self.app._draw_background() 
@@ -79,12 +110,17 @@ class ScreenManager:
             self.show_asrama_selection()
             return
         self._display_screen(KamarDetailScreen, kamar_id)
+    def show_kamar_kosong_screen(self):
+        self._display_screen(KamarKosongScreen)
     def show_insert_data_form(self, kamar_id): self._display_screen(InsertDataScreen, kamar_id)
     def show_update_data_form(self, kamar_id): self._display_screen(UpdateDataScreen, kamar_id)
     def show_delete_data_form(self, kamar_id): self._display_screen(DeleteDataScreen, kamar_id)
     def show_pindah_kamar_form(self, kamar_id_asal): 
         self._display_screen(PindahKamarScreen, kamar_id_asal)
     
+    def show_alokasi_kamar_screen(self):
+        self._display_screen(AlokasiKamarScreen)
+
     def show_riwayat_utama_screen(self): # Baru
         self._display_screen(RiwayatUtamaScreen)
 
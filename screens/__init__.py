@@ -2,16 +2,19 @@
 
 # Mengimpor kelas-kelas layar agar bisa diakses langsung dari package 'screens'
 from .base_screen import BaseScreen
+from .riwayat_base_screen import RiwayatBaseScreen
 from .login_screen import LoginScreen
 from .signup_screen import SignUpScreen
 from .main_menu_screen import MainMenuScreen
 from .asrama_selection_screen import AsramaSelectionScreen
 from .kamar_list_screen import KamarListScreen
 from .kamar_detail_screen import KamarDetailScreen
+from .kamar_kosong_screen import KamarKosongScreen
 from .insert_data_screen import InsertDataScreen
 from .update_data_screen import UpdateDataScreen
 from .delete_data_screen import DeleteDataScreen
 from .pindah_kamar_screen import PindahKamarScreen
+from .alokasi_kamar_screen import AlokasiKamarScreen
 from .add_asrama_screen import AddAsramaScreen
 from .add_kamar_screen import AddKamarScreen
 from .riwayat_utama_screen import RiwayatUtamaScreen
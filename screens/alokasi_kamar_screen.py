@@ -0,0 +1,154 @@
+from .base_screen import BaseScreen
+from tkinter import ttk, messagebox, filedialog, StringVar, BooleanVar
+import tkinter as tk
+import os
+from tombol import tbl
+import impor_csv
+class AlokasiKamarScreen(BaseScreen):
+    """
+    Alokasi kamar otomatis untuk calon penghuni dari file CSV (format kolom: lihat alokasi.py).
+    Rencana dibuat di thread latar dan ditampilkan untuk diperiksa; "Simpan Rencana" menyimpan seluruh
+    penempatan dalam satu transaksi.
+    """
+    SEMUA_ASRAMA = "Semua Asrama"
+
+    def __init__(self, screen_manager, db_service):
+        super().__init__(screen_manager, db_service)
+        self.path_csv = None
+        self.asrama_var = StringVar(value=self.SEMUA_ASRAMA)
+        self.kelompok_fakultas_var = BooleanVar(value=True)
+        self.satukan_grup_var = BooleanVar(value=True)
+        self.asrama_options_map = {}
+        self.rencana = None
+        self.rencana_treeview = None
+        self._label_file = None
+        self._label_ringkasan = None
+        self._sedang_memuat = False
+        self.posisi_memuat = None
+
+    def setup_ui(self):
+        style=ttk.Style(); style.configure("Riwayat.Treeview",background="#F0F0F0",fieldbackground="#FFFFFF",foreground="black",rowheight=25)
+        style.configure("Riwayat.Treeview.Heading",background="#BFBFBF",foreground="black",font=('Arial',10,'bold'),relief="flat")
+        style.map("Riwayat.Treeview.Heading",background=[('active','#A0A0A0')])
+
+        tbl(self.canvas, 50, 15, 150, 50, 10, 10, 90, 180, 270, 360, "red", "Kembali", self.screen_manager.show_asrama_selection)
+        self.create_canvas_text(self.app_instance.appwidth/2, 50, text="Alokasi Kamar Otomatis", fill="#000000", font=("Cooper Black",24,"bold"))
+
+        y_baris = 85
+        tbl(self.canvas, 30, y_baris, 200, 40, 10, 10, 90, 180, 270, 360, "#17a2b8", "Pilih File CSV", self._pilih_file)
+        self._label_file = self.create_canvas_text(245, y_baris+20, text="Belum ada file dipilih.", fill="#000000", font=("Arial",11,"italic"), anchor="w")
+
+        y_baris += 55
+        self.create_canvas_text(30, y_baris+15, text="Asrama:", fill="#000000", font=("Arial",12,"bold"), anchor="w")
+        self.asrama_options_map = {a['nama_asrama']: a['asrama_id'] for a in self.db_service.get_all_asrama()}
+        self.add_widget(ttk.Combobox(self.canvas, textvariable=self.asrama_var, values=[self.SEMUA_ASRAMA] + list(self.asrama_options_map.keys()),
+                                     width=20, state="readonly", font=("Arial",12))).place(x=105, y=y_baris+3)
+        self.add_widget(ttk.Checkbutton(self.canvas, text="Kelompokkan per fakultas", variable=self.kelompok_fakultas_var)).place(x=340, y=y_baris+6)
+        self.add_widget(ttk.Checkbutton(self.canvas, text="Satukan anggota grup", variable=self.satukan_grup_var)).place(x=540, y=y_baris+6)
+        tbl(self.canvas, 860, y_baris, 190, 40, 10, 10, 90, 180, 270, 360, "#007bff", "Buat Rencana", self._buat_rencana)
+
+        table_x = 30; table_y = y_baris + 55
+        scr_w = 20; tree_w = self.app_instance.appwidth - 2*table_x - scr_w
+        tree_h = self.app_instance.appheight - table_y - 100
+        cols = ("nim","nama","fakultas","grup","asrama","kamar")
+        hdrs = {"nim":"NIM","nama":"Nama","fakultas":"Fakultas","grup":"Grup","asrama":"Asrama","kamar":"Kamar"}
+        lebar = {"nim":0.13,"nama":0.25,"fakultas":0.17,"grup":0.10,"asrama":0.17,"kamar":0.18}
+        self.rencana_treeview = ttk.Treeview(self.canvas, columns=cols, show='headings', style="Riwayat.Treeview")
+        for c, t in hdrs.items():
+            self.rencana_treeview.heading(c, text=t)
+            self.rencana_treeview.column(c, width=int(tree_w*lebar[c]), anchor=tk.W)
+        self.rencana_treeview.tag_configure("tanpa_kamar", foreground="#dc3545")
+        scrollbar = ttk.Scrollbar(self.canvas, orient="vertical", command=self.rencana_treeview.yview)
+        self.rencana_treeview.configure(yscrollcommand=scrollbar.set)
+        self.add_widget(self.rencana_treeview); self.add_widget(scrollbar)
+        self.canvas.create_window(table_x, table_y, anchor=tk.NW, window=self.rencana_treeview, width=tree_w, height=tree_h)
+        self.canvas.create_window(table_x+tree_w, table_y, anchor=tk.NW, window=scrollbar, height=tree_h)
+        self.posisi_memuat = (self.app_instance.appwidth/2, table_y+tree_h/2)
+
+        y_bawah = table_y + tree_h + 10
+        self._label_ringkasan = self.create_canvas_text(table_x, y_bawah+20, text="", fill="#000000", font=("Arial",12,"bold"), anchor="w")
+        tbl(self.canvas, self.app_instance.appwidth-430, y_bawah+30, 190, 45, 10, 10, 90, 180, 270, 360, "#6c757d", "Simpan Laporan", self._simpan_laporan)
+        tbl(self.canvas, self.app_instance.appwidth-220, y_bawah+30, 190, 45, 10, 10, 90, 180, 270, 360, "#28a745", "Simpan Rencana", self._simpan_rencana)
+
+    def _pilih_file(self):
+        path = filedialog.askopenfilename(parent=self.app_instance.window, title="Pilih File CSV Calon Penghuni",
+                                          filetypes=[("File CSV", "*.csv"), ("Semua File", "*.*")])
+        if not path: return
+        self.path_csv = path
+        self.canvas.itemconfig(self._label_file, text=os.path.basename(path))
+        self._buat_rencana()
+
+    def _buat_rencana(self):
+        if self._sedang_memuat: return
+        if not self.path_csv:
+            messagebox.showwarning("Pilihan Kosong", "Pilih file CSV calon penghuni terlebih dahulu.", parent=self.app_instance.window)
+            return
+        self._sedang_memuat = True
+        self.muat_async(self.db_service.rencanakan_alokasi, self.path_csv, self.asrama_options_map.get(self.asrama_var.get()),
+                        self.kelompok_fakultas_var.get(), self.satukan_grup_var.get(),
+                        saat_selesai=self._tampilkan_rencana, saat_gagal=self._gagal_memuat,
+                        teks_memuat="Menyusun rencana alokasi...", posisi=self.posisi_memuat, warna="#000000")
+
+    def _gagal_memuat(self, err):
+        self._sedang_memuat = False
+
+    def _tampilkan_rencana(self, rencana):
+        self._sedang_memuat = False
+        self.rencana = rencana
+        if not self.rencana_treeview: return
+        for i in self.rencana_treeview.get_children(): self.rencana_treeview.delete(i)
+        for p in sorted(rencana['penempatan'], key=lambda p: (p['nama_asrama'], p['nomor_kamar'], p['nim'])):
+            self.rencana_treeview.insert("", "end", values=(p['nim'], p['nama_penghuni'], p['fakultas'] or "-", p['grup'] or "-",
+                                                             p['nama_asrama'], f"Kamar {p['nomor_kamar']}"))
+        for c in rencana['tidak_ditempatkan']:
+            self.rencana_treeview.insert("", "end", tags=("tanpa_kamar",), values=(c['nim'], c['nama_penghuni'], c['fakultas'] or "-",
+                                                                                  c['grup'] or "-", "-", "Tidak dapat kamar"))
+        self.rencana_treeview.yview_moveto(0)
+        self.canvas.itemconfig(self._label_ringkasan, text=(
+            f"{len(rencana['penempatan'])} ditempatkan di {rencana['jumlah_kamar']} kamar, "
+            f"{len(rencana['tidak_ditempatkan'])} tanpa kamar, {len(rencana['ditolak'])} baris ditolak "
+            f"(dari {rencana['total']} baris, {rencana['durasi_detik']} detik)."))
+
+    def _simpan_rencana(self):
+        if self._sedang_memuat: return
+        if not self.rencana or not self.rencana['penempatan']:
+            messagebox.showwarning("Rencana Kosong", "Buat rencana dengan minimal satu penempatan terlebih dahulu.", parent=self.app_instance.window)
+            return
+        jumlah = len(self.rencana['penempatan'])
+        if not messagebox.askyesno("Konfirmasi Alokasi", f"Simpan penempatan {jumlah} penghuni ke {self.rencana['jumlah_kamar']} kamar?", parent=self.app_instance.window):
+            return
+        self._sedang_memuat = True
+        self.muat_async(self.db_service.terapkan_alokasi, self.rencana, self.app_instance.current_username,
+                        saat_selesai=self._rencana_disimpan, saat_gagal=self._gagal_memuat,
+                        teks_memuat="Menyimpan alokasi...", posisi=self.posisi_memuat, warna="#000000")
+
+    def _rencana_disimpan(self, hasil):
+        self._sedang_memuat = False
+        sukses, pesan = hasil
+        if sukses:
+            messagebox.showinfo("Alokasi Tersimpan", pesan, parent=self.app_instance.window)
+            self._buat_rencana()  # sisa calon (tanpa kamar) direncanakan ulang terhadap data terbaru
+        else:
+            messagebox.showerror("Alokasi Gagal", pesan, parent=self.app_instance.window)
+
+    def _simpan_laporan(self):
+        if not self.rencana or not (self.rencana['ditolak'] or self.rencana['tidak_ditempatkan']):
+            messagebox.showinfo("Laporan", "Tidak ada baris yang ditolak atau tanpa kamar.", parent=self.app_instance.window)
+            return
+        path = filedialog.asksaveasfilename(parent=self.app_instance.window, title="Simpan Laporan Alokasi",
+                                            defaultextension=".csv", filetypes=[("File CSV", "*.csv")])
+        if not path: return
+        laporan = {'ditolak': self.rencana['ditolak'] + [{'baris': c['baris'], 'nim': c['nim'], 'alasan': c['alasan']}
+                                                         for c in self.rencana['tidak_ditempatkan']]}
+        laporan['ditolak'].sort(key=lambda t: t['baris'])
+        try:
+            impor_csv.tulis_laporan_penolakan(laporan, path)
+        except OSError as e:
+            messagebox.showerror("Gagal Menyimpan", f"Laporan tidak dapat disimpan: {e}", parent=self.app_instance.window)
+
+    def clear_screen_elements(self):
+        super().clear_screen_elements()
+        self.rencana_treeview = None
+        self._label_file = None
+        self._label_ringkasan = None
+        self._sedang_memuat = False
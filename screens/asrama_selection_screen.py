@@ -1,6 +1,8 @@
 from .base_screen import BaseScreen
-from tkinter import messagebox,StringVar, ttk
+from tkinter import messagebox,StringVar, ttk, filedialog
 from tombol import tbl
+from .riwayat_base_screen import pilih_file_ekspor
+import impor_csv
 
 class AsramaSelectionScreen(BaseScreen):
     def __init__(self, screen_manager, db_service):
@@ -10,7 +12,10 @@ class AsramaSelectionScreen(BaseScreen):
         self.asrama_dropdown = None
 
     def _populate_asrama_dropdown(self):
-        asramas_data = self.db_service.get_all_asrama()
+        self.muat_async(self.db_service.get_all_asrama, saat_selesai=self._isi_asrama_dropdown,
+                        teks_memuat="Memuat daftar asrama...", posisi=(self.app_instance.appwidth / 2, 250))
+
+    def _isi_asrama_dropdown(self, asramas_data):
         self.asrama_options_map = {asrama['nama_asrama']: asrama['asrama_id'] for asrama in asramas_data}
         asrama_names = list(self.asrama_options_map.keys())
         
@@ -54,8 +59,19 @@ class AsramaSelectionScreen(BaseScreen):
         
         tbl(self.canvas, x_start_buttons + button_width + 20, y_pos, button_width, button_height, 10, 10, 90, 180, 270, 360,
             "#dc3545", "Hapus Asrama Ini", self._hapus_asrama)
+        y_pos += button_height + 15
+
+        tbl(self.canvas, x_start_buttons, y_pos, button_width, button_height, 10, 10, 90, 180, 270, 360,
+            "#17a2b8", "Impor Penghuni (CSV)", self._impor_penghuni_csv)
+
+        tbl(self.canvas, x_start_buttons + button_width + 20, y_pos, button_width, button_height, 10, 10, 90, 180, 270, 360,
+            "#6c757d", "Ekspor Semua Penghuni", self._ekspor_penghuni)
+        y_pos += button_height + 15
+
+        tbl(self.canvas, x_start_buttons, y_pos, button_width, button_height, 10, 10, 90, 180, 270, 360,
+            "#6f42c1", "Alokasi Kamar Otomatis", self.screen_manager.show_alokasi_kamar_screen)
         
-        tbl(self.canvas, 460, 550, 150, 50, 10, 10, 90, 180, 270, 360, 
+        tbl(self.canvas, x_start_buttons + button_width + 20, y_pos, button_width, button_height, 10, 10, 90, 180, 270, 360, 
             "red", "Kembali", self.screen_manager.show_main_menu)
 
     def _get_selected_asrama_details(self):
@@ -89,3 +105,40 @@ class AsramaSelectionScreen(BaseScreen):
                     self._populate_asrama_dropdown() 
                 else:
                     messagebox.showerror("Gagal Menghapus", status_message, parent=self.app_instance.window)
+
+    def _impor_penghuni_csv(self):
+        path = filedialog.askopenfilename(parent=self.app_instance.window, title="Pilih File CSV Penghuni",
+                                          filetypes=[("File CSV", "*.csv"), ("Semua File", "*.*")])
+        if not path: return
+        self.muat_async(self.db_service.impor_penghuni_csv, path, self.app_instance.current_username,
+                        saat_selesai=self._impor_selesai, saat_gagal=self._impor_gagal,
+                        teks_memuat="Mengimpor penghuni...", posisi=(self.app_instance.appwidth / 2, 250))
+
+    def _ekspor_penghuni(self):
+        path = pilih_file_ekspor(self.app_instance.window, "penghuni")
+        if not path: return
+        self.muat_async(self.db_service.ekspor_data, "penghuni", path,
+                        saat_selesai=lambda jumlah: messagebox.showinfo("Ekspor Selesai", f"{jumlah} penghuni diekspor ke {path}.", parent=self.app_instance.window),
+                        saat_gagal=lambda err: messagebox.showerror("Ekspor Gagal", f"Ekspor gagal: {err}", parent=self.app_instance.window),
+                        teks_memuat="Mengekspor penghuni...", posisi=(self.app_instance.appwidth / 2, 250))
+
+    def _impor_gagal(self, err):
+        messagebox.showerror("Impor Gagal", f"Impor penghuni gagal: {err}", parent=self.app_instance.window)
+
+    def _impor_selesai(self, ringkasan):
+        ditolak = ringkasan['ditolak']
+        pesan = (f"{ringkasan['diterima']} dari {ringkasan['total']} baris berhasil diimpor "
+                 f"dalam {ringkasan['durasi_detik']} detik.\n{len(ditolak)} baris ditolak.")
+        if not ditolak:
+            messagebox.showinfo("Impor Selesai", pesan, parent=self.app_instance.window)
+            return
+        contoh = "\n".join(f"Baris {t['baris']} ({t['nim'] or '-'}): {t['alasan']}" for t in ditolak[:10])
+        if len(ditolak) > 10: contoh += f"\n... dan {len(ditolak) - 10} lainnya."
+        if messagebox.askyesno("Impor Selesai", f"{pesan}\n\n{contoh}\n\nSimpan laporan baris yang ditolak?", parent=self.app_instance.window):
+            path = filedialog.asksaveasfilename(parent=self.app_instance.window, title="Simpan Laporan Penolakan",
+                                                defaultextension=".csv", filetypes=[("File CSV", "*.csv")])
+            if path:
+                try:
+                    impor_csv.tulis_laporan_penolakan(ringkasan, path)
+                except OSError as e:
+                    messagebox.showerror("Gagal Menyimpan", f"Laporan tidak dapat disimpan: {e}", parent=self.app_instance.window)
@@ -1,3 +1,4 @@
+from tkinter import messagebox
 class BaseScreen:
     def __init__(self, screen_manager, db_service):
         self.screen_manager = screen_manager
@@ -22,4 +23,30 @@ class BaseScreen:
         item = self.canvas.create_image(*args, **kwargs)
         self.canvas_items_on_screen.append(item)
         return item
+    def muat_async(self, fungsi, *args, saat_selesai=None, saat_gagal=None, teks_memuat="Memuat data...", posisi=None, warna="#F4FEFF", **kwargs):
+        """
+        Menjalankan fungsi(*args) (biasanya metode db_service) di thread latar sambil menampilkan teks memuat di canvas.
+        saat_selesai(hasil) dipanggil di thread UI; jika layar sudah berganti, hasilnya dibuang.
+        Jika gagal, pesan kesalahan ditampilkan lalu saat_gagal(err) dipanggil (jika ada).
+        """
+        x, y = posisi if posisi else (self.app_instance.appwidth / 2, self.app_instance.appheight / 2)
+        item_memuat = self.create_canvas_text(x, y, text=teks_memuat, fill=warna, font=("Arial", 14, "italic")) if teks_memuat else None
+        def _hapus_indikator():
+            if item_memuat in self.canvas_items_on_screen:
+                self.canvas.delete(item_memuat)
+                self.canvas_items_on_screen.remove(item_memuat)
+        def _sukses(hasil):
+            _hapus_indikator()
+            if saat_selesai: saat_selesai(hasil)
+        def _gagal(err):
+            _hapus_indikator()
+            messagebox.showerror("Kesalahan Database", f"Gagal memuat data: {err}", parent=self.app_instance.window)
+            if saat_gagal: saat_gagal(err)
+        return self.app_instance.db_executor.jalankan(fungsi, *args, saat_selesai=_sukses, saat_gagal=_gagal, **kwargs)
+    def terapkan_perubahan(self, perubahan):
+        """
+        Dipanggil ScreenManager (thread UI) ketika umpan perubahan memuat event baru; perubahan['asrama'] dan
+        perubahan['kamar'] berisi id yang terdampak (lihat umpan_perubahan.py). Bawaan: diabaikan.
+        """
+        pass
     def setup_ui(self): raise NotImplementedError("Subclass harus mengimplementasikan metode setup_ui")
\ No newline at end of file
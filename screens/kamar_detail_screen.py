@@ -9,16 +9,15 @@ class KamarDetailScreen(BaseScreen):
         self.asrama_id=self.screen_manager.current_asrama_id_context
         self.asrama_nama=self.screen_manager.current_asrama_nama_context
         self.nomor_kamar=kamar_id 
-        self.penghuni_treeview=None; self.treeview_scrollbar=None
+        self.kamar_id_internal=None
+        self.penghuni_treeview=None; self.treeview_scrollbar=None; self.info_penghuni_text=None
     def setup_ui(self):
         style=ttk.Style(); style.configure("Custom.Treeview", background="#E1E1E1", fieldbackground="#FFFFFF", foreground="black")
         style.configure("Custom.Treeview.Heading", background="yellow", foreground="black", font=('Arial',10,'bold'), relief="flat")
         style.map("Custom.Treeview.Heading", background=[('active','#FFD700')])
         self.create_canvas_text(self.app_instance.appwidth/2, 80, text=f"Asrama {self.asrama_nama} - Kamar {self.nomor_kamar}", fill="#000000", font=("Cooper Black",22,"bold"))
         info_text_x=self.app_instance.appwidth/2; info_text_y=120
-        jml_penghuni=self.db_service.get_jumlah_penghuni(self.nomor_kamar,self.asrama_id)
-        kapasitas=self.db_service.get_kapasitas_kamar(self.nomor_kamar,self.asrama_id)
-        self.create_canvas_text(info_text_x,info_text_y, text=f"Data Penghuni ({jml_penghuni}/{kapasitas})", fill="#F4F0FF", font=("Cooper Black",18,"bold"))
+        self.info_penghuni_text=self.create_canvas_text(info_text_x,info_text_y, text="Data Penghuni (.../...)", fill="#F4F0FF", font=("Cooper Black",18,"bold"))
         table_x=50; table_y=info_text_y+20+20; table_container_width=self.app_instance.appwidth-(2*50)
         scrollbar_width=20; treeview_actual_width=table_container_width-scrollbar_width
         treeview_display_height=self.app_instance.appheight-table_y-70-120
@@ -27,14 +26,10 @@ class KamarDetailScreen(BaseScreen):
             self.penghuni_treeview.heading(col,text=txt); self.penghuni_treeview.column(col,width=int(treeview_actual_width*w),anchor=anc,stretch=tk.YES if col!="no" else tk.NO)
         self.treeview_scrollbar=ttk.Scrollbar(self.canvas,orient="vertical",command=self.penghuni_treeview.yview)
         self.penghuni_treeview.configure(yscrollcommand=self.treeview_scrollbar.set)
-        _,daftar_penghuni=self.db_service.get_penghuni_in_kamar(self.nomor_kamar,self.asrama_id)
-        for i in self.penghuni_treeview.get_children(): self.penghuni_treeview.delete(i)
-        if daftar_penghuni and not (isinstance(daftar_penghuni[0],str) and daftar_penghuni[0].startswith("Info:")):
-            for i,p in enumerate(daftar_penghuni): self.penghuni_treeview.insert("","end",values=(i+1,p['nim'],p['nama_penghuni'],p.get('fakultas') or "N/A")) 
-        else:
-            if not self.penghuni_treeview.get_children(): self.penghuni_treeview.insert("","end",values=("","Belum ada penghuni.","",""))
         self.add_widget(self.penghuni_treeview); self.add_widget(self.treeview_scrollbar)
         self.canvas.create_window(table_x,table_y,anchor=tk.NW,window=self.penghuni_treeview,width=treeview_actual_width,height=treeview_display_height)
+        self._posisi_memuat=(info_text_x, table_y+treeview_display_height/2)
+        self._muat_data_kamar()
         self.canvas.create_window(table_x+treeview_actual_width,table_y,anchor=tk.NW,window=self.treeview_scrollbar,height=treeview_display_height)
         y_buttons=15; btn_width=150; btn_spacing=273; current_x=50
         actions=[("Kembali","red",lambda:self.screen_manager.show_kamar_list(self.asrama_id,self.asrama_nama)),
@@ -46,4 +41,19 @@ class KamarDetailScreen(BaseScreen):
         y_pindah=table_y+treeview_display_height+25; lebar_pindah=200; x_pindah=(self.app_instance.appwidth/2)-(lebar_pindah/2)
         tbl(self.canvas,x_pindah,y_pindah,lebar_pindah,50,10,10,90,180,270,360,"blue","Pindah Kamar",lambda:self.screen_manager.show_pindah_kamar_form(self.nomor_kamar))
 
+    def _muat_data_kamar(self, teks_memuat="Memuat data..."):
+        self.muat_async(self.db_service.get_kamar_snapshot, self.nomor_kamar, self.asrama_id, saat_selesai=self._tampilkan_data_kamar, teks_memuat=teks_memuat, posisi=self._posisi_memuat, warna="#000000")
+
+    def terapkan_perubahan(self, perubahan):
+        # Penghuni/kapasitas kamar ini diubah klien lain; kamar yang belum ditemukan ikut dimuat ulang jika asramanya berubah.
+        if self.kamar_id_internal in perubahan['kamar'] or (self.kamar_id_internal is None and self.asrama_id in perubahan['asrama']):
+            self._muat_data_kamar(teks_memuat=None)
+
+    def _tampilkan_data_kamar(self, snapshot):
+        self.kamar_id_internal=snapshot['kamar']['kamar_id_internal'] if snapshot['kamar'] else None
+        self.canvas.itemconfigure(self.info_penghuni_text,text=f"Data Penghuni ({snapshot['jumlah_penghuni']}/{snapshot['kapasitas']})")
+        for i in self.penghuni_treeview.get_children(): self.penghuni_treeview.delete(i)
+        for i,p in enumerate(snapshot['penghuni']): self.penghuni_treeview.insert("","end",values=(i+1,p['nim'],p['nama_penghuni'],p.get('fakultas') or "N/A")) 
+        if not self.penghuni_treeview.get_children(): self.penghuni_treeview.insert("","end",values=("","Belum ada penghuni.","",""))
+
     def clear_screen_elements(self): super().clear_screen_elements(); self.penghuni_treeview=None; self.treeview_scrollbar=None
@@ -0,0 +1,109 @@
+from .base_screen import BaseScreen
+from tkinter import ttk, messagebox, StringVar
+import tkinter as tk
+from tombol import tbl
+class KamarKosongScreen(BaseScreen):
+    """
+    Pencarian kamar yang masih memiliki tempat kosong di semua asrama (atau satu asrama) dengan satu
+    panggilan db_service.cari_kamar_kosong; hasil diurutkan dari sisa tempat terbanyak.
+    """
+    SEMUA_ASRAMA = "Semua Asrama"
+
+    def __init__(self, screen_manager, db_service):
+        super().__init__(screen_manager, db_service)
+        self.asrama_var = StringVar(value=self.SEMUA_ASRAMA)
+        self.min_kosong_var = StringVar(value="1")
+        self.asrama_options_map = {}
+        self.kamar_treeview = None
+        self._kamar_per_baris = {}
+        self._label_jumlah = None
+        self._sedang_memuat = False
+        self.posisi_memuat = None
+
+    def setup_ui(self):
+        style=ttk.Style(); style.configure("Riwayat.Treeview",background="#F0F0F0",fieldbackground="#FFFFFF",foreground="black",rowheight=25)
+        style.configure("Riwayat.Treeview.Heading",background="#BFBFBF",foreground="black",font=('Arial',10,'bold'),relief="flat")
+        style.map("Riwayat.Treeview.Heading",background=[('active','#A0A0A0')])
+
+        tbl(self.canvas, 50, 15, 150, 50, 10, 10, 90, 180, 270, 360, "red", "Kembali", self.screen_manager.show_main_menu)
+        self.create_canvas_text(self.app_instance.appwidth/2, 50, text="Cari Kamar Kosong", fill="#000000", font=("Cooper Black",24,"bold"))
+
+        y_filter = 95
+        self.asrama_options_map = {a['nama_asrama']: a['asrama_id'] for a in self.db_service.get_all_asrama()}
+        self.create_canvas_text(60, y_filter+15, text="Asrama:", fill="#000000", font=("Arial",12,"bold"), anchor="w")
+        asrama_dd = self.add_widget(ttk.Combobox(self.canvas, textvariable=self.asrama_var, values=[self.SEMUA_ASRAMA] + list(self.asrama_options_map.keys()),
+                                                 width=22, state="readonly", font=("Arial",12)))
+        asrama_dd.place(x=140, y=y_filter+3)
+        asrama_dd.bind("<<ComboboxSelected>>", lambda e: self.cari())
+        self.create_canvas_text(440, y_filter+15, text="Min. Tempat Kosong:", fill="#000000", font=("Arial",12,"bold"), anchor="w")
+        min_spin = self.add_widget(ttk.Spinbox(self.canvas, textvariable=self.min_kosong_var, from_=1, to=20, width=5, font=("Arial",12)))
+        min_spin.place(x=610, y=y_filter+3)
+        tbl(self.canvas, 700, y_filter, 140, 40, 10, 10, 90, 180, 270, 360, "#007bff", "Cari", self.cari)
+        tbl(self.canvas, 860, y_filter, 180, 40, 10, 10, 90, 180, 270, 360, "#28a745", "Lihat Detail", self._lihat_detail_kamar)
+
+        table_x = 30; table_y = y_filter + 60
+        scr_w = 20; tree_w = self.app_instance.appwidth - 2*table_x - scr_w
+        tree_h = self.app_instance.appheight - table_y - 70
+        cols = ("asrama","kamar","kapasitas","terisi","sisa")
+        hdrs = {"asrama":"Asrama","kamar":"Nomor Kamar","kapasitas":"Kapasitas","terisi":"Terisi","sisa":"Tempat Kosong"}
+        lebar = {"asrama":0.36,"kamar":0.16,"kapasitas":0.16,"terisi":0.16,"sisa":0.16}
+        self.kamar_treeview = ttk.Treeview(self.canvas, columns=cols, show='headings', style="Riwayat.Treeview", selectmode="browse")
+        for c, t in hdrs.items():
+            self.kamar_treeview.heading(c, text=t)
+            self.kamar_treeview.column(c, width=int(tree_w*lebar[c]), anchor=tk.W if c == "asrama" else tk.CENTER)
+        scrollbar = ttk.Scrollbar(self.canvas, orient="vertical", command=self.kamar_treeview.yview)
+        self.kamar_treeview.configure(yscrollcommand=scrollbar.set)
+        self.kamar_treeview.bind("<Double-1>", lambda e: self._lihat_detail_kamar())
+        self.add_widget(self.kamar_treeview); self.add_widget(scrollbar)
+        self.canvas.create_window(table_x, table_y, anchor=tk.NW, window=self.kamar_treeview, width=tree_w, height=tree_h)
+        self.canvas.create_window(table_x+tree_w, table_y, anchor=tk.NW, window=scrollbar, height=tree_h)
+        self.posisi_memuat = (self.app_instance.appwidth/2, table_y+tree_h/2)
+        self._label_jumlah = self.create_canvas_text(self.app_instance.appwidth/2, table_y+tree_h+25, text="", fill="#000000", font=("Arial",12,"bold"))
+        self.cari()
+
+    def cari(self):
+        if self._sedang_memuat: return
+        try:
+            min_kosong = int(self.min_kosong_var.get())
+            if min_kosong < 1: raise ValueError
+        except ValueError:
+            messagebox.showwarning("Input Tidak Valid", "Minimal tempat kosong harus berupa angka 1 atau lebih.", parent=self.app_instance.window)
+            return
+        asrama_id = self.asrama_options_map.get(self.asrama_var.get())
+        self._sedang_memuat = True
+        self.muat_async(self.db_service.cari_kamar_kosong, asrama_id, min_kosong,
+                        saat_selesai=lambda kamar: self._tampilkan_kamar(kamar, min_kosong), saat_gagal=self._gagal_memuat,
+                        teks_memuat="Mencari kamar kosong...", posisi=self.posisi_memuat, warna="#000000")
+
+    def _gagal_memuat(self, err):
+        self._sedang_memuat = False
+
+    def _tampilkan_kamar(self, daftar_kamar, min_kosong):
+        self._sedang_memuat = False
+        if not self.kamar_treeview: return
+        for i in self.kamar_treeview.get_children(): self.kamar_treeview.delete(i)
+        self._kamar_per_baris = {}
+        for k in daftar_kamar:
+            iid = self.kamar_treeview.insert("", "end", values=(k['nama_asrama'], k['nomor_kamar'], k['kapasitas'], k['jumlah_penghuni'], k['sisa_kapasitas']))
+            self._kamar_per_baris[iid] = k
+        self.kamar_treeview.yview_moveto(0)
+        total_kosong = sum(k['sisa_kapasitas'] for k in daftar_kamar)
+        self.canvas.itemconfig(self._label_jumlah, text=f"{len(daftar_kamar)} kamar dengan minimal {min_kosong} tempat kosong ({total_kosong} tempat tidur tersedia)"
+                               if daftar_kamar else f"Tidak ada kamar dengan minimal {min_kosong} tempat kosong.")
+
+    def _lihat_detail_kamar(self):
+        pilihan = self.kamar_treeview.selection() if self.kamar_treeview else ()
+        kamar = self._kamar_per_baris.get(pilihan[0]) if pilihan else None
+        if not kamar:
+            messagebox.showwarning("Pilihan Kosong", "Pilih kamar pada tabel terlebih dahulu.", parent=self.app_instance.window)
+            return
+        self.screen_manager.current_asrama_id_context = kamar['asrama_id']
+        self.screen_manager.current_asrama_nama_context = kamar['nama_asrama']
+        self.screen_manager.show_kamar_detail(kamar['nomor_kamar'])
+
+    def clear_screen_elements(self):
+        super().clear_screen_elements()
+        self.kamar_treeview = None
+        self._label_jumlah = None
+        self._kamar_per_baris = {}
+        self._sedang_memuat = False
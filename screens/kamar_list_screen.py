@@ -10,8 +10,16 @@ class KamarListScreen(BaseScreen):
         self.kamar_options_map = {}
         self.kamar_dropdown = None
 
-    def _populate_kamar_dropdown(self):
-        kamars_data = self.db_service.get_all_kamar_in_asrama(self.asrama_id)
+    def _populate_kamar_dropdown(self, teks_memuat="Memuat daftar kamar..."):
+        self.muat_async(self.db_service.get_all_kamar_in_asrama, self.asrama_id, saat_selesai=self._isi_kamar_dropdown,
+                        teks_memuat=teks_memuat, posisi=(self.app_instance.appwidth / 2, 250))
+
+    def terapkan_perubahan(self, perubahan):
+        # Kamar asrama ini ditambah/diubah/dihapus di klien lain: muat ulang daftar tanpa indikator, pilihan dipertahankan.
+        if self.asrama_id in perubahan['asrama']:
+            self._populate_kamar_dropdown(teks_memuat=None)
+
+    def _isi_kamar_dropdown(self, kamars_data):
         self.kamar_options_map = {
             str(k['nomor_kamar']): (k['kamar_id_internal'], k['kapasitas']) 
             for k in kamars_data
@@ -20,6 +28,8 @@ class KamarListScreen(BaseScreen):
         
         if self.kamar_dropdown:
             self.kamar_dropdown['values'] = kamar_numbers
+            if self.kamar_dropdown_var.get() in self.kamar_options_map:
+                return  # pilihan sebelumnya masih ada (muat ulang karena perubahan)
             if kamar_numbers:
                 self.kamar_dropdown_var.set(kamar_numbers[0])
             else:
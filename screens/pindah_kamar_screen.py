@@ -31,36 +31,65 @@ class PindahKamarScreen(BaseScreen):
         self.kamar_tujuan_dropdown=self.add_widget(ttk.Combobox(self.canvas,textvariable=self.selected_kamar_tujuan_var,values=[],width=dd_w_char,state="disabled",font=("Arial",14)))
         self.kamar_tujuan_dropdown.place(x=x_dd,y=y_curr);y_curr+=70
         
-        btn_w=200;x_btn_p=self.app_instance.appwidth/2-btn_w-10;x_btn_b=self.app_instance.appwidth/2+10
+        btn_w=200;x_btn_p=self.app_instance.appwidth/2-btn_w*1.5-20;x_btn_s=self.app_instance.appwidth/2-btn_w/2;x_btn_b=self.app_instance.appwidth/2+btn_w/2+20
         tbl(self.canvas,x_btn_p,y_curr,btn_w,50,10,10,90,180,270,360,"blue","Pindahkan",self._proses_pindah_kamar)
+        tbl(self.canvas,x_btn_s,y_curr,btn_w,50,10,10,90,180,270,360,"#6f42c1","Pindahkan Semua",self._proses_pindah_semua)
         tbl(self.canvas,x_btn_b,y_curr,btn_w,50,10,10,90,180,270,360,"red","Batal",lambda:self.screen_manager.show_kamar_detail(self.nomor_kamar_asal))
 
     def _on_asrama_tujuan_selected(self,e=None):
         nama_a=self.selected_asrama_tujuan_var.get()
         id_a_t=self.asrama_tujuan_options_map.get(nama_a)
         self.kamar_tujuan_options_map = {} # Reset map kamar
+        self.kamar_tujuan_dropdown['values']=[]
+        self.kamar_tujuan_dropdown['state']="disabled"
         if id_a_t:
-            kamars=self.db_service.get_all_kamar_in_asrama(id_a_t)
-            kamar_display_options = []
-            for k in kamars:
-                # Pastikan kamar tujuan tidak sama dengan kamar asal jika asramanya sama
-                if not (id_a_t == self.asrama_id_asal and k['nomor_kamar'] == self.nomor_kamar_asal):
-                    display_text = f"Kamar {k['nomor_kamar']} (Kapasitas: {k['kapasitas']})"
-                    self.kamar_tujuan_options_map[display_text] = k['nomor_kamar']
-                    kamar_display_options.append(display_text)
-
-            self.kamar_tujuan_dropdown['values']=kamar_display_options
-            if kamar_display_options:
-                self.selected_kamar_tujuan_var.set(kamar_display_options[0])
-                self.kamar_tujuan_dropdown['state']="readonly"
-            else:
-                self.selected_kamar_tujuan_var.set("Tidak ada kamar tersedia")
-                self.kamar_tujuan_dropdown['state']="disabled"
+            # Hanya kamar yang masih memiliki tempat kosong (satu kueri lewat indeks sisa_kapasitas).
+            self.selected_kamar_tujuan_var.set("Memuat kamar...")
+            self.muat_async(self.db_service.cari_kamar_kosong,id_a_t,saat_selesai=lambda kamars:self._isi_kamar_tujuan(id_a_t,kamars),teks_memuat=None)
         else:
-            self.kamar_tujuan_dropdown['values']=[]
             self.selected_kamar_tujuan_var.set("")
+
+    def _isi_kamar_tujuan(self,id_a_t,kamars):
+        if self.asrama_tujuan_options_map.get(self.selected_asrama_tujuan_var.get())!=id_a_t: return # asrama tujuan sudah diganti
+        kamar_display_options = []
+        for k in sorted(kamars,key=lambda k:k['nomor_kamar']):
+            # Pastikan kamar tujuan tidak sama dengan kamar asal jika asramanya sama
+            if not (id_a_t == self.asrama_id_asal and k['nomor_kamar'] == self.nomor_kamar_asal):
+                display_text = f"Kamar {k['nomor_kamar']} (Kosong: {k['sisa_kapasitas']} dari {k['kapasitas']})"
+                self.kamar_tujuan_options_map[display_text] = k['nomor_kamar']
+                kamar_display_options.append(display_text)
+
+        self.kamar_tujuan_dropdown['values']=kamar_display_options
+        if kamar_display_options:
+            self.selected_kamar_tujuan_var.set(kamar_display_options[0])
+            self.kamar_tujuan_dropdown['state']="readonly"
+        else:
+            self.selected_kamar_tujuan_var.set("Tidak ada kamar tersedia")
             self.kamar_tujuan_dropdown['state']="disabled"
 
+    def _get_tujuan_terpilih(self):
+        id_a_t=self.asrama_tujuan_options_map.get(self.selected_asrama_tujuan_var.get())
+        kamar_tujuan_display=self.selected_kamar_tujuan_var.get()
+        no_k_t=self.kamar_tujuan_options_map.get(kamar_tujuan_display)
+        if not id_a_t or not no_k_t or kamar_tujuan_display=="Tidak ada kamar tersedia":
+            messagebox.showwarning("Peringatan","Pilih asrama & kamar tujuan yang valid.", parent=self.app_instance.window)
+            return None, None
+        return id_a_t, no_k_t
+
+    def _proses_pindah_semua(self):
+        """Memindahkan seluruh penghuni kamar asal ke kamar tujuan dalam satu batch atomik."""
+        daftar_nim=[p.split(" - ")[0] for p in self.penghuni_asal_options if p!="Tidak ada penghuni"]
+        if not daftar_nim:
+            messagebox.showwarning("Peringatan","Tidak ada penghuni di kamar ini.", parent=self.app_instance.window)
+            return
+        id_a_t,no_k_t=self._get_tujuan_terpilih()
+        if not id_a_t: return
+        if not messagebox.askyesno("Konfirmasi Pindah Semua",f"Pindahkan {len(daftar_nim)} penghuni ke Kamar {no_k_t}?", parent=self.app_instance.window):
+            return
+        succ,msg=self.db_service.pindah_kamar_batch([(nim,id_a_t,no_k_t) for nim in daftar_nim], self.app_instance.current_username)
+        if succ:
+            self.screen_manager.show_kamar_detail(self.nomor_kamar_asal)
+
     def _proses_pindah_kamar(self):
         nim_s=self.selected_nim_var.get()
         if not nim_s or nim_s=="Tidak ada penghuni":
@@ -1,12 +1,9 @@
-from .base_screen import BaseScreen
+from .riwayat_base_screen import RiwayatBaseScreen
 from tkinter import ttk
 import tkinter as tk
 from tombol import tbl
-class RiwayatAsramaScreen(BaseScreen):
-    def __init__(self, screen_manager, db_service):
-        super().__init__(screen_manager, db_service)
-        self.log_treeview = None
-        self.log_scrollbar = None
+class RiwayatAsramaScreen(RiwayatBaseScreen):
+    JENIS_EKSPOR = "audit_asrama"
 
     def setup_ui(self):
         style = ttk.Style()
@@ -49,22 +46,23 @@ class RiwayatAsramaScreen(BaseScreen):
         self.log_scrollbar = ttk.Scrollbar(self.canvas, orient="vertical", command=self.log_treeview.yview)
         self.log_treeview.configure(yscrollcommand=self.log_scrollbar.set)
 
-        logs = self.db_service.get_audit_log_asrama(limit=200)
-        for i in self.log_treeview.get_children(): self.log_treeview.delete(i)
-        if logs:
-            for log in logs:
-                self.log_treeview.insert("", "end", values=(
-                    log['log_id'], log['waktu_aksi_formatted'], log['aksi'],
-                    log.get('asrama_id_aksi', 'N/A'),
-                    log.get('nama_asrama_lama', 'N/A'),
-                    log.get('nama_asrama_baru', 'N/A'),
-                    log.get('user_aksi', 'N/A'),
-                    log.get('keterangan_tambahan', '')
-                ))
-        else:
-            self.log_treeview.insert("", "end", values=("", "Belum ada riwayat.", "", "", "", "", "", ""))
-
         self.add_widget(self.log_treeview)
         self.add_widget(self.log_scrollbar)
         self.canvas.create_window(table_x, table_y, anchor=tk.NW, window=self.log_treeview, width=treeview_actual_width, height=treeview_display_height)
-        self.canvas.create_window(table_x + treeview_actual_width, table_y, anchor=tk.NW, window=self.log_scrollbar, height=treeview_display_height)
\ No newline at end of file
+        self.canvas.create_window(table_x + treeview_actual_width, table_y, anchor=tk.NW, window=self.log_scrollbar, height=treeview_display_height)
+        self.posisi_memuat = (self.app_instance.appwidth / 2, table_y + treeview_display_height / 2)
+        self.buat_navigasi_halaman(table_y + treeview_display_height + 12)
+        self.muat_halaman()
+
+    def ambil_log(self, limit, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        return self.db_service.get_audit_log_asrama(limit=limit, sebelum=sebelum, sesudah=sesudah, sejak_log_id=sejak_log_id, celah=celah)
+
+    def baris_log(self, log):
+        return (
+            log['log_id'], log['waktu_aksi_formatted'], log['aksi'],
+            log.get('asrama_id_aksi', 'N/A'),
+            log.get('nama_asrama_lama', 'N/A'),
+            log.get('nama_asrama_baru', 'N/A'),
+            log.get('user_aksi', 'N/A'),
+            log.get('keterangan_tambahan', '')
+        )
@@ -0,0 +1,198 @@
+import collections
+import umpan_perubahan
+from .base_screen import BaseScreen
+from tkinter import filedialog, messagebox
+from tombol import tbl
+class RiwayatBaseScreen(BaseScreen):
+    """
+    Dasar layar riwayat log audit dengan navigasi halaman berbasis kursor (Lebih Baru / Lebih Lama).
+    Subclass membuat log_treeview di setup_ui (dan mengisi posisi_memuat), lalu memanggil
+    buat_navigasi_halaman() dan muat_halaman(), serta mengimplementasikan ambil_log() dan baris_log().
+    JENIS_EKSPOR (kunci SUMBER_EKSPOR di DatabaseService) mengaktifkan tombol ekspor seluruh riwayat.
+    Mode live menambahkan log baru (log_id di atas yang tertinggi tampil, ditambah celah yang commit terlambat;
+    lihat umpan_perubahan) ke atas tabel setiap INTERVAL_LIVE_MS; baris tertua dibuang setelah MAKS_BARIS_LIVE
+    sehingga tabel dan memori tidak terus bertambah.
+    """
+    UKURAN_HALAMAN = 100
+    JENIS_EKSPOR = None
+    INTERVAL_LIVE_MS = 3000
+    MAKS_BARIS_LIVE = 1000
+
+    def __init__(self, screen_manager, db_service):
+        super().__init__(screen_manager, db_service)
+        self.log_treeview = None
+        self.log_scrollbar = None
+        self._logs_halaman = collections.deque(maxlen=self.MAKS_BARIS_LIVE)
+        self._nomor_halaman = 1
+        self._ada_lebih_baru = False
+        self._ada_lebih_lama = False
+        self._sedang_memuat = False
+        self._label_halaman = None
+        self.posisi_memuat = None  # posisi teks "Memuat data..." (biasanya tengah tabel)
+        self._live = False
+        self._after_live = None
+        self._penanda_live = {'log_id': 0, 'celah': {}}
+
+    def ambil_log(self, limit, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        """Memanggil get_audit_log_* milik db_service (berjalan di thread latar)."""
+        raise NotImplementedError("Subclass harus mengimplementasikan metode ambil_log")
+
+    def baris_log(self, log):
+        """Mengubah satu baris log menjadi tuple nilai kolom log_treeview."""
+        raise NotImplementedError("Subclass harus mengimplementasikan metode baris_log")
+
+    def buat_navigasi_halaman(self, y_pos):
+        tengah = self.app_instance.appwidth / 2
+        tbl(self.canvas, tengah - 300, y_pos, 170, 40, 10, 10, 90, 180, 270, 360, "#4682B4", "< Lebih Baru", self.halaman_lebih_baru)
+        tbl(self.canvas, tengah + 130, y_pos, 170, 40, 10, 10, 90, 180, 270, 360, "#4682B4", "Lebih Lama >", self.halaman_lebih_lama)
+        self._label_halaman = self.create_canvas_text(tengah, y_pos + 20, text="", fill="#000000", font=("Arial", 12, "bold"))
+        tbl(self.canvas, 30, y_pos, 150, 40, 10, 10, 90, 180, 270, 360, "#6f42c1", "Live On/Off", self.alihkan_live)
+        if self.JENIS_EKSPOR:
+            tbl(self.canvas, self.app_instance.appwidth - 200, y_pos, 170, 40, 10, 10, 90, 180, 270, 360, "#28a745", "Ekspor Semua", self.ekspor_riwayat)
+
+    def ekspor_riwayat(self):
+        """Mengekspor seluruh riwayat (bukan hanya halaman yang tampil) ke CSV/JSONL di thread latar."""
+        path = pilih_file_ekspor(self.app_instance.window, f"riwayat_{self.JENIS_EKSPOR}")
+        if not path: return
+        self.muat_async(self.db_service.ekspor_data, self.JENIS_EKSPOR, path,
+                        saat_selesai=lambda jumlah: messagebox.showinfo("Ekspor Selesai", f"{jumlah} baris diekspor ke {path}.", parent=self.app_instance.window),
+                        saat_gagal=lambda err: messagebox.showerror("Ekspor Gagal", f"Ekspor gagal: {err}", parent=self.app_instance.window),
+                        teks_memuat="Mengekspor riwayat...", posisi=self.posisi_memuat, warna="#000000")
+
+    def muat_halaman(self, sebelum=None, sesudah=None):
+        """Memuat halaman terbaru, atau halaman sebelum/sesudah kursor (waktu_aksi, log_id)."""
+        if self._sedang_memuat: return
+        self._sedang_memuat = True
+        self.muat_async(self.ambil_log, limit=self.UKURAN_HALAMAN + 1, sebelum=sebelum, sesudah=sesudah,
+                        saat_selesai=lambda logs: self._halaman_dimuat(logs, sebelum, sesudah),
+                        saat_gagal=self._gagal_memuat, posisi=self.posisi_memuat, warna="#000000")
+
+    def halaman_lebih_lama(self):
+        if self._ada_lebih_lama and self._logs_halaman:
+            self._hentikan_live()  # mode live hanya untuk halaman terbaru
+            self.muat_halaman(sebelum=self.db_service.kursor_log(self._logs_halaman[-1]))
+
+    def halaman_lebih_baru(self):
+        if self._ada_lebih_baru and self._logs_halaman:
+            self.muat_halaman(sesudah=self.db_service.kursor_log(self._logs_halaman[0]))
+
+    def _gagal_memuat(self, err):
+        self._sedang_memuat = False
+
+    def alihkan_live(self):
+        if self._live:
+            self._hentikan_live()
+            return
+        self._live = True
+        if self._nomor_halaman != 1:
+            self.muat_halaman()
+        self._perbarui_label_halaman()
+        self._jadwalkan_live()
+
+    def _hentikan_live(self):
+        self._live = False
+        if self._after_live is not None:
+            self.app_instance.window.after_cancel(self._after_live)
+            self._after_live = None
+        self._perbarui_label_halaman()
+
+    def _jadwalkan_live(self):
+        if self._live and self._after_live is None:
+            self._after_live = self.app_instance.window.after(self.INTERVAL_LIVE_MS, self._ambil_live)
+
+    def _ambil_live(self):
+        # Hanya log yang belum tampil yang diambil; selama halaman sedang dimuat, giliran ini dilewati.
+        self._after_live = None
+        if not self._live or not self.log_treeview: return
+        if self._sedang_memuat or self._nomor_halaman != 1:
+            self._jadwalkan_live()
+            return
+        self._sedang_memuat = True
+        penanda, celah = self._penanda_live, list(self._penanda_live['celah'])
+        self.muat_async(self.ambil_log, limit=self.MAKS_BARIS_LIVE + len(celah), sejak_log_id=penanda['log_id'], celah=celah,
+                        saat_selesai=lambda logs: self._live_dimuat(penanda, logs), saat_gagal=self._gagal_live, teks_memuat=None)
+
+    def _gagal_live(self, err):
+        self._sedang_memuat = False
+        self._hentikan_live()
+
+    def _live_dimuat(self, penanda, logs):
+        self._sedang_memuat = False
+        self._penanda_live, diterima = umpan_perubahan.majukan_penanda(penanda, [log['log_id'] for log in logs])
+        logs = [log for log in logs if log['log_id'] in diterima]
+        if logs and self.log_treeview:
+            if not self._logs_halaman:
+                for i in self.log_treeview.get_children(): self.log_treeview.delete(i)  # baris "Belum ada riwayat."
+            for log in reversed(logs):  # logs terbaru lebih dulu; yang terbaru berakhir di baris paling atas
+                self.log_treeview.insert("", 0, values=self.baris_log(log))
+                self._logs_halaman.appendleft(log)
+            lebih = self.log_treeview.get_children()[self.MAKS_BARIS_LIVE:]
+            if lebih:
+                self.log_treeview.delete(*lebih)
+                self._ada_lebih_lama = True
+            self._perbarui_label_halaman()
+        self._jadwalkan_live()
+
+    def _halaman_dimuat(self, logs, sebelum, sesudah):
+        # Satu baris ekstra diminta untuk mengetahui apakah masih ada halaman ke arah yang sama.
+        self._sedang_memuat = False
+        ada_lagi = len(logs) > self.UKURAN_HALAMAN
+        if sesudah is not None:
+            if not ada_lagi:
+                # Sudah sampai baris terbaru: tampilkan halaman pertama yang penuh.
+                self.muat_halaman()
+                return
+            logs = logs[1:]
+            self._nomor_halaman = max(2, self._nomor_halaman - 1)
+            self._ada_lebih_baru, self._ada_lebih_lama = True, True
+        elif sebelum is not None:
+            if not logs:
+                self._ada_lebih_lama = False
+                self._perbarui_label_halaman()
+                return
+            logs = logs[:self.UKURAN_HALAMAN]
+            self._nomor_halaman += 1
+            self._ada_lebih_baru, self._ada_lebih_lama = True, ada_lagi
+        else:
+            logs = logs[:self.UKURAN_HALAMAN]
+            self._nomor_halaman = 1
+            self._penanda_live = {'log_id': max((log['log_id'] for log in logs), default=0), 'celah': {}}
+            self._ada_lebih_baru, self._ada_lebih_lama = False, ada_lagi
+        self._logs_halaman = collections.deque(logs, maxlen=self.MAKS_BARIS_LIVE)  # ring buffer untuk mode live
+        self._tampilkan_logs(logs)
+        self._perbarui_label_halaman()
+
+    def _tampilkan_logs(self, logs):
+        if not self.log_treeview: return
+        for i in self.log_treeview.get_children(): self.log_treeview.delete(i)
+        if logs:
+            for log in logs:
+                self.log_treeview.insert("", "end", values=self.baris_log(log))
+            self.log_treeview.yview_moveto(0)
+        else:
+            jumlah_kolom = len(self.log_treeview["columns"])
+            self.log_treeview.insert("", "end", values=("", "Belum ada riwayat.") + ("",) * (jumlah_kolom - 2))
+
+    def _perbarui_label_halaman(self):
+        if self._label_halaman is None: return
+        teks = f"Halaman {self._nomor_halaman}"
+        if not self._ada_lebih_baru: teks += " (terbaru)"
+        if not self._ada_lebih_lama: teks += " (terakhir)"
+        if self._live: teks += " - live"
+        self.canvas.itemconfig(self._label_halaman, text=teks)
+
+    def clear_screen_elements(self):
+        self._hentikan_live()
+        super().clear_screen_elements()
+        self.log_treeview = None
+        self.log_scrollbar = None
+        self._label_halaman = None
+        self._logs_halaman = collections.deque(maxlen=self.MAKS_BARIS_LIVE)
+        self._sedang_memuat = False
+
+
+def pilih_file_ekspor(parent, nama_awal):
+    """Dialog simpan file ekspor; format dan kompresi ditentukan dari ekstensi yang dipilih."""
+    return filedialog.asksaveasfilename(parent=parent, title="Simpan Ekspor", initialfile=f"{nama_awal}.csv", defaultextension=".csv",
+                                        filetypes=[("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz"),
+                                                   ("JSON Lines", "*.jsonl"), ("JSON Lines (gzip)", "*.jsonl.gz")])
@@ -1,11 +1,9 @@
-from .base_screen import BaseScreen
+from .riwayat_base_screen import RiwayatBaseScreen
 from tkinter import ttk
 import tkinter as tk
 from tombol import tbl
-class RiwayatPenghuniScreen(BaseScreen): # Sebelumnya RiwayatAktivitasScreen
-    def __init__(self, screen_manager, db_service):
-        super().__init__(screen_manager, db_service)
-        self.log_treeview=None; self.log_scrollbar=None
+class RiwayatPenghuniScreen(RiwayatBaseScreen): # Sebelumnya RiwayatAktivitasScreen
+    JENIS_EKSPOR="audit_penghuni"
     def setup_ui(self):
         style=ttk.Style(); style.configure("Riwayat.Treeview",background="#F0F0F0",fieldbackground="#FFFFFF",foreground="black",rowheight=25)
         style.configure("Riwayat.Treeview.Heading",background="#BFBFBF",foreground="black",font=('Arial',10,'bold'),relief="flat")
@@ -34,17 +32,17 @@ class RiwayatPenghuniScreen(BaseScreen): # Sebelumnya RiwayatAktivitasScreen
                   "detail_kamar":{"w":0.22,"anc":tk.W,"st":tk.YES},"keterangan":{"w":0.17,"anc":tk.W,"st":tk.YES}}
         for c,t in hdrs.items(): self.log_treeview.heading(c,text=t); self.log_treeview.column(c,width=int(tree_w*cols_cfg[c]["w"]),anchor=cols_cfg[c]["anc"],stretch=cols_cfg[c]["st"])
         self.log_scrollbar=ttk.Scrollbar(self.canvas,orient="vertical",command=self.log_treeview.yview); self.log_treeview.configure(yscrollcommand=self.log_scrollbar.set)
-        logs=self.db_service.get_audit_log_penghuni(limit=200)
-        for i in self.log_treeview.get_children(): self.log_treeview.delete(i)
-        if logs:
-            for log in logs: self.log_treeview.insert("","end",values=(
-                log['log_id'],log['waktu_aksi_formatted'],log['aksi'],log['nim'],
-                log.get('user_aksi', 'N/A'), 
-                log['nama_terkait'],log['detail_perubahan'],log['keterangan_tambahan']
-                ))
-        else: self.log_treeview.insert("","end",values=("","Belum ada riwayat.","","","","","",""))
         self.add_widget(self.log_treeview); self.add_widget(self.log_scrollbar)
         self.canvas.create_window(table_x,table_y,anchor=tk.NW,window=self.log_treeview,width=tree_w,height=tree_h)
         self.canvas.create_window(table_x+tree_w,table_y,anchor=tk.NW,window=self.log_scrollbar,height=tree_h) # Disesuaikan dengan tbl_y
-        
-    def clear_screen_elements(self): super().clear_screen_elements(); self.log_treeview=None; self.log_scrollbar=None
+        self.posisi_memuat=(self.app_instance.appwidth/2, table_y+tree_h/2)
+        self.buat_navigasi_halaman(table_y+tree_h+12)
+        self.muat_halaman()
+
+    def ambil_log(self, limit, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        return self.db_service.get_audit_log_penghuni(limit=limit, sebelum=sebelum, sesudah=sesudah, sejak_log_id=sejak_log_id, celah=celah)
+
+    def baris_log(self, log):
+        return (log['log_id'],log['waktu_aksi_formatted'],log['aksi'],log['nim'],
+                log.get('user_aksi', 'N/A'),
+                log['nama_terkait'],log['detail_perubahan'],log['keterangan_tambahan'])
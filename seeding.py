@@ -0,0 +1,76 @@
+"""
+Tata letak deklaratif untuk data master awal (Asrama, Fakultas, Kamar).
+
+Tata letak berupa dict:
+    asrama            : daftar (asrama_id, nama_asrama) atau dict {"id", "nama", dan penimpaan opsional
+                        "jumlah_lantai", "kamar_per_lantai", "kapasitas"}
+    fakultas          : daftar nama fakultas
+    jumlah_lantai     : jumlah lantai per asrama (bawaan untuk semua asrama)
+    kamar_per_lantai  : jumlah kamar per lantai
+    kapasitas_default : kapasitas setiap kamar
+Nomor kamar dibentuk sebagai lantai * 100 + nomor urut (lantai 2 kamar 3 -> 203).
+"""
+import json
+
+TATA_LETAK_DEFAULT = {
+    "asrama": [
+        (1, "Aster"), (2, "Soka"), (3, "Tulip"), (4, "Edelweiss"),
+        (5, "Lily"), (6, "Dahlia"), (7, "Melati"), (8, "Anyelir")
+    ],
+    "fakultas": [
+        'Teknik', 'Ekonomi dan Bisnis', 'Ilmu Sosial dan Ilmu Politik',
+        'Kedokteran', 'Ilmu Budaya', 'MIPA', 'Ilmu Komputer',
+        'Ilmu Keolahragaan', 'Vokasi', 'Ilmu Pendidikan'
+    ],
+    "jumlah_lantai": 3,
+    "kamar_per_lantai": 3,
+    "kapasitas_default": 2,
+}
+
+
+def muat_tata_letak(path):
+    """Membaca tata letak dari file JSON; kunci yang tidak diisi memakai nilai TATA_LETAK_DEFAULT."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    tata_letak = dict(TATA_LETAK_DEFAULT)
+    tata_letak.update(data)
+    return tata_letak
+
+
+def _normalisasi_asrama(entri, tata_letak):
+    if isinstance(entri, dict):
+        return {
+            "id": int(entri["id"]),
+            "nama": entri["nama"],
+            "jumlah_lantai": int(entri.get("jumlah_lantai", tata_letak["jumlah_lantai"])),
+            "kamar_per_lantai": int(entri.get("kamar_per_lantai", tata_letak["kamar_per_lantai"])),
+            "kapasitas": int(entri.get("kapasitas", tata_letak["kapasitas_default"])),
+        }
+    asrama_id, nama = entri
+    return {
+        "id": int(asrama_id), "nama": nama,
+        "jumlah_lantai": int(tata_letak["jumlah_lantai"]),
+        "kamar_per_lantai": int(tata_letak["kamar_per_lantai"]),
+        "kapasitas": int(tata_letak["kapasitas_default"]),
+    }
+
+
+def baris_asrama(tata_letak):
+    """Baris (asrama_id, nama_asrama) untuk INSERT ke tabel Asrama."""
+    return [(a["id"], a["nama"]) for a in (_normalisasi_asrama(e, tata_letak) for e in tata_letak["asrama"])]
+
+
+def baris_fakultas(tata_letak):
+    """Baris (nama_fakultas,) untuk INSERT ke tabel Fakultas."""
+    return [(nama,) for nama in tata_letak["fakultas"]]
+
+
+def baris_kamar(tata_letak):
+    """Baris (nomor_kamar, asrama_id, kapasitas) untuk semua kamar di semua asrama."""
+    rows = []
+    for entri in tata_letak["asrama"]:
+        asrama = _normalisasi_asrama(entri, tata_letak)
+        for lantai in range(1, asrama["jumlah_lantai"] + 1):
+            for nomor_urut in range(1, asrama["kamar_per_lantai"] + 1):
+                rows.append(((lantai * 100) + nomor_urut, asrama["id"], asrama["kapasitas"]))
+    return rows
@@ -0,0 +1,1051 @@
+import sqlite3
+import threading
+import collections
+import getpass
+import datetime
+import time
+from contextlib import contextmanager
+from tkinter import messagebox
+from master_cache import MasterDataCache
+from query_stats import StatistikKueri
+import schema
+import schema_sqlite
+import seeding
+import impor_csv
+import alokasi
+import ekspor
+import umpan_perubahan
+
+# Kolom halaman riwayat log audit, padanan KUERI_LOG_AUDIT di database_service.py.
+# waktu_aksi disimpan sebagai teks 'YYYY-MM-DD HH:MM:SS', sehingga sudah dalam bentuk tampilan.
+KUERI_LOG_AUDIT = {
+    "penghuni": ("AuditLogAktivitasPenghuni", """
+                log_id, waktu_aksi, waktu_aksi AS waktu_aksi_formatted,
+                aksi, nim, user_aksi,
+                IFNULL(nama_penghuni_baru, nama_penghuni_lama) AS nama_terkait,
+                CASE aksi
+                    WHEN 'INSERT' THEN 'Ke: ' || IFNULL(nomor_kamar_baru, 'N/A') || ' (' || IFNULL(nama_asrama_baru, 'N/A') || ') - Fak: ' || IFNULL(fakultas_baru, 'N/A')
+                    WHEN 'DELETE' THEN 'Dari: ' || IFNULL(nomor_kamar_lama, 'N/A') || ' (' || IFNULL(nama_asrama_lama, 'N/A') || ') - Fak: ' || IFNULL(fakultas_lama, 'N/A')
+                    ELSE 'Dari: ' || IFNULL(nomor_kamar_lama, 'N/A') || ' (' || IFNULL(nama_asrama_lama, 'N/A') || ') Fak: ' || IFNULL(fakultas_lama, 'N/A') ||
+                         ' Ke: ' || IFNULL(nomor_kamar_baru, 'N/A') || ' (' || IFNULL(nama_asrama_baru, 'N/A') || ') Fak: ' || IFNULL(fakultas_baru, 'N/A')
+                END AS detail_perubahan,
+                keterangan_tambahan"""),
+    "asrama": ("AuditLogAktivitasAsrama", """
+                log_id, waktu_aksi, asrama_id_aksi, nama_asrama_lama, nama_asrama_baru, aksi,
+                waktu_aksi AS waktu_aksi_formatted,
+                user_aksi, keterangan_tambahan"""),
+    "kamar": ("AuditLogAktivitasKamar", """
+                log_id, waktu_aksi, kamar_id_internal_aksi,
+                nomor_kamar_lama, nomor_kamar_baru,
+                asrama_id_lama, asrama_id_baru,
+                nama_asrama_lama, nama_asrama_baru,
+                kapasitas_lama, kapasitas_baru,
+                aksi, waktu_aksi AS waktu_aksi_formatted,
+                user_aksi, keterangan_tambahan"""),
+}
+
+SUMBER_EKSPOR = {
+    "penghuni": """SELECT nim, nama_penghuni, fakultas, nomor_kamar, id_asrama_kamar AS asrama_id, nama_asrama
+            FROM vw_DaftarPenghuniLengkap ORDER BY id_asrama_kamar, nomor_kamar, nim""",
+    **{f"audit_{jenis}": f"SELECT * FROM {tabel} ORDER BY waktu_aksi, log_id" for jenis, (tabel, _) in KUERI_LOG_AUDIT.items()},
+}
+
+# Dialog untuk setiap kode hasil update_penghuni (kode yang sama dengan DatabaseService).
+DIALOG_UPDATE_PENGHUNI = {
+    "SUCCESS_DATA_CHANGED": (messagebox.showinfo, "Sukses"),
+    "SUCCESS_NO_CHANGE": (messagebox.showinfo, "Info"),
+    "SUCCESS_NO_ACTUAL_CHANGE": (messagebox.showwarning, "Perhatian"),
+    "ERROR_NIM_ORIGINAL_NOT_FOUND": (messagebox.showwarning, "Perhatian"),
+    "ERROR_INVALID_NIM_FORMAT": (messagebox.showerror, "Kesalahan Input"),
+    "ERROR_NIM_CONFLICT": (messagebox.showerror, "Kesalahan"),
+}
+
+
+def kueri_log_audit(jenis, arah=None, jumlah_celah=0):
+    """Sama seperti database_service.kueri_log_audit, dengan placeholder SQLite dan perbandingan baris (row value)."""
+    tabel, kolom = KUERI_LOG_AUDIT[jenis]
+    if arah == "sejak_log_id":
+        where = "log_id > ?" + (f" OR log_id IN ({_placeholder(jumlah_celah)})" if jumlah_celah else "")
+        return f"SELECT {kolom}\n            FROM {tabel}\n            WHERE {where}\n            ORDER BY log_id ASC\n            LIMIT ?"
+    where, urut = "", "DESC"
+    if arah == "sebelum":
+        where = "WHERE (waktu_aksi, log_id) < (?, ?)"
+    elif arah == "sesudah":
+        where, urut = "WHERE (waktu_aksi, log_id) > (?, ?)", "ASC"
+    return f"SELECT {kolom}\n            FROM {tabel}\n            {where}\n            ORDER BY waktu_aksi {urut}, log_id {urut}\n            LIMIT ?"
+
+
+def _baris_dict(cursor, row):
+    return {kolom[0]: nilai for kolom, nilai in zip(cursor.description, row)}
+
+
+def _placeholder(n):
+    return ', '.join(['?'] * n)
+
+
+class SQLiteDatabaseService:
+    """
+    Padanan DatabaseService yang menyimpan data di satu file SQLite lokal, untuk pemakaian di satu komputer
+    dan pengujian tanpa server MySQL. Metode publik, nilai kembalian, pesan, dan dialognya sama dengan
+    DatabaseService; logika stored procedure (kapasitas, validasi) dijalankan di Python dalam transaksi
+    BEGIN IMMEDIATE, sedangkan log audit, okupansi kamar, dan view tetap dikerjakan oleh trigger/view SQLite.
+    Setiap thread memakai koneksinya sendiri (mode WAL: pembaca tidak menghalangi penulis);
+    pernyataan yang sering dipakai disimpan di cache prepared statement modul sqlite3.
+    """
+    def __init__(self, path, parent_window=None, timeout=10.0, seed_tata_letak=None, seed_tanpa_audit=False,
+                 audit_retensi_bulan=None, cache_ttl=60.0, statistik_kueri=False, ambang_lambat_ms=None, log_kueri_lambat=None,
+                 audit_mode="trigger"):
+        self._path = path
+        self._parent_window = parent_window
+        self._timeout = timeout
+        self._seed_tata_letak = seed_tata_letak
+        self._seed_tanpa_audit = seed_tanpa_audit
+        self._audit_retensi_bulan = audit_retensi_bulan
+        self._cache = MasterDataCache(cache_ttl)
+        self._statistik_kueri = StatistikKueri(statistik_kueri, ambang_lambat_ms, log_kueri_lambat)
+        self._user_db = getpass.getuser()  # padanan USER() yang dicatat SP CRUD master data di MySQL
+        self._lokal = threading.local()
+        self._lock_koneksi = threading.Lock()
+        self._semua_koneksi = []
+        self._terbuka = False
+        self._connect()
+        if self._terbuka:
+            self._initialize_database_schema()
+            self.kelola_partisi_audit(self._audit_retensi_bulan)
+            self._populate_initial_master_data_if_empty()
+            self.atur_mode_audit(audit_mode)
+
+    def _connect(self):
+        try:
+            conn = self._conn()
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()
+            self._terbuka = True
+            print(f"Berhasil membuka database SQLite '{self._path}' (journal_mode={mode['journal_mode']}).")
+        except sqlite3.Error as err:
+            print(f"Kesalahan membuka database SQLite: {err}")
+            if self._parent_window and self._parent_window.winfo_exists():
+                messagebox.showerror("Kesalahan Database", f"Tidak dapat membuka database SQLite '{self._path}': {err}", parent=self._parent_window)
+            self._terbuka = False
+
+    def _conn(self):
+        """Koneksi milik thread ini; dibuat saat pertama kali dibutuhkan."""
+        conn = getattr(self._lokal, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=self._timeout, isolation_level=None,
+                                   check_same_thread=False, cached_statements=256)
+            conn.row_factory = _baris_dict
+            sesi = {'user_aksi': None, 'audit_nonaktif': 0, 'tingkat': []}
+            # Pengganti variabel sesi @session_user_aksi / @audit_nonaktif untuk trigger audit.
+            conn.create_function("sesi_user_aksi", 0, lambda: sesi['user_aksi'])
+            conn.create_function("sesi_audit_nonaktif", 0, lambda: sesi['audit_nonaktif'])
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._lokal.conn, self._lokal.sesi = conn, sesi
+            with self._lock_koneksi:
+                self._semua_koneksi.append(conn)
+        return conn
+
+    def is_connected(self):
+        return self._terbuka
+
+    def _close(self):
+        """Menutup semua koneksi SQLite yang dibuka oleh thread mana pun."""
+        if not self._terbuka: return
+        self._terbuka = False
+        with self._lock_koneksi:
+            daftar, self._semua_koneksi = self._semua_koneksi, []
+        for conn in daftar:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._statistik_kueri.tutup()
+        print("Koneksi SQLite ditutup.")
+
+    @contextmanager
+    def _transaksi(self, user_aksi=None, tanpa_audit=False):
+        """
+        Transaksi tulis (BEGIN IMMEDIATE: kunci tulis diambil di awal sehingga pemeriksaan kapasitas dan
+        penulisan tidak bisa disela penulis lain). Commit jika blok selesai, rollback jika melempar exception.
+        Di dalam transaksi yang sudah berjalan di thread ini, blok berjalan di atas SAVEPOINT: exception atau
+        _batalkan_transaksi() di dalamnya hanya membatalkan blok itu sendiri. Jangan memanggil conn.rollback()
+        di dalam blok; untuk membatalkan isi blok (misalnya saat validasi gagal) gunakan _batalkan_transaksi().
+        Fungsi yang didaftarkan lewat _setelah_commit() dijalankan setelah commit berhasil, dan dibuang bersama
+        blok yang dibatalkan.
+        """
+        conn = self._conn()
+        sesi = self._lokal.sesi
+        if sesi['tingkat']:
+            yield from self._transaksi_bersarang(conn, sesi)
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        tingkat = {'savepoint': None, 'setelah_commit': []}
+        sesi['tingkat'].append(tingkat)
+        sesi['user_aksi'], sesi['audit_nonaktif'] = user_aksi, 1 if tanpa_audit else 0
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            sesi['tingkat'].pop()
+            sesi['user_aksi'], sesi['audit_nonaktif'] = None, 0
+        for fungsi in tingkat['setelah_commit']:
+            fungsi()
+
+    def _transaksi_bersarang(self, conn, sesi):
+        induk = sesi['tingkat'][-1]
+        tingkat = {'savepoint': f"sp_transaksi_{len(sesi['tingkat'])}", 'setelah_commit': []}
+        conn.execute(f"SAVEPOINT {tingkat['savepoint']}")
+        sesi['tingkat'].append(tingkat)
+        try:
+            yield conn
+            conn.execute(f"RELEASE {tingkat['savepoint']}")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute(f"ROLLBACK TO {tingkat['savepoint']}")
+                conn.execute(f"RELEASE {tingkat['savepoint']}")
+            raise
+        finally:
+            sesi['tingkat'].pop()
+        induk['setelah_commit'] += tingkat['setelah_commit']
+
+    def _batalkan_transaksi(self):
+        """
+        Membatalkan semua perubahan blok _transaksi() terdalam milik thread ini tanpa menyentuh transaksi
+        pemanggil di luarnya; blok tetap dapat dilanjutkan lalu selesai normal.
+        """
+        conn, sesi = self._conn(), self._lokal.sesi
+        tingkat = sesi['tingkat'][-1]
+        if tingkat['savepoint']:
+            conn.execute(f"ROLLBACK TO {tingkat['savepoint']}")
+        else:
+            conn.execute("ROLLBACK")
+            conn.execute("BEGIN IMMEDIATE")
+        tingkat['setelah_commit'].clear()
+
+    def _setelah_commit(self, fungsi):
+        """Padanan DatabaseService._setelah_commit: menunda fungsi (invalidasi cache) sampai transaksi thread ini di-commit."""
+        self._conn()
+        tingkat = self._lokal.sesi['tingkat']
+        if tingkat:
+            tingkat[-1]['setelah_commit'].append(fungsi)
+        else:
+            fungsi()
+
+    def transaction(self, user_aksi=None):
+        """
+        Padanan DatabaseService.transaction(): blok transaksi tulis eksplisit, commit jika selesai dan rollback jika
+        melempar exception. Koneksi per thread berjalan autocommit di luar blok ini. Menghasilkan koneksi sqlite3
+        (bukan pasangan (conn, cursor) seperti backend MySQL).
+        """
+        return self._transaksi(user_aksi)
+
+    def _execute_query(self, query, params=(), fetch_one=False, fetch_all=False):
+        """Menjalankan satu kueri baca; mencetak kesalahan dan mengembalikan None jika gagal."""
+        if not self._terbuka:
+            print("Kesalahan Database: Database SQLite tidak terbuka.")
+            return None
+        try:
+            with self._statistik_kueri.ukur(query, params) as ukur:
+                cursor = self._conn().execute(query, params)
+                if fetch_one:
+                    row = cursor.fetchone()
+                    ukur.catat_baris(1 if row else 0)
+                    return row
+                if fetch_all:
+                    rows = cursor.fetchall()
+                    ukur.catat_baris(len(rows))
+                    return rows
+                ukur.catat_baris(cursor.rowcount)
+                return True
+        except sqlite3.Error as err:
+            print(f"Kesalahan kueri SQLite: {err}\nKueri: {query}\nParams: {params}")
+            if self._conn().in_transaction:
+                raise
+            return None
+
+    # --- Skema dan data awal ---
+    def _initialize_database_schema(self):
+        """Menerapkan langkah schema_sqlite yang berubah, dengan checksum di SchemaVersi seperti versi MySQL."""
+        checksum_bundel = schema.checksum_bundel(schema_sqlite.LANGKAH_SKEMA)
+        conn = self._conn()
+        try:
+            conn.execute(schema_sqlite.DDL_TABEL_VERSI)
+            row = conn.execute("SELECT checksum FROM SchemaVersi WHERE komponen = ?", (schema_sqlite.NAMA_BUNDEL,)).fetchone()
+            if row and row['checksum'] == checksum_bundel:
+                print("Skema database sudah terbaru.")
+                return
+            with self._transaksi():
+                tercatat = {r['komponen']: r['checksum'] for r in conn.execute("SELECT komponen, checksum FROM SchemaVersi")}
+                langkah_berubah = [(nama, pernyataan, schema.checksum_langkah(pernyataan))
+                                   for nama, pernyataan in schema_sqlite.LANGKAH_SKEMA
+                                   if tercatat.get(nama) != schema.checksum_langkah(pernyataan)]
+                print(f"Memulai migrasi skema database: {len(langkah_berubah)} dari {len(schema_sqlite.LANGKAH_SKEMA)} langkah perlu diterapkan...")
+                for nama, pernyataan, checksum in langkah_berubah:
+                    for stmt in pernyataan:
+                        conn.execute(stmt)
+                    conn.execute("REPLACE INTO SchemaVersi (komponen, checksum) VALUES (?, ?)", (nama, checksum))
+                conn.execute("REPLACE INTO SchemaVersi (komponen, checksum) VALUES (?, ?)", (schema_sqlite.NAMA_BUNDEL, checksum_bundel))
+            print("Inisialisasi skema database selesai.")
+        except sqlite3.Error as err:
+            print(f"Kesalahan saat inisialisasi skema database: {err}")
+
+    def kelola_partisi_audit(self, retensi_bulan=None, bulan_ke_depan=3, hari_ini=None):
+        """
+        SQLite tidak mendukung partisi: retensi dijalankan dengan DELETE baris log yang lebih tua dari
+        retensi_bulan bulan (termasuk bulan ini), memakai indeks waktu_aksi. bulan_ke_depan diabaikan.
+        Mengembalikan {tabel: {'dibuat': [], 'dihapus': [], 'baris_dihapus': n}}, atau None jika gagal.
+        """
+        if not self._terbuka: return None
+        ringkasan = {tabel: {'dibuat': [], 'dihapus': [], 'baris_dihapus': 0} for tabel in schema_sqlite.TABEL_AUDIT}
+        if not retensi_bulan:
+            return ringkasan
+        hari_ini = hari_ini or datetime.date.today()
+        tahun, bulan = schema.geser_bulan((hari_ini.year, hari_ini.month), -(int(retensi_bulan) - 1))
+        batas = f"{tahun:04d}-{bulan:02d}-01 00:00:00"
+        try:
+            with self._transaksi() as conn:
+                for tabel in schema_sqlite.TABEL_AUDIT:
+                    ringkasan[tabel]['baris_dihapus'] = conn.execute(f"DELETE FROM {tabel} WHERE waktu_aksi < ?", (batas,)).rowcount
+                    if ringkasan[tabel]['baris_dihapus']:
+                        print(f"Log {tabel} sebelum {batas} dihapus ({ringkasan[tabel]['baris_dihapus']} baris, retensi {retensi_bulan} bulan).")
+            return ringkasan
+        except sqlite3.Error as err:
+            print(f"Kesalahan saat menerapkan retensi log audit: {err}")
+            return None
+
+    def _populate_initial_master_data_if_empty(self):
+        if not self._terbuka: return
+        try:
+            status_isi = self._conn().execute("""SELECT EXISTS(SELECT 1 FROM Asrama) AS ada_asrama, EXISTS(SELECT 1 FROM Fakultas) AS ada_fakultas,
+                                                        EXISTS(SELECT 1 FROM Kamar) AS ada_kamar, EXISTS(SELECT 1 FROM PenggunaAplikasi) AS ada_pengguna""").fetchone()
+            if not (status_isi['ada_asrama'] and status_isi['ada_fakultas'] and status_isi['ada_kamar']):
+                self.seed_master_data(self._seed_tata_letak, tanpa_audit=self._seed_tanpa_audit,
+                                      isi_asrama=not status_isi['ada_asrama'],
+                                      isi_fakultas=not status_isi['ada_fakultas'],
+                                      isi_kamar=not status_isi['ada_kamar'])
+            if not status_isi['ada_pengguna']:
+                print("Membuat pengguna admin default...")
+                sukses, pesan = self.register_user("admin", "adminpassword")
+                print(f"Pengguna admin default 'admin' berhasil dibuat: {pesan}" if sukses else f"Gagal membuat pengguna admin default: {pesan}")
+        except sqlite3.Error as e:
+            print(f"Kesalahan saat mengisi data master awal: {e}")
+
+    def seed_master_data(self, tata_letak=None, tanpa_audit=False, isi_asrama=True, isi_fakultas=True, isi_kamar=True, ukuran_batch=1000):
+        """Sama seperti DatabaseService.seed_master_data; melempar sqlite3.Error (setelah rollback) jika gagal."""
+        tata_letak = tata_letak or seeding.TATA_LETAK_DEFAULT
+        muatan = []
+        if isi_asrama:
+            muatan.append(("Asrama", "INSERT INTO Asrama (asrama_id, nama_asrama) VALUES (?, ?)", seeding.baris_asrama(tata_letak)))
+        if isi_fakultas:
+            muatan.append(("Fakultas", "INSERT INTO Fakultas (nama_fakultas) VALUES (?)", seeding.baris_fakultas(tata_letak)))
+        if isi_kamar:
+            muatan.append(("Kamar", "INSERT INTO Kamar (nomor_kamar, asrama_id, kapasitas) VALUES (?, ?, ?)", seeding.baris_kamar(tata_letak)))
+        jumlah = {}
+        with self._transaksi(tanpa_audit=tanpa_audit) as conn:
+            for tabel, query, rows in muatan:
+                for i in range(0, len(rows), ukuran_batch):
+                    conn.executemany(query, rows[i:i + ukuran_batch])
+                jumlah[tabel] = len(rows)
+        self._cache.hapus_semua()
+        for tabel, total in jumlah.items():
+            print(f"Data awal {tabel} dimasukkan ({total} baris).")
+        return jumlah
+
+    # --- Pengguna ---
+    def register_user(self, username, password):
+        if not username or not password:
+            return False, "Username dan password tidak boleh kosong."
+        if not self._terbuka:
+            return False, "Kesalahan koneksi database internal (database SQLite tidak terbuka)."
+        try:
+            with self._transaksi() as conn:
+                if conn.execute("SELECT 1 FROM PenggunaAplikasi WHERE username = ?", (username,)).fetchone():
+                    return False, "Username sudah terdaftar."
+                conn.execute("INSERT INTO PenggunaAplikasi (username, password_hash) VALUES (?, ?)", (username, password))
+            return True, "Registrasi berhasil."
+        except sqlite3.Error as err:
+            msg = f"Gagal melakukan registrasi: {err}"
+            print(f"ERROR: {msg}")
+            return False, msg
+
+    def login_user(self, username, password):
+        if not username or not password:
+            return None, None, "Username dan password tidak boleh kosong."
+        if not self._terbuka:
+            return None, None, "Kesalahan koneksi database internal."
+        try:
+            row = self._conn().execute("SELECT id, username, password_hash FROM PenggunaAplikasi WHERE username = ?", (username,)).fetchone()
+        except sqlite3.Error as err:
+            msg = f"Kesalahan Database saat login: {err}"
+            print(f"ERROR: {msg}")
+            return None, None, msg
+        if not row:
+            return None, None, "Username tidak ditemukan."
+        if row['password_hash'] != password:
+            return None, None, "Password salah."
+        return row['id'], row['username'], "Login berhasil."
+
+    # --- Penghuni ---
+    def _id_kamar(self, conn, nomor_kamar, asrama_id):
+        row = conn.execute("SELECT kamar_id_internal FROM Kamar WHERE nomor_kamar = ? AND asrama_id = ?", (nomor_kamar, asrama_id)).fetchone()
+        return row['kamar_id_internal'] if row else None
+
+    def _pastikan_fakultas(self, conn, nama_fakultas):
+        """{nama_fakultas: fakultas_id} untuk nama-nama yang diberikan; yang belum ada ditambahkan."""
+        nama_fakultas = sorted(set(nama_fakultas))
+        if not nama_fakultas:
+            return {}
+        if conn.executemany("INSERT OR IGNORE INTO Fakultas (nama_fakultas) VALUES (?)", [(n,) for n in nama_fakultas]).rowcount > 0:
+            self._setelah_commit(lambda: self._cache.hapus(("fakultas",)))
+        rows = conn.execute(f"SELECT fakultas_id, nama_fakultas FROM Fakultas WHERE nama_fakultas IN ({_placeholder(len(nama_fakultas))})", nama_fakultas)
+        return {r['nama_fakultas']: r['fakultas_id'] for r in rows}
+
+    def _tambah_penghuni(self, conn, nim, nama, nama_fakultas, nomor_kamar, asrama_id):
+        """Logika sp_TambahPenghuni; mengembalikan (status_code, status_message)."""
+        if not nim or not str(nim).isdigit():
+            return 5, "Gagal: NIM tidak valid (harus berupa angka dan tidak boleh kosong)."
+        fakultas_id = self._pastikan_fakultas(conn, [nama_fakultas]).get(nama_fakultas) if nama_fakultas else None
+        kamar = conn.execute("SELECT kamar_id_internal, kapasitas, occupied FROM Kamar WHERE nomor_kamar = ? AND asrama_id = ?",
+                             (nomor_kamar, asrama_id)).fetchone()
+        if not kamar:
+            return 1, "Gagal: Kamar tidak ditemukan."
+        if kamar['occupied'] >= kamar['kapasitas']:
+            return 2, "Gagal: Kamar sudah penuh."
+        if conn.execute("SELECT 1 FROM Penghuni WHERE nim = ?", (nim,)).fetchone():
+            return 3, f"Gagal: NIM {nim} sudah terdaftar."
+        conn.execute("INSERT INTO Penghuni (nim, nama_penghuni, fakultas_id, kamar_id_internal) VALUES (?, ?, ?, ?)",
+                     (nim, nama, fakultas_id, kamar['kamar_id_internal']))
+        return 0, "Sukses: Penghuni berhasil ditambahkan."
+
+    def add_penghuni(self, nim, nama, nama_fakultas, nomor_kamar_val, asrama_id_val, user_aksi):
+        if not self._terbuka:
+            messagebox.showerror("Kesalahan Database", "Database SQLite tidak terbuka.", parent=self._parent_window)
+            return False
+        try:
+            with self._transaksi(user_aksi) as conn:
+                status_code, status_message = self._tambah_penghuni(conn, nim, nama, nama_fakultas, nomor_kamar_val, asrama_id_val)
+                if status_code != 0:
+                    self._batalkan_transaksi()  # fakultas baru ikut dibatalkan, seperti sp_TambahPenghuni tanpa commit
+        except sqlite3.Error as err:
+            messagebox.showerror("Kesalahan Database", f"Gagal menambah penghuni: {err}", parent=self._parent_window)
+            return False
+        if status_code == 0:
+            messagebox.showinfo("Sukses", status_message, parent=self._parent_window)
+            return True
+        messagebox.showerror("Gagal Menambah Penghuni", status_message, parent=self._parent_window)
+        return False
+
+    def _pindah_kamar(self, conn, nim, nomor_kamar_baru, asrama_id_baru):
+        """Logika sp_PindahKamarPenghuni; mengembalikan (status_code, status_message)."""
+        if not nim or not str(nim).isdigit():
+            return 5, "Gagal: NIM tidak valid (harus berupa angka dan tidak boleh kosong)."
+        penghuni = conn.execute("SELECT kamar_id_internal FROM Penghuni WHERE nim = ?", (nim,)).fetchone()
+        if not penghuni:
+            return 1, "Gagal: Penghuni dengan NIM tersebut tidak ditemukan."
+        kamar = conn.execute("SELECT kamar_id_internal, kapasitas, occupied FROM Kamar WHERE nomor_kamar = ? AND asrama_id = ?",
+                             (nomor_kamar_baru, asrama_id_baru)).fetchone()
+        if not kamar:
+            return 2, "Gagal: Kamar tujuan tidak ditemukan."
+        if kamar['kamar_id_internal'] == penghuni['kamar_id_internal']:
+            return 0, "Info: Penghuni sudah berada di kamar tujuan."
+        if kamar['occupied'] >= kamar['kapasitas']:
+            return 3, "Gagal: Kamar tujuan sudah penuh."
+        conn.execute("UPDATE Penghuni SET kamar_id_internal = ? WHERE nim = ?", (kamar['kamar_id_internal'], nim))
+        return 0, "Sukses: Penghuni berhasil dipindahkan."
+
+    def pindah_kamar_penghuni(self, nim, nomor_kamar_baru, asrama_id_baru, user_aksi):
+        if not self._terbuka:
+            messagebox.showerror("Kesalahan Database", "Database SQLite tidak terbuka.", parent=self._parent_window)
+            return False, "Tidak ada koneksi database."
+        try:
+            with self._transaksi(user_aksi) as conn:
+                status_code, status_message = self._pindah_kamar(conn, nim, nomor_kamar_baru, asrama_id_baru)
+                if status_code != 0:
+                    self._batalkan_transaksi()
+        except sqlite3.Error as err:
+            messagebox.showerror("Kesalahan Database", f"Gagal memindahkan penghuni: {err}", parent=self._parent_window)
+            return False, str(err)
+        if status_code == 0:
+            judul = "Info Pindah Kamar" if "Info:" in status_message else "Sukses Pindah Kamar"
+            messagebox.showinfo(judul, status_message, parent=self._parent_window)
+            return True, status_message
+        messagebox.showerror("Gagal Pindah Kamar", status_message, parent=self._parent_window)
+        return False, status_message
+
+    def pindah_kamar_batch(self, daftar_pindah, user_aksi):
+        """Sama seperti DatabaseService.pindah_kamar_batch; seluruh batch berjalan dalam satu transaksi tulis."""
+        if not self._terbuka:
+            messagebox.showerror("Kesalahan Database", "Database SQLite tidak terbuka.", parent=self._parent_window)
+            return False, "Tidak ada koneksi database."
+        if not daftar_pindah:
+            return False, "Tidak ada penghuni yang dipindahkan."
+        try:
+            with self._transaksi(user_aksi) as conn:
+                sukses, pesan = self._pindah_kamar_batch(conn, list(daftar_pindah))
+                if not sukses:
+                    self._batalkan_transaksi()
+        except sqlite3.Error as err:
+            messagebox.showerror("Kesalahan Database", f"Gagal memindahkan penghuni: {err}", parent=self._parent_window)
+            return False, str(err)
+        if sukses:
+            messagebox.showinfo("Sukses Pindah Kamar", pesan, parent=self._parent_window)
+        else:
+            messagebox.showerror("Gagal Pindah Kamar", pesan, parent=self._parent_window)
+        return sukses, pesan
+
+    def _pindah_kamar_batch(self, conn, daftar_pindah):
+        kesalahan, daftar = [], []
+        for nim, asrama_id, nomor in daftar_pindah:
+            nim = str(nim)
+            if not nim.isdigit():
+                kesalahan.append(f"NIM {nim or '(kosong)'} tidak valid.")
+            try:
+                daftar.append((nim, int(asrama_id), int(nomor)))
+            except (TypeError, ValueError):
+                kesalahan.append(f"Kamar tujuan {nomor or '(kosong)'} di asrama {asrama_id or '(kosong)'} tidak valid (NIM {nim}).")
+        daftar_nim = [nim for nim, _, _ in daftar]
+        ganda = sorted({nim for nim in daftar_nim if daftar_nim.count(nim) > 1})
+        if ganda:
+            kesalahan.append(f"NIM muncul lebih dari sekali: {', '.join(ganda)}.")
+        if kesalahan:
+            return False, "Gagal: " + " ".join(kesalahan)
+
+        kamar_asal = {r['nim']: r['kamar_id_internal'] for r in conn.execute(
+            f"SELECT nim, kamar_id_internal FROM Penghuni WHERE nim IN ({_placeholder(len(daftar_nim))})", daftar_nim)}
+        kamar = {(r['nomor_kamar'], r['asrama_id']): r for r in conn.execute(
+            "SELECT kamar_id_internal, nomor_kamar, asrama_id, kapasitas, occupied FROM Kamar")}
+        per_id = {r['kamar_id_internal']: r for r in kamar.values()}
+
+        pindah = {}
+        for nim, asrama_id, nomor in daftar:
+            tujuan = kamar.get((nomor, asrama_id))
+            if nim not in kamar_asal:
+                kesalahan.append(f"Penghuni dengan NIM {nim} tidak ditemukan.")
+            elif tujuan is None:
+                kesalahan.append(f"Kamar tujuan {nomor} di asrama {asrama_id} tidak ditemukan (NIM {nim}).")
+            elif tujuan['kamar_id_internal'] != kamar_asal[nim]:
+                pindah[nim] = tujuan['kamar_id_internal']
+        if kesalahan:
+            return False, "Gagal: " + " ".join(kesalahan)
+        if not pindah:
+            return True, "Info: Semua penghuni sudah berada di kamar tujuan."
+
+        perubahan = {}
+        for nim, tujuan in pindah.items():
+            perubahan[kamar_asal[nim]] = perubahan.get(kamar_asal[nim], 0) - 1
+            perubahan[tujuan] = perubahan.get(tujuan, 0) + 1
+        for id_kamar in sorted(perubahan):
+            bersih, k = perubahan[id_kamar], per_id[id_kamar]
+            if bersih > 0 and k['occupied'] + bersih > k['kapasitas']:
+                kesalahan.append(f"Kamar {k['nomor_kamar']} hanya memiliki {max(0, k['kapasitas'] - k['occupied'])} "
+                                 f"tempat kosong, tetapi batch menambah {bersih} penghuni.")
+        if kesalahan:
+            return False, "Gagal: " + " ".join(kesalahan)
+
+        conn.executemany("UPDATE Penghuni SET kamar_id_internal = ? WHERE nim = ?", [(tujuan, nim) for nim, tujuan in pindah.items()])
+        return True, f"Sukses: {len(pindah)} penghuni berhasil dipindahkan."
+
+    def update_penghuni(self, nim_original, nim_baru, nama_baru, nama_fakultas_baru, user_aksi):
+        if not self._terbuka:
+            messagebox.showerror("Kesalahan Database", "Database SQLite tidak terbuka.", parent=self._parent_window)
+            return "ERROR_CONNECTION"
+        try:
+            with self._transaksi(user_aksi) as conn:
+                kode, pesan = self._update_penghuni(conn, nim_original, nim_baru, nama_baru, nama_fakultas_baru)
+                if kode != "SUCCESS_DATA_CHANGED":
+                    self._batalkan_transaksi()
+        except sqlite3.Error as err:
+            messagebox.showerror("Kesalahan Database", f"Gagal mengubah data penghuni: {err}", parent=self._parent_window)
+            return "ERROR_UPDATE_FAILED"
+        # Dialog ditampilkan setelah transaksi selesai agar kunci tulis tidak tertahan selama dialog terbuka.
+        tampilkan, judul = DIALOG_UPDATE_PENGHUNI.get(kode, (messagebox.showerror, "Kesalahan"))
+        tampilkan(judul, pesan, parent=self._parent_window)
+        return kode
+
+    def _update_penghuni(self, conn, nim_original, nim_baru, nama_baru, nama_fakultas_baru):
+        """Logika sp_UpdatePenghuni di dalam transaksi tulis pemanggil; mengembalikan (kode status, pesan)."""
+        lama = conn.execute("SELECT nim, nama_penghuni, fakultas_id FROM Penghuni WHERE nim = ?", (nim_original,)).fetchone()
+        if not lama:
+            return "ERROR_NIM_ORIGINAL_NOT_FOUND", f"Tidak ada data penghuni yang cocok dengan NIM original: {nim_original}."
+        baru = {}
+        if nim_baru and nim_original != nim_baru:
+            if not nim_baru.isdigit():
+                return "ERROR_INVALID_NIM_FORMAT", "NIM baru harus berupa angka."
+            if conn.execute("SELECT 1 FROM Penghuni WHERE nim = ?", (nim_baru,)).fetchone():
+                return "ERROR_NIM_CONFLICT", f"NIM baru '{nim_baru}' sudah digunakan oleh penghuni lain."
+            baru['nim'] = nim_baru
+        if nama_baru:
+            baru['nama_penghuni'] = nama_baru
+        if nama_fakultas_baru is not None:
+            baru['fakultas_id'] = self._pastikan_fakultas(conn, [nama_fakultas_baru]).get(nama_fakultas_baru) if nama_fakultas_baru else None
+        if not baru:
+            return "SUCCESS_NO_CHANGE", "Tidak ada data yang akan diubah (semua input kosong atau sama dengan data lama)."
+        berubah = {kolom: nilai for kolom, nilai in baru.items() if lama[kolom] != nilai}
+        if not berubah:
+            return "SUCCESS_NO_ACTUAL_CHANGE", "Tidak ada perubahan aktual pada data (data baru mungkin sama dengan data lama)."
+        conn.execute(f"UPDATE Penghuni SET {', '.join(f'{kolom} = ?' for kolom in berubah)} WHERE nim = ?",
+                     list(berubah.values()) + [nim_original])
+        return "SUCCESS_DATA_CHANGED", "Data penghuni berhasil diubah."
+
+    def delete_penghuni(self, nim, user_aksi):
+        if not self._terbuka:
+            messagebox.showerror("Kesalahan Database", "Database SQLite tidak terbuka.", parent=self._parent_window)
+            return False
+        try:
+            with self._transaksi(user_aksi) as conn:
+                rowcount = conn.execute("DELETE FROM Penghuni WHERE nim = ?", (nim,)).rowcount
+        except sqlite3.Error as err:
+            messagebox.showerror("Kesalahan Database", f"Gagal menghapus penghuni: {err}", parent=self._parent_window)
+            return False
+        if rowcount > 0:
+            messagebox.showinfo("Sukses", f"Data penghuni dengan NIM {nim} berhasil dihapus.", parent=self._parent_window)
+            return True
+        messagebox.showwarning("Gagal", f"Penghuni dengan NIM {nim} tidak ditemukan.", parent=self._parent_window)
+        return False
+
+    def impor_penghuni_csv(self, sumber, user_aksi, ukuran_chunk=500):
+        """
+        Sama seperti DatabaseService.impor_penghuni_csv. Setiap chunk diperiksa dan dimasukkan dalam satu
+        transaksi tulis, sehingga pemeriksaan NIM dan kapasitas tidak perlu diulang.
+        """
+        mulai = time.monotonic()
+        ringkasan = {'total': 0, 'diterima': 0, 'ditolak': [], 'durasi_detik': 0.0}
+        def tolak(data, alasan):
+            ringkasan['ditolak'].append({'baris': data['baris'], 'nim': data.get('nim', ''), 'alasan': alasan})
+
+        asrama_per_nama = {a['nama_asrama']: a['asrama_id'] for a in self.get_all_asrama()}
+        kandidat, nim_di_file = [], set()
+        for nomor_baris, baris in impor_csv.baca_csv_penghuni(sumber):
+            ringkasan['total'] += 1
+            data, alasan = impor_csv.normalisasi_baris(baris, asrama_per_nama)
+            if alasan:
+                tolak({'baris': nomor_baris, 'nim': baris.get('nim', '')}, alasan)
+            elif data['nim'] in nim_di_file:
+                tolak(dict(data, baris=nomor_baris), "NIM ganda di dalam file.")
+            else:
+                nim_di_file.add(data['nim'])
+                kandidat.append(dict(data, baris=nomor_baris))
+
+        for i in range(0, len(kandidat), ukuran_chunk):
+            chunk = kandidat[i:i + ukuran_chunk]
+            with self._transaksi(user_aksi) as conn:
+                daftar_nim = [d['nim'] for d in chunk]
+                terdaftar = {r['nim'] for r in conn.execute(f"SELECT nim FROM Penghuni WHERE nim IN ({_placeholder(len(daftar_nim))})", daftar_nim)}
+                kamar = {(r['nomor_kamar'], r['asrama_id']): r for r in conn.execute(
+                    "SELECT kamar_id_internal, nomor_kamar, asrama_id, kapasitas, occupied FROM Kamar")}
+                sisa = {r['kamar_id_internal']: r['kapasitas'] - r['occupied'] for r in kamar.values()}
+                diterima = []
+                for data in chunk:
+                    k = kamar.get((data['nomor_kamar'], data['asrama_id']))
+                    if data['nim'] in terdaftar:
+                        tolak(data, f"NIM {data['nim']} sudah terdaftar.")
+                    elif not k:
+                        tolak(data, f"Kamar {data['nomor_kamar']} di asrama {data['asrama_id']} tidak ditemukan.")
+                    elif sisa[k['kamar_id_internal']] <= 0:
+                        tolak(data, f"Kamar {data['nomor_kamar']} sudah penuh.")
+                    else:
+                        sisa[k['kamar_id_internal']] -= 1
+                        diterima.append(dict(data, kamar_id_internal=k['kamar_id_internal']))
+                fakultas_id = self._pastikan_fakultas(conn, [d['fakultas'] for d in diterima if d['fakultas']])
+                conn.executemany("INSERT INTO Penghuni (nim, nama_penghuni, fakultas_id, kamar_id_internal) VALUES (?, ?, ?, ?)",
+                                 [(d['nim'], d['nama_penghuni'], fakultas_id.get(d['fakultas']), d['kamar_id_internal']) for d in diterima])
+                ringkasan['diterima'] += len(diterima)
+
+        ringkasan['ditolak'].sort(key=lambda t: t['baris'])
+        ringkasan['durasi_detik'] = round(time.monotonic() - mulai, 3)
+        print(f"Impor penghuni selesai: {ringkasan['diterima']} diterima, {len(ringkasan['ditolak'])} ditolak dari {ringkasan['total']} baris ({ringkasan['durasi_detik']} detik).")
+        return ringkasan
+
+    def _nim_terdaftar(self, conn, daftar_nim, ukuran_batch=500):
+        terdaftar = set()
+        for i in range(0, len(daftar_nim), ukuran_batch):
+            batch = daftar_nim[i:i + ukuran_batch]
+            terdaftar.update(r['nim'] for r in conn.execute(f"SELECT nim FROM Penghuni WHERE nim IN ({_placeholder(len(batch))})", batch))
+        return terdaftar
+
+    def rencanakan_alokasi(self, sumber, asrama_id=None, kelompok_fakultas=True, satukan_grup=True):
+        """Sama seperti DatabaseService.rencanakan_alokasi; melempar sqlite3.Error jika database gagal."""
+        mulai = time.monotonic()
+        asrama_per_nama = {a['nama_asrama']: a['asrama_id'] for a in self.get_all_asrama()}
+        calon, ditolak, total = alokasi.baca_calon_penghuni(sumber, asrama_per_nama)
+        conn = self._conn()
+        nim_terdaftar = self._nim_terdaftar(conn, [c['nim'] for c in calon])
+        fakultas_per_kamar = collections.defaultdict(set)
+        for row in conn.execute("""SELECT P.kamar_id_internal, F.nama_fakultas FROM Penghuni P
+                                   JOIN Kamar K ON P.kamar_id_internal = K.kamar_id_internal
+                                   JOIN Fakultas F ON P.fakultas_id = F.fakultas_id
+                                   WHERE K.sisa_kapasitas > 0"""):
+            fakultas_per_kamar[row['kamar_id_internal']].add(row['nama_fakultas'])
+        ditolak += [{'baris': c['baris'], 'nim': c['nim'], 'alasan': f"NIM {c['nim']} sudah terdaftar."} for c in calon if c['nim'] in nim_terdaftar]
+        calon = [c for c in calon if c['nim'] not in nim_terdaftar]
+        rencana = alokasi.rencanakan_alokasi(calon, self.cari_kamar_kosong(asrama_id), fakultas_per_kamar, kelompok_fakultas, satukan_grup)
+        rencana.update(total=total, ditolak=sorted(ditolak, key=lambda t: t['baris']), durasi_detik=round(time.monotonic() - mulai, 3))
+        print(f"Rencana alokasi: {len(rencana['penempatan'])} ditempatkan di {rencana['jumlah_kamar']} kamar, "
+              f"{len(rencana['tidak_ditempatkan'])} tanpa kamar, {len(ditolak)} ditolak ({rencana['durasi_detik']} detik).")
+        return rencana
+
+    def terapkan_alokasi(self, rencana, user_aksi):
+        """Sama seperti DatabaseService.terapkan_alokasi; pemeriksaan ulang dan INSERT berjalan dalam satu transaksi tulis."""
+        penempatan = rencana['penempatan']
+        if not penempatan:
+            return False, "Tidak ada penghuni yang ditempatkan dalam rencana."
+        kebutuhan = collections.Counter(p['kamar_id_internal'] for p in penempatan)
+        with self._transaksi(user_aksi) as conn:
+            id_kamar = sorted(kebutuhan)
+            kamar = {}
+            for i in range(0, len(id_kamar), 500):
+                batch = id_kamar[i:i + 500]
+                kamar.update((k['kamar_id_internal'], k) for k in conn.execute(
+                    f"SELECT kamar_id_internal, nomor_kamar, asrama_id, sisa_kapasitas FROM Kamar WHERE kamar_id_internal IN ({_placeholder(len(batch))})", batch))
+            kesalahan = [f"Kamar {p['nomor_kamar']} {p['nama_asrama']} sudah tidak ada." for p in penempatan
+                         if p['kamar_id_internal'] not in kamar]
+            kesalahan += [f"Kamar {k['nomor_kamar']} (asrama {k['asrama_id']}) tinggal {k['sisa_kapasitas']} tempat, rencana {kebutuhan[kamar_id]}."
+                          for kamar_id, k in kamar.items() if k['sisa_kapasitas'] < kebutuhan[kamar_id]]
+            kesalahan += [f"NIM {nim} sudah terdaftar." for nim in sorted(self._nim_terdaftar(conn, [p['nim'] for p in penempatan]))]
+            if kesalahan:
+                self._batalkan_transaksi()
+                contoh = "\n".join(kesalahan[:10]) + (f"\n... dan {len(kesalahan) - 10} lainnya." if len(kesalahan) > 10 else "")
+                return False, f"Data kamar/penghuni berubah sejak rencana dibuat; buat ulang rencana.\n{contoh}"
+            fakultas_id = self._pastikan_fakultas(conn, [p['fakultas'] for p in penempatan if p['fakultas']])
+            conn.executemany("INSERT INTO Penghuni (nim, nama_penghuni, fakultas_id, kamar_id_internal) VALUES (?, ?, ?, ?)",
+                             [(p['nim'], p['nama_penghuni'], fakultas_id.get(p['fakultas']), p['kamar_id_internal']) for p in penempatan])
+        return True, f"Sukses: {len(penempatan)} penghuni ditempatkan di {len(kebutuhan)} kamar."
+
+    # --- Riwayat dan ekspor ---
+    @staticmethod
+    def kursor_log(log):
+        """Kursor halaman (waktu_aksi, log_id) dari satu baris log audit."""
+        return (log['waktu_aksi'], log['log_id'])
+
+    def _get_audit_log(self, jenis, limit, sebelum, sesudah, sejak_log_id=None, celah=()):
+        if sum(kursor is not None for kursor in (sebelum, sesudah, sejak_log_id)) > 1:
+            raise ValueError("Gunakan salah satu dari 'sebelum', 'sesudah', atau 'sejak_log_id'.")
+        if sebelum is not None:
+            query, params = kueri_log_audit(jenis, "sebelum"), (sebelum[0], sebelum[1], limit)
+        elif sesudah is not None:
+            query, params = kueri_log_audit(jenis, "sesudah"), (sesudah[0], sesudah[1], limit)
+        elif sejak_log_id is not None:
+            celah = sorted(celah)
+            query, params = kueri_log_audit(jenis, "sejak_log_id", len(celah)), (sejak_log_id, *celah, limit)
+        else:
+            query, params = kueri_log_audit(jenis), (limit,)
+        logs = self._execute_query(query, params, fetch_all=True) or []
+        if sesudah is not None or sejak_log_id is not None:
+            logs.reverse()
+        return logs
+
+    def get_audit_log_penghuni(self, limit=100, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        return self._get_audit_log("penghuni", limit, sebelum, sesudah, sejak_log_id, celah)
+
+    def get_audit_log_asrama(self, limit=100, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        return self._get_audit_log("asrama", limit, sebelum, sesudah, sejak_log_id, celah)
+
+    def get_audit_log_kamar(self, limit=100, sebelum=None, sesudah=None, sejak_log_id=None, celah=()):
+        return self._get_audit_log("kamar", limit, sebelum, sesudah, sejak_log_id, celah)
+
+    def ambil_perubahan(self, sejak=None, batas=umpan_perubahan.BATAS_BAWAAN):
+        """Padanan DatabaseService.ambil_perubahan dengan placeholder SQLite."""
+        if sejak is None:
+            return umpan_perubahan.hasil_awal(self._execute_query(umpan_perubahan.kueri_penanda_awal(), fetch_all=True))
+        query, params = umpan_perubahan.kueri_perubahan(sejak, batas, placeholder="?")
+        hasil = umpan_perubahan.ringkas_perubahan(sejak, self._execute_query(query, params, fetch_all=True), batas)
+        self._hapus_cache_perubahan(hasil)
+        return hasil
+
+    def _hapus_cache_perubahan(self, hasil):
+        """Menghapus cache daftar asrama/kamar/fakultas yang terdampak event umpan perubahan (termasuk dari klien lain)."""
+        kunci = [("kamar", asrama_id) for asrama_id in hasil['asrama']]
+        if any(row['sumber'] == "asrama" for row in hasil['perubahan']):
+            kunci.append(("asrama",))
+        for row in hasil['perubahan']:
+            if row['sumber'] == "kamar":
+                kunci += self._kunci_cache_kamar(row['kamar_lama'])
+        fakultas = self._cache.intip(("fakultas",))
+        if fakultas is not None:
+            dikenal = {f['nama_fakultas'] for f in fakultas}
+            if any(row['fakultas'] and row['fakultas'] not in dikenal for row in hasil['perubahan']):
+                kunci.append(("fakultas",))
+        if kunci:
+            self._cache.hapus(*kunci)
+
+    def periksa_rencana_kueri_audit(self, limit=100):
+        """Padanan versi MySQL dengan EXPLAIN QUERY PLAN; pakai_indeks False jika SQLite masih mengurutkan dengan B-tree sementara."""
+        hasil = {}
+        for jenis, (tabel, _) in KUERI_LOG_AUDIT.items():
+            for arah, params in ((None, (limit,)), ("sebelum", ("9999-12-31 23:59:59", 2**63 - 1, limit))):
+                rencana = self._execute_query("EXPLAIN QUERY PLAN " + kueri_log_audit(jenis, arah), params, fetch_all=True) or []
+                detail = " | ".join(r['detail'] for r in rencana)
+                indeks = next((kata for r in rencana for kata in r['detail'].split() if kata.startswith("idx_")), None)
+                pakai_indeks = indeks is not None and "TEMP B-TREE" not in detail.upper()
+                hasil[(jenis, arah)] = {'tabel': tabel, 'key': indeks, 'type': None, 'rows': None, 'extra': detail, 'pakai_indeks': pakai_indeks}
+                if not pakai_indeks:
+                    print(f"Peringatan: kueri log audit {jenis} ({arah or 'terbaru'}) tidak memakai indeks ({detail}).")
+        return hasil
+
+    def ekspor_data(self, jenis, path, format=None, kompres=None, ukuran_batch=1000):
+        """Sama seperti DatabaseService.ekspor_data; cursor SQLite membaca baris secara bertahap."""
+        if jenis not in SUMBER_EKSPOR:
+            raise ValueError(f"Jenis ekspor tidak dikenal: {jenis}.")
+        mulai = time.monotonic()
+        cursor = self._conn().cursor()
+        cursor.row_factory = None  # tuple, sesuai urutan kolom
+        try:
+            cursor.execute(SUMBER_EKSPOR[jenis])
+            with ekspor.PenulisEkspor(path, [kolom[0] for kolom in cursor.description], format, kompres) as penulis:
+                while True:
+                    batch = cursor.fetchmany(ukuran_batch)
+                    if not batch:
+                        break
+                    penulis.tulis(batch)
+        finally:
+            cursor.close()
+        print(f"Ekspor {jenis} selesai: {penulis.jumlah_baris} baris ke {path} ({time.monotonic() - mulai:.2f} detik).")
+        return penulis.jumlah_baris
+
+    # --- CRUD Asrama dan Kamar (logika sp_*Asrama / sp_*Kamar) ---
+    def _jalankan_crud(self, fungsi, args, kunci_cache=()):
+        """Menjalankan fungsi(conn, *args) -> (status_code, status_message) dalam satu transaksi; rollback jika gagal."""
+        if not self._terbuka:
+            return -1, "Error database: Database SQLite tidak terbuka."
+        try:
+            with self._transaksi(self._user_db) as conn:
+                status_code, status_message = fungsi(conn, *args)
+                if status_code != 0:
+                    self._batalkan_transaksi()
+                else:
+                    self._setelah_commit(lambda: self._cache.hapus(*kunci_cache))
+            return status_code, status_message
+        except sqlite3.Error as err:
+            return -1, f"Error database: {err}"
+
+    @staticmethod
+    def _tambah_asrama(conn, asrama_id, nama_asrama):
+        if asrama_id is None or not nama_asrama:
+            return 1, "Gagal: ID Asrama dan Nama Asrama tidak boleh kosong."
+        if conn.execute("SELECT 1 FROM Asrama WHERE asrama_id = ?", (asrama_id,)).fetchone():
+            return 2, f"Gagal: Asrama dengan ID {asrama_id} sudah ada."
+        if conn.execute("SELECT 1 FROM Asrama WHERE nama_asrama = ?", (nama_asrama,)).fetchone():
+            return 3, f"Gagal: Nama Asrama '{nama_asrama}' sudah digunakan."
+        conn.execute("INSERT INTO Asrama (asrama_id, nama_asrama) VALUES (?, ?)", (asrama_id, nama_asrama))
+        return 0, "Sukses: Asrama berhasil ditambahkan."
+
+    @staticmethod
+    def _update_asrama(conn, asrama_id, nama_asrama_baru):
+        if asrama_id is None or not nama_asrama_baru:
+            return 1, "Gagal: ID Asrama dan Nama Asrama baru tidak boleh kosong."
+        lama = conn.execute("SELECT nama_asrama FROM Asrama WHERE asrama_id = ?", (asrama_id,)).fetchone()
+        if not lama:
+            return 2, f"Gagal: Asrama dengan ID {asrama_id} tidak ditemukan."
+        if conn.execute("SELECT 1 FROM Asrama WHERE nama_asrama = ? AND asrama_id != ?", (nama_asrama_baru, asrama_id)).fetchone():
+            return 3, f"Gagal: Nama Asrama '{nama_asrama_baru}' sudah digunakan oleh asrama lain."
+        if lama['nama_asrama'] == nama_asrama_baru:
+            return 0, "Info: Tidak ada perubahan pada nama asrama (nama baru sama dengan nama lama)."
+        conn.execute("UPDATE Asrama SET nama_asrama = ? WHERE asrama_id = ?", (nama_asrama_baru, asrama_id))
+        return 0, "Sukses: Nama asrama berhasil diubah."
+
+    @staticmethod
+    def _hapus_asrama(conn, asrama_id):
+        if asrama_id is None:
+            return 1, "Gagal: ID Asrama tidak boleh kosong."
+        if conn.execute("SELECT 1 FROM Kamar WHERE asrama_id = ? LIMIT 1", (asrama_id,)).fetchone():
+            return 2, "Gagal: Asrama tidak dapat dihapus karena masih memiliki kamar. Hapus semua kamar di asrama ini terlebih dahulu."
+        if conn.execute("DELETE FROM Asrama WHERE asrama_id = ?", (asrama_id,)).rowcount > 0:
+            return 0, "Sukses: Asrama berhasil dihapus."
+        return 3, "Gagal: Asrama dengan ID tersebut tidak ditemukan."
+
+    @staticmethod
+    def _tambah_kamar(conn, nomor_kamar, asrama_id, kapasitas):
+        if nomor_kamar is None or asrama_id is None or kapasitas is None or kapasitas <= 0:
+            return 1, "Gagal: Nomor kamar, ID asrama, dan kapasitas (harus > 0) tidak boleh kosong."
+        if not conn.execute("SELECT 1 FROM Asrama WHERE asrama_id = ?", (asrama_id,)).fetchone():
+            return 2, "Gagal: Asrama dengan ID tersebut tidak ditemukan."
+        if conn.execute("SELECT 1 FROM Kamar WHERE nomor_kamar = ? AND asrama_id = ?", (nomor_kamar, asrama_id)).fetchone():
+            return 3, f"Gagal: Kamar nomor {nomor_kamar} sudah ada di asrama ini."
+        conn.execute("INSERT INTO Kamar (nomor_kamar, asrama_id, kapasitas) VALUES (?, ?, ?)", (nomor_kamar, asrama_id, kapasitas))
+        return 0, "Sukses: Kamar berhasil ditambahkan."
+
+    @staticmethod
+    def _update_kamar(conn, kamar_id_internal, nomor_kamar_baru, kapasitas_baru, asrama_id_konteks):
+        if kamar_id_internal is None or nomor_kamar_baru is None or kapasitas_baru is None or kapasitas_baru <= 0:
+            return 1, "Gagal: ID Kamar, Nomor Kamar baru, dan Kapasitas baru (harus > 0) tidak boleh kosong."
+        lama = conn.execute("SELECT nomor_kamar, kapasitas FROM Kamar WHERE kamar_id_internal = ?", (kamar_id_internal,)).fetchone()
+        if not lama:
+            return 2, "Gagal: Kamar dengan ID tersebut tidak ditemukan."
+        if conn.execute("SELECT 1 FROM Kamar WHERE nomor_kamar = ? AND asrama_id = ? AND kamar_id_internal != ?",
+                        (nomor_kamar_baru, asrama_id_konteks, kamar_id_internal)).fetchone():
+            return 3, f"Gagal: Nomor kamar {nomor_kamar_baru} sudah ada di asrama ini."
+        if (lama['nomor_kamar'], lama['kapasitas']) == (nomor_kamar_baru, kapasitas_baru):
+            return 0, "Info: Tidak ada perubahan pada detail kamar."
+        conn.execute("UPDATE Kamar SET nomor_kamar = ?, kapasitas = ? WHERE kamar_id_internal = ?", (nomor_kamar_baru, kapasitas_baru, kamar_id_internal))
+        return 0, "Sukses: Detail kamar berhasil diubah."
+
+    @staticmethod
+    def _hapus_kamar(conn, kamar_id_internal):
+        if kamar_id_internal is None:
+            return 1, "Gagal: ID Kamar tidak boleh kosong."
+        if conn.execute("SELECT 1 FROM Penghuni WHERE kamar_id_internal = ? LIMIT 1", (kamar_id_internal,)).fetchone():
+            return 2, "Gagal: Kamar tidak dapat dihapus karena masih memiliki penghuni. Hapus semua penghuni di kamar ini terlebih dahulu."
+        if conn.execute("DELETE FROM Kamar WHERE kamar_id_internal = ?", (kamar_id_internal,)).rowcount > 0:
+            return 0, "Sukses: Kamar berhasil dihapus."
+        return 3, "Gagal: Kamar dengan ID tersebut tidak ditemukan."
+
+    # --- Mode audit (lihat DatabaseService.atur_mode_audit) ---
+    def atur_mode_audit(self, mode):
+        """
+        Backend SQLite selalu memakai trigger: penulisan log di dalam transaksi lokal tidak menambah round trip,
+        dan satu penulis SQLite tambahan hanya akan bersaing memperebutkan kunci tulis yang sama.
+        """
+        if mode not in ("trigger", "aplikasi"):
+            raise ValueError(f"Mode audit tidak dikenal: {mode} (pilihan: trigger, aplikasi).")
+        if mode == "aplikasi":
+            print("Info: backend SQLite tidak mendukung mode audit aplikasi; log tetap ditulis oleh trigger.")
+
+    def get_mode_audit(self):
+        return "trigger"
+
+    def flush_audit(self, timeout=None):
+        return True
+
+    def get_audit_stats(self):
+        return None
+
+    # --- Statistik kueri (lihat DatabaseService.get_stats) ---
+    def get_stats(self):
+        return self._statistik_kueri.snapshot()
+
+    def atur_instrumentasi(self, **pengaturan):
+        self._statistik_kueri.atur(**pengaturan)
+
+    def reset_stats(self):
+        self._statistik_kueri.reset()
+
+    def get_cache_stats(self):
+        return self._cache.statistik()
+
+    def get_all_asrama(self):
+        return list(self._cache.ambil(("asrama",), lambda: self._execute_query(
+            "SELECT asrama_id, nama_asrama FROM Asrama ORDER BY nama_asrama", fetch_all=True)) or [])
+
+    def add_asrama(self, asrama_id, nama_asrama):
+        return self._jalankan_crud(self._tambah_asrama, (asrama_id, nama_asrama), [("asrama",)])
+
+    def update_asrama(self, asrama_id, nama_asrama_baru):
+        return self._jalankan_crud(self._update_asrama, (asrama_id, nama_asrama_baru), [("asrama",)])
+
+    def delete_asrama(self, asrama_id):
+        return self._jalankan_crud(self._hapus_asrama, (asrama_id,), [("asrama",), ("kamar", asrama_id)])
+
+    def get_all_kamar_in_asrama(self, asrama_id):
+        query = "SELECT kamar_id_internal, nomor_kamar, kapasitas FROM Kamar WHERE asrama_id = ? ORDER BY nomor_kamar"
+        return list(self._cache.ambil(("kamar", asrama_id), lambda: self._execute_query(query, (asrama_id,), fetch_all=True)) or [])
+
+    def add_kamar(self, nomor_kamar, asrama_id, kapasitas):
+        return self._jalankan_crud(self._tambah_kamar, (nomor_kamar, asrama_id, kapasitas), [("kamar", asrama_id)])
+
+    def update_kamar(self, kamar_id_internal, nomor_kamar_baru, kapasitas_baru, asrama_id_konteks):
+        return self._jalankan_crud(self._update_kamar, (kamar_id_internal, nomor_kamar_baru, kapasitas_baru, asrama_id_konteks),
+                                   [("kamar", asrama_id_konteks)] + self._kunci_cache_kamar(kamar_id_internal))
+
+    def delete_kamar(self, kamar_id_internal):
+        return self._jalankan_crud(self._hapus_kamar, (kamar_id_internal,), self._kunci_cache_kamar(kamar_id_internal))
+
+    def _kunci_cache_kamar(self, kamar_id_internal):
+        return self._cache.kunci_dengan(lambda kunci, daftar: kunci[0] == "kamar" and
+                                        any(k['kamar_id_internal'] == kamar_id_internal for k in daftar))
+
+    # --- Bacaan kamar dan penghuni ---
+    def get_penghuni_in_kamar(self, nomor_kamar, asrama_id):
+        query = """
+            SELECT nim, nama_penghuni, fakultas
+            FROM vw_DaftarPenghuniLengkap
+            WHERE nomor_kamar = ? AND id_asrama_kamar = ?
+            ORDER BY nama_penghuni
+        """
+        penghuni = self._execute_query(query, (nomor_kamar, asrama_id), fetch_all=True)
+        options_display = [f"{p['nim']} - {p['nama_penghuni']}" for p in penghuni or []]
+        if not options_display:
+            options_display = ["Info: Belum ada penghuni di kamar ini."]
+        return options_display, penghuni or []
+
+    def get_kamar_snapshot(self, nomor_kamar, asrama_id):
+        """Padanan sp_SnapshotKamar: header kamar dan daftar penghuni dibaca dalam satu transaksi baca."""
+        snapshot = {'kamar': None, 'kapasitas': 0, 'jumlah_penghuni': 0, 'penghuni': []}
+        if not self._terbuka: return snapshot
+        conn = self._conn()
+        transaksi_sendiri = not conn.in_transaction  # di dalam _transaksi(), baca saja dari transaksi pemanggil
+        try:
+            if transaksi_sendiri:
+                conn.execute("BEGIN")
+            try:
+                kamar = conn.execute("""SELECT K.kamar_id_internal, K.nomor_kamar, K.asrama_id, A.nama_asrama, K.kapasitas, K.occupied AS jumlah_penghuni
+                                        FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id
+                                        WHERE K.nomor_kamar = ? AND K.asrama_id = ?""", (nomor_kamar, asrama_id)).fetchone()
+                penghuni = conn.execute("""SELECT P.nim, P.nama_penghuni, F.nama_fakultas AS fakultas
+                                           FROM Penghuni P LEFT JOIN Fakultas F ON P.fakultas_id = F.fakultas_id
+                                           WHERE P.kamar_id_internal = ? ORDER BY P.nama_penghuni""",
+                                        (kamar['kamar_id_internal'] if kamar else None,)).fetchall()
+            finally:
+                if transaksi_sendiri:
+                    conn.execute("COMMIT")
+        except sqlite3.Error as err:
+            print(f"Kesalahan saat mengambil data kamar {nomor_kamar} (asrama {asrama_id}): {err}")
+            if not transaksi_sendiri:
+                raise
+            return snapshot
+        if kamar:
+            snapshot.update(kamar=kamar, kapasitas=kamar['kapasitas'], jumlah_penghuni=kamar['jumlah_penghuni'], penghuni=penghuni)
+        return snapshot
+
+    def get_jumlah_penghuni(self, nomor_kamar, asrama_id):
+        result = self._execute_query("SELECT occupied FROM Kamar WHERE nomor_kamar = ? AND asrama_id = ?", (nomor_kamar, asrama_id), fetch_one=True)
+        return result['occupied'] if result else 0
+
+    def rekonsiliasi_okupansi(self):
+        """Menghitung ulang Kamar.occupied dari tabel Penghuni; mengembalikan jumlah kamar yang dikoreksi, atau None jika gagal."""
+        if not self._terbuka: return None
+        try:
+            with self._transaksi() as conn:
+                dikoreksi = conn.execute(schema_sqlite.SQL_REKONSILIASI_OKUPANSI).rowcount
+            print(f"Rekonsiliasi okupansi selesai: {dikoreksi} kamar dikoreksi.")
+            return dikoreksi
+        except sqlite3.Error as err:
+            print(f"Kesalahan saat rekonsiliasi okupansi kamar: {err}")
+            return None
+
+    def get_kapasitas_kamar(self, nomor_kamar, asrama_id):
+        result = self._execute_query("SELECT kapasitas FROM vw_DetailKamarPenghuni WHERE nomor_kamar = ? AND asrama_id = ?", (nomor_kamar, asrama_id), fetch_one=True)
+        return result['kapasitas'] if result else 0
+
+    def cari_kamar_kosong(self, asrama_id=None, min_kosong=1, limit=None):
+        """Sama seperti DatabaseService.cari_kamar_kosong; memakai indeks kolom generated Kamar.sisa_kapasitas."""
+        kondisi, params = ["K.sisa_kapasitas >= ?"], [max(1, int(min_kosong))]
+        if asrama_id is not None:
+            kondisi.append("K.asrama_id = ?")
+            params.append(asrama_id)
+        query = f"""SELECT K.kamar_id_internal, K.nomor_kamar, K.asrama_id, A.nama_asrama, K.kapasitas,
+                           K.occupied AS jumlah_penghuni, K.sisa_kapasitas
+                    FROM Kamar K JOIN Asrama A ON K.asrama_id = A.asrama_id
+                    WHERE {' AND '.join(kondisi)}
+                    ORDER BY K.sisa_kapasitas DESC, A.nama_asrama, K.nomor_kamar"""
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return self._execute_query(query, tuple(params), fetch_all=True) or []
+
+    def get_all_fakultas(self):
+        return list(self._cache.ambil(("fakultas",), lambda: self._execute_query(
+            "SELECT fakultas_id, nama_fakultas FROM Fakultas ORDER BY nama_fakultas", fetch_all=True)) or [])
+
+    def get_fakultas_id_by_name(self, nama_fakultas):
+        fakultas_id = {f['nama_fakultas']: f['fakultas_id'] for f in self.get_all_fakultas()}.get(nama_fakultas)
+        if fakultas_id is None:
+            result = self._execute_query("SELECT fakultas_id FROM Fakultas WHERE nama_fakultas = ?", (nama_fakultas,), fetch_one=True)
+            fakultas_id = result['fakultas_id'] if result else None
+        return fakultas_id
+
+    def __del__(self):
+        self._close()
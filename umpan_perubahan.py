@@ -0,0 +1,124 @@
+"""
+Umpan perubahan (change feed) untuk penyegaran otomatis antar-klien, dibaca dari tabel log audit (tanpa akses database).
+
+Penanda berisi log_id tertinggi yang sudah dibaca dari setiap tabel log. Setiap polling mengambil baris dengan
+log_id di atas penanda dari ketiga tabel dalam satu kueri UNION ALL (range scan kunci primer per tabel), lalu
+meringkas asrama dan kamar yang terdampak sehingga layar aktif hanya memuat ulang bagian tersebut:
+    'asrama' : asrama yang daftar kamar atau namanya berubah (log asrama dan log kamar)
+    'kamar'  : kamar yang penghuni atau datanya berubah (semua log, termasuk kamar asal dan tujuan pindah)
+
+log_id dibagikan saat INSERT, bukan saat commit, sehingga transaksi yang lebih lama bisa commit setelah log_id
+yang lebih besar sudah terbaca. Nomor yang terlewati di bawah penanda ('celah') ikut dibaca ulang pada polling
+berikutnya selama BATAS_CELAH_DETIK; nomor yang tidak pernah muncul (transaksinya di-rollback) lalu dilupakan.
+"""
+import time
+
+BATAS_BAWAAN = 500
+BATAS_CELAH_DETIK = 120.0
+MAKS_CELAH = 1000
+
+# sumber: (tabel, kolom nim, fakultas, kamar lama, kamar baru, asrama lama, asrama baru, JOIN tambahan)
+SUMBER_PERUBAHAN = {
+    "penghuni": ("AuditLogAktivitasPenghuni", "L.nim", "L.fakultas_baru", "L.kamar_id_internal_lama", "L.kamar_id_internal_baru",
+                 "KL.asrama_id", "KB.asrama_id",
+                 """LEFT JOIN Kamar KL ON KL.kamar_id_internal = L.kamar_id_internal_lama
+                       LEFT JOIN Kamar KB ON KB.kamar_id_internal = L.kamar_id_internal_baru"""),
+    "kamar": ("AuditLogAktivitasKamar", "NULL", "NULL", "L.kamar_id_internal_aksi", "L.kamar_id_internal_aksi",
+              "L.asrama_id_lama", "L.asrama_id_baru", ""),
+    "asrama": ("AuditLogAktivitasAsrama", "NULL", "NULL", "NULL", "NULL", "L.asrama_id_aksi", "L.asrama_id_aksi", ""),
+}
+
+
+def kueri_penanda_awal():
+    """log_id tertinggi setiap tabel log saat ini (satu baris per sumber)."""
+    return "\n            UNION ALL ".join(
+        f"SELECT '{sumber}' AS sumber, IFNULL(MAX(log_id), 0) AS log_id FROM {tabel}"
+        for sumber, (tabel, *_) in SUMBER_PERUBAHAN.items())
+
+
+def hasil_awal(rows):
+    """Hasil ambil_perubahan tanpa event dengan penanda dari kueri_penanda_awal (None jika kueri gagal)."""
+    penanda = None
+    if rows is not None:
+        penanda = {sumber: {'log_id': 0, 'celah': {}} for sumber in SUMBER_PERUBAHAN}
+        for row in rows:
+            penanda[row['sumber']]['log_id'] = int(row['log_id'])
+    return {'penanda': penanda, 'perubahan': [], 'asrama': set(), 'kamar': set(), 'lengkap': True}
+
+
+def _batas_sumber(posisi, batas):
+    return batas + len(posisi['celah'])
+
+
+def kueri_perubahan(penanda, batas=BATAS_BAWAAN, placeholder="%s"):
+    """
+    Menyusun kueri UNION ALL event baru sejak penanda: log_id di atas penanda ditambah celah yang masih ditunggu,
+    paling banyak batas baris baru per sumber. Mengembalikan (query, params).
+    """
+    bagian, params = [], []
+    for sumber, (tabel, nim, fakultas, kamar_lama, kamar_baru, asrama_lama, asrama_baru, join) in SUMBER_PERUBAHAN.items():
+        posisi = penanda[sumber]
+        celah = sorted(posisi['celah'])
+        kondisi = f"L.log_id > {placeholder}"
+        if celah:
+            kondisi += f" OR L.log_id IN ({', '.join([placeholder] * len(celah))})"
+        bagian.append(f"""SELECT * FROM (
+                SELECT '{sumber}' AS sumber, L.log_id, L.aksi, L.user_aksi, {nim} AS nim, {fakultas} AS fakultas,
+                       {kamar_lama} AS kamar_lama, {kamar_baru} AS kamar_baru, {asrama_lama} AS asrama_lama, {asrama_baru} AS asrama_baru
+                FROM {tabel} L
+                {join}
+                WHERE {kondisi}
+                ORDER BY L.log_id LIMIT {placeholder}
+            ) AS umpan_{sumber}""")
+        params += [posisi['log_id'], *celah, _batas_sumber(posisi, batas)]
+    return "\n            UNION ALL ".join(bagian), tuple(params)
+
+
+def majukan_penanda(posisi, daftar_log_id, sekarang=None):
+    """
+    Memajukan posisi satu sumber ({'log_id': tertinggi, 'celah': {log_id: sejak}}) dengan log_id yang baru terbaca.
+    Mengembalikan (posisi baru, himpunan log_id yang belum pernah diterima). Celah yang lebih lama dari
+    BATAS_CELAH_DETIK dilupakan; dipakai juga oleh mode live layar riwayat.
+    """
+    sekarang = time.monotonic() if sekarang is None else sekarang
+    hw = posisi['log_id']
+    celah = {log_id: sejak for log_id, sejak in posisi['celah'].items() if sekarang - sejak < BATAS_CELAH_DETIK}
+    terbaca = sorted(int(log_id) for log_id in daftar_log_id)
+    diterima = {log_id for log_id in terbaca if log_id > hw or celah.pop(log_id, None) is not None}
+    baru = [log_id for log_id in terbaca if log_id > hw]
+    if baru:
+        ada = set(baru)
+        awal = max(hw + 1, baru[-1] - len(baru) - MAKS_CELAH)  # lompatan auto-increment besar tidak dicatat seluruhnya
+        celah.update((log_id, sekarang) for log_id in range(awal, baru[-1]) if log_id not in ada)
+        hw = baru[-1]
+    if len(celah) > MAKS_CELAH:
+        celah = dict(sorted(celah.items())[-MAKS_CELAH:])
+    return {'log_id': hw, 'celah': celah}, diterima
+
+
+def ringkas_perubahan(penanda, rows, batas=BATAS_BAWAAN, sekarang=None):
+    """
+    Memajukan penanda dengan baris hasil kueri_perubahan dan meringkas asrama/kamar yang terdampak.
+    rows=None (kueri gagal) mengembalikan penanda yang sama tanpa event. 'lengkap' bernilai False jika ada
+    sumber yang mencapai batas, artinya masih ada event lain yang bisa langsung diambil.
+    """
+    if rows is None:
+        return {'penanda': penanda, 'perubahan': [], 'asrama': set(), 'kamar': set(), 'lengkap': True}
+    sekarang = time.monotonic() if sekarang is None else sekarang
+    per_sumber = {sumber: [] for sumber in SUMBER_PERUBAHAN}
+    for row in rows:
+        per_sumber[row['sumber']].append(row)
+
+    penanda_baru, perubahan, lengkap = {}, [], True
+    for sumber, baris in per_sumber.items():
+        posisi = penanda[sumber]
+        penanda_baru[sumber], diterima = majukan_penanda(posisi, [row['log_id'] for row in baris], sekarang)
+        perubahan += [row for row in baris if int(row['log_id']) in diterima]
+        if len(baris) >= _batas_sumber(posisi, batas):
+            lengkap = False
+
+    perubahan.sort(key=lambda row: (row['sumber'], row['log_id']))
+    asrama = {row[kolom] for row in perubahan if row['sumber'] != "penghuni"
+              for kolom in ('asrama_lama', 'asrama_baru') if row[kolom] is not None}
+    kamar = {row[kolom] for row in perubahan for kolom in ('kamar_lama', 'kamar_baru') if row[kolom] is not None}
+    return {'penanda': penanda_baru, 'perubahan': perubahan, 'asrama': asrama, 'kamar': kamar, 'lengkap': lengkap}